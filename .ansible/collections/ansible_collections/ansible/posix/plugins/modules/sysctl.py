@@ -20,7 +20,7 @@ options:
     name:
         description:
             - The dot-separated path (also known as O(key)) specifying the sysctl variable.
-        required: true
+            - Required unless O(settings) is used.
         aliases: [ 'key' ]
         type: str
     value:
@@ -56,6 +56,18 @@ options:
             - Verify token value with the sysctl command and set with C(-w) if necessary.
         type: bool
         default: false
+    settings:
+        description:
+            - Manage many keys of one O(sysctl_file) in a single module run.
+            - Either a dict of key to value, where a V(null) value removes the key,
+              or a list of dicts with C(name) (or C(key)), C(value) (or C(val)) and an
+              optional C(state) (V(present) or V(absent), default O(state)).
+            - Current values are read from C(/proc/sys) in-process where available, the
+              file is rewritten at most once and reloaded at most once, whatever the
+              number of keys.
+            - Mutually exclusive with O(name) and O(value).
+        type: raw
+        version_added: "2.2.0"
 author:
 - David CHANIAL (@davixx)
 '''
@@ -93,6 +105,38 @@ EXAMPLES = r'''
     sysctl_set: true
     state: present
     reload: true
+
+# Apply a set of keys with one file write and one reload
+- ansible.posix.sysctl:
+    sysctl_file: /etc/sysctl.d/98-networking-performance.conf
+    settings:
+      net.core.rmem_max: 16777216
+      net.core.wmem_max: 16777216
+      net.ipv4.tcp_rmem: 4096 87380 16777216
+
+# The list form can also remove keys
+- ansible.posix.sysctl:
+    sysctl_file: /etc/sysctl.d/99-hardened.conf
+    settings:
+      - name: kernel.kptr_restrict
+        value: 2
+      - name: kernel.unused_key
+        state: absent
+'''
+
+RETURN = r'''
+changes:
+    description:
+        - Per-key outcome in O(settings) mode, keyed by sysctl name; only keys that changed are listed.
+        - C(file) is the previous value in O(sysctl_file) (V(null) when the key was absent), C(value)
+          the desired value (V(null) when removed) and C(proc) the previous runtime value.
+    returned: when O(settings) is used
+    type: dict
+    sample: {"net.core.rmem_max": {"file": "212992", "value": "16777216", "proc": "212992"}}
+reloaded:
+    description: Whether the sysctl file was reloaded.
+    returned: when O(settings) is used
+    type: bool
 '''
 
 # ==============================================================
@@ -108,6 +152,9 @@ from ansible.module_utils.parsing.convert_bool import BOOLEANS_FALSE, BOOLEANS_T
 from ansible.module_utils._text import to_native
 
 
+PROC_SYS = '/proc/sys'
+
+
 class SysctlModule(object):
 
     # We have to use LANG=C because we are capturing STDERR of sysctl to detect
@@ -129,8 +176,13 @@ class SysctlModule(object):
         self.changed = False    # will change occur
         self.set_proc = False   # does sysctl need to set value
         self.write_file = False  # does the sysctl file need to be reloaded
+        self.reloaded = False
+        self.changes = {}       # per-key changes in settings mode
 
-        self.process()
+        if self.args.get('settings') is not None:
+            self.process_settings()
+        else:
+            self.process()
 
     # ==============================================================
     #   LOGIC
@@ -194,6 +246,89 @@ class SysctlModule(object):
             if self.changed and self.args['reload']:
                 self.reload_sysctl()
 
+    def _parse_settings(self, settings):
+        """Normalize O(settings) to an ordered list of (name, value, state)."""
+        default_state = self.args['state']
+        if isinstance(settings, dict):
+            items = [dict(name=k, value=v, state='present' if v is not None else 'absent')
+                     for k, v in settings.items()]
+        elif isinstance(settings, list):
+            items = []
+            for item in settings:
+                if not isinstance(item, dict):
+                    self.module.fail_json(msg="settings list items must be dicts, got %r" % (item,))
+                items.append(dict(
+                    name=item.get('name', item.get('key')),
+                    value=item.get('value', item.get('val')),
+                    state=item.get('state', default_state),
+                ))
+        else:
+            self.module.fail_json(msg="settings must be a dict or a list of dicts")
+
+        entries = []
+        seen = set()
+        for item in items:
+            name = item['name']
+            if not isinstance(name, string_types) or not name.strip():
+                self.module.fail_json(msg="settings entry without a name: %r" % (item,))
+            name = name.strip()
+            if name in seen:
+                self.module.fail_json(msg="settings lists %s more than once" % name)
+            seen.add(name)
+            state = item['state']
+            if state not in ('present', 'absent'):
+                self.module.fail_json(msg="invalid state %r for %s" % (state, name))
+            value = self._parse_value(item['value'])
+            if state == 'present' and not isinstance(value, string_types):
+                value = to_native(value)
+            if state == 'present' and value == '':
+                self.module.fail_json(msg="value cannot be blank for %s" % name)
+            entries.append((name, value, state))
+        return entries
+
+    def process_settings(self):
+        """Batch mode: diff every key, write the file once, reload at most once."""
+        self.platform = platform.system().lower()
+        self.entries = self._parse_settings(self.args['settings'])
+        self.read_sysctl_file()
+        self.fixed_lines = self._fixed_lines(self.entries)
+
+        set_proc = []
+        reload_needed = False
+        for name, value, state in self.entries:
+            file_value = self.file_values.get(name)
+            proc_value = self.get_token_curr_value(name)
+            key_changed = False
+            if state == 'absent':
+                key_changed = bool(file_value)
+                self.write_file = self.write_file or key_changed
+            elif file_value != value:
+                key_changed = True
+                self.write_file = True
+            elif self.args['reload'] and not self._values_is_equal(proc_value, value):
+                key_changed = True
+            if self.args['sysctl_set'] and state == 'present' and not self._values_is_equal(proc_value, value):
+                key_changed = True
+                if proc_value is not None:
+                    set_proc.append((name, value))
+            if key_changed:
+                reload_needed = True
+                self.changes[name] = dict(
+                    file=file_value,
+                    value=value if state == 'present' else None,
+                    proc=proc_value.strip() if proc_value is not None else None,
+                )
+        self.changed = bool(self.changes)
+
+        if not self.module.check_mode:
+            for name, value in set_proc:
+                self.set_token_value(name, value)
+            if self.write_file:
+                self.write_sysctl()
+            if reload_needed and self.args['reload']:
+                self.reload_sysctl()
+                self.reloaded = True
+
     def _values_is_equal(self, a, b):
         """Expects two string values. It will split the string by whitespace
         and compare each value. It will return True if both lists are the same,
@@ -239,8 +374,17 @@ class SysctlModule(object):
     #   SYSCTL COMMAND MANAGEMENT
     # ==============================================================
 
-    # Use the sysctl command to find the current value
+    # Read the current value from /proc/sys, falling back to the sysctl command
     def get_token_curr_value(self, token):
+        if self.platform == 'linux':
+            # sysctl names use '.' as separator and '/' for a literal '.'
+            # (net.ipv4.conf.eth0/100.forwarding -> net/ipv4/conf/eth0.100/forwarding)
+            proc_path = os.path.join(PROC_SYS, *[part.replace('/', '.') for part in token.split('.')])
+            try:
+                with open(proc_path, 'r') as proc_file:
+                    return proc_file.read()
+            except (IOError, OSError):
+                pass
         if self.platform == 'openbsd':
             # openbsd doesn't support -e, just drop it
             thiscmd = "%s -n %s" % (self.sysctl_cmd, token)
@@ -284,15 +428,18 @@ class SysctlModule(object):
         elif self.platform == 'openbsd':
             # openbsd doesn't support -p and doesn't have a sysctl service,
             # so we have to set every value with its own sysctl call
+            entries = getattr(self, 'entries', None) or [(self.args['name'], self.args['value'], self.args['state'])]
+            managed = set(name for name, _, _ in entries)
+            rc = 0
             for k, v in self.file_values.items():
-                rc = 0
-                if k != self.args['name']:
+                if k not in managed:
                     rc = self.set_token_value(k, v)
                     # FIXME this check is probably not needed as set_token_value would fail_json if rc != 0
                     if rc != 0:
                         break
-            if rc == 0 and self.args['state'] == "present":
-                rc = self.set_token_value(self.args['name'], self.args['value'])
+            for name, value, state in entries:
+                if rc == 0 and state == "present":
+                    rc = self.set_token_value(name, value)
 
             # set_token_value would have called fail_json in case of failure
             # so return here and do not continue to the error processing below
@@ -339,29 +486,36 @@ class SysctlModule(object):
 
     # Fix the value in the sysctl file content
     def fix_lines(self):
-        checked = []
-        self.fixed_lines = []
+        self.fixed_lines = self._fixed_lines([(self.args['name'], self.args['value'], self.args['state'])])
+
+    def _fixed_lines(self, entries):
+        """File lines with every (name, value, state) entry applied in one pass."""
+        desired = dict((name, (value, state)) for name, value, state in entries)
+        checked = set()
+        fixed_lines = []
         for line in self.file_lines:
             if not line.strip() or line.strip().startswith(("#", ";")) or "=" not in line:
-                self.fixed_lines.append(line)
+                fixed_lines.append(line)
                 continue
             tmpline = line.strip()
             k, v = tmpline.split('=', 1)
             k = k.strip()
             v = v.strip()
             if k not in checked:
-                checked.append(k)
-                if k == self.args['name']:
-                    if self.args['state'] == "present":
-                        new_line = "%s=%s\n" % (k, self.args['value'])
-                        self.fixed_lines.append(new_line)
+                checked.add(k)
+                if k in desired:
+                    if desired[k][1] == "present":
+                        new_line = "%s=%s\n" % (k, desired[k][0])
+                        fixed_lines.append(new_line)
                 else:
                     new_line = "%s=%s\n" % (k, v)
-                    self.fixed_lines.append(new_line)
+                    fixed_lines.append(new_line)
 
-        if self.args['name'] not in checked and self.args['state'] == "present":
-            new_line = "%s=%s\n" % (self.args['name'], self.args['value'])
-            self.fixed_lines.append(new_line)
+        for name, value, state in entries:
+            if name not in checked and state == "present":
+                new_line = "%s=%s\n" % (name, value)
+                fixed_lines.append(new_line)
+        return fixed_lines
 
     # Completely rewrite the sysctl file
     def write_sysctl(self):
@@ -388,18 +542,24 @@ def main():
     # defining module
     module = AnsibleModule(
         argument_spec=dict(
-            name=dict(aliases=['key'], required=True),
+            name=dict(aliases=['key']),
             value=dict(aliases=['val'], required=False, type='str'),
             state=dict(default='present', choices=['present', 'absent']),
             reload=dict(default=True, type='bool'),
             sysctl_set=dict(default=False, type='bool'),
             ignoreerrors=dict(default=False, type='bool'),
-            sysctl_file=dict(default='/etc/sysctl.conf', type='path')
+            sysctl_file=dict(default='/etc/sysctl.conf', type='path'),
+            settings=dict(type='raw'),
         ),
         supports_check_mode=True,
-        required_if=[('state', 'present', ['value'])],
+        mutually_exclusive=[('name', 'settings'), ('value', 'settings')],
+        required_one_of=[('name', 'settings')],
     )
 
+    if module.params['settings'] is not None:
+        result = SysctlModule(module)
+        module.exit_json(changed=result.changed, changes=result.changes, reloaded=result.reloaded)
+
     if module.params['name'] is None:
         module.fail_json(msg="name cannot be None")
     if module.params['state'] == 'present' and module.params['value'] is None:
@@ -11,6 +11,8 @@ name: memcached
 short_description: Use memcached DB for cache
 description:
   - This cache uses JSON formatted, per host records saved in memcached.
+  - The set of cached hosts is kept in sharded, append-only logs, so an update appends one line
+    instead of re-uploading the whole key set. Logs are compacted once they hold mostly stale lines.
 requirements:
   - memcache (python lib)
 options:
@@ -44,15 +46,54 @@ options:
     ini:
       - key: fact_caching_timeout
         section: defaults
+  _keyset_shards:
+    description:
+      - Number of memcached entries the set of cached hosts is spread over.
+      - Changing it on an existing cache hides previously cached hosts from the key set until they are cached again.
+    type: integer
+    default: 16
+    env:
+      - name: ANSIBLE_CACHE_MEMCACHED_KEYSET_SHARDS
+    ini:
+      - key: fact_caching_memcached_keyset_shards
+        section: defaults
+    version_added: 12.4.0
+  _keyset_flush_size:
+    description:
+      - Number of key set updates buffered before they are written to memcached.
+      - Buffered updates are also written by the first update after one second, and when the process exits.
+    type: integer
+    default: 64
+    env:
+      - name: ANSIBLE_CACHE_MEMCACHED_KEYSET_FLUSH_SIZE
+    ini:
+      - key: fact_caching_memcached_keyset_flush_size
+        section: defaults
+    version_added: 12.4.0
+  _pool_size:
+    description:
+      - Maximum number of memcached connections. Callers wait for a free connection once it is reached.
+      - Defaults to the number of forks.
+    type: integer
+    env:
+      - name: ANSIBLE_CACHE_MEMCACHED_POOL_SIZE
+    ini:
+      - key: fact_caching_memcached_pool_size
+        section: defaults
+    version_added: 12.4.0
 """
 
+import atexit
 import collections
 import os
+import threading
 import time
+import zlib
 from collections.abc import MutableSet
 from itertools import chain
 from multiprocessing import Lock
 
+from ansible import constants as C
 from ansible.errors import AnsibleError
 from ansible.plugins.cache import BaseCacheModule
 from ansible.utils.display import Display
@@ -73,6 +114,7 @@ class ProxyClientPool:
     connection pool.
 
     Available connections are maintained in a deque and released in a FIFO manner.
+    Once max_connections are in use, callers wait for one to be released.
     """
 
     def __init__(self, *args, **kwargs):
@@ -87,6 +129,7 @@ class ProxyClientPool:
         self._available_connections = collections.deque(maxlen=self.max_connections)
         self._locked_connections = set()
         self._lock = Lock()
+        self._released = threading.Condition()
 
     def _check_safe(self):
         if self.pid != os.getpid():
@@ -99,11 +142,14 @@ class ProxyClientPool:
 
     def get_connection(self):
         self._check_safe()
-        try:
-            connection = self._available_connections.popleft()
-        except IndexError:
-            connection = self.create_connection()
-        self._locked_connections.add(connection)
+        with self._released:
+            while not self._available_connections and self._num_connections >= self.max_connections:
+                self._released.wait()
+            try:
+                connection = self._available_connections.popleft()
+            except IndexError:
+                connection = self.create_connection()
+            self._locked_connections.add(connection)
         return connection
 
     def create_connection(self):
@@ -114,8 +160,10 @@ class ProxyClientPool:
 
     def release_connection(self, connection):
         self._check_safe()
-        self._locked_connections.remove(connection)
-        self._available_connections.append(connection)
+        with self._released:
+            self._locked_connections.discard(connection)
+            self._available_connections.append(connection)
+            self._released.notify()
 
     def disconnect_all(self):
         for conn in chain(self._available_connections, self._locked_connections):
@@ -140,13 +188,68 @@ class CacheModuleKeys(MutableSet):
     """
     A set subclass that keeps track of insertion time and persists
     the set in memcached.
+
+    The set is spread over shards by a CRC32 of the key. Each shard is an
+    append-only log of "<timestamp> TAB <key>" (add) and "- TAB <key>" (discard)
+    lines, so an update appends one line instead of re-uploading the set.
+    Updates are buffered and appended per shard; a shard is rewritten
+    (compacted) once its log is more than twice as long as its live keys.
+    Entries written by older versions under PREFIX alone are migrated on load.
     """
 
     PREFIX = "ansible_cache_keys"
+    # flush buffered updates at least this often (seconds)
+    FLUSH_INTERVAL = 1.0
+    # log lines a shard may hold beyond twice its live keys before compaction
+    COMPACT_SLACK = 64
 
-    def __init__(self, cache, *args, **kwargs):
+    def __init__(self, cache, *args, shards=16, flush_size=64, **kwargs):
         self._cache = cache
         self._keyset = dict(*args, **kwargs)
+        self._shards = max(1, shards)
+        self._flush_size = max(1, flush_size)
+        self._log_lines = collections.Counter()
+        self._live = collections.Counter()
+        for key in self._keyset:
+            self._live[self._shard(key)] += 1
+        self._pending = collections.defaultdict(list)
+        self._num_pending = 0
+        self._last_flush = time.time()
+        self._lock = threading.RLock()
+
+    def _shard(self, key):
+        return f"{self.PREFIX}.{zlib.crc32(key.encode('utf-8')) % self._shards}"
+
+    def shard_names(self):
+        return [f"{self.PREFIX}.{n}" for n in range(self._shards)]
+
+    @staticmethod
+    def _text(value):
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def load(self):
+        """Read every shard (and a pre-shard key set) with one get_multi."""
+        data = self._cache.get_multi([self.PREFIX] + self.shard_names())
+        with self._lock:
+            for name in self.shard_names():
+                log = self._text(data.get(name)) or ""
+                lines = log.splitlines()
+                self._log_lines[name] = len(lines)
+                for line in lines:
+                    stamp, sep, key = line.partition("\t")
+                    if not sep:
+                        continue
+                    if stamp == "-":
+                        self._remove(key)
+                    else:
+                        self._insert(key, float(stamp))
+            legacy = data.get(self.PREFIX)
+            if isinstance(legacy, dict) and legacy:
+                for key, stamp in legacy.items():
+                    if key not in self._keyset:
+                        self._insert(key, stamp)
+                self._compact(self.shard_names())
+                self._cache.delete(self.PREFIX)
 
     def __contains__(self, key):
         return key in self._keyset
@@ -157,23 +260,76 @@ class CacheModuleKeys(MutableSet):
     def __len__(self):
         return len(self._keyset)
 
+    def timestamp(self, key):
+        return self._keyset.get(key)
+
+    def _insert(self, key, stamp):
+        if key not in self._keyset:
+            self._live[self._shard(key)] += 1
+        self._keyset[key] = stamp
+
+    def _remove(self, key):
+        if self._keyset.pop(key, None) is not None:
+            self._live[self._shard(key)] -= 1
+            return True
+        return False
+
+    def _log(self, key, line):
+        self._pending[self._shard(key)].append(line)
+        self._num_pending += 1
+        if self._num_pending >= self._flush_size or time.time() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+
     def add(self, value):
-        self._keyset[value] = time.time()
-        self._cache.set(self.PREFIX, self._keyset)
+        stamp = time.time()
+        with self._lock:
+            self._insert(value, stamp)
+            self._log(value, f"{stamp!r}\t{value}\n")
 
     def discard(self, value):
-        del self._keyset[value]
-        self._cache.set(self.PREFIX, self._keyset)
+        with self._lock:
+            if self._remove(value):
+                self._log(value, f"-\t{value}\n")
 
     def remove_by_timerange(self, s_min, s_max):
-        for k in list(self._keyset.keys()):
-            t = self._keyset[k]
-            if s_min < t < s_max:
-                del self._keyset[k]
-        self._cache.set(self.PREFIX, self._keyset)
+        # Only the in-memory view changes: stale lines carry their timestamps and are
+        # dropped from memcached when their shard is next compacted.
+        with self._lock:
+            for k in [k for k, t in self._keyset.items() if s_min < t < s_max]:
+                self._remove(k)
+
+    def flush(self):
+        """Append the buffered updates, one call per shard, and compact grown shards."""
+        with self._lock:
+            compact = []
+            for name, lines in self._pending.items():
+                total = self._log_lines[name] + len(lines)
+                if total > 2 * self._live[name] + self.COMPACT_SLACK or not self._cache.append(name, "".join(lines)):
+                    # also taken when the shard does not exist yet (append fails)
+                    compact.append(name)
+                else:
+                    self._log_lines[name] = total
+            self._pending.clear()
+            self._num_pending = 0
+            self._last_flush = time.time()
+            if compact:
+                self._compact(compact)
+
+    def _compact(self, names):
+        logs = {name: [] for name in names}
+        for key, stamp in self._keyset.items():
+            name = self._shard(key)
+            if name in logs:
+                logs[name].append(f"{stamp!r}\t{key}\n")
+        self._cache.set_multi({name: "".join(lines) for name, lines in logs.items()})
+        for name, lines in logs.items():
+            self._log_lines[name] = len(lines)
 
 
 class CacheModule(BaseCacheModule):
+    # keys per get_multi in copy()
+    get_multi_batch_size = 500
+
     def __init__(self, *args, **kwargs):
         connection = ["127.0.0.1:11211"]
 
@@ -182,13 +338,20 @@ class CacheModule(BaseCacheModule):
             connection = self.get_option("_uri")
         self._timeout = self.get_option("_timeout")
         self._prefix = self.get_option("_prefix")
+        pool_size = self.get_option("_pool_size") or C.DEFAULT_FORKS
 
         if not HAS_MEMCACHE:
             raise AnsibleError("python-memcached is required for the memcached fact cache")
 
         self._cache = {}
-        self._db = ProxyClientPool(connection, debug=0)
-        self._keys = CacheModuleKeys(self._db, self._db.get(CacheModuleKeys.PREFIX) or [])
+        self._db = ProxyClientPool(connection, debug=0, max_connections=max(1, pool_size))
+        self._keys = CacheModuleKeys(
+            self._db,
+            shards=self.get_option("_keyset_shards"),
+            flush_size=self.get_option("_keyset_flush_size"),
+        )
+        self._keys.load()
+        atexit.register(self._keys.flush)
 
     def _make_key(self, key):
         return f"{self._prefix}{key}"
@@ -198,6 +361,10 @@ class CacheModule(BaseCacheModule):
             expiry_age = time.time() - self._timeout
             self._keys.remove_by_timerange(0, expiry_age)
 
+    def _expired(self, key):
+        stamp = self._keys.timestamp(key)
+        return stamp is None or (self._timeout > 0 and stamp <= time.time() - self._timeout)
+
     def get(self, key):
         if key not in self._cache:
             value = self._db.get(self._make_key(key))
@@ -221,20 +388,38 @@ class CacheModule(BaseCacheModule):
         return list(iter(self._keys))
 
     def contains(self, key):
-        self._expire_keys()
-        return key in self._keys
+        return not self._expired(key)
 
     def delete(self, key):
-        del self._cache[key]
+        self._cache.pop(key, None)
         self._db.delete(self._make_key(key))
         self._keys.discard(key)
 
     def flush(self):
-        for key in self.keys():
-            self.delete(key)
+        keys = self.keys()
+        self._db.delete_multi([self._make_key(key) for key in keys])
+        for key in keys:
+            self._cache.pop(key, None)
+            self._keys.discard(key)
+        self._keys.flush()
 
     def copy(self):
-        return self._keys.copy()
+        ret = {}
+        keys = self.keys()
+        for start in range(0, len(keys), self.get_multi_batch_size):
+            batch = [k for k in keys[start : start + self.get_multi_batch_size] if k not in self._cache]
+            if batch:
+                found = self._db.get_multi(batch, key_prefix=self._prefix)
+                for key in batch:
+                    if key in found:
+                        self._cache[key] = found[key]
+                    else:
+                        # record expired or evicted
+                        self._keys.discard(key)
+        for key in keys:
+            if key in self._cache:
+                ret[key] = self._cache[key]
+        return ret
 
     def __getstate__(self):
         return dict()
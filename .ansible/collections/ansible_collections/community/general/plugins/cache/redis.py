@@ -10,6 +10,8 @@ name: redis
 short_description: Use Redis DB for cache
 description:
   - This cache uses JSON formatted, per host records saved in Redis.
+  - Each update writes the record and its keyset entry in one pipelined transaction. Reading
+    the whole cache fetches the records with C(MGET) in batches.
 requirements:
   - redis>=2.4.5 (python lib)
 options:
@@ -64,11 +66,40 @@ options:
     ini:
       - key: fact_caching_timeout
         section: defaults
+  _compression:
+    description:
+      - Compress records before they are stored.
+      - V(zstd) requires the C(zstandard) python library (or Python 3.14 or newer).
+      - Records are read back whatever compression they were written with, so this can be changed
+        on an existing cache.
+    type: string
+    choices: [none, zlib, zstd]
+    default: none
+    env:
+      - name: ANSIBLE_CACHE_REDIS_COMPRESSION
+    ini:
+      - key: fact_caching_redis_compression
+        section: defaults
+    version_added: 12.4.0
+  _expire_interval:
+    description:
+      - Minimum number of seconds between two sweeps of expired entries from the keyset.
+      - Expired entries are never returned in between, they are only left in the keyset until the next sweep.
+      - Set to 0 to sweep on every lookup.
+    type: float
+    default: 60
+    env:
+      - name: ANSIBLE_CACHE_REDIS_EXPIRE_INTERVAL
+    ini:
+      - key: fact_caching_redis_expire_interval
+        section: defaults
+    version_added: 12.4.0
 """
 
 import json
 import re
 import time
+import zlib
 
 from ansible.errors import AnsibleError
 from ansible.parsing.ajson import AnsibleJSONDecoder, AnsibleJSONEncoder
@@ -82,6 +113,18 @@ try:
 except ImportError:
     HAS_REDIS = False
 
+try:
+    from compression import zstd
+
+    HAS_ZSTD = True
+except ImportError:
+    try:
+        import zstandard as zstd
+
+        HAS_ZSTD = True
+    except ImportError:
+        HAS_ZSTD = False
+
 display = Display()
 
 
@@ -93,8 +136,15 @@ class CacheModule(BaseCacheModule):
     when they are inserted. This allows for the usage of 'zremrangebyscore'
     to expire keys. This mechanism is used or a pattern matched 'scan' for
     performance.
+
+    Lookups filter the zset by score, so the 'zremrangebyscore' sweep only
+    reclaims space and runs at most once per '_expire_interval'.
     """
 
+    # keys per MGET in copy()
+    mget_batch_size = 500
+    zstd_magic = b"\x28\xb5\x2f\xfd"
+
     _sentinel_service_name = None
     re_url_conn = re.compile(r"^([^:]+|\[[^]]+\]):(\d+):(\d+)(?::(.*))?$")
     re_sent_conn = re.compile(r"^(.*):(\d+)$")
@@ -109,11 +159,18 @@ class CacheModule(BaseCacheModule):
         self._prefix = self.get_option("_prefix")
         self._keys_set = self.get_option("_keyset_name")
         self._sentinel_service_name = self.get_option("_sentinel_service_name")
+        self._compression = self.get_option("_compression") or "none"
+        self._expire_interval = float(self.get_option("_expire_interval"))
+        self._last_expire = None
 
         if not HAS_REDIS:
             raise AnsibleError(
                 "The 'redis' python module (version 2.4.5 or newer) is required for the redis fact cache, 'pip install redis'"
             )
+        if self._compression == "zstd" and not HAS_ZSTD:
+            raise AnsibleError(
+                "The 'zstandard' python module is required for zstd compression of the redis fact cache, 'pip install zstandard'"
+            )
 
         self._cache = {}
         kw = {}
@@ -177,6 +234,34 @@ class CacheModule(BaseCacheModule):
     def _make_key(self, key):
         return self._prefix + key
 
+    def _encode(self, value):
+        data = json.dumps(value, cls=AnsibleJSONEncoder, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        if self._compression == "zlib":
+            return zlib.compress(data)
+        if self._compression == "zstd":
+            return zstd.compress(data)
+        return data
+
+    def _decode(self, data):
+        # JSON never starts with the zlib (0x78) or zstd magic bytes, so records written
+        # with any compression setting (or none) can be told apart.
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if data[:4] == self.zstd_magic:
+            if not HAS_ZSTD:
+                raise AnsibleError(
+                    "The 'zstandard' python module is required to read zstd compressed redis fact cache entries"
+                )
+            data = zstd.decompress(data)
+        elif data[:1] == b"x":
+            data = zlib.decompress(data)
+        return json.loads(data.decode("utf-8"), cls=AnsibleJSONDecoder)
+
+    def _expiry_age(self):
+        if self._timeout > 0:
+            return time.time() - self._timeout
+        return None
+
     def get(self, key):
         if key not in self._cache:
             value = self._db.get(self._make_key(key))
@@ -186,49 +271,95 @@ class CacheModule(BaseCacheModule):
             if value is None:
                 self.delete(key)
                 raise KeyError
-            self._cache[key] = json.loads(value, cls=AnsibleJSONDecoder)
+            self._cache[key] = self._decode(value)
 
         return self._cache.get(key)
 
     def set(self, key, value):
-        value2 = json.dumps(value, cls=AnsibleJSONEncoder, sort_keys=True, indent=4)
+        value2 = self._encode(value)
+        # record and keyset entry in one round trip
+        pipe = self._db.pipeline(transaction=True)
         if self._timeout > 0:  # a timeout of 0 is handled as meaning 'never expire'
-            self._db.setex(self._make_key(key), int(self._timeout), value2)
+            pipe.setex(self._make_key(key), int(self._timeout), value2)
         else:
-            self._db.set(self._make_key(key), value2)
+            pipe.set(self._make_key(key), value2)
 
         if VERSION[0] == 2:
-            self._db.zadd(self._keys_set, time.time(), key)
+            pipe.zadd(self._keys_set, time.time(), key)
         else:
-            self._db.zadd(self._keys_set, {key: time.time()})
+            pipe.zadd(self._keys_set, {key: time.time()})
+        pipe.execute()
         self._cache[key] = value
 
     def _expire_keys(self):
         if self._timeout > 0:
-            expiry_age = time.time() - self._timeout
-            self._db.zremrangebyscore(self._keys_set, 0, expiry_age)
+            now = time.time()
+            if self._last_expire is not None and now - self._last_expire < self._expire_interval:
+                return
+            self._last_expire = now
+            self._db.zremrangebyscore(self._keys_set, 0, now - self._timeout)
 
     def keys(self):
         self._expire_keys()
-        return self._db.zrange(self._keys_set, 0, -1)
+        expiry_age = self._expiry_age()
+        if expiry_age is None:
+            keys = self._db.zrange(self._keys_set, 0, -1)
+        else:
+            keys = self._db.zrangebyscore(self._keys_set, f"({expiry_age}", "+inf")
+        return [self._to_text(k) for k in keys]
 
     def contains(self, key):
         self._expire_keys()
-        return self._db.zrank(self._keys_set, key) is not None
+        score = self._db.zscore(self._keys_set, key)
+        if score is None:
+            return False
+        expiry_age = self._expiry_age()
+        return expiry_age is None or score > expiry_age
 
     def delete(self, key):
         if key in self._cache:
             del self._cache[key]
-        self._db.delete(self._make_key(key))
-        self._db.zrem(self._keys_set, key)
+        pipe = self._db.pipeline(transaction=True)
+        pipe.delete(self._make_key(key))
+        pipe.zrem(self._keys_set, key)
+        pipe.execute()
 
     def flush(self):
-        for key in list(self.keys()):
-            self.delete(key)
+        keys = list(self._db.zrange(self._keys_set, 0, -1))
+        self._cache = {}
+        if not keys:
+            return
+        pipe = self._db.pipeline(transaction=True)
+        for start in range(0, len(keys), self.mget_batch_size):
+            batch = keys[start : start + self.mget_batch_size]
+            pipe.delete(*[self._make_key(self._to_text(k)) for k in batch])
+            pipe.zrem(self._keys_set, *batch)
+        pipe.execute()
+
+    @staticmethod
+    def _to_text(key):
+        return key.decode("utf-8") if isinstance(key, bytes) else key
 
     def copy(self):
-        # TODO: there is probably a better way to do this in redis
-        ret = {k: self.get(k) for k in self.keys()}
+        ret = {}
+        missing = []
+        keys = self.keys()
+        for start in range(0, len(keys), self.mget_batch_size):
+            batch = keys[start : start + self.mget_batch_size]
+            uncached = [k for k in batch if k not in self._cache]
+            if uncached:
+                values = self._db.mget([self._make_key(k) for k in uncached])
+                for key, value in zip(uncached, values):
+                    if value is None:
+                        missing.append(key)
+                    else:
+                        self._cache[key] = self._decode(value)
+            for key in batch:
+                if key in self._cache:
+                    ret[key] = self._cache[key]
+        if missing:
+            # same guard as get(): drop keyset entries whose record is gone
+            self._db.zrem(self._keys_set, *missing)
         return ret
 
     def __getstate__(self):
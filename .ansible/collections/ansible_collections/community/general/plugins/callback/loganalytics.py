@@ -12,6 +12,8 @@ author: "Cyrus Li (@zhcli) <cyrus1006@gmail.com>"
 description:
   - This callback plugin posts task results in JSON formatted to an Azure Log Analytics workspace.
   - Credits to authors of splunk callback plugin.
+  - Events are sent from a background thread in batches, so a slow workspace endpoint does not hold up the play.
+    Queued events are delivered when the playbook finishes.
 version_added: "2.4.0"
 requirements:
   - Whitelisting this callback plugin.
@@ -35,6 +37,48 @@ options:
     ini:
       - section: callback_loganalytics
         key: shared_key
+  queue_size:
+    description:
+      - Number of events that can wait for delivery. Tasks wait for room when the queue is full.
+      - Set to V(0) to send every event synchronously in its own request.
+    type: int
+    default: 10000
+    env:
+      - name: LOGANALYTICS_QUEUE_SIZE
+    ini:
+      - section: callback_loganalytics
+        key: queue_size
+    version_added: 12.4.0
+  flush_size:
+    description: Maximum number of events sent in one request.
+    type: int
+    default: 100
+    env:
+      - name: LOGANALYTICS_FLUSH_SIZE
+    ini:
+      - section: callback_loganalytics
+        key: flush_size
+    version_added: 12.4.0
+  flush_interval:
+    description: Maximum number of seconds an event waits for its batch to fill up.
+    type: float
+    default: 2.0
+    env:
+      - name: LOGANALYTICS_FLUSH_INTERVAL
+    ini:
+      - section: callback_loganalytics
+        key: flush_interval
+    version_added: 12.4.0
+  retries:
+    description: How often a failed request is retried (with exponential backoff) before its events are dropped.
+    type: int
+    default: 3
+    env:
+      - name: LOGANALYTICS_RETRIES
+    ini:
+      - section: callback_loganalytics
+        key: retries
+    version_added: 12.4.0
 """
 
 EXAMPLES = r"""
@@ -68,6 +112,10 @@ from ansible.plugins.callback import CallbackBase
 from ansible_collections.community.general.plugins.module_utils.datetime import (
     now,
 )
+from ansible_collections.community.general.plugins.plugin_utils._event_shipper import (
+    EventShipper,
+    KeepAliveClient,
+)
 
 
 class AzureLogAnalyticsSource:
@@ -95,7 +143,10 @@ class AzureLogAnalyticsSource:
     def __rfc1123date(self):
         return now().strftime("%a, %d %b %Y %H:%M:%S GMT")
 
-    def send_event(self, workspace_id, shared_key, state, result, runtime):
+    def workspace_url(self, workspace_id):
+        return self.__build_workspace_url(workspace_id)
+
+    def build_event(self, state, result, runtime):
         if result._task_fields["args"].get("_ansible_check_mode") is True:
             self.ansible_check_mode = True
 
@@ -129,24 +180,32 @@ class AzureLogAnalyticsSource:
         data["extra_vars"] = self.extra_vars
 
         # Preparing the playbook logs as JSON format and send to Azure log analytics
-        jsondata = json.dumps({"event": data}, cls=AnsibleJSONEncoder, sort_keys=True)
-        content_length = len(jsondata)
+        return json.dumps({"event": data}, cls=AnsibleJSONEncoder, sort_keys=True)
+
+    def _headers(self, workspace_id, shared_key, content_length):
         rfc1123date = self.__rfc1123date()
-        signature = self.__build_signature(rfc1123date, workspace_id, shared_key, content_length)
-        workspace_url = self.__build_workspace_url(workspace_id)
+        return {
+            "content-type": "application/json",
+            "Authorization": self.__build_signature(rfc1123date, workspace_id, shared_key, content_length),
+            "Log-Type": "ansible_playbook",
+            "x-ms-date": rfc1123date,
+        }
+
+    def send_event(self, workspace_id, shared_key, state, result, runtime):
+        jsondata = self.build_event(state, result, runtime)
 
         open_url(
-            workspace_url,
+            self.__build_workspace_url(workspace_id),
             jsondata,
-            headers={
-                "content-type": "application/json",
-                "Authorization": signature,
-                "Log-Type": "ansible_playbook",
-                "x-ms-date": rfc1123date,
-            },
+            headers=self._headers(workspace_id, shared_key, len(jsondata)),
             method="POST",
         )
 
+    def send_batch(self, client, workspace_id, shared_key, events):
+        # The Data Collector API takes a JSON array of records per request
+        body = b"[" + b",".join(events) + b"]"
+        client.post(body, self._headers(workspace_id, shared_key, len(body)))
+
 
 class CallbackModule(CallbackBase):
     CALLBACK_VERSION = 2.0
@@ -159,6 +218,7 @@ class CallbackModule(CallbackBase):
         self.start_datetimes = {}  # Collect task start times
         self.workspace_id = None
         self.shared_key = None
+        self.shipper = None
         self.loganalytics = AzureLogAnalyticsSource()
 
     def _seconds_since_start(self, result):
@@ -169,6 +229,27 @@ class CallbackModule(CallbackBase):
         self.workspace_id = self.get_option("workspace_id")
         self.shared_key = self.get_option("shared_key")
 
+        if self.get_option("queue_size") > 0:
+            client = KeepAliveClient(self.loganalytics.workspace_url(self.workspace_id))
+            self.shipper = EventShipper(
+                lambda events: self.loganalytics.send_batch(client, self.workspace_id, self.shared_key, events),
+                self._display.warning,
+                queue_size=self.get_option("queue_size"),
+                batch_size=self.get_option("flush_size"),
+                flush_interval=self.get_option("flush_interval"),
+                retries=self.get_option("retries"),
+            )
+
+    def _send_event(self, state, result):
+        if self.shipper is None:
+            self.loganalytics.send_event(
+                self.workspace_id, self.shared_key, state, result, self._seconds_since_start(result)
+            )
+        else:
+            # encoded now: the result objects may change once the hook returns
+            event = self.loganalytics.build_event(state, result, self._seconds_since_start(result))
+            self.shipper.put(event.encode("utf-8"))
+
     def v2_playbook_on_play_start(self, play):
         vm = play.get_variable_manager()
         extra_vars = vm.extra_vars
@@ -184,26 +265,20 @@ class CallbackModule(CallbackBase):
         self.start_datetimes[task._uuid] = now()
 
     def v2_runner_on_ok(self, result, **kwargs):
-        self.loganalytics.send_event(
-            self.workspace_id, self.shared_key, "OK", result, self._seconds_since_start(result)
-        )
+        self._send_event("OK", result)
 
     def v2_runner_on_skipped(self, result, **kwargs):
-        self.loganalytics.send_event(
-            self.workspace_id, self.shared_key, "SKIPPED", result, self._seconds_since_start(result)
-        )
+        self._send_event("SKIPPED", result)
 
     def v2_runner_on_failed(self, result, **kwargs):
-        self.loganalytics.send_event(
-            self.workspace_id, self.shared_key, "FAILED", result, self._seconds_since_start(result)
-        )
+        self._send_event("FAILED", result)
 
     def runner_on_async_failed(self, result, **kwargs):
-        self.loganalytics.send_event(
-            self.workspace_id, self.shared_key, "FAILED", result, self._seconds_since_start(result)
-        )
+        self._send_event("FAILED", result)
 
     def v2_runner_on_unreachable(self, result, **kwargs):
-        self.loganalytics.send_event(
-            self.workspace_id, self.shared_key, "UNREACHABLE", result, self._seconds_since_start(result)
-        )
+        self._send_event("UNREACHABLE", result)
+
+    def v2_playbook_on_stats(self, stats):
+        if self.shipper is not None:
+            self.shipper.close()
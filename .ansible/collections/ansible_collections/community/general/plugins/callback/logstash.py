@@ -68,6 +68,19 @@ options:
     choices:
       - v1
       - v2
+  queue_size:
+    description:
+      - Number of events that can wait to be sent by a background thread. Tasks wait for room when the queue is full.
+      - Queued events are sent when the playbook finishes.
+      - Set to V(0) to send every event synchronously.
+    type: int
+    default: 10000
+    ini:
+      - section: callback_logstash
+        key: queue_size
+    env:
+      - name: LOGSTASH_QUEUE_SIZE
+    version_added: 12.4.0
 """
 
 EXAMPLES = r"""
@@ -96,7 +109,9 @@ ansible.cfg: |
 
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import socket
 import uuid
 
@@ -116,6 +131,13 @@ from ansible_collections.community.general.plugins.module_utils.datetime import
 )
 
 
+class BlockingQueueHandler(logging.handlers.QueueHandler):
+    """Waits for room instead of dropping the record when the queue is full."""
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+
 class CallbackModule(CallbackBase):
     CALLBACK_VERSION = 2.0
     CALLBACK_TYPE = "notification"
@@ -130,6 +152,7 @@ class CallbackModule(CallbackBase):
             self._display.warning("The required python3-logstash is not installed.")
 
         self.start_time = now()
+        self.listener = None
 
     def _init_plugin(self):
         if not self.disabled:
@@ -140,7 +163,13 @@ class CallbackModule(CallbackBase):
                 self.ls_server, self.ls_port, version=1, message_type=self.ls_type
             )
 
-            self.logger.addHandler(self.handler)
+            if self.ls_queue_size > 0:
+                # The TCP handler sends each record synchronously; send from a listener thread instead
+                self.listener = logging.handlers.QueueListener(queue.Queue(self.ls_queue_size), self.handler)
+                self.listener.start()
+                self.logger.addHandler(BlockingQueueHandler(self.listener.queue))
+            else:
+                self.logger.addHandler(self.handler)
             self.hostname = socket.gethostname()
             self.session = str(uuid.uuid4())
             self.errors = 0
@@ -164,6 +193,7 @@ class CallbackModule(CallbackBase):
         self.ls_type = self.get_option("type")
         self.ls_pre_command = self.get_option("pre_command")
         self.ls_format_version = self.get_option("format_version")
+        self.ls_queue_size = self.get_option("queue_size")
 
         self._init_plugin()
 
@@ -201,6 +231,10 @@ class CallbackModule(CallbackBase):
         else:
             self.logger.info("ansible stats", extra=data)
 
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
     def v2_playbook_on_play_start(self, play):
         self.play_id = str(play._uuid)
 
@@ -13,6 +13,8 @@ description:
   - This callback plugin sends task results as JSON formatted events to a Splunk HTTP collector.
   - The companion Splunk Monitoring & Diagnostics App is available here U(https://splunkbase.splunk.com/app/4023/).
   - Credit to "Ryan Currah (@ryancurrah)" for original source upon which this is based.
+  - Events are sent from a background thread in batches, so a slow collector does not hold up the play.
+    Queued events are delivered when the playbook finishes.
 requirements:
   - Whitelisting this callback plugin
   - 'Create a HTTP Event Collector in Splunk'
@@ -67,6 +69,58 @@ options:
         key: batch
     type: str
     version_added: 3.3.0
+  queue_size:
+    description:
+      - Number of events that can wait for delivery. Tasks wait for room when the queue is full.
+      - Set to V(0) to send every event synchronously in its own request.
+    env:
+      - name: SPLUNK_QUEUE_SIZE
+    ini:
+      - section: callback_splunk
+        key: queue_size
+    type: int
+    default: 10000
+    version_added: 12.4.0
+  flush_size:
+    description: Maximum number of events sent in one request.
+    env:
+      - name: SPLUNK_FLUSH_SIZE
+    ini:
+      - section: callback_splunk
+        key: flush_size
+    type: int
+    default: 100
+    version_added: 12.4.0
+  flush_interval:
+    description: Maximum number of seconds an event waits for its batch to fill up.
+    env:
+      - name: SPLUNK_FLUSH_INTERVAL
+    ini:
+      - section: callback_splunk
+        key: flush_interval
+    type: float
+    default: 2.0
+    version_added: 12.4.0
+  compress:
+    description: Whether to gzip request bodies.
+    env:
+      - name: SPLUNK_COMPRESS
+    ini:
+      - section: callback_splunk
+        key: compress
+    type: bool
+    default: true
+    version_added: 12.4.0
+  retries:
+    description: How often a failed request is retried (with exponential backoff) before its events are dropped.
+    env:
+      - name: SPLUNK_RETRIES
+    ini:
+      - section: callback_splunk
+        key: retries
+    type: int
+    default: 3
+    version_added: 12.4.0
 """
 
 EXAMPLES = r"""
@@ -97,6 +151,11 @@ from ansible.plugins.callback import CallbackBase
 from ansible_collections.community.general.plugins.module_utils.datetime import (
     now,
 )
+from ansible_collections.community.general.plugins.plugin_utils._event_shipper import (
+    EventShipper,
+    KeepAliveClient,
+    gzip_body,
+)
 
 
 class SplunkHTTPCollectorSource:
@@ -108,7 +167,7 @@ class SplunkHTTPCollectorSource:
         self.ip_address = socket.gethostbyname(socket.gethostname())
         self.user = getpass.getuser()
 
-    def send_event(self, url, authtoken, validate_certs, include_milliseconds, batch, state, result, runtime):
+    def build_event(self, include_milliseconds, batch, state, result, runtime):
         if result._task_fields["args"].get("_ansible_check_mode") is True:
             self.ansible_check_mode = True
 
@@ -146,7 +205,10 @@ class SplunkHTTPCollectorSource:
         data["ansible_result"] = result._result
 
         # This wraps the json payload in and outer json event needed by Splunk
-        jsondata = json.dumps({"event": data}, cls=AnsibleJSONEncoder, sort_keys=True)
+        return json.dumps({"event": data}, cls=AnsibleJSONEncoder, sort_keys=True)
+
+    def send_event(self, url, authtoken, validate_certs, include_milliseconds, batch, state, result, runtime):
+        jsondata = self.build_event(include_milliseconds, batch, state, result, runtime)
 
         open_url(
             url,
@@ -156,6 +218,14 @@ class SplunkHTTPCollectorSource:
             validate_certs=validate_certs,
         )
 
+    def send_batch(self, client, authtoken, compress, events):
+        # HEC accepts several events in one body as concatenated JSON objects
+        body = b"\n".join(events)
+        headers = {"Content-type": "application/json", "Authorization": f"Splunk {authtoken}"}
+        if compress:
+            body = gzip_body(body, headers)
+        client.post(body, headers)
+
 
 class CallbackModule(CallbackBase):
     CALLBACK_VERSION = 2.0
@@ -171,6 +241,7 @@ class CallbackModule(CallbackBase):
         self.validate_certs = None
         self.include_milliseconds = None
         self.batch = None
+        self.shipper = None
         self.splunk = SplunkHTTPCollectorSource()
 
     def _runtime(self, result):
@@ -209,6 +280,35 @@ class CallbackModule(CallbackBase):
 
         self.batch = self.get_option("batch")
 
+        if self.get_option("queue_size") > 0 and not self.disabled:
+            client = KeepAliveClient(self.url, validate_certs=self.validate_certs)
+            compress = self.get_option("compress")
+            self.shipper = EventShipper(
+                lambda events: self.splunk.send_batch(client, self.authtoken, compress, events),
+                self._display.warning,
+                queue_size=self.get_option("queue_size"),
+                batch_size=self.get_option("flush_size"),
+                flush_interval=self.get_option("flush_interval"),
+                retries=self.get_option("retries"),
+            )
+
+    def _send_event(self, state, result):
+        if self.shipper is None:
+            self.splunk.send_event(
+                self.url,
+                self.authtoken,
+                self.validate_certs,
+                self.include_milliseconds,
+                self.batch,
+                state,
+                result,
+                self._runtime(result),
+            )
+        else:
+            # encoded now: the result objects may change once the hook returns
+            event = self.splunk.build_event(self.include_milliseconds, self.batch, state, result, self._runtime(result))
+            self.shipper.put(event.encode("utf-8"))
+
     def v2_playbook_on_start(self, playbook):
         self.splunk.ansible_playbook = basename(playbook._file_name)
 
@@ -219,61 +319,20 @@ class CallbackModule(CallbackBase):
         self.start_datetimes[task._uuid] = now()
 
     def v2_runner_on_ok(self, result, **kwargs):
-        self.splunk.send_event(
-            self.url,
-            self.authtoken,
-            self.validate_certs,
-            self.include_milliseconds,
-            self.batch,
-            "OK",
-            result,
-            self._runtime(result),
-        )
+        self._send_event("OK", result)
 
     def v2_runner_on_skipped(self, result, **kwargs):
-        self.splunk.send_event(
-            self.url,
-            self.authtoken,
-            self.validate_certs,
-            self.include_milliseconds,
-            self.batch,
-            "SKIPPED",
-            result,
-            self._runtime(result),
-        )
+        self._send_event("SKIPPED", result)
 
     def v2_runner_on_failed(self, result, **kwargs):
-        self.splunk.send_event(
-            self.url,
-            self.authtoken,
-            self.validate_certs,
-            self.include_milliseconds,
-            self.batch,
-            "FAILED",
-            result,
-            self._runtime(result),
-        )
+        self._send_event("FAILED", result)
 
     def runner_on_async_failed(self, result, **kwargs):
-        self.splunk.send_event(
-            self.url,
-            self.authtoken,
-            self.validate_certs,
-            self.include_milliseconds,
-            self.batch,
-            "FAILED",
-            result,
-            self._runtime(result),
-        )
+        self._send_event("FAILED", result)
 
     def v2_runner_on_unreachable(self, result, **kwargs):
-        self.splunk.send_event(
-            self.url,
-            self.authtoken,
-            self.validate_certs,
-            self.include_milliseconds,
-            self.batch,
-            "UNREACHABLE",
-            result,
-            self._runtime(result),
-        )
+        self._send_event("UNREACHABLE", result)
+
+    def v2_playbook_on_stats(self, stats):
+        if self.shipper is not None:
+            self.shipper.close()
@@ -75,6 +75,36 @@ options:
     default: default
     vars:
       - name: ansible_incus_project
+  persistent:
+    description:
+      - Run commands and file transfers through one long-lived agent process in the instance instead of one
+        C(incus exec) per command.
+      - The agent is kept by a local broker process that exits after O(persistent_timeout) seconds without use, so later
+        tasks reuse it like SSH C(ControlPersist). Its control socket is kept in C(~/.ansible/cp).
+      - The agent needs O(persistent_interpreter) in the instance. When it cannot be started, or the channel fails
+        before a command was sent, the plugin falls back to running C(incus exec) per command.
+      - Not used for Windows instances.
+    type: bool
+    default: false
+    vars:
+      - name: ansible_incus_persistent
+    version_added: 12.4.0
+  persistent_timeout:
+    description:
+      - Seconds an unused persistent agent is kept running.
+    type: int
+    default: 60
+    vars:
+      - name: ansible_incus_persistent_timeout
+    version_added: 12.4.0
+  persistent_interpreter:
+    description:
+      - Python 3 interpreter in the instance that runs the persistent agent.
+    type: string
+    default: python3
+    vars:
+      - name: ansible_incus_persistent_interpreter
+    version_added: 12.4.0
 """
 
 import os
@@ -86,6 +116,13 @@ from ansible.module_utils.common.process import get_bin_path
 from ansible.module_utils.common.text.converters import to_bytes, to_text
 from ansible.plugins.connection import ConnectionBase
 
+from ansible_collections.community.general.plugins.plugin_utils._exec_channel import (
+    ChannelError,
+    ExecChannel,
+    RemoteFileError,
+    agent_command,
+)
+
 
 class Connection(ConnectionBase):
     """Incus based connections"""
@@ -97,6 +134,8 @@ class Connection(ConnectionBase):
         super().__init__(play_context, new_stdin, *args, **kwargs)
 
         self._incus_cmd = get_bin_path("incus")
+        self._channel = None
+        self._channel_failed = False
 
         if not self._incus_cmd:
             raise AnsibleError("incus command not found in PATH")
@@ -177,6 +216,34 @@ class Connection(ConnectionBase):
 
         return exec_cmd
 
+    def _get_channel(self):
+        """the persistent channel to the instance, or None to exec per command"""
+        if self._channel is None and not self._channel_failed:
+            if not self.get_option("persistent") or getattr(self._shell, "_IS_WINDOWS", False):
+                self._channel_failed = True
+                return None
+            spec = {"argv": self._build_command(agent_command(self.get_option("persistent_interpreter")))}
+            try:
+                self._channel = ExecChannel.connect(
+                    "incus", spec, persist=self.get_option("persistent_timeout"), timeout=self._play_context.timeout
+                )
+            except ChannelError as e:
+                self._display.vvv(
+                    f"persistent channel unavailable, using incus exec per command: {e}", host=self._instance()
+                )
+                self._channel_failed = True
+        return self._channel
+
+    def _channel_error(self, error):
+        if isinstance(error, RemoteFileError):
+            # the channel is fine; retry the transfer with the incus CLI
+            self._display.vvv(f"persistent channel transfer failed, using incus file: {error}", host=self._instance())
+            return
+        self._display.vvv(f"persistent channel failed, using incus exec per command: {error}", host=self._instance())
+        self._channel.close()
+        self._channel = None
+        self._channel_failed = True
+
     def _instance(self):
         # Return only the leading part of the FQDN as the instance name
         # as Incus instance names cannot be a FQDN.
@@ -188,6 +255,21 @@ class Connection(ConnectionBase):
 
         self._display.vvv(f"EXEC {cmd}", host=self._instance())
 
+        channel = self._get_channel()
+        if channel is not None:
+            try:
+                rc, stdout, stderr = channel.exec_command(
+                    [self.get_option("executable"), "-c", cmd],
+                    to_bytes(in_data, errors="surrogate_or_strict", nonstring="passthru"),
+                )
+            except ChannelError as e:
+                self._channel_error(e)
+                if e.delivered:
+                    # the command may have run; do not run it a second time
+                    raise AnsibleConnectionFailure(f"persistent channel to {self._instance()} failed: {e}") from e
+            else:
+                return rc, to_text(stdout), to_text(stderr)
+
         local_cmd = self._build_command(cmd)
         self._display.vvvvv(f"EXEC {local_cmd}", host=self._instance())
 
@@ -246,6 +328,16 @@ class Connection(ConnectionBase):
         if not os.path.isfile(to_bytes(in_path, errors="surrogate_or_strict")):
             raise AnsibleFileNotFound(f"input path is not a file: {in_path}")
 
+        channel = self._get_channel()
+        if channel is not None:
+            # the agent runs as remote_user, so the file is owned by it as with --uid/--gid
+            mode = os.stat(to_bytes(in_path, errors="surrogate_or_strict")).st_mode & 0o7777
+            try:
+                channel.put_file(to_bytes(in_path, errors="surrogate_or_strict"), out_path, mode)
+                return
+            except ChannelError as e:
+                self._channel_error(e)
+
         if not getattr(self._shell, "_IS_WINDOWS", False) and self.get_option("remote_user") != "root":
             uid, gid = self._get_remote_uid_gid()
             local_cmd = [
@@ -286,6 +378,14 @@ class Connection(ConnectionBase):
 
         self._display.vvv(f"FETCH {in_path} TO {out_path}", host=self._instance())
 
+        channel = self._get_channel()
+        if channel is not None:
+            try:
+                channel.fetch_file(in_path, to_bytes(out_path, errors="surrogate_or_strict"))
+                return
+            except ChannelError as e:
+                self._channel_error(e)
+
         local_cmd = [
             self._incus_cmd,
             "--project",
@@ -302,7 +402,11 @@ class Connection(ConnectionBase):
         call(local_cmd)
 
     def close(self):
-        """close the connection (nothing to do here)"""
+        """close the connection; a persistent agent keeps running for the next task"""
         super().close()
 
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
+
         self._connected = False
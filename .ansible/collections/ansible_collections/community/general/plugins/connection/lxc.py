@@ -29,6 +29,35 @@ options:
     vars:
       - name: ansible_executable
       - name: ansible_lxc_executable
+  persistent:
+    description:
+      - Run commands and file transfers through one long-lived agent process in the container instead of attaching to
+        the container for every command.
+      - The agent is kept by a local broker process that exits after O(persistent_timeout) seconds without use, so later
+        tasks reuse it like SSH C(ControlPersist). Its control socket is kept in C(~/.ansible/cp).
+      - The agent needs O(persistent_interpreter) in the container. When it cannot be started, or the channel fails
+        before a command was sent, the plugin falls back to attaching per command.
+    type: bool
+    default: false
+    vars:
+      - name: ansible_lxc_persistent
+    version_added: 12.4.0
+  persistent_timeout:
+    description:
+      - Seconds an unused persistent agent is kept running.
+    type: int
+    default: 60
+    vars:
+      - name: ansible_lxc_persistent_timeout
+    version_added: 12.4.0
+  persistent_interpreter:
+    description:
+      - Python 3 interpreter in the container that runs the persistent agent.
+    type: string
+    default: python3
+    vars:
+      - name: ansible_lxc_persistent_interpreter
+    version_added: 12.4.0
 """
 
 import errno
@@ -47,9 +76,16 @@ except ImportError:
     pass
 
 from ansible import errors
-from ansible.module_utils.common.text.converters import to_bytes, to_native
+from ansible.module_utils.common.text.converters import to_bytes, to_native, to_text
 from ansible.plugins.connection import ConnectionBase
 
+from ansible_collections.community.general.plugins.plugin_utils._exec_channel import (
+    ChannelError,
+    ExecChannel,
+    RemoteFileError,
+    agent_command,
+)
+
 
 class Connection(ConnectionBase):
     """Local lxc based connections"""
@@ -63,6 +99,8 @@ class Connection(ConnectionBase):
 
         self.container_name = None
         self.container = None
+        self._channel = None
+        self._channel_failed = False
 
     def _connect(self):
         """connect to the lxc; nothing to do here"""
@@ -83,6 +121,38 @@ class Connection(ConnectionBase):
         if self.container.state == "STOPPED":
             raise errors.AnsibleError(f"{self.container_name} is not running")
 
+    def _get_channel(self):
+        """the persistent channel to the container, or None to attach per command"""
+        if self._channel is None and not self._channel_failed:
+            if not self.get_option("persistent"):
+                self._channel_failed = True
+                return None
+            executable = self.get_option("executable")
+            spec = {
+                "lxc": self.container_name,
+                "argv": [executable, "-c", agent_command(self.get_option("persistent_interpreter"))],
+            }
+            try:
+                self._channel = ExecChannel.connect(
+                    "lxc", spec, persist=self.get_option("persistent_timeout"), timeout=self._play_context.timeout
+                )
+            except ChannelError as e:
+                self._display.vvv(
+                    f"persistent channel unavailable, attaching per command: {e}", host=self.container_name
+                )
+                self._channel_failed = True
+        return self._channel
+
+    def _channel_error(self, error):
+        if isinstance(error, RemoteFileError):
+            # the channel is fine; retry the transfer by attaching
+            self._display.vvv(f"persistent channel transfer failed, attaching: {error}", host=self.container_name)
+            return
+        self._display.vvv(f"persistent channel failed, attaching per command: {error}", host=self.container_name)
+        self._channel.close()
+        self._channel = None
+        self._channel_failed = True
+
     @staticmethod
     def _communicate(pid, in_data, stdin, stdout, stderr):
         buf = {stdout: [], stderr: []}
@@ -125,6 +195,21 @@ class Connection(ConnectionBase):
         executable = to_native(self.get_option("executable"), errors="surrogate_or_strict")
         local_cmd = [executable, "-c", to_native(cmd, errors="surrogate_or_strict")]
 
+        channel = self._get_channel()
+        if channel is not None:
+            self._display.vvv(f"EXEC {local_cmd} (persistent)", host=self.container_name)
+            try:
+                return channel.exec_command(
+                    local_cmd, to_bytes(in_data, errors="surrogate_or_strict", nonstring="passthru")
+                )
+            except ChannelError as e:
+                self._channel_error(e)
+                if e.delivered:
+                    # the command may have run; do not run it a second time
+                    raise errors.AnsibleConnectionFailure(
+                        f"persistent channel to {self.container_name} failed: {e}"
+                    ) from e
+
         read_stdout, write_stdout = None, None
         read_stderr, write_stderr = None, None
         read_stdin, write_stdin = None, None
@@ -171,6 +256,14 @@ class Connection(ConnectionBase):
         if not os.path.exists(in_path):
             msg = f"file or module does not exist: {in_path}"
             raise errors.AnsibleFileNotFound(msg)
+
+        channel = self._get_channel()
+        if channel is not None:
+            try:
+                channel.put_file(in_path, to_text(out_path, errors="surrogate_or_strict"))
+                return
+            except ChannelError as e:
+                self._channel_error(e)
         try:
             src_file = open(in_path, "rb")
         except OSError as e:
@@ -195,6 +288,14 @@ class Connection(ConnectionBase):
         """fetch a file from lxc to local"""
         super().fetch_file(in_path, out_path)
         self._display.vvv(f"FETCH {in_path} TO {out_path}", host=self.container_name)
+        channel = self._get_channel()
+        if channel is not None:
+            try:
+                channel.fetch_file(to_text(in_path, errors="surrogate_or_strict"), out_path)
+                return
+            except ChannelError as e:
+                self._channel_error(e)
+
         in_path = to_bytes(in_path, errors="surrogate_or_strict")
         out_path = to_bytes(out_path, errors="surrogate_or_strict")
 
@@ -225,6 +326,9 @@ class Connection(ConnectionBase):
             dst_file.close()
 
     def close(self):
-        """terminate the connection; nothing to do here"""
+        """terminate the connection; a persistent agent keeps running for the next task"""
         super().close()
+        if self._channel is not None:
+            self._channel.close()
+            self._channel = None
         self._connected = False
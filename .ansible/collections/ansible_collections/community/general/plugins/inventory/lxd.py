@@ -80,6 +80,16 @@ options:
     default: container
     choices: ['virtual-machine', 'container', 'both']
     version_added: 4.2.0
+  concurrent_requests:
+    description:
+      - Number of API requests sent in parallel, each over its own connection.
+      - Instances are fetched with one C(recursion=2) request when the server supports it (API extension C(container_full));
+        otherwise the configuration and state of every instance are requested separately. Network states are always
+        requested per network.
+      - Set to V(1) to send the requests one after another.
+    type: int
+    default: 8
+    version_added: 12.4.0
   prefered_instance_network_interface:
     description:
       - If an instance has multiple network interfaces, select which one is the preferred as pattern.
@@ -169,7 +179,9 @@ groupby:
 import json
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode
 
 from ansible.errors import AnsibleError, AnsibleParserError
@@ -369,6 +381,22 @@ class InventoryModule(BaseInventoryPlugin):
 
         return [m.split("/")[3] for m in instances["metadata"]]
 
+    def _config_url(self, branch, name):
+        """API path of one branch of an instance or network
+
+        Args:
+            str(branch): Name oft the API-Branch, or tuple(branch, section)
+            str(name): Name of instance
+        Kwargs:
+            None
+        Raises:
+            None
+        Returns:
+            str(url): API path"""
+        if isinstance(branch, (tuple, list)):
+            return f"/1.0/{to_native(branch[0])}/{to_native(name)}/{to_native(branch[1])}?{urlencode(dict(project=self.project))}"
+        return f"/1.0/{to_native(branch)}/{to_native(name)}?{urlencode(dict(project=self.project))}"
+
     def _get_config(self, branch, name):
         """Get inventory of instance
 
@@ -385,21 +413,92 @@ class InventoryModule(BaseInventoryPlugin):
             None
         Returns:
             dict(config): Config of the instance"""
-        config = {}
-        if isinstance(branch, (tuple, list)):
-            config[name] = {
-                branch[1]: self.socket.do(
-                    "GET",
-                    f"/1.0/{to_native(branch[0])}/{to_native(name)}/{to_native(branch[1])}?{urlencode(dict(project=self.project))}",
-                )
-            }
-        else:
-            config[name] = {
-                branch: self.socket.do(
-                    "GET", f"/1.0/{to_native(branch)}/{to_native(name)}?{urlencode(dict(project=self.project))}"
-                )
+        key = branch[1] if isinstance(branch, (tuple, list)) else branch
+        return {name: {key: self.socket.do("GET", self._config_url(branch, name))}}
+
+    def _new_client(self):
+        """Open another connection to the server self.socket is connected to"""
+        return LXDClient(
+            self.socket.url, self.client_key, self.client_cert, self.debug, self.server_cert, self.server_check_hostname
+        )
+
+    def _fetch(self, requests):
+        """GET many API paths
+
+        Requests are sent concurrently over up to O(concurrent_requests) connections;
+        each worker thread keeps its connection open for all of its requests.
+
+        Args:
+            list(requests): (key, url) pairs
+        Kwargs:
+            None
+        Raises:
+            None
+        Returns:
+            dict(results): key => response json, or the LXDClientException raised for it"""
+
+        def get(client, url):
+            try:
+                return client.do("GET", url)
+            except LXDClientException as err:
+                return err
+
+        workers = min(self.concurrent_requests, len(requests))
+        if workers <= 1:
+            return {key: get(self.socket, url) for key, url in requests}
+
+        local = threading.local()
+        clients = []
+
+        def run(request):
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = self._new_client()
+                clients.append(client)
+            return request[0], get(client, request[1])
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return dict(executor.map(run, requests))
+        finally:
+            for client in clients:
+                client.connection.close()
+
+    def _supports_recursive_instances(self):
+        """Whether GET /1.0/instances?recursion=2 includes the instance state"""
+        try:
+            server = self.socket.do("GET", "/1.0")
+        except LXDClientException:
+            return False
+        return "container_full" in (server.get("metadata") or {}).get("api_extensions", [])
+
+    def get_instance_data_recursive(self):
+        """Create Inventory of all instances with one request
+
+        Splits each full instance of the recursion=2 listing into the "instances" and "state"
+        responses get_instance_data() would have stored.
+
+        Args:
+            None
+        Kwargs:
+            None
+        Raises:
+            None
+        Returns:
+            bool(done): False when the server does not support the bulk listing"""
+        if not self._supports_recursive_instances():
+            return False
+        listing = self.socket.do("GET", f"/1.0/instances?{urlencode(dict(recursion=2, project=self.project))}")
+        envelope = {key: value for key, value in listing.items() if key != "metadata"}
+        instances = {}
+        for full in listing["metadata"]:
+            metadata = {key: value for key, value in full.items() if key not in ("state", "snapshots", "backups")}
+            instances[full["name"]] = {
+                "instances": dict(envelope, metadata=metadata),
+                "state": dict(envelope, metadata=full.get("state")),
             }
-        return config
+        self.data["instances"] = instances
+        return True
 
     def get_instance_data(self, names):
         """Create Inventory of the instance
@@ -411,17 +510,23 @@ class InventoryModule(BaseInventoryPlugin):
         Kwargs:
             None
         Raises:
-            None
+            LXDClientException
         Returns:
             None"""
         # tuple(('instances','metadata/templates')) to get section in branch
         # e.g. /1.0/instances/<name>/metadata/templates
         branches = ["instances", ("instances", "state")]
-        instance_config = {}
+        requests = []
         for branch in branches:
-            for name in names:
-                instance_config["instances"] = self._get_config(branch, name)
-                self.data = dict_merge(instance_config, self.data)
+            key = branch[1] if isinstance(branch, (tuple, list)) else branch
+            requests.extend(((name, key), self._config_url(branch, name)) for name in names)
+        results = self._fetch(requests)
+        instances = self.data.setdefault("instances", {})
+        for (name, key), _url in requests:
+            result = results[(name, key)]
+            if isinstance(result, LXDClientException):
+                raise result
+            instances.setdefault(name, {})[key] = result
 
     def get_network_data(self, names):
         """Create Inventory of the instance
@@ -439,14 +544,19 @@ class InventoryModule(BaseInventoryPlugin):
         # tuple(('instances','metadata/templates')) to get section in branch
         # e.g. /1.0/instances/<name>/metadata/templates
         branches = [("networks", "state")]
-        network_config = {}
+        requests = []
         for branch in branches:
-            for name in names:
-                try:
-                    network_config["networks"] = self._get_config(branch, name)
-                except LXDClientException:
-                    network_config["networks"] = {name: None}
-                self.data = dict_merge(network_config, self.data)
+            requests.extend(((name, branch[1]), self._config_url(branch, name)) for name in names)
+        results = self._fetch(requests)
+        networks = self.data.setdefault("networks", {})
+        for (name, key), _url in requests:
+            result = results[(name, key)]
+            if isinstance(result, LXDClientException):
+                networks[name] = None
+            elif networks.get(name) is not None:
+                networks[name][key] = result
+            else:
+                networks[name] = {key: result}
 
     def extract_network_information_from_instance_config(self, instance_name):
         """Returns the network interface configuration
@@ -1145,7 +1255,8 @@ class InventoryModule(BaseInventoryPlugin):
 
         if len(self.data) == 0:  # If no data is injected by unittests open socket
             self.socket = self._connect_to_socket()
-            self.get_instance_data(self._get_instances())
+            if not self.get_instance_data_recursive():
+                self.get_instance_data(self._get_instances())
             self.get_network_data(self._get_networks())
 
         # The first version of the inventory only supported containers.
@@ -1203,6 +1314,7 @@ class InventoryModule(BaseInventoryPlugin):
                 self.filter = self.get_option("state").lower()
             self.trust_password = self.get_option("trust_password")
             self.url = self.get_option("url")
+            self.concurrent_requests = self.get_option("concurrent_requests")
         except Exception as err:
             raise AnsibleParserError(f"All correct options required: {err}") from err
         # Call our internal helper to populate the dynamic inventory
@@ -10,6 +10,8 @@ name: nmap
 short_description: Uses nmap to find hosts to target
 description:
   - Uses a YAML configuration file with a valid YAML extension.
+  - The XML output of nmap is parsed as it is produced. Large CIDR ranges are split into chunks that are scanned by
+    concurrent nmap processes; with caching enabled, the results of each chunk are cached separately.
 extends_documentation_fragment:
   - constructed
   - inventory_cache
@@ -95,6 +97,21 @@ options:
     type: boolean
     default: true
     version_added: 7.4.0
+  chunk_size:
+    description:
+      - A CIDR O(address) with more addresses than this is split into chunks of at most this many addresses, each scanned
+        by its own nmap process.
+      - A range is split into at most 1024 chunks. Other forms of O(address) (simple ranges, host names) are scanned as one chunk.
+      - Set to V(0) to never split.
+    type: int
+    default: 256
+    version_added: 12.4.0
+  concurrent_scans:
+    description:
+      - Maximum number of nmap processes running at the same time.
+      - Defaults to the number of CPUs.
+    type: int
+    version_added: 12.4.0
 notes:
   - At least one of O(ipv4) or O(ipv6) is required to be V(true); both can be V(true), but they cannot both be V(false).
   - 'TODO: add OS fingerprinting.'
@@ -123,23 +140,103 @@ groups:
   web_servers: "ports | selectattr('port', 'equalto', '443')"
 """
 
+import hashlib
+import ipaddress
 import os
-import re
-from subprocess import PIPE, Popen
+import tempfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import PIPE, Popen, TimeoutExpired
 
 from ansible import constants as C
 from ansible.errors import AnsibleParserError
 from ansible.module_utils.common.process import get_bin_path
-from ansible.module_utils.common.text.converters import to_native, to_text
+from ansible.module_utils.common.text.converters import to_native
 from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
 
 from ansible_collections.community.general.plugins.plugin_utils.unsafe import make_unsafe
 
+# upper bound of chunks one address is split into
+MAX_CHUNKS = 1024
+
+
+def split_address(address, chunk_size):
+    """Split a CIDR network into subnets of at most chunk_size addresses; anything else is one chunk."""
+    try:
+        network = ipaddress.ip_network(address, strict=False)
+    except ValueError:
+        return [address]
+    if chunk_size <= 0 or network.num_addresses <= chunk_size:
+        return [address]
+    prefix = min(network.max_prefixlen - (chunk_size.bit_length() - 1), network.prefixlen + MAX_CHUNKS.bit_length() - 1)
+    return [str(subnet) for subnet in network.subnets(new_prefix=prefix)]
+
+
+def parse_nmap_xml(stream):
+    """Hosts reported up in nmap's XML output, parsed incrementally.
+
+    Every <host> element is released once read, so memory does not grow with the scan size.
+    """
+    results = []
+    context = ET.iterparse(stream, events=("start", "end"))
+    root = None
+    for event, elem in context:
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "host":
+            continue
+        host = _host_from_xml(elem)
+        if host is not None:
+            results.append(host)
+        elem.clear()
+        if root is not None:
+            # drop the reference the document root keeps to the processed host
+            root.clear()
+    return results
+
+
+def _host_from_xml(elem):
+    status = elem.find("status")
+    if status is not None and status.get("state") != "up":
+        return None
+    ip = None
+    for address in elem.iter("address"):
+        if address.get("addrtype") in ("ipv4", "ipv6"):
+            ip = address.get("addr")
+            break
+    if ip is None:
+        return None
+
+    names = [(hostname.get("type"), hostname.get("name")) for hostname in elem.iter("hostname")]
+    # the name as given on the command line first, then reverse DNS
+    names.sort(key=lambda name: name[0] != "user")
+    name = names[0][1] if names else ip
+    # if dns only shows arpa, just use ip instead as hostname
+    if name.endswith(".in-addr.arpa"):
+        name = ip
+    host = {"name": name, "ip": ip}
+
+    ports = []
+    for port in elem.iter("port"):
+        state = port.find("state")
+        service = port.find("service")
+        ports.append(
+            {
+                "port": port.get("portid"),
+                "protocol": port.get("protocol"),
+                "state": state.get("state") if state is not None else "unknown",
+                "service": service.get("name") if service is not None else "unknown",
+            }
+        )
+    if ports:
+        host["ports"] = ports
+    return host
+
 
 class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     NAME = "community.general.nmap"
-    find_host = re.compile(r"^Nmap scan report for ([\w,.,-]+)(?: \(([\w,.,:,\[,\]]+)\))?")
-    find_port = re.compile(r"^(\d+)/(\w+)\s+(\w+)\s+(\w+)")
 
     def __init__(self):
         self._nmap = None
@@ -175,6 +272,80 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
 
         return valid
 
+    def _command(self):
+        # setup command
+        cmd = [self._nmap]
+
+        if self.get_option("sudo"):
+            cmd.insert(0, "sudo")
+
+        if self.get_option("port"):
+            cmd.append("-p")
+            cmd.append(self.get_option("port"))
+
+        if not self.get_option("ports"):
+            cmd.append("-sP")
+
+        if self.get_option("ipv4") and not self.get_option("ipv6"):
+            cmd.append("-4")
+        elif self.get_option("ipv6") and not self.get_option("ipv4"):
+            cmd.append("-6")
+        elif not self.get_option("ipv6") and not self.get_option("ipv4"):
+            raise AnsibleParserError("One of ipv4 or ipv6 must be enabled for this plugin")
+
+        if self.get_option("exclude"):
+            cmd.append("--exclude")
+            cmd.append(",".join(self.get_option("exclude")))
+
+        if self.get_option("dns_resolve"):
+            cmd.append("-n")
+
+        if self.get_option("dns_servers"):
+            cmd.append("--dns-servers")
+            cmd.append(",".join(self.get_option("dns_servers")))
+
+        if self.get_option("udp_scan"):
+            cmd.append("-sU")
+
+        if self.get_option("icmp_timestamp"):
+            cmd.append("-PP")
+
+        if self.get_option("open"):
+            cmd.append("--open")
+
+        if not self.get_option("use_arp_ping"):
+            cmd.append("--disable-arp-ping")
+
+        # XML on stdout, parsed while nmap runs
+        cmd.extend(["-oX", "-"])
+        return cmd
+
+    def _scan(self, cmd, target):
+        # stderr goes to a file so a chatty nmap cannot block on a full pipe while stdout is read
+        with tempfile.TemporaryFile() as stderr:
+            p = Popen(cmd + [target], stdout=PIPE, stderr=stderr)
+            error = None
+            try:
+                results = parse_nmap_xml(p.stdout)
+            except ET.ParseError as e:
+                error = e
+            finally:
+                p.stdout.close()
+            try:
+                # with stdout closed, an nmap that is still writing exits on the broken pipe
+                rc = p.wait(timeout=10 if error else None)
+            except TimeoutExpired:
+                p.kill()
+                rc = p.wait()
+            stderr.seek(0)
+            if rc > 0 or (rc != 0 and error is None):
+                raise AnsibleParserError(f"Failed to run nmap, rc={rc}: {to_native(stderr.read())}") from error
+            if error is not None:
+                raise AnsibleParserError(
+                    f"Invalid nmap XML output for {target}: {error}: {to_native(stderr.read())}"
+                ) from error
+        return results
+
     def parse(self, inventory, loader, path, cache=True):
         try:
             self._nmap = get_bin_path("nmap")
@@ -196,122 +367,39 @@ class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
         # update if the user has caching enabled and the cache is being refreshed; update this value to True if the cache has expired below
         cache_needs_update = user_cache_setting and not cache
 
-        if attempt_to_read_cache:
-            try:
-                results = self._cache[cache_key]
-            except KeyError:
-                # This occurs if the cache_key is not in the cache or if the cache_key expired, so the cache needs to be updated
-                cache_needs_update = True
-
-        if not user_cache_setting or cache_needs_update:
-            # setup command
-            cmd = [self._nmap]
-
-            if self.get_option("sudo"):
-                cmd.insert(0, "sudo")
-
-            if self.get_option("port"):
-                cmd.append("-p")
-                cmd.append(self.get_option("port"))
-
-            if not self.get_option("ports"):
-                cmd.append("-sP")
-
-            if self.get_option("ipv4") and not self.get_option("ipv6"):
-                cmd.append("-4")
-            elif self.get_option("ipv6") and not self.get_option("ipv4"):
-                cmd.append("-6")
-            elif not self.get_option("ipv6") and not self.get_option("ipv4"):
-                raise AnsibleParserError("One of ipv4 or ipv6 must be enabled for this plugin")
-
-            if self.get_option("exclude"):
-                cmd.append("--exclude")
-                cmd.append(",".join(self.get_option("exclude")))
-
-            if self.get_option("dns_resolve"):
-                cmd.append("-n")
-
-            if self.get_option("dns_servers"):
-                cmd.append("--dns-servers")
-                cmd.append(",".join(self.get_option("dns_servers")))
-
-            if self.get_option("udp_scan"):
-                cmd.append("-sU")
-
-            if self.get_option("icmp_timestamp"):
-                cmd.append("-PP")
-
-            if self.get_option("open"):
-                cmd.append("--open")
-
-            if not self.get_option("use_arp_ping"):
-                cmd.append("--disable-arp-ping")
-
-            cmd.append(self.get_option("address"))
-            try:
-                # execute
-                p = Popen(cmd, stdout=PIPE, stderr=PIPE)
-                stdout, stderr = p.communicate()
-                if p.returncode != 0:
-                    raise AnsibleParserError(f"Failed to run nmap, rc={p.returncode}: {to_native(stderr)}")
-
-                # parse results
-                host = None
-                ip = None
-                ports = []
-                results = []
+        cmd = self._command()
+        chunks = split_address(self.get_option("address"), self.get_option("chunk_size"))
+        # every chunk is cached on its own, keyed by the scan options too
+        chunk_keys = [
+            f"{cache_key}_{hashlib.sha1(chr(0).join(cmd + [chunk]).encode('utf-8')).hexdigest()[:16]}"
+            for chunk in chunks
+        ]
+        chunk_results = [None] * len(chunks)
 
+        if attempt_to_read_cache:
+            for n, key in enumerate(chunk_keys):
                 try:
-                    t_stdout = to_text(stdout, errors="surrogate_or_strict")
-                except UnicodeError as e:
-                    raise AnsibleParserError(f"Invalid (non unicode) input returned: {e}") from e
-
-                for line in t_stdout.splitlines():
-                    hits = self.find_host.match(line)
-                    if hits:
-                        if host is not None and ports:
-                            results[-1]["ports"] = ports
-
-                        # if dns only shows arpa, just use ip instead as hostname
-                        if hits.group(1).endswith(".in-addr.arpa"):
-                            host = hits.group(2)
-                        else:
-                            host = hits.group(1)
-
-                        # if no reverse dns exists, just use ip instead as hostname
-                        if hits.group(2) is not None:
-                            ip = hits.group(2)
-                        else:
-                            ip = hits.group(1)
-
-                        if host is not None:
-                            # update inventory
-                            results.append(dict())
-                            results[-1]["name"] = host
-                            results[-1]["ip"] = ip
-                            ports = []
-                        continue
-
-                    host_ports = self.find_port.match(line)
-                    if host is not None and host_ports:
-                        ports.append(
-                            {
-                                "port": host_ports.group(1),
-                                "protocol": host_ports.group(2),
-                                "state": host_ports.group(3),
-                                "service": host_ports.group(4),
-                            }
-                        )
-                        continue
-
-                # if any leftovers
-                if host and ports:
-                    results[-1]["ports"] = ports
-
+                    chunk_results[n] = self._cache[key]
+                except KeyError:
+                    # This occurs if the key is not in the cache or if it expired, so the chunk needs to be scanned
+                    cache_needs_update = True
+
+        pending = [n for n, results in enumerate(chunk_results) if results is None]
+        if pending:
+            workers = min(len(pending), self.get_option("concurrent_scans") or os.cpu_count() or 1)
+            try:
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        scanned = list(executor.map(lambda n: self._scan(cmd, chunks[n]), pending))
+                else:
+                    scanned = [self._scan(cmd, chunks[n]) for n in pending]
             except Exception as e:
                 raise AnsibleParserError(f"failed to parse {to_native(path)}: {e} ") from e
+            for n, results in zip(pending, scanned):
+                chunk_results[n] = results
 
         if cache_needs_update:
-            self._cache[cache_key] = results
+            for n in pending:
+                self._cache[chunk_keys[n]] = chunk_results[n]
 
-        self._populate(results)
+        self._populate(host for results in chunk_results for host in results)
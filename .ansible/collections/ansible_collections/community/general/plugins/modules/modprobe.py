@@ -25,9 +25,9 @@ attributes:
 options:
   name:
     type: str
-    required: true
     description:
       - Name of kernel module to manage.
+      - Required unless O(modules) is used.
   state:
     type: str
     description:
@@ -57,6 +57,26 @@ options:
         triggers encoded in the kernel modules themselves instead of configuration like this.
       - In fact, most modern kernel modules are prepared for automatic loading already.
       - B(Note:) This option works only with distributions that use C(systemd) when set to values other than V(disabled).
+  modules:
+    type: list
+    elements: raw
+    version_added: 12.4.0
+    description:
+      - Manage several kernel modules in one run instead of O(name).
+      - Each element is a module name or a dict with C(name) and optional C(state), C(params) and C(persistent);
+        missing keys default to O(state), V('') and O(persistent).
+      - C(/proc/modules) is read once, only modules that are not loaded yet are passed to C(modprobe) (modules without
+        parameters in a single C(modprobe -a) call), and all unloads share one C(modprobe -r) call.
+      - Persistence files are rewritten at most once each, see O(persistent_file).
+  persistent_file:
+    type: str
+    version_added: 12.4.0
+    description:
+      - With O(modules), name (without C(.conf)) of one consolidated file in C(/etc/modules-load.d/) and
+        C(/etc/modprobe.d/) that holds every module with C(persistent=present) and its parameters.
+      - The files are managed as a whole; modules no longer listed are dropped from them, and C(options) lines for
+        these modules in other files are commented out.
+      - If not set, each module gets its own C(<name>.conf) files as with O(name).
 """
 
 EXAMPLES = r"""
@@ -77,6 +97,31 @@ EXAMPLES = r"""
     state: present
     params: 'numdummies=2'
     persistent: present
+
+- name: Load the container networking modules and persist them in one file pair
+  community.general.modprobe:
+    modules:
+      - overlay
+      - br_netfilter
+      - name: dummy
+        params: 'numdummies=2'
+    persistent: present
+    persistent_file: container-networks
+"""
+
+RETURN = r"""
+modules:
+  description: Per-module outcome when O(modules) is used.
+  returned: when O(modules) is used
+  type: list
+  elements: dict
+  sample: [{"name": "overlay", "state": "present", "params": "", "persistent": "present", "changed": true}]
+files:
+  description: Persistence files written (or that would be written in check mode) when O(modules) is used.
+  returned: when O(modules) is used
+  type: list
+  elements: str
+  sample: ["/etc/modules-load.d/container-networks.conf"]
 """
 
 import os.path
@@ -284,14 +329,203 @@ class Modprobe:
         }
 
 
+class ModprobeBatch:
+    """Manage a list of modules with one /proc/modules read and one write per file."""
+
+    STATES = ("absent", "present")
+    PERSISTENT = ("disabled", "absent", "present")
+
+    def __init__(self, module):
+        self.module = module
+        self.modprobe_bin = module.get_bin_path("modprobe", True)
+        self.check_mode = module.check_mode
+        self.persistent_file = module.params["persistent_file"]
+        self.entries = self._parse_entries(module.params["modules"])
+        self.changed_modules = set()
+        self.files = []
+        self._loaded = None
+        self._builtin = None
+
+    def _parse_entries(self, modules):
+        defaults = self.module.params
+        entries = []
+        seen = set()
+        for item in modules:
+            if isinstance(item, str):
+                item = {"name": item}
+            if not isinstance(item, dict) or not item.get("name"):
+                self.module.fail_json(msg=f"modules elements must be a name or a dict with a name, got {item!r}")
+            entry = {
+                "name": str(item["name"]).strip(),
+                "state": item.get("state", defaults["state"]),
+                "params": str(item.get("params") or ""),
+                "persistent": item.get("persistent", defaults["persistent"]),
+            }
+            if entry["state"] not in self.STATES:
+                self.module.fail_json(msg=f"invalid state {entry['state']!r} for module {entry['name']}")
+            if entry["persistent"] not in self.PERSISTENT:
+                self.module.fail_json(msg=f"invalid persistent {entry['persistent']!r} for module {entry['name']}")
+            if entry["name"] in seen:
+                self.module.fail_json(msg=f"module {entry['name']} is listed more than once")
+            seen.add(entry["name"])
+            entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _kernel_name(name):
+        return name.replace("-", "_")
+
+    def _read_loaded(self):
+        try:
+            with open("/proc/modules") as modules:
+                return {line.split(" ", 1)[0] for line in modules}
+        except OSError as e:
+            self.module.fail_json(msg=f"{e}", exception=traceback.format_exc())
+
+    def is_loaded(self, name):
+        if self._loaded is None:
+            self._loaded = self._read_loaded()
+        if self._kernel_name(name) in self._loaded:
+            return True
+        if self._builtin is None:
+            builtin_path = os.path.join("/lib/modules/", RELEASE_VER, "modules.builtin")
+            try:
+                with open(builtin_path) as builtins:
+                    self._builtin = {os.path.basename(line.rstrip())[: -len(".ko")] for line in builtins}
+            except OSError:
+                self._builtin = set()
+        return name in self._builtin or self._kernel_name(name) in self._builtin
+
+    def _run(self, command):
+        rc, out, err = self.module.run_command(command)
+        if rc != 0:
+            self.module.fail_json(msg=err, rc=rc, stdout=out, stderr=err, cmd=command, **self.result)
+
+    def apply_runtime(self):
+        to_load = [e for e in self.entries if e["state"] == "present" and not self.is_loaded(e["name"])]
+        to_unload = [e for e in self.entries if e["state"] == "absent" and self.is_loaded(e["name"])]
+        dry_run = ["-n"] if self.check_mode else []
+
+        plain = [e["name"] for e in to_load if not e["params"]]
+        if plain:
+            self._run([self.modprobe_bin] + dry_run + ["-a"] + plain)
+        for entry in to_load:
+            if entry["params"]:
+                self._run([self.modprobe_bin] + dry_run + [entry["name"]] + shlex.split(entry["params"]))
+        if to_unload:
+            self._run([self.modprobe_bin, "-r"] + dry_run + [e["name"] for e in to_unload])
+            self.changed_modules.update(e["name"] for e in to_unload)
+
+        if to_load:
+            if self.check_mode:
+                self.changed_modules.update(e["name"] for e in to_load)
+                return
+            # One re-read tells which modules actually got loaded
+            self._loaded = self._read_loaded()
+            for entry in to_load:
+                if self.is_loaded(entry["name"]):
+                    self.changed_modules.add(entry["name"])
+                else:
+                    self.module.warn(f"modprobe succeeded but {entry['name']} is not loaded")
+
+    @staticmethod
+    def _list_files(location):
+        if not os.path.isdir(location):
+            return []
+        paths = [os.path.join(location, path) for path in sorted(os.listdir(location))]
+        return [path for path in paths if os.path.isfile(path)]
+
+    @staticmethod
+    def _read_lines(path):
+        with open(path) as file:
+            return file.readlines()
+
+    def _write(self, path, lines):
+        self.files.append(path)
+        if not self.check_mode:
+            with open(path, "w") as file:
+                file.write("".join(lines))
+
+    def _target(self, name):
+        return f"{self.persistent_file or name}.conf"
+
+    def apply_persistence(self):
+        managed = [e for e in self.entries if e["persistent"] != "disabled"]
+        if not managed:
+            return
+
+        module_res = {e["name"]: re.compile(rf"^ *{re.escape(e['name'])} *(?:[#;].*)?\n?\Z") for e in managed}
+        option_res = {
+            e["name"]: re.compile(rf"^options {re.escape(e['name'])} \w+=\S+ *(?:[#;].*)?\n?\Z") for e in managed
+        }
+        present = [e for e in managed if e["persistent"] == "present"]
+        absent = {e["name"] for e in managed if e["persistent"] == "absent"}
+
+        # Desired content of the files this run owns: {filename: [(module, lines)]}
+        load_targets = {}
+        option_targets = {}
+        for entry in present:
+            name = entry["name"]
+            load_targets.setdefault(self._target(name), []).append((name, [f"{name}\n"]))
+            option_targets.setdefault(self._target(name), []).append(
+                (name, [f"options {name} {param}\n" for param in entry["params"].split()])
+            )
+
+        for location, targets, patterns, comment_for in (
+            (MODULES_LOAD_LOCATION, load_targets, module_res, absent),
+            (PARAMETERS_FILES_LOCATION, option_targets, option_res, absent | {e["name"] for e in present}),
+        ):
+            # Comment out entries for these modules everywhere but in the files written below
+            for path in self._list_files(location):
+                if os.path.basename(path) in targets:
+                    continue
+                lines = self._read_lines(path)
+                changed = False
+                for index, line in enumerate(lines):
+                    for name in comment_for:
+                        if patterns[name].match(line):
+                            lines[index] = f"#{line}"
+                            changed = True
+                            self.changed_modules.add(name)
+                            break
+                if changed:
+                    self._write(path, lines)
+
+            for filename, wanted in targets.items():
+                path = os.path.join(location, filename)
+                current = self._read_lines(path) if os.path.isfile(path) else None
+                lines = [line for _, module_lines in wanted for line in module_lines]
+                if current == lines or (current is None and not lines):
+                    continue
+                self._write(path, lines)
+                old = current or []
+                self.changed_modules.update(
+                    name
+                    for name, module_lines in wanted
+                    if [line for line in old if patterns[name].match(line)] != module_lines
+                )
+
+    @property
+    def result(self):
+        return {
+            "changed": bool(self.changed_modules or self.files),
+            "modules": [dict(entry, changed=entry["name"] in self.changed_modules) for entry in self.entries],
+            "files": self.files,
+        }
+
+
 def build_module():
     return AnsibleModule(
         argument_spec=dict(
-            name=dict(type="str", required=True),
+            name=dict(type="str"),
             state=dict(type="str", default="present", choices=["absent", "present"]),
             params=dict(type="str", default=""),
             persistent=dict(type="str", default="disabled", choices=["disabled", "present", "absent"]),
+            modules=dict(type="list", elements="raw"),
+            persistent_file=dict(type="str"),
         ),
+        mutually_exclusive=[("name", "modules")],
+        required_one_of=[("name", "modules")],
         supports_check_mode=True,
     )
 
@@ -299,6 +533,12 @@ def build_module():
 def main():
     module = build_module()
 
+    if module.params["modules"] is not None:
+        batch = ModprobeBatch(module)
+        batch.apply_runtime()
+        batch.apply_persistence()
+        module.exit_json(**batch.result)
+
     modprobe = Modprobe(module)
 
     if modprobe.desired_state == "present" and not modprobe.module_loaded():
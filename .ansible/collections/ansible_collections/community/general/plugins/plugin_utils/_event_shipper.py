@@ -0,0 +1,250 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Note that this module util is **PRIVATE** to the collection. It can have breaking changes at any time.
+# Do not use this from other collections or standalone plugins/modules!
+
+"""Background, batched event delivery for the HTTP notification callbacks.
+
+Callbacks encode each event on the controller's main thread and put() it on a
+bounded queue. A worker thread collects events into batches (by count, size
+and age), hands each batch to the callback's send function and retries failed
+deliveries with exponential backoff, so a slow collector no longer blocks the
+strategy. KeepAliveClient keeps one HTTP(S) connection open across batches.
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import http.client
+import queue
+import ssl
+import threading
+import time
+import typing as t
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+from ansible.module_utils.urls import open_url
+
+# Upper bound of one request body before compression; Splunk HEC rejects
+# bodies over its max_content_length (1 MB by default).
+MAX_BATCH_BYTES = 1000000
+
+
+class ShipperError(Exception):
+    """A batch was not delivered; ``retryable`` tells whether trying again can help."""
+
+    def __init__(self, msg: str, retryable: bool = True) -> None:
+        super().__init__(msg)
+        self.retryable = retryable
+
+
+def _retryable_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def gzip_body(body: bytes, headers: dict[str, str]) -> bytes:
+    """Compress ``body`` and mark it in ``headers``."""
+    headers["Content-Encoding"] = "gzip"
+    return gzip.compress(body, compresslevel=6)
+
+
+class KeepAliveClient:
+    """POSTs to one URL, reusing the connection between requests.
+
+    When a proxy from the environment applies to the URL, every request goes
+    through ``open_url`` instead (one connection per request), as before.
+    """
+
+    def __init__(self, url: str, validate_certs: bool = True, timeout: float = 30) -> None:
+        parts = urlsplit(url)
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.validate_certs = validate_certs
+        self.timeout = timeout
+        self.use_proxy = parts.scheme in getproxies() and not proxy_bypass(parts.hostname or "")
+        self.connections = 0
+        self._conn: http.client.HTTPConnection | None = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.connections += 1
+        if self.scheme == "https":
+            context = ssl.create_default_context()
+            if not self.validate_certs:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def post(self, body: bytes, headers: dict[str, str]) -> None:
+        if self.use_proxy:
+            self._post_open_url(body, headers)
+            return
+        for attempt in range(2):
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                self._conn.request("POST", self.path, body=body, headers=headers)
+                response = self._conn.getresponse()
+                response.read()
+            except (http.client.HTTPException, OSError) as e:
+                self.close()
+                if reused and attempt == 0:
+                    # the collector closed the idle connection; reconnect once
+                    continue
+                raise ShipperError(f"POST to {self.url} failed: {e}") from e
+            if response.will_close:
+                self.close()
+            if response.status >= 300:
+                raise ShipperError(
+                    f"POST to {self.url} returned HTTP {response.status} {response.reason}",
+                    retryable=_retryable_status(response.status),
+                )
+            return
+
+    def _post_open_url(self, body: bytes, headers: dict[str, str]) -> None:
+        try:
+            open_url(
+                self.url,
+                body,
+                headers=headers,
+                method="POST",
+                validate_certs=self.validate_certs,
+                timeout=self.timeout,
+            )
+        except HTTPError as e:
+            raise ShipperError(f"POST to {self.url} returned HTTP {e.code}", retryable=_retryable_status(e.code)) from e
+        except (URLError, OSError) as e:
+            raise ShipperError(f"POST to {self.url} failed: {e}") from e
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class _Marker:
+    def __init__(self, stop: bool) -> None:
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class EventShipper:
+    """Delivers encoded events in batches from a worker thread.
+
+    ``send(events)`` delivers one batch (a list of the ``bytes`` passed to
+    put()) and raises ShipperError on failure. ``warn(msg)`` reports dropped
+    batches. put() blocks while the queue is full, so memory stays bounded when
+    the collector cannot keep up.
+    """
+
+    def __init__(
+        self,
+        send: t.Callable[[list[bytes]], None],
+        warn: t.Callable[[str], None],
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_batch_bytes: int = MAX_BATCH_BYTES,
+    ) -> None:
+        self._send = send
+        self._warn = warn
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_batch_bytes = max_batch_bytes
+        self.sent = 0
+        self.dropped = 0
+        self.requests = 0
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def put(self, event: bytes) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-shipper", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        self._queue.put(event)
+
+    def _control(self, stop: bool, timeout: float | None) -> bool:
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return True
+            if stop:
+                self._thread = None
+        marker = _Marker(stop)
+        self._queue.put(marker)
+        done = marker.done.wait(timeout)
+        if stop:
+            thread.join(timeout)
+            atexit.unregister(self.close)
+        return done
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Deliver everything queued so far; False when ``timeout`` expired first."""
+        return self._control(False, timeout)
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Deliver everything queued and stop the worker; put() restarts it."""
+        return self._control(True, timeout)
+
+    def _run(self) -> None:
+        batch: list[bytes] = []
+        size = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, bytes):
+                if batch and size + len(item) > self.max_batch_bytes:
+                    self._deliver(batch)
+                    batch, size, deadline = [], 0, None
+                batch.append(item)
+                size += len(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                self._deliver(batch)
+                batch, size, deadline = [], 0, None
+            if isinstance(item, _Marker):
+                item.done.set()
+                if item.stop:
+                    return
+
+    def _deliver(self, batch: list[bytes]) -> None:
+        for attempt in range(self.retries + 1):
+            self.requests += 1
+            try:
+                self._send(batch)
+            except ShipperError as e:
+                if e.retryable and attempt < self.retries:
+                    time.sleep(self.backoff * 2**attempt)
+                    continue
+                error = e
+            except Exception as e:  # a failing callback must not kill the worker
+                error = e
+            else:
+                self.sent += len(batch)
+                return
+            self.dropped += len(batch)
+            self._warn(f"Dropped {len(batch)} events after {attempt + 1} attempts: {error}")
+            return
@@ -0,0 +1,480 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Note that this module util is **PRIVATE** to the collection. It can have breaking changes at any time.
+# Do not use this from other collections or standalone plugins/modules!
+
+"""Persistent exec channel for the container connection plugins.
+
+Instead of one ``incus exec`` (or liblxc attach) per command, a small Python
+agent is started once inside the instance. It runs commands and reads/writes
+files on request, with requests and replies framed over its stdin/stdout.
+
+The agent is owned by a broker process on the controller, which serves it on
+a unix socket in ``~/.ansible/cp`` and exits after being idle for ``persist``
+seconds, like SSH's ControlPersist. Connections of later tasks (which run in
+other worker processes) connect to the socket and reuse the agent; requests
+of concurrent clients are serialized.
+
+Every message is a JSON header frame followed by data frames and an empty
+terminating frame; a frame is a 4-byte big-endian length and that many bytes.
+This module only uses the standard library, since the broker runs it as a
+script (``python _exec_channel.py SPEC``).
+"""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import os
+import select
+import shlex
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import typing as t
+
+CONTROL_DIR = "~/.ansible/cp"
+HELLO = b"#ansible-exec-channel-1\n"
+CHUNK_SIZE = 1 << 20
+# output a login shell may print before the agent starts
+MAX_BANNER = 65536
+
+_LENGTH = struct.Struct("!I")
+
+AGENT = r"""
+import json, os, struct, subprocess, sys
+rfile, wfile = sys.stdin.buffer, sys.stdout.buffer
+sys.stdout = sys.stderr
+CHUNK = 1 << 20
+
+def read_frame():
+    head = rfile.read(4)
+    if len(head) < 4:
+        sys.exit(0)
+    size = struct.unpack("!I", head)[0]
+    data = rfile.read(size)
+    if len(data) < size:
+        sys.exit(0)
+    return data
+
+def read_data():
+    while True:
+        data = read_frame()
+        if not data:
+            return
+        yield data
+
+def write_frame(data):
+    wfile.write(struct.pack("!I", len(data)))
+    wfile.write(data)
+
+def reply(header, data=()):
+    write_frame(json.dumps(header).encode())
+    for block in data:
+        for start in range(0, len(block), CHUNK):
+            write_frame(block[start:start + CHUNK])
+    write_frame(b"")
+    wfile.flush()
+
+wfile.write(b"#ansible-exec-channel-1\n")
+wfile.flush()
+while True:
+    req = json.loads(read_frame().decode())
+    op = req["op"]
+    if op == "exec":
+        stdin = b"".join(read_data())
+        try:
+            proc = subprocess.Popen(req["argv"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out, err = proc.communicate(stdin)
+            rc = proc.returncode
+        except OSError as e:
+            out, err, rc = b"", str(e).encode(), 127
+        reply({"rc": rc, "stdout": len(out)}, [out, err])
+    elif op == "put":
+        error = None
+        try:
+            dst = open(req["path"], "wb")
+        except OSError as e:
+            dst, error = None, str(e)
+        for data in read_data():
+            if dst is not None:
+                try:
+                    dst.write(data)
+                except OSError as e:
+                    dst.close()
+                    dst, error = None, str(e)
+        if dst is not None:
+            try:
+                dst.close()
+                if req.get("mode") is not None:
+                    os.chmod(req["path"], req["mode"])
+            except OSError as e:
+                error = str(e)
+        reply({"error": error})
+    elif op == "fetch":
+        for data in read_data():
+            pass
+        try:
+            src = open(req["path"], "rb")
+        except OSError as e:
+            reply({"error": str(e)})
+            continue
+        with src:
+            reply({"error": None}, iter(lambda: src.read(CHUNK), b""))
+    else:
+        for data in read_data():
+            pass
+        reply({"error": "unknown request %r" % op})
+"""
+
+
+class ChannelError(Exception):
+    """The channel failed; ``delivered`` tells whether the request may have run."""
+
+    def __init__(self, msg: str, delivered: bool = False) -> None:
+        super().__init__(msg)
+        self.delivered = delivered
+
+
+class RemoteFileError(ChannelError):
+    """A file could not be read or written in the instance; the channel itself is fine."""
+
+
+def agent_command(interpreter: str) -> str:
+    """Shell command that replaces the shell with the agent."""
+    return f"exec {interpreter} -c {shlex.quote(AGENT)}"
+
+
+def control_path(name: str, spec: dict[str, t.Any], control_dir: str = CONTROL_DIR) -> str:
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.expanduser(control_dir), f"{name}-{digest}")
+
+
+def _frame(data: bytes) -> bytes:
+    return _LENGTH.pack(len(data)) + data
+
+
+def _read_exact(rfile: t.BinaryIO, size: int) -> bytes:
+    data = rfile.read(size)
+    if len(data) < size:
+        raise EOFError("unexpected end of stream")
+    return data
+
+
+def _read_frame(rfile: t.BinaryIO) -> bytes:
+    return _read_exact(rfile, _LENGTH.unpack(_read_exact(rfile, _LENGTH.size))[0])
+
+
+def _relay_message(rfile: t.BinaryIO, wfile: t.BinaryIO | None, first: bytes | None = None) -> None:
+    """Copy one message frame by frame; a ``wfile`` of None discards it."""
+    # the first frame is the JSON header and never empty
+    data = _read_frame(rfile) if first is None else first
+    while True:
+        if wfile is not None:
+            wfile.write(_frame(data))
+        if not data:
+            break
+        data = _read_frame(rfile)
+    if wfile is not None:
+        wfile.flush()
+
+
+class _Agent:
+    """The agent process inside the instance, as seen by the broker."""
+
+    def __init__(self, spec: dict[str, t.Any]) -> None:
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = None
+        self._pid = None
+        self.wfile = None
+        self.rfile = None
+        if "lxc" in spec:
+            import lxc as _lxc
+
+            container = _lxc.Container(spec["lxc"])
+            in_read, in_write = os.pipe()
+            out_read, out_write = os.pipe()
+            try:
+                self._pid = container.attach(
+                    _lxc.attach_run_command,
+                    spec["argv"],
+                    stdin=in_read,
+                    stdout=out_write,
+                    stderr=self._stderr.fileno(),
+                    env_policy=_lxc.LXC_ATTACH_CLEAR_ENV,
+                )
+            finally:
+                os.close(in_read)
+                os.close(out_write)
+            if self._pid == -1:
+                os.close(in_write)
+                os.close(out_read)
+                raise ChannelError(f"failed to attach to container {spec['lxc']}")
+            self.wfile = os.fdopen(in_write, "wb")
+            self.rfile = os.fdopen(out_read, "rb")
+        else:
+            try:
+                self._proc = subprocess.Popen(
+                    spec["argv"], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr
+                )
+            except OSError as e:
+                raise ChannelError(f"failed to start {spec['argv'][0]}: {e}") from e
+            self.wfile = self._proc.stdin
+            self.rfile = self._proc.stdout
+        try:
+            self._wait_hello(spec.get("timeout", 30))
+        except ChannelError:
+            self.stop()
+            raise
+
+    def _wait_hello(self, timeout: float) -> None:
+        fd = self.rfile.fileno()
+        seen = b""
+        while HELLO not in seen:
+            ready, dummy, dummy = select.select([fd], [], [], timeout)
+            data = os.read(fd, 4096) if ready else b""
+            if not data or len(seen) > MAX_BANNER:
+                self._stderr.seek(0)
+                reason = self._stderr.read().decode("utf-8", "replace").strip() or "no reply"
+                raise ChannelError(f"agent did not start: {reason}")
+            seen += data
+        if not seen.endswith(HELLO):
+            raise ChannelError("unexpected agent output after start")
+
+    def stop(self) -> None:
+        for stream in (self.wfile, self.rfile):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        if self._proc is not None:
+            try:
+                self._proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        elif self._pid is not None:
+            try:
+                os.kill(self._pid, signal.SIGTERM)
+                os.waitpid(self._pid, 0)
+            except OSError:
+                pass
+        self._stderr.close()
+
+
+def _serve_client(client: socket.socket, agent: _Agent) -> bool:
+    """Relay the requests of one client; False when the agent is no longer usable."""
+    crfile = client.makefile("rb")
+    cwfile = client.makefile("wb")
+    try:
+        while True:
+            try:
+                first = _read_frame(crfile)
+            except EOFError:
+                # disconnected between requests
+                return True
+            except OSError:
+                return True
+            try:
+                _relay_message(crfile, agent.wfile, first)
+            except (EOFError, OSError):
+                # the request is incomplete, the agent's stream is out of sync
+                return False
+            try:
+                _relay_message(agent.rfile, cwfile)
+            except EOFError:
+                return False
+            except OSError:
+                # the client went away while the reply was sent; drop the rest of it
+                try:
+                    _relay_message(agent.rfile, None)
+                except (EOFError, OSError):
+                    return False
+                return True
+    finally:
+        crfile.close()
+        try:
+            cwfile.close()
+        except OSError:
+            pass
+
+
+def serve(spec_json: str) -> int:
+    """Broker entry point: start the agent and serve it until idle."""
+    spec = json.loads(spec_json)
+    path = spec["path"]
+    out = sys.stdout
+    try:
+        agent = _Agent(spec)
+    except Exception as e:
+        out.write(f"error {e}\n")
+        return 1
+
+    os.umask(0o077)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+    except OSError as e:
+        sock.close()
+        agent.stop()
+        out.write("exists\n" if e.errno == errno.EADDRINUSE else f"error {e}\n")
+        return 0
+    inode = os.stat(path).st_ino
+    try:
+        sock.listen(16)
+        sock.settimeout(spec["persist"])
+        out.write("ready\n")
+        out.close()
+        while True:
+            try:
+                client, dummy = sock.accept()
+            except TimeoutError:
+                break
+            client.settimeout(None)
+            with client:
+                if not _serve_client(client, agent):
+                    break
+    finally:
+        sock.close()
+        try:
+            # only remove the socket if a newer broker has not replaced it
+            if os.stat(path).st_ino == inode:
+                os.unlink(path)
+        except OSError:
+            pass
+        agent.stop()
+    return 0
+
+
+def _start_broker(spec: dict[str, t.Any], timeout: float) -> None:
+    try:
+        broker = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), json.dumps(spec)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            close_fds=True,
+            start_new_session=True,
+        )
+    except OSError as e:
+        raise ChannelError(f"failed to start the channel broker: {e}") from e
+    with broker.stdout:
+        ready, dummy, dummy = select.select([broker.stdout], [], [], timeout + 5)
+        status = broker.stdout.readline().decode("utf-8", "replace").strip() if ready else "error timed out"
+    if status.startswith("error"):
+        broker.wait()
+        raise ChannelError(status[len("error") :].strip() or "channel broker failed")
+
+
+class ExecChannel:
+    """Client side of a persistent channel to one instance."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._rfile = sock.makefile("rb")
+
+    @classmethod
+    def connect(
+        cls,
+        name: str,
+        spec: dict[str, t.Any],
+        persist: float = 60,
+        timeout: float = 30,
+        control_dir: str = CONTROL_DIR,
+    ) -> ExecChannel:
+        """Connect to the broker for ``spec``, starting it first when needed.
+
+        ``spec`` is ``{"argv": [...]}`` to start the agent with that command on
+        the controller, or ``{"lxc": name, "argv": [...]}`` to run ``argv`` in a
+        local LXC container through liblxc.
+        """
+        path = control_path(name, spec, control_dir)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        for _attempt in range(3):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+            except OSError as e:
+                sock.close()
+                if e.errno == errno.ECONNREFUSED:
+                    # left behind by a broker that did not exit cleanly
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                elif e.errno != errno.ENOENT:
+                    raise ChannelError(f"cannot connect to {path}: {e}") from e
+                _start_broker(dict(spec, path=path, persist=persist, timeout=timeout), timeout)
+                continue
+            return cls(sock)
+        raise ChannelError(f"cannot connect to {path}")
+
+    def _request(self, header: dict[str, t.Any], data: t.Iterable[bytes] = ()) -> None:
+        try:
+            self._sock.sendall(_frame(json.dumps(header).encode("utf-8")))
+            for block in data:
+                for start in range(0, len(block), CHUNK_SIZE):
+                    self._sock.sendall(_frame(block[start : start + CHUNK_SIZE]))
+            self._sock.sendall(_frame(b""))
+        except OSError as e:
+            raise ChannelError(f"sending the request failed: {e}") from e
+
+    def _reply(self, delivered: bool = True) -> tuple[dict[str, t.Any], t.Iterator[bytes]]:
+        try:
+            header = json.loads(_read_frame(self._rfile))
+        except (EOFError, OSError, ValueError) as e:
+            raise ChannelError(f"no reply from the agent: {e}", delivered=delivered) from e
+
+        def data() -> t.Iterator[bytes]:
+            while True:
+                try:
+                    block = _read_frame(self._rfile)
+                except (EOFError, OSError) as e:
+                    raise ChannelError(f"incomplete reply from the agent: {e}", delivered=delivered) from e
+                if not block:
+                    return
+                yield block
+
+        return header, data()
+
+    def exec_command(self, argv: list[str], in_data: bytes | None = None) -> tuple[int, bytes, bytes]:
+        """Run ``argv`` in the instance; ``(rc, stdout, stderr)``."""
+        self._request({"op": "exec", "argv": argv}, [in_data] if in_data else [])
+        header, data = self._reply()
+        output = b"".join(data)
+        return header["rc"], output[: header["stdout"]], output[header["stdout"] :]
+
+    def put_file(self, in_path: str | bytes, out_path: str, mode: int | None = None) -> None:
+        with open(in_path, "rb") as src:
+            self._request({"op": "put", "path": out_path, "mode": mode}, iter(lambda: src.read(CHUNK_SIZE), b""))
+        header, data = self._reply(delivered=False)
+        for dummy in data:
+            pass
+        if header.get("error"):
+            raise RemoteFileError(f"failed to write {out_path}: {header['error']}")
+
+    def fetch_file(self, in_path: str, out_path: str | bytes) -> None:
+        self._request({"op": "fetch", "path": in_path})
+        header, data = self._reply(delivered=False)
+        if header.get("error"):
+            for dummy in data:
+                pass
+            raise RemoteFileError(f"failed to read {in_path}: {header['error']}")
+        with open(out_path, "wb") as dst:
+            for block in data:
+                dst.write(block)
+
+    def close(self) -> None:
+        self._rfile.close()
+        self._sock.close()
+
+
+if __name__ == "__main__":
+    sys.exit(serve(sys.argv[1]))
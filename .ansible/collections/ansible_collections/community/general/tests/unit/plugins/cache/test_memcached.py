@@ -16,3 +16,124 @@ from ansible_collections.community.general.plugins.cache.memcached import CacheM
 
 def test_memcached_cachemodule():
     assert isinstance(cache_loader.get("community.general.memcached"), MemcachedCache)
+
+
+class FakeClient:
+    """In-memory stand-in for memcache.Client; all instances share one store."""
+
+    store = {}
+    calls = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _record(self, name, *values):
+        self.calls.append((name, sum(len(v) for v in values if isinstance(v, str))))
+
+    def get(self, key):
+        self._record("get")
+        return self.store.get(key)
+
+    def get_multi(self, keys, key_prefix=""):
+        self._record("get_multi")
+        return {k: self.store[key_prefix + k] for k in keys if key_prefix + k in self.store}
+
+    def set(self, key, value, time=0, min_compress_len=0):
+        self._record("set")
+        self.store[key] = value
+        return True
+
+    def set_multi(self, mapping, time=0, key_prefix=""):
+        self._record("set_multi", *mapping.values())
+        self.store.update(mapping)
+        return []
+
+    def append(self, key, value):
+        self._record("append", value)
+        if key not in self.store:
+            return 0
+        self.store[key] += value
+        return 1
+
+    def delete(self, key):
+        self._record("delete")
+        self.store.pop(key, None)
+
+    def delete_multi(self, keys):
+        self._record("delete_multi")
+        for key in keys:
+            self.store.pop(key, None)
+
+    def disconnect_all(self):
+        pass
+
+
+@pytest.fixture
+def memcached_cache(monkeypatch):
+    import memcache
+
+    monkeypatch.setattr(memcache, "Client", FakeClient)
+    FakeClient.store = {}
+    FakeClient.calls = []
+
+    def load():
+        cache = cache_loader.get("community.general.memcached", _keyset_flush_size=8)
+        # ansible-core 2.19+ wraps cache plugins in a proxy that rewrites keys and values; test the plugin itself
+        cache = getattr(cache, "__wrapped__", cache)
+        assert isinstance(cache, MemcachedCache)
+        return cache
+
+    return load
+
+
+def test_memcached_keyset_updates_are_appended(memcached_cache):
+    cache = memcached_cache()
+    for n in range(2000):
+        cache.set(f"host{n:04d}", {"n": n})
+    cache._keys.flush()
+    uploaded = sum(size for name, size in FakeClient.calls if name in ("append", "set_multi"))
+    # every host's keyset line is written a small, constant number of times
+    assert uploaded < 2000 * 30 * 4
+    assert not any(name == "set" and size for name, size in FakeClient.calls)
+
+
+def test_memcached_keyset_survives_reload(memcached_cache):
+    cache = memcached_cache()
+    for n in range(20):
+        cache.set(f"host{n}", {"n": n})
+    cache.delete("host3")
+    cache._keys.flush()
+    reloaded = memcached_cache()
+    assert sorted(reloaded.keys()) == sorted(f"host{n}" for n in range(20) if n != 3)
+    assert reloaded.contains("host4")
+    assert not reloaded.contains("host3")
+
+
+def test_memcached_copy_uses_get_multi(memcached_cache):
+    cache = memcached_cache()
+    for n in range(3):
+        cache.set(f"host{n}", {"n": n})
+    cache._cache = {}
+    FakeClient.calls = []
+    assert cache.copy() == {"host0": {"n": 0}, "host1": {"n": 1}, "host2": {"n": 2}}
+    assert [name for name, size in FakeClient.calls] == ["get_multi"]
+
+
+def test_memcached_migrates_legacy_keyset(memcached_cache):
+    FakeClient.store["ansible_cache_keys"] = {"old": 4102444800.0}
+    FakeClient.store["ansible_factsold"] = {"n": 0}
+    cache = memcached_cache()
+    assert cache.keys() == ["old"]
+    assert "ansible_cache_keys" not in FakeClient.store
+    assert memcached_cache().get("old") == {"n": 0}
+
+
+def test_memcached_round_trip_through_loader(memcached_cache):
+    # only the public API, so this also holds behind the 2.19+ proxy
+    cache = cache_loader.get("community.general.memcached", _keyset_flush_size=8)
+    cache.set("host1", {"ansible_os_family": "Debian"})
+    assert cache.keys() == ["host1"]
+    assert cache.contains("host1")
+    assert cache.get("host1") == {"ansible_os_family": "Debian"}
+    cache.delete("host1")
+    assert cache.keys() == []
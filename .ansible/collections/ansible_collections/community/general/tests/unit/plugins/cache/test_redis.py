@@ -24,3 +24,150 @@ def test_redis_cachemodule_2():
     # The _uri option is required for the redis plugin
     connection = "[::1]:6379:1"
     assert isinstance(cache_loader.get("community.general.redis", **{"_uri": connection}), RedisCache)
+
+
+class FakeRedis:
+    """In-memory stand-in for StrictRedis that records one entry per round trip."""
+
+    def __init__(self):
+        self.data = {}
+        self.zset = {}
+        self.round_trips = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _call(self, name, *args):
+        self.round_trips.append(name)
+        return getattr(self, f"_{name}")(*args)
+
+    def __getattr__(self, name):
+        if name in (
+            "get",
+            "set",
+            "setex",
+            "mget",
+            "delete",
+            "zadd",
+            "zrem",
+            "zrange",
+            "zrangebyscore",
+            "zremrangebyscore",
+            "zscore",
+        ):
+            return lambda *args: self._call(name, *args)
+        raise AttributeError(name)
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _set(self, key, value):
+        self.data[key] = value
+
+    def _setex(self, key, timeout, value):
+        self.data[key] = value
+
+    def _mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def _delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def _zadd(self, name, mapping):
+        self.zset.update(mapping)
+
+    def _zrem(self, name, *keys):
+        for key in keys:
+            self.zset.pop(key, None)
+
+    def _zrange(self, name, start, end):
+        return [k.encode() for k, s in sorted(self.zset.items(), key=lambda i: i[1])]
+
+    def _zrangebyscore(self, name, low, high):
+        low = float(str(low).lstrip("("))
+        return [k.encode() for k, s in sorted(self.zset.items(), key=lambda i: i[1]) if s > low]
+
+    def _zremrangebyscore(self, name, low, high):
+        for key in [k for k, s in self.zset.items() if low <= s <= high]:
+            del self.zset[key]
+
+    def _zscore(self, name, key):
+        return self.zset.get(key)
+
+
+class FakePipeline:
+    def __init__(self, db):
+        self.db = db
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.queued.append((name, args))
+            return self
+
+        return queue
+
+    def execute(self):
+        self.db.round_trips.append("exec")
+        return [getattr(self.db, f"_{name}")(*args) for name, args in self.queued]
+
+
+@pytest.fixture
+def redis_cache():
+    cache = cache_loader.get("community.general.redis", **{"_uri": "127.0.0.1:6379:1"})
+    # ansible-core 2.19+ wraps cache plugins in a proxy that rewrites keys and values; test the plugin itself
+    cache = getattr(cache, "__wrapped__", cache)
+    assert isinstance(cache, RedisCache)
+    cache._db = FakeRedis()
+    return cache
+
+
+def test_redis_set_is_one_round_trip(redis_cache):
+    redis_cache.set("host1", {"ansible_os_family": "Debian"})
+    assert redis_cache._db.round_trips == ["exec"]
+    assert redis_cache._db.data["ansible_factshost1"] == b'{"ansible_os_family":"Debian"}'
+    assert "host1" in redis_cache._db.zset
+
+
+def test_redis_copy_uses_mget(redis_cache):
+    for n in range(3):
+        redis_cache.set(f"host{n}", {"n": n})
+    redis_cache._cache = {}
+    redis_cache._db.round_trips = []
+    assert redis_cache.copy() == {"host0": {"n": 0}, "host1": {"n": 1}, "host2": {"n": 2}}
+    assert redis_cache._db.round_trips == ["zremrangebyscore", "zrangebyscore", "mget"]
+
+
+@pytest.mark.parametrize("compression", ["zlib", "none"])
+def test_redis_reads_any_compression(redis_cache, compression):
+    redis_cache._compression = compression
+    redis_cache.set("host1", {"facts": "x" * 1000})
+    stored = redis_cache._db.data["ansible_factshost1"]
+    assert (len(stored) < 100) == (compression == "zlib")
+    redis_cache._compression = "none" if compression == "zlib" else "zlib"
+    redis_cache._cache = {}
+    assert redis_cache.get("host1") == {"facts": "x" * 1000}
+
+
+def test_redis_expiry_sweep_is_throttled(redis_cache):
+    redis_cache.set("host1", {})
+    assert redis_cache.contains("host1")
+    redis_cache._db.zset["stale"] = 1.0
+    assert not redis_cache.contains("stale")
+    assert redis_cache.keys() == ["host1"]
+    # expired, but left in the keyset until the next sweep
+    assert "stale" in redis_cache._db.zset
+    assert redis_cache._db.round_trips.count("zremrangebyscore") == 1
+
+
+def test_redis_round_trip_through_loader():
+    # only the public API, so this also holds behind the 2.19+ proxy
+    cache = cache_loader.get("community.general.redis", **{"_uri": "127.0.0.1:6379:1"})
+    cache._db = FakeRedis()
+    cache.set("host1", {"ansible_os_family": "Debian"})
+    assert cache.keys() == ["host1"]
+    assert cache.contains("host1")
+    assert cache.get("host1") == {"ansible_os_family": "Debian"}
+    cache.delete("host1")
+    assert cache.keys() == []
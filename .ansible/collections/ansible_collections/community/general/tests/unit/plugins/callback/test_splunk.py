@@ -4,6 +4,7 @@
 
 from __future__ import annotations
 
+import gzip
 import json
 import unittest
 from datetime import datetime
@@ -74,3 +75,12 @@ class TestSplunkClient(unittest.TestCase):
         self.assertEqual(sent_data["event"]["timestamp"], "2020-12-01 00:00:00 +0000")
         self.assertEqual(sent_data["event"]["host"], "my-host")
         self.assertEqual(sent_data["event"]["ip_address"], "1.2.3.4")
+
+    def test_send_batch_gzips_concatenated_events(self):
+        client = Mock()
+        self.splunk.send_batch(client, "token", True, [b'{"event": 1}', b'{"event": 2}'])
+
+        body, headers = client.post.call_args[0]
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Authorization"], "Splunk token")
+        self.assertEqual(gzip.decompress(body), b'{"event": 1}\n{"event": 2}')
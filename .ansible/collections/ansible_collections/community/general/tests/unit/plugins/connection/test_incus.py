@@ -11,6 +11,8 @@ import pytest
 from ansible.playbook.play_context import PlayContext
 from ansible.plugins.loader import connection_loader
 
+from ansible_collections.community.general.plugins.plugin_utils._exec_channel import ChannelError, ExecChannel
+
 BUILD_CMD_TEST_CASES: list[dict[str, t.Any]] = [
     dict(
         id="sh simple",
@@ -134,3 +136,42 @@ def test_build_command(mocker, testcase):
     built = conn._build_command(testcase["input"]["cmd"])
     tc_cmd = cli_preamble + testcase["output"]
     assert built == tc_cmd, f"\n   built = {built}\ntestcase = {tc_cmd}"
+
+
+def make_persistent_conn(mocker):
+    mocker.patch("ansible.module_utils.common.process.get_bin_path").return_value = "/test/bin/incus"
+    conn = connection_loader.get("community.general.incus", PlayContext(), StringIO())
+    conn.set_option("remote_addr", "server1")
+    conn.set_option("remote_user", "root")
+    conn.set_option("persistent", True)
+    return conn
+
+
+def test_persistent_channel(mocker):
+    conn = make_persistent_conn(mocker)
+    channel = mocker.MagicMock()
+    channel.exec_command.return_value = (0, b"out", b"")
+    connect = mocker.patch.object(ExecChannel, "connect", return_value=channel)
+
+    assert conn.exec_command("echo out") == (0, "out", "")
+    assert conn.exec_command("echo out", in_data=b"data") == (0, "out", "")
+
+    connect.assert_called_once()
+    argv = connect.call_args.args[1]["argv"]
+    assert argv[:7] == ["/test/bin/incus", "--project", "default", "exec", "local:server1", "--", "/bin/sh"]
+    channel.exec_command.assert_called_with(["/bin/sh", "-c", "echo out"], b"data")
+
+
+def test_persistent_channel_falls_back_to_exec(mocker):
+    conn = make_persistent_conn(mocker)
+    connect = mocker.patch.object(ExecChannel, "connect", side_effect=ChannelError("agent did not start"))
+    popen = mocker.patch("ansible_collections.community.general.plugins.connection.incus.Popen")
+    popen.return_value.communicate.return_value = (b"out", b"")
+    popen.return_value.returncode = 0
+
+    assert conn.exec_command("echo out") == (0, "out", "")
+    assert conn.exec_command("echo out") == (0, "out", "")
+
+    # a failed channel is not retried for every command
+    connect.assert_called_once()
+    assert popen.call_count == 2
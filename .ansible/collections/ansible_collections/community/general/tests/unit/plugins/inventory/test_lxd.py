@@ -5,10 +5,14 @@
 
 from __future__ import annotations
 
+import copy
+from unittest.mock import Mock
+
 import pytest
 from ansible.inventory.data import InventoryData
 
 from ansible_collections.community.general.plugins.inventory.lxd import InventoryModule
+from ansible_collections.community.general.plugins.module_utils.lxd import LXDClientException
 
 HOST_COMPARATIVE_DATA = {
     "ansible_connection": "ssh",
@@ -120,3 +124,56 @@ def test_build_inventory_groups_with_no_groupselection(inventory):
         if generated_data[key] != value:
             eq = False
     assert eq
+
+
+class FakeLXDClient:
+    """Answers GET requests from inventory test data the way the LXD API would."""
+
+    def __init__(self, data, api_extensions):
+        self.data = data
+        self.api_extensions = api_extensions
+        self.url = "unix:/fake/unix.socket"
+        self.connection = Mock()
+        self.paths = []
+
+    def do(self, method, url, **kwargs):
+        path, dummy, query = url.partition("?")
+        self.paths.append(path)
+        parts = path.split("/")[2:]
+        if not parts:
+            return {"metadata": {"api_extensions": self.api_extensions}}
+        if parts == ["instances"] and "recursion=2" in query:
+            return {
+                "metadata": [
+                    dict(entry["instances"]["metadata"], state=entry["state"]["metadata"], snapshots=None)
+                    for entry in self.data["instances"].values()
+                ]
+            }
+        branch = "instances" if len(parts) == 2 else parts[2]
+        entry = self.data[parts[0]].get(parts[1])
+        if entry is None:
+            raise LXDClientException("not found")
+        return copy.deepcopy(entry[branch])
+
+
+@pytest.mark.parametrize(
+    "api_extensions, concurrent_requests",
+    [(["container_full"], 8), ([], 1), ([], 4)],
+)
+def test_fetched_data_matches_fixture(inventory, api_extensions, concurrent_requests):
+    expected = copy.deepcopy(inventory.data)
+    expected["networks"]["missing"] = None
+    client = FakeLXDClient(inventory.data, api_extensions)
+    inventory.data = {}
+    inventory.socket = client
+    inventory.project = "default"
+    inventory.concurrent_requests = concurrent_requests
+    inventory._new_client = lambda: client
+
+    if not inventory.get_instance_data_recursive():
+        inventory.get_instance_data(list(expected["instances"]))
+    inventory.get_network_data(list(expected["networks"]))
+
+    assert inventory.data == expected
+    instance_requests = [p for p in client.paths if p.startswith("/1.0/instances")]
+    assert len(instance_requests) == (1 if api_extensions else 2 * len(expected["instances"]))
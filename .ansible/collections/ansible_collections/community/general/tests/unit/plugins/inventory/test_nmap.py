@@ -0,0 +1,194 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import pytest
+from ansible.errors import AnsibleParserError
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+
+from ansible_collections.community.general.plugins.inventory import nmap
+from ansible_collections.community.general.plugins.inventory.nmap import (
+    MAX_CHUNKS,
+    InventoryModule,
+    parse_nmap_xml,
+    split_address,
+)
+
+FIXTURE = "tests/unit/plugins/inventory/fixtures/nmap_scan.xml"
+
+OPTIONS = {
+    "address": "10.0.0.0/22",
+    "chunk_size": 256,
+    "concurrent_scans": 2,
+    "sudo": False,
+    "port": None,
+    "ports": True,
+    "ipv4": True,
+    "ipv6": True,
+    "exclude": None,
+    "dns_resolve": False,
+    "dns_servers": None,
+    "udp_scan": False,
+    "icmp_timestamp": False,
+    "open": False,
+    "use_arp_ping": True,
+    "cache": True,
+    "strict": False,
+    "compose": {},
+    "groups": {},
+    "keyed_groups": [],
+}
+
+
+@pytest.fixture
+def inventory(mocker):
+    plugin = InventoryModule()
+    plugin._options = dict(OPTIONS)
+    plugin._cache = {}
+    mocker.patch.object(nmap, "get_bin_path", return_value="/usr/bin/nmap")
+    mocker.patch.object(plugin, "_read_config_data")
+    mocker.patch.object(plugin, "get_cache_key", return_value="nmap_key")
+    return plugin
+
+
+@pytest.fixture
+def scanned(mocker, inventory):
+    """Replace nmap with one fake up host per chunk and record the scanned targets."""
+    targets = []
+
+    def scan(cmd, target):
+        targets.append(target)
+        return [{"name": target.split("/")[0], "ip": target.split("/")[0]}]
+
+    mocker.patch.object(inventory, "_scan", side_effect=scan)
+    return targets
+
+
+def run(plugin, cache=True):
+    plugin.parse(InventoryData(), DataLoader(), "test.nmap.yml", cache=cache)
+    return plugin.inventory
+
+
+def test_parse_xml_fixture():
+    with open(FIXTURE, "rb") as f:
+        hosts = parse_nmap_xml(f)
+
+    # the down host is skipped
+    assert [host["ip"] for host in hosts] == ["192.0.2.1", "192.0.2.2", "192.0.2.3", "192.0.2.5"]
+    by_ip = {host["ip"]: host for host in hosts}
+
+    # the name given on the command line wins over reverse DNS
+    assert by_ip["192.0.2.1"]["name"] == "gateway"
+    assert by_ip["192.0.2.1"]["ports"] == [
+        {"port": "22", "protocol": "tcp", "state": "open", "service": "ssh"},
+        {"port": "80", "protocol": "tcp", "state": "open", "service": "http"},
+    ]
+    assert by_ip["192.0.2.2"]["name"] == "www.example.com"
+    assert by_ip["192.0.2.2"]["ports"] == [
+        {"port": "53", "protocol": "udp", "state": "open|filtered", "service": "domain"},
+        {"port": "8443", "protocol": "tcp", "state": "open", "service": "unknown"},
+    ]
+    # arpa names and hosts without names fall back to the address
+    assert by_ip["192.0.2.3"] == {"name": "192.0.2.3", "ip": "192.0.2.3"}
+    assert by_ip["192.0.2.5"] == {"name": "192.0.2.5", "ip": "192.0.2.5"}
+
+
+def test_split_address():
+    assert split_address("10.0.0.0/22", 256) == ["10.0.0.0/24", "10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24"]
+    assert split_address("10.0.0.0/24", 256) == ["10.0.0.0/24"]
+    assert split_address("10.0.0.0/22", 0) == ["10.0.0.0/22"]
+    # chunk sizes that are not a power of two round down
+    assert split_address("10.0.0.0/24", 100) == [f"10.0.0.{n}/26" for n in range(0, 256, 64)]
+    assert len(split_address("2001:db8::/112", 256)) == 256
+
+
+def test_split_address_caps_chunks():
+    chunks = split_address("10.0.0.0/8", 256)
+    assert len(chunks) == MAX_CHUNKS
+    assert chunks[:2] == ["10.0.0.0/18", "10.0.64.0/18"]
+    assert len(split_address("2001:db8::/64", 256)) == MAX_CHUNKS
+
+
+@pytest.mark.parametrize("address", ["host.example.com", "10.0.0.1-20", "10.0.0.1,10.0.1.1", "10.0.*.1"])
+def test_split_address_passes_through_other_targets(address):
+    assert split_address(address, 256) == [address]
+
+
+def test_scan_parses_command_output(inventory):
+    # the fixture stands in for "nmap ... -oX - <target>"
+    hosts = inventory._scan(["/bin/sh", "-c", 'cat "$0"', FIXTURE], "192.0.2.0/29")
+    assert len(hosts) == 4
+
+
+def test_scan_errors(inventory):
+    with pytest.raises(AnsibleParserError, match="rc=3: boom"):
+        inventory._scan(["/bin/sh", "-c", "echo boom >&2; exit 3"], "192.0.2.0/29")
+    with pytest.raises(AnsibleParserError, match="Invalid nmap XML output for 192.0.2.0/29"):
+        inventory._scan(["/bin/sh", "-c", "echo '<nmaprun><host>'"], "192.0.2.0/29")
+    # a process still writing when the output turns invalid is stopped by the closed pipe
+    with pytest.raises(AnsibleParserError, match="Invalid nmap XML output"):
+        inventory._scan(["/bin/sh", "-c", "echo '<nmaprun></host>'; exec yes"], "192.0.2.0/29")
+
+
+def test_command_requests_xml(inventory):
+    inventory._nmap = "/usr/bin/nmap"
+    inventory._options.update(ipv6=False, open=True)
+    assert inventory._command() == ["/usr/bin/nmap", "-4", "--open", "-oX", "-"]
+
+
+def test_parse_scans_chunks_and_caches_them(inventory, scanned):
+    hosts = run(inventory).hosts
+    assert sorted(scanned) == ["10.0.0.0/24", "10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24"]
+    assert sorted(hosts) == ["10.0.0.0", "10.0.1.0", "10.0.2.0", "10.0.3.0"]
+    assert hosts["10.0.1.0"].vars["ip"] == "10.0.1.0"
+    assert len(inventory._cache) == 4
+
+    # a second run is served from the cache
+    scanned.clear()
+    assert sorted(run(inventory).hosts) == sorted(hosts)
+    assert scanned == []
+
+
+def test_parse_partial_cache_hit(inventory, scanned):
+    run(inventory)
+    # expire one chunk
+    key = sorted(inventory._cache)[0]
+    expired = inventory._cache.pop(key)
+    scanned.clear()
+
+    hosts = run(inventory).hosts
+    assert scanned == [expired[0]["ip"] + "/24"]
+    assert len(hosts) == 4
+    assert inventory._cache[key] == expired
+
+
+def test_parse_refresh_rescans_everything(inventory, scanned):
+    run(inventory)
+    scanned.clear()
+    run(inventory, cache=False)
+    assert len(scanned) == 4
+
+
+def test_parse_cache_is_keyed_by_scan_options(inventory, scanned):
+    run(inventory)
+    scanned.clear()
+    inventory._options["udp_scan"] = True
+    run(inventory)
+    assert len(scanned) == 4
+    assert len(inventory._cache) == 8
+
+
+def test_parse_without_cache(inventory, scanned):
+    inventory._options["cache"] = False
+    run(inventory)
+    assert len(scanned) == 4
+    assert inventory._cache == {}
+
+
+def test_parse_scan_failure(inventory, mocker):
+    mocker.patch.object(inventory, "_scan", side_effect=AnsibleParserError("Failed to run nmap, rc=1: nope"))
+    with pytest.raises(AnsibleParserError, match="failed to parse test.nmap.yml: Failed to run nmap"):
+        run(inventory)
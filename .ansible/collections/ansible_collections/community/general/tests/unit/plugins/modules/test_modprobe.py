@@ -4,6 +4,8 @@
 
 from __future__ import annotations
 
+import os
+import tempfile
 from unittest.mock import Mock, mock_open, patch
 
 from ansible_collections.community.internal_test_tools.tests.unit.plugins.modules.utils import (
@@ -11,7 +13,7 @@ from ansible_collections.community.internal_test_tools.tests.unit.plugins.module
     set_module_args,
 )
 
-from ansible_collections.community.general.plugins.modules.modprobe import Modprobe, build_module
+from ansible_collections.community.general.plugins.modules.modprobe import Modprobe, ModprobeBatch, build_module
 
 
 class TestLoadModule(ModuleTestCase):
@@ -428,3 +430,128 @@ class TestDisableModulePermanent(ModuleTestCase):
                     modprobe.modules_files = ["/etc/modules-load.d/dummy.conf"]
                     modprobe.disable_module_permanent()
                     mocked_file.assert_called_once_with("/etc/modules-load.d/dummy.conf")
+
+
+class TestModprobeBatch(ModuleTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.mock_read_loaded = patch(
+            "ansible_collections.community.general.plugins.modules.modprobe.ModprobeBatch._read_loaded"
+        )
+        self.mock_run_command = patch("ansible.module_utils.basic.AnsibleModule.run_command")
+        self.mock_get_bin_path = patch("ansible.module_utils.basic.AnsibleModule.get_bin_path")
+
+        self.read_loaded = self.mock_read_loaded.start()
+        self.run_command = self.mock_run_command.start()
+        self.get_bin_path = self.mock_get_bin_path.start()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.modules_load = os.path.join(self.tmpdir.name, "modules-load.d")
+        self.modprobe_d = os.path.join(self.tmpdir.name, "modprobe.d")
+        os.mkdir(self.modules_load)
+        os.mkdir(self.modprobe_d)
+        self.mock_locations = [
+            patch(
+                "ansible_collections.community.general.plugins.modules.modprobe.MODULES_LOAD_LOCATION",
+                self.modules_load,
+            ),
+            patch(
+                "ansible_collections.community.general.plugins.modules.modprobe.PARAMETERS_FILES_LOCATION",
+                self.modprobe_d,
+            ),
+        ]
+        for location in self.mock_locations:
+            location.start()
+
+    def tearDown(self):
+        """Teardown."""
+        super().tearDown()
+        for location in self.mock_locations:
+            location.stop()
+        self.tmpdir.cleanup()
+        self.mock_read_loaded.stop()
+        self.mock_run_command.stop()
+        self.mock_get_bin_path.stop()
+
+    def read(self, *path):
+        with open(os.path.join(*path)) as file:
+            return file.read()
+
+    def test_loads_only_missing_modules(self):
+        with set_module_args(
+            dict(modules=["loaded", "overlay", "br_netfilter", dict(name="dummy", params="numdummies=2")])
+        ):
+            module = build_module()
+
+            self.get_bin_path.side_effect = ["modprobe"]
+            self.read_loaded.side_effect = [{"loaded"}, {"loaded", "overlay", "br_netfilter", "dummy"}]
+            self.run_command.side_effect = [(0, "", ""), (0, "", "")]
+
+            batch = ModprobeBatch(module)
+            batch._builtin = set()
+            batch.apply_runtime()
+
+        assert [call.args[0] for call in self.run_command.call_args_list] == [
+            ["modprobe", "-a", "overlay", "br_netfilter"],
+            ["modprobe", "dummy", "numdummies=2"],
+        ]
+        assert [entry["changed"] for entry in batch.result["modules"]] == [False, True, True, True]
+
+    def test_unloads_in_one_call(self):
+        with set_module_args(dict(modules=["a", "b", "c"], state="absent")):
+            module = build_module()
+
+            self.get_bin_path.side_effect = ["modprobe"]
+            self.read_loaded.side_effect = [{"a", "c"}]
+            self.run_command.side_effect = [(0, "", "")]
+
+            batch = ModprobeBatch(module)
+            batch._builtin = set()
+            batch.apply_runtime()
+
+        self.run_command.assert_called_once_with(["modprobe", "-r", "a", "c"])
+        assert batch.result["changed"]
+
+    def test_consolidated_persistence(self):
+        with open(os.path.join(self.modprobe_d, "old.conf"), "w") as file:
+            file.write("options dummy numdummies=4\noptions other a=1\n")
+        with open(os.path.join(self.modules_load, "old.conf"), "w") as file:
+            file.write("gone\nkeep\n")
+
+        with set_module_args(
+            dict(
+                modules=["overlay", dict(name="dummy", params="numdummies=2"), dict(name="gone", persistent="absent")],
+                persistent="present",
+                persistent_file="net",
+            )
+        ):
+            module = build_module()
+
+            self.get_bin_path.side_effect = ["modprobe"]
+
+            batch = ModprobeBatch(module)
+            batch.apply_persistence()
+
+        assert self.read(self.modules_load, "net.conf") == "overlay\ndummy\n"
+        assert self.read(self.modprobe_d, "net.conf") == "options dummy numdummies=2\n"
+        assert self.read(self.modules_load, "old.conf") == "#gone\nkeep\n"
+        assert self.read(self.modprobe_d, "old.conf") == "#options dummy numdummies=4\noptions other a=1\n"
+        assert batch.result["changed"]
+
+        with set_module_args(
+            dict(
+                modules=["overlay", dict(name="dummy", params="numdummies=2"), dict(name="gone", persistent="absent")],
+                persistent="present",
+                persistent_file="net",
+            )
+        ):
+            module = build_module()
+
+            self.get_bin_path.side_effect = ["modprobe"]
+
+            batch = ModprobeBatch(module)
+            batch.apply_persistence()
+
+        assert batch.result["files"] == []
+        assert not batch.result["changed"]
@@ -0,0 +1,111 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ansible_collections.community.general.plugins.plugin_utils._event_shipper import (
+    EventShipper,
+    KeepAliveClient,
+    gzip_body,
+)
+
+
+class Collector(BaseHTTPRequestHandler):
+    """Local stand-in for an HTTP event collector."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        server = self.server
+        server.requests.append((self.client_address, body))
+        status = server.statuses.pop(0) if server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def collector():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Collector)
+    server.requests = []
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_shipper(collector, warnings, **kwargs):
+    client = KeepAliveClient(f"http://127.0.0.1:{collector.server_port}/services/collector/event")
+    client.use_proxy = False
+
+    def send(events):
+        headers = {"Content-Type": "application/json"}
+        client.post(gzip_body(b"\n".join(events), headers), headers)
+
+    kwargs.setdefault("backoff", 0)
+    return EventShipper(send, warnings.append, **kwargs), client
+
+
+def test_batches_share_one_connection(collector):
+    warnings = []
+    shipper, client = make_shipper(collector, warnings, batch_size=100, flush_interval=60)
+    events = [f'{{"event": {n}}}'.encode() for n in range(250)]
+    for event in events:
+        shipper.put(event)
+    assert shipper.close(timeout=10)
+
+    assert [len(body.split(b"\n")) for addr, body in collector.requests] == [100, 100, 50]
+    assert b"\n".join(body for addr, body in collector.requests).split(b"\n") == events
+    assert len({addr for addr, body in collector.requests}) == 1
+    assert client.connections == 1
+    assert shipper.sent == 250
+    assert warnings == []
+
+
+def test_flush_interval_sends_partial_batch(collector):
+    shipper, client = make_shipper(collector, [], batch_size=100, flush_interval=0.05)
+    shipper.put(b'{"event": 1}')
+    deadline = time.monotonic() + 5
+    while not collector.requests and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [body for addr, body in collector.requests] == [b'{"event": 1}']
+    shipper.close(timeout=10)
+
+
+def test_retries_server_errors(collector):
+    collector.statuses = [503, 503]
+    warnings = []
+    shipper, client = make_shipper(collector, warnings, retries=3)
+    shipper.put(b'{"event": 1}')
+    assert shipper.flush(timeout=10)
+    assert len(collector.requests) == 3
+    assert shipper.sent == 1
+    assert warnings == []
+    shipper.close(timeout=10)
+
+
+def test_client_errors_drop_the_batch(collector):
+    collector.statuses = [400]
+    warnings = []
+    shipper, client = make_shipper(collector, warnings, retries=3)
+    shipper.put(b'{"event": 1}')
+    shipper.close(timeout=10)
+    assert len(collector.requests) == 1
+    assert shipper.dropped == 1
+    assert len(warnings) == 1 and "HTTP 400" in warnings[0]
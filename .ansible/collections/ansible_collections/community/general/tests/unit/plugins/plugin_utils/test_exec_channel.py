@@ -0,0 +1,79 @@
+# Copyright (c) Ansible Project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+from ansible_collections.community.general.plugins.plugin_utils._exec_channel import (
+    ChannelError,
+    ExecChannel,
+    RemoteFileError,
+    agent_command,
+    control_path,
+)
+
+
+@pytest.fixture
+def control_dir():
+    # unix socket paths are short; keep clear of deep pytest tmp paths
+    with tempfile.TemporaryDirectory(prefix="cp") as path:
+        yield path
+
+
+def local_spec(interpreter=sys.executable):
+    """The agent on the controller itself, standing in for an instance."""
+    return {"argv": ["/bin/sh", "-c", agent_command(interpreter)]}
+
+
+def test_exec_reuses_the_agent(control_dir):
+    spec = local_spec()
+    channel = ExecChannel.connect("test", spec, persist=5, control_dir=control_dir)
+    try:
+        rc, out, err = channel.exec_command(["/bin/sh", "-c", "cat; echo oops >&2; exit 3"], b"in\x00put")
+        assert (rc, out, err) == (3, b"in\x00put", b"oops\n")
+        agent_pid = channel.exec_command(["/bin/sh", "-c", "echo $PPID"])[1]
+    finally:
+        channel.close()
+    assert os.path.exists(control_path("test", spec, control_dir))
+
+    # a later connection (the next task) runs its commands through the same agent
+    channel = ExecChannel.connect("test", spec, persist=5, control_dir=control_dir)
+    try:
+        assert channel.exec_command(["/bin/sh", "-c", "echo $PPID"])[1] == agent_pid
+    finally:
+        channel.close()
+
+
+def test_put_and_fetch(control_dir, tmp_path):
+    payload = os.urandom(3 * (1 << 20) + 17)
+    src = tmp_path / "src"
+    src.write_bytes(payload)
+    channel = ExecChannel.connect("test", local_spec(), persist=5, control_dir=control_dir)
+    try:
+        channel.put_file(str(src), str(tmp_path / "remote"), 0o640)
+        assert (tmp_path / "remote").read_bytes() == payload
+        assert (tmp_path / "remote").stat().st_mode & 0o777 == 0o640
+
+        channel.fetch_file(str(tmp_path / "remote"), str(tmp_path / "back"))
+        assert (tmp_path / "back").read_bytes() == payload
+
+        with pytest.raises(RemoteFileError, match="failed to read") as excinfo:
+            channel.fetch_file(str(tmp_path / "missing"), str(tmp_path / "never"))
+        assert not excinfo.value.delivered
+        # the channel is still in sync after an error
+        assert channel.exec_command(["true"])[0] == 0
+    finally:
+        channel.close()
+
+
+def test_missing_interpreter_fails_to_connect(control_dir):
+    spec = local_spec("/nonexistent/python3")
+    with pytest.raises(ChannelError, match="agent did not start"):
+        ExecChannel.connect("test", spec, persist=5, timeout=5, control_dir=control_dir)
+    assert not os.path.exists(control_path("test", spec, control_dir))
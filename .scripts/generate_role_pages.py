@@ -1,74 +1,20 @@
 #!/usr/bin/env python3
 """Script to generate role pages from ROLE_REFERENCE.md."""
 
-import re
-from pathlib import Path
+from role_index import WIKI_DIR, load_index, role_page
 
 
-ROOT = Path(__file__).resolve().parents[1]
-RR = ROOT / 'wiki_pages' / 'ROLE_REFERENCE.md'
-OUT_DIR = ROOT / 'wiki_pages' / 'roles'
-PROJECT_ROLES = ROOT / 'roles'
+RR = WIKI_DIR / 'ROLE_REFERENCE.md'
+OUT_DIR = WIKI_DIR / 'roles'
 
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-text = RR.read_text()
-lines = text.splitlines()
-
-roles = []
-for i, line in enumerate(lines):
-    if line.startswith('### `'):
-        try:
-            role = line.split('`', 1)[1].split('`', 1)[0]
-            roles.append((i, role))
-        except IndexError:
-            continue
-
-role_blocks = {}
-for idx, role in roles:
-    j = idx + 1
-    block_lines = []
-    while j < len(lines) and not lines[j].startswith('### `'):
-        block_lines.append(lines[j])
-        j += 1
-    while block_lines and block_lines[0].strip() == '':
-        block_lines.pop(0)
-    while block_lines and block_lines[-1].strip() == '':
-        block_lines.pop()
-    role_blocks[role] = '\n'.join(block_lines)
-
-
-def extract_variables(role_path):
-    """Extract variables from defaults/main.yml of a role."""
-    defaults_file = PROJECT_ROLES / role_path / 'defaults' / 'main.yml'
-    if not defaults_file.exists():
-        return []
-
-    vars_found = []
-    seen_vars = set()
-    content = defaults_file.read_text()
-    # Simple parser for top-level keys and comments
-    # Matches "key: value # comment" or just "key: value"
-    # Ignores indented keys (sub-keys) for now to keep it simple
-    for line in content.splitlines():
-        if line.startswith('#') or line.strip() == '---' or not line.strip():
-            continue
-        m = re.match(r'^([a-zA-Z0-9_]+):\s*(.*)$', line)
-        if m:
-            varname = m.group(1)
-            if varname in seen_vars:
-                continue
-            seen_vars.add(varname)
-            val_and_comment = m.group(2)
-            comment = ""
-            if '#' in val_and_comment:
-                comment = val_and_comment.split('#', 1)[1].strip()
-            vars_found.append((varname, comment))
-    return vars_found
-
+# Role blocks and defaults variables come from the shared, cached role index
+index = load_index()
+role_blocks = {role: index.reference_block(role) for role in index.reference_roles()}
 
 for role, body in role_blocks.items():
-    filename = role.replace('/', '_') + '.md'
+    filename = role_page(role)
     filepath = OUT_DIR / filename
     h1 = filename[:-3]
 
@@ -79,7 +25,7 @@ for role, body in role_blocks.items():
         content_lines.append('')
 
     # Always try to append Variables section
-    vars_list = extract_variables(role)
+    vars_list = index.variables(role)
     if vars_list:
         content_lines.append('## Variables')
         content_lines.append('')
@@ -101,11 +47,11 @@ for role, body in role_blocks.items():
     filepath.write_text(content)
 
 new_lines = []
-for line in lines:
+for line in RR.read_text().splitlines():
     if line.startswith('### `') and ' — [Read details]' not in line:
         try:
             role = line.split('`', 1)[1].split('`', 1)[0]
-            filename = role.replace('/', '_') + '.md'
+            filename = role_page(role)
             new_line = f"{line} — [Read details](roles/{filename})"
             new_lines.append(new_line)
         except IndexError:
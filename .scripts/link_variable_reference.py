@@ -2,22 +2,17 @@
 """Script to link VARIABLE_REFERENCE.md and its split counterparts to role pages."""
 
 import re
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
+# slugify is the linter's; the role index tells which variables a role still defines
+from role_index import WIKI_DIR, load_index, role_page, slugify
 
-# Use the same slugify function as the linter to match what it expects
-slug_re = re.compile(r'[^a-z0-9 -]')
-def slugify(s):
-    s = s.lower()
-    s = slug_re.sub('', s)
-    s = re.sub(r'\s+', '-', s)
-    s = re.sub(r'-+', '-', s)
-    return s.strip('-')
+index = load_index()
+stale_links = []
 
 
 def process_file(filepath):
     """Process a variable reference file to update anchors to match linter's slugify.
+    Links to variables no longer in the role's defaults are collected in stale_links.
     Returns (exists, modified) tuple.
     """
     if not filepath.exists():
@@ -27,6 +22,7 @@ def process_file(filepath):
     lines = text.splitlines()
 
     current_role_file = None
+    current_vars = None
     new_lines = []
     modified = False
 
@@ -35,7 +31,8 @@ def process_file(filepath):
         m_role = re.match(r'^### `([^`]+)`', line)
         if m_role:
             role_name = m_role.group(1)
-            current_role_file = f"roles/{role_name.replace('/', '_')}.md"
+            current_role_file = f"roles/{role_page(role_name)}"
+            current_vars = {v for v, _ in index.variables(role_name)} if index.role(role_name) else None
             new_lines.append(line)
             continue
 
@@ -46,6 +43,8 @@ def process_file(filepath):
             prefix, varname, middle, path_part, old_anchor, suffix = m_var.groups()
             # Generate the correct anchor using slugify
             anchor_name = slugify(varname)
+            if current_vars is not None and varname not in current_vars:
+                stale_links.append((filepath.name, current_role_file, varname))
             if old_anchor != anchor_name:
                 modified = True
                 new_line = f'{prefix}{varname}{middle}{path_part}#{anchor_name}{suffix}'
@@ -62,7 +61,7 @@ def process_file(filepath):
 
 
 # Handle the main VARIABLE_REFERENCE.md file
-VR = ROOT / 'wiki_pages' / 'VARIABLE_REFERENCE.md'
+VR = WIKI_DIR / 'VARIABLE_REFERENCE.md'
 exists, modified = process_file(VR)
 if not exists:
     print("VARIABLE_REFERENCE.md not found; skipping.")
@@ -82,7 +81,7 @@ split_files = [
 ]
 
 for filename in split_files:
-    vr_split = ROOT / 'wiki_pages' / filename
+    vr_split = WIKI_DIR / filename
     exists, modified = process_file(vr_split)
     if not exists:
         print(f"{filename} not found; skipping.")
@@ -91,4 +90,7 @@ for filename in split_files:
     else:
         print(f"{filename} already up to date.")
 
+for filename, role_file, varname in stale_links:
+    print(f"WARNING: {filename} links `{varname}`, which {role_file} no longer defines")
+
 print("All variable reference files linked to role pages.")
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""role_index.py — cached role metadata shared by the wiki generators.
+
+generate_role_pages.py, sync_variable_references.py and
+link_variable_reference.py query this index instead of each re-parsing
+ROLE_REFERENCE.md and regex-scanning every role's defaults/main.yml.
+
+The index holds, per role: name, category, the top-level variables of
+defaults/main.yml with their trailing comments, and whether the role has
+tasks, templates or molecule tests; plus the role blocks and categories of
+ROLE_REFERENCE.md. It is stored in .cache/role_index.json. A role entry is
+rebuilt only when its directory or defaults/main.yml changed (mtime/size), and
+the reference only when ROLE_REFERENCE.md changed, so regenerating the wiki
+after a defaults change re-reads one file.
+
+Usage:
+  python3 .scripts/role_index.py [--json] [--rebuild]
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+WIKI_DIR = ROOT / 'wiki_pages'
+ROLE_REFERENCE = WIKI_DIR / 'ROLE_REFERENCE.md'
+CACHE_FILE = ROOT / '.cache' / 'role_index.json'
+INDEX_VERSION = 1
+
+# Standalone checkout first, then the monorepo layout
+ROLES_ROOTS = (ROOT / 'roles', ROOT / 'deploy-system-unified' / 'roles')
+ROLES_ROOT = next((p for p in ROLES_ROOTS if p.is_dir()), ROLES_ROOTS[0])
+
+# A directory holding tasks/ or defaults/ is a role. Its standard subdirectories
+# are not searched; any other subdirectory may hold sub-roles
+# (roles/storage/backup/rclone). Category directories (roles/containers, ...)
+# only carry shared handlers/vars.
+ROLE_MARKERS = frozenset(('tasks', 'defaults'))
+ROLE_SUBDIRS = frozenset(('tasks', 'defaults', 'meta', 'handlers', 'vars', 'templates', 'files',
+                          'molecule', 'tests', 'library', 'module_utils'))
+
+VAR_RE = re.compile(r'^([a-zA-Z0-9_]+):\s*(.*)$')
+ROLE_HEADER_RE = re.compile(r'^###\s+`([^`]+)`')
+CATEGORY_RE = re.compile(r'^##\s+(.+)\s+Roles')
+
+slug_re = re.compile(r'[^a-z0-9 -]')
+def slugify(s):
+    # Same slugify as the wiki linter, so generated anchors resolve
+    s = s.lower()
+    s = slug_re.sub('', s)
+    s = re.sub(r'\s+', '-', s)
+    s = re.sub(r'-+', '-', s)
+    return s.strip('-')
+
+
+def role_page(role):
+    """Wiki page file name of a role (``containers/caddy`` -> ``containers_caddy.md``)."""
+    return role.replace('/', '_') + '.md'
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def parse_defaults(text):
+    """Top-level variables of a defaults file as ``[name, comment]``, first occurrence only.
+
+    Indented keys (sub-keys) are ignored; the comment is whatever follows ``#``
+    on the variable's line.
+    """
+    found = []
+    seen = set()
+    for line in text.splitlines():
+        if line.startswith('#') or line.strip() == '---' or not line.strip():
+            continue
+        m = VAR_RE.match(line)
+        if m and m.group(1) not in seen:
+            seen.add(m.group(1))
+            rest = m.group(2)
+            found.append([m.group(1), rest.split('#', 1)[1].strip() if '#' in rest else ''])
+    return found
+
+
+def parse_reference(text):
+    """Role order, categories and description blocks of ROLE_REFERENCE.md.
+
+    A block is everything between a role's ``### `role``` header and the next
+    one, without leading/trailing blank lines.
+    """
+    lines = text.splitlines()
+    order = []
+    categories = {}
+    current_category = None
+    headers = []
+    for i, line in enumerate(lines):
+        m_cat = CATEGORY_RE.match(line)
+        if m_cat:
+            current_category = m_cat.group(1).strip()
+            categories[current_category] = []
+            continue
+        if line.startswith('### `'):
+            try:
+                role = line.split('`', 1)[1].split('`', 1)[0]
+            except IndexError:
+                continue
+            headers.append((i, role))
+            m_role = ROLE_HEADER_RE.match(line)
+            if current_category and m_role:
+                categories[current_category].append(m_role.group(1).strip())
+
+    blocks = {}
+    for n, (idx, role) in enumerate(headers):
+        end = headers[n + 1][0] if n + 1 < len(headers) else len(lines)
+        block = lines[idx + 1:end]
+        while block and block[0].strip() == '':
+            block.pop(0)
+        while block and block[-1].strip() == '':
+            block.pop()
+        if role not in blocks:
+            order.append(role)
+        blocks[role] = '\n'.join(block)
+    return {'order': order, 'categories': categories, 'blocks': blocks}
+
+
+def discover_roles(roles_root=ROLES_ROOT):
+    """Map of role name (path below ``roles_root``) -> set of its subdirectories."""
+    roles = {}
+    stack = [roles_root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                subdirs = {e.name for e in entries if e.is_dir()}
+        except OSError:
+            continue
+        if subdirs & ROLE_MARKERS:
+            roles[Path(current).relative_to(roles_root).as_posix()] = subdirs
+        stack.extend(os.path.join(current, name) for name in subdirs - ROLE_SUBDIRS)
+    return roles
+
+
+class RoleIndex:
+    """Role metadata, loaded from the cache and refreshed from the role tree."""
+
+    def __init__(self, roles_root=ROLES_ROOT, reference=ROLE_REFERENCE, cache_file=CACHE_FILE, rebuild=False):
+        self.roles_root = Path(roles_root)
+        self.reference_file = Path(reference)
+        self.cache_file = cache_file
+        self.roles = {}
+        self.reference = {'order': [], 'categories': {}, 'blocks': {}}
+        self.reference_stamp = None
+        self.rebuilt = []
+        self.dirty = rebuild
+        if cache_file and not rebuild and Path(cache_file).exists():
+            try:
+                data = json.loads(Path(cache_file).read_text(encoding='utf-8'))
+                if data.get('version') == INDEX_VERSION and data.get('roles_root') == str(self.roles_root):
+                    self.roles = data.get('roles', {})
+                    self.reference = data.get('reference', self.reference)
+                    self.reference_stamp = data.get('reference_stamp')
+            except (OSError, ValueError):
+                self.roles = {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-read ROLE_REFERENCE.md and the roles whose stamps changed."""
+        stamp = _stamp(self.reference_file)
+        if stamp != self.reference_stamp:
+            text = self.reference_file.read_text() if stamp else ''
+            self.reference = parse_reference(text)
+            self.reference_stamp = stamp
+            self.dirty = True
+        role_category = {role: category
+                         for category, roles in self.reference['categories'].items() for role in roles}
+
+        discovered = discover_roles(self.roles_root)
+        for name in set(self.roles) - set(discovered):
+            del self.roles[name]
+            self.dirty = True
+        for name, subdirs in discovered.items():
+            role_dir = self.roles_root / name
+            defaults = role_dir / 'defaults' / 'main.yml'
+            stamps = [_stamp(role_dir), _stamp(defaults)]
+            category = role_category.get(name) or name.split('/', 1)[0].capitalize()
+            entry = self.roles.get(name)
+            if entry and entry['stamps'] == stamps:
+                if entry['category'] != category:
+                    entry['category'] = category
+                    self.dirty = True
+                continue
+            self.roles[name] = {
+                'category': category,
+                'variables': parse_defaults(defaults.read_text()) if stamps[1] else [],
+                'has_tasks': 'tasks' in subdirs,
+                'has_templates': 'templates' in subdirs,
+                'has_molecule': 'molecule' in subdirs,
+                'stamps': stamps,
+            }
+            self.rebuilt.append(name)
+            self.dirty = True
+
+    def save(self):
+        """Write the index atomically when anything was rebuilt."""
+        if not self.cache_file or not self.dirty:
+            return
+        path = Path(self.cache_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix='.role_index.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'roles_root': str(self.roles_root),
+                'reference_stamp': self.reference_stamp,
+                'reference': self.reference,
+                'roles': self.roles,
+            }, f, separators=(',', ':'))
+        os.replace(tmp, path)
+        self.dirty = False
+
+    def role(self, name):
+        return self.roles.get(name)
+
+    def variables(self, name):
+        """``(name, comment)`` pairs of a role's defaults; empty for unknown roles."""
+        entry = self.roles.get(name)
+        return [tuple(v) for v in entry['variables']] if entry else []
+
+    def reference_roles(self):
+        """Roles listed in ROLE_REFERENCE.md, in document order."""
+        return list(self.reference['order'])
+
+    def reference_block(self, name):
+        return self.reference['blocks'].get(name, '')
+
+    def roles_by_category(self):
+        """Category => roles as listed in ROLE_REFERENCE.md."""
+        return {category: list(roles) for category, roles in self.reference['categories'].items()}
+
+
+_shared = None
+
+
+def load_index(rebuild=False):
+    """The refreshed index, saved to the cache; shared within one process."""
+    global _shared
+    if _shared is None or rebuild:
+        _shared = RoleIndex(rebuild=rebuild)
+    else:
+        _shared.refresh()
+    _shared.save()
+    return _shared
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Build or show the cached role metadata index')
+    ap.add_argument('--json', action='store_true', help='Print the index as JSON')
+    ap.add_argument('--rebuild', action='store_true', help='Ignore the cache and re-read every role')
+    args = ap.parse_args()
+
+    index = load_index(rebuild=args.rebuild)
+    if args.json:
+        print(json.dumps({'roles_root': str(index.roles_root), 'roles': index.roles}, indent=2, sort_keys=True))
+    else:
+        print(f"Roles root: {index.roles_root}")
+        print(f"Roles: {len(index.roles)} ({len(index.rebuilt)} re-read)")
+        print(f"Reference roles: {len(index.reference_roles())}")
@@ -1,61 +1,9 @@
-import os
-import re
-from pathlib import Path
-
-ROOT = Path('.').resolve()
-WIKI_DIR = ROOT / 'wiki_pages'
-PROJECT_ROLES = ROOT / 'deploy-system-unified' / 'roles'
-ROLE_REF = WIKI_DIR / 'ROLE_REFERENCE.md'
-
-def slugify(s):
-    # Using the same slugify as the linter
-    s = s.lower()
-    s = re.sub(r'[^a-z0-9 -]', '', s)
-    s = re.sub(r'\s+', '-', s)
-    s = re.sub(r'-+', '-', s)
-    return s.strip('-')
-
-def extract_variables(role_path):
-    defaults_file = PROJECT_ROLES / role_path / 'defaults' / 'main.yml'
-    if not defaults_file.exists():
-        return []
-
-    vars_found = []
-    content = defaults_file.read_text()
-    for line in content.splitlines():
-        if line.startswith('#') or line.strip() == '---' or not line.strip():
-            continue
-        m = re.match(r'^([a-zA-Z0-9_]+):', line)
-        if m:
-            vars_found.append(m.group(1))
-    return vars_found
-
-def get_roles_by_category():
-    """Build a map of category => [roles] from ROLE_REFERENCE.md."""
-    if not ROLE_REF.exists():
-        return {}
-    
-    content = ROLE_REF.read_text()
-    categories = {}
-    current_category = None
-    
-    for line in content.splitlines():
-        # Match ## Category Roles
-        m_cat = re.match(r'^##\s+(.+)\s+Roles', line)
-        if m_cat:
-            current_category = m_cat.group(1).strip()
-            categories[current_category] = []
-            continue
-            
-        # Match ### `subsystem/role`
-        m_role = re.match(r'^###\s+`([^`]+)`', line)
-        if m_role and current_category:
-            categories[current_category].append(m_role.group(1).strip())
-            
-    return categories
+from role_index import WIKI_DIR, load_index, role_page, slugify
 
 def process_categories():
-    roles_map = get_roles_by_category()
+    # Categories and defaults variables come from the shared, cached role index
+    index = load_index()
+    roles_map = index.roles_by_category()
     
     # Category-to-file mapping must follow the canonical
     # SCREAMING_SNAKE_CASE naming that the wiki now uses.  Older commits
@@ -81,11 +29,11 @@ def process_categories():
         
         for role_name in sorted(roles):
             new_lines.append(f"### `{role_name}`")
-            role_vars = extract_variables(role_name)
+            role_vars = index.variables(role_name)
             
             if role_vars:
-                role_md_file = role_name.replace('/', '_') + '.md'
-                for v in role_vars:
+                role_md_file = role_page(role_name)
+                for v, _ in role_vars:
                     anchor = slugify(v)
                     new_lines.append(f'- [`{v}`](roles/{role_md_file}#{anchor})')
                 new_lines.append('')
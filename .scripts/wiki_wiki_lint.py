@@ -3,7 +3,8 @@
 wiki_wiki_lint.py — enforce GitHub Wiki style and accessibility rules for repo documentation
 
 Usage:
-  python3 .scripts/wiki_wiki_lint.py [--paths paths] [--fix-h1] [--create-placeholders] [--json]
+  python3 .scripts/wiki_wiki_lint.py [--paths paths] [--fix-h1] [--create-placeholders] [--json] [--jobs N]
+                                     [--changed-since REV] [--cache FILE | --no-cache]
 
 By default this scans these folders (if present):
  - wiki_pages
@@ -23,6 +24,15 @@ Warnings (exit code 1) include:
  - Use of raw HTML <img> tags
  - Missing anchors in linked pages (GitHub auto-generates these, often false positives)
 
+Each page is read once (in a process pool for large wikis) into an index of
+heading slugs, links and images; link and image checks are then lookups in that
+index. A page under several scanned folders is checked once.
+
+Parsed pages are kept in a link graph cache (.cache/wiki_link_graph.json), so
+unchanged pages are not re-read. --changed-since REV (e.g. origin/main, or HEAD
+in a pre-commit hook) lints only pages changed since REV plus the pages linking
+to a changed or deleted page or image.
+
 Note: Anchor validation is lenient because GitHub Wiki auto-generates anchors from
 headings using its own algorithm. What appears as a "missing" anchor may still work.
 
@@ -36,9 +46,14 @@ and accessibility regressions.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
+import subprocess
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 DEFAULT_PATHS = [
@@ -58,6 +73,17 @@ DEFAULT_PATHS = [
 LINK_RE = re.compile(r'\[[^\]]+\]\(([^)]+)\)')
 IMG_RE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
 HEADING_RE = re.compile(r'^(#+)\s*(.+)$', flags=re.M)
+H1_RE = re.compile(r'^#\s*(.+)$', flags=re.M)
+URL_RE = re.compile(r'https?://')
+EXTERNAL_PREFIXES = ('docs/', 'deploy-system-unified', '../deploy-system-unified', 'inventory/', 'ci-artifacts/')
+
+# Below this many pages a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+DEFAULT_GRAPH_FILE = Path('.cache/wiki_link_graph.json')
+LINK_GRAPH_VERSION = 1
+# Page fields persisted in the link graph
+PAGE_FIELDS = ('slugs', 'h1', 'images', 'html_img', 'links')
 
 slug_re = re.compile(r'[^a-z0-9 -]')
 def slugify(s: str) -> str:
@@ -86,131 +112,388 @@ def read_file_safe(path: Path):
         return None
 
 
-def scan_files(paths, fix_h1=False, create_placeholders=False):
-    md_files = []
-    for p in paths:
-        if p.exists():
-            md_files.extend(sorted(p.rglob('*.md')))
-
-    # Filter to only existing, readable files
-    readable_files = []
-    for f in md_files:
-        if f.exists() and f.is_file():
-            readable_files.append(f)
+def parse_page(path: str, fix_h1: bool = False, known_sha256=None):
+    """Read one page once and return everything the link checks need.
 
-    results = {
-        'files_scanned': len(readable_files),
-        'errors': [],
-        'warnings': [],
-        'fixed': []
+    Runs in worker processes, so it returns plain picklable data. H1 fixes are
+    applied here, while the text is in memory; ``slugs`` reflect the page as read.
+    When the content still hashes to ``known_sha256`` only the hash is returned
+    (``unchanged``) and the caller reuses its cached parse.
+    """
+    f = Path(path)
+    txt = read_file_safe(f)
+    if txt is None:
+        return None
+    sha256 = hashlib.sha256(txt.encode('utf-8')).hexdigest()
+    if sha256 == known_sha256 and not fix_h1:
+        return {'path': path, 'sha256': sha256, 'unchanged': True}
+    page = {
+        'path': path,
+        'sha256': sha256,
+        'unchanged': False,
+        'slugs': sorted(set(slugify(h) for _, h in HEADING_RE.findall(txt))),
+        'h1': None,
+        'fixed': None,
+        'images': [(m.group(1).strip(), m.group(2).split()[0]) for m in IMG_RE.finditer(txt)],
+        'html_img': '<img' in txt,
+        'links': [m.group(1).strip() for m in LINK_RE.finditer(txt)],
     }
+    m = H1_RE.search(txt)
+    page['h1'] = m.group(1).strip() if m else None
+    if fix_h1:
+        fname = f.stem
+        if page['h1'] is None:
+            f.write_text(f"# {fname}\n\n" + txt, encoding='utf-8')
+            page['fixed'] = 'insert_h1'
+        elif page['h1'] != fname:
+            f.write_text(re.sub(r'^(#\s*).+$', r'\1' + fname, txt, count=1, flags=re.M), encoding='utf-8')
+            page['fixed'] = 'fix_h1'
+    return page
 
-    # Build a map of file => headings (slugs)
-    headings_map = {}
-    for f in readable_files:
-        txt = read_file_safe(f)
-        if txt is None:
-            # Should not happen since we filtered, but handle gracefully
+
+def _walk_files(root: str, found: set):
+    """Add every file below ``root`` to ``found`` (normalized paths, one scandir per directory)."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        found.add(os.path.normpath(entry.path))
+        except OSError:
             continue
-        headers = [(m.group(1), m.group(2).strip()) for m in HEADING_RE.finditer(txt)]
-        headings_map[str(f)] = set(slugify(h) for _, h in headers)
 
-    for f in readable_files:
-        txt = read_file_safe(f)
-        if txt is None:
+
+class WikiIndex:
+    """Page, heading and file existence index built before any link is checked.
+
+    Files below the scanned roots are listed once up front; anything else a link
+    points at is stat'ed (or, for anchors, read) at most once and memoized.
+    """
+
+    def __init__(self, roots):
+        self.roots = [os.path.normpath(str(r)) for r in roots]
+        self.files = set()
+        for root in self.roots:
+            # Nested roots (docs, docs/research) are covered by their parent's walk
+            if not any(root != other and root.startswith(other + os.sep) for other in self.roots):
+                _walk_files(root, self.files)
+        self.headings = {}
+        self._exists = {}
+
+    def markdown_files(self):
+        """Markdown pages per root in the order the roots were given, each page once."""
+        seen = set()
+        pages = []
+        for root in self.roots:
+            prefix = '' if root == '.' else root + os.sep
+            for path in sorted(Path(p) for p in self.files if p.endswith('.md') and p.startswith(prefix)):
+                key = str(path)
+                if key not in seen:
+                    seen.add(key)
+                    pages.append(key)
+        return pages
+
+    def add_page(self, page):
+        self.headings[os.path.normpath(page['path'])] = set(page['slugs'])
+
+    def exists(self, path) -> bool:
+        key = os.path.normpath(str(path))
+        if key in self.files:
+            return True
+        if key not in self._exists:
+            self._exists[key] = os.path.exists(key)
+        return self._exists[key]
+
+    def anchors(self, path):
+        """Heading slugs of ``path``; None when the file cannot be read."""
+        key = os.path.normpath(str(path))
+        if key not in self.headings:
+            txt = read_file_safe(Path(key))
+            self.headings[key] = None if txt is None else set(slugify(h) for _, h in HEADING_RE.findall(txt))
+        return self.headings[key]
+
+
+def page_targets(page):
+    """Normalized paths a page's links and images may resolve to.
+
+    Both the page-relative and the repo-root candidate of a link are returned,
+    so reverse edges over-approximate rather than miss a dependent page.
+    """
+    f = Path(page['path'])
+    targets = set()
+    for _, target in page['images']:
+        if not URL_RE.match(target):
+            targets.add(os.path.normpath(str(f.parent / target)))
+    for target in page['links']:
+        if URL_RE.match(target) or target.startswith(('mailto:', '#')):
             continue
-        fname = f.stem
-        # H1 check
-        m = re.search(r'^#\s*(.+)$', txt, flags=re.M)
-        h1 = m.group(1).strip() if m else None
-        if h1 is None:
-            msg = f'MISSING_H1: {f}'
-            if fix_h1:
-                newtxt = f"# {fname}\n\n" + txt
-                f.write_text(newtxt, encoding='utf-8')
-                results['fixed'].append(('insert_h1', str(f)))
-            else:
-                results['errors'].append(('missing_h1', str(f)))
-        elif h1 != fname:
-            msg = f'MISMATCH_H1: {f} -> "{h1}" vs "{fname}"'
-            if fix_h1:
-                newtxt = re.sub(r'^(#\s*).+$', r'\1' + fname, txt, count=1, flags=re.M)
-                f.write_text(newtxt, encoding='utf-8')
-                results['fixed'].append(('fix_h1', str(f)))
-            else:
-                results['warnings'].append(('h1_mismatch', str(f), h1, fname))
-
-        # Image checks
-        for m in IMG_RE.finditer(txt):
-            alt = m.group(1).strip()
-            target = m.group(2).split()[0]
-            if alt == '':
-                results['warnings'].append(('img_missing_alt', str(f), target))
-            if not re.match(r'https?://', target):
-                target_path = (f.parent / target).with_name(Path(target).name)
-                if not target_path.exists():
-                    results['errors'].append(('img_missing_file', str(f), target))
-        if '<img' in txt:
-            results['warnings'].append(('html_img_tag', str(f)))
-
-        # Link checks
-        for m in LINK_RE.finditer(txt):
-            target = m.group(1).strip()
-            if re.match(r'https?://', target) or target.startswith('mailto:'):
-                continue
-            if target.startswith('#'):
-                anchor = target[1:]
-                if anchor not in headings_map.get(str(f), set()):
-                    results['errors'].append(('missing_local_anchor', str(f), target))
+        pagepart = target.split('#', 1)[0]
+        if pagepart.endswith(('.yml', '.yaml')):
+            continue
+        pagefile = pagepart if pagepart.endswith('.md') else pagepart + '.md'
+        targets.add(os.path.normpath(str(f.parent / pagefile)))
+        targets.add(os.path.normpath(pagefile))
+    return targets
+
+
+class LinkGraph:
+    """Wiki pages as last parsed: heading slugs, H1, outgoing links and images.
+
+    A page whose mtime and size are unchanged is taken from the graph without
+    being read; a page that was only touched is re-hashed but not re-parsed.
+    The stored links double as the graph's edges: ``reverse_edges`` tells
+    ``--changed-since`` which pages link to a changed or deleted page, and
+    pages missing from the current scan are reported by ``vanished``.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if path and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                if data.get('version') == LINK_GRAPH_VERSION:
+                    self.entries = data.get('pages', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def lookup(self, key, stat):
+        """Return the cached page if (mtime_ns, size) still match."""
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            return self.page(key)
+        return None
+
+    def known_sha256(self, key):
+        entry = self.entries.get(key)
+        return entry['sha256'] if entry else None
+
+    def page(self, key):
+        entry = self.entries[key]
+        page = {name: entry[name] for name in PAGE_FIELDS}
+        page.update(path=key, fixed=None)
+        return page
+
+    def store(self, key, stat, page):
+        """Record a worker result; returns whether the page content changed."""
+        self.seen.add(key)
+        self.dirty = True
+        if page['unchanged']:
+            self.hits += 1
+            self.entries[key].update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            return False
+        self.misses += 1
+        changed = key in self.entries
+        entry = {name: page[name] for name in PAGE_FIELDS}
+        entry.update(sha256=page['sha256'], mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        self.entries[key] = entry
+        return changed
+
+    def forget(self, key):
+        """Drop a page whose file changed again (e.g. an H1 fix) after it was stored."""
+        if self.entries.pop(key, None) is not None:
+            self.dirty = True
+
+    def vanished(self):
+        """Pages recorded in the graph that were not seen in this scan."""
+        return set(self.entries) - self.seen
+
+    def reverse_edges(self):
+        """Map of target path -> pages linking to it."""
+        reverse = {}
+        for key in self.entries:
+            for target in page_targets(self.page(key)):
+                reverse.setdefault(target, set()).add(key)
+        return reverse
+
+    def save(self):
+        """Write the graph atomically, dropping pages that were not seen."""
+        stale = self.vanished()
+        if not self.path or not (self.dirty or stale):
+            return
+        for key in stale:
+            del self.entries[key]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix='.wiki_link_graph.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': LINK_GRAPH_VERSION, 'pages': self.entries}, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+
+def git_changed_files(rev):
+    """Paths (relative to the working directory) changed since ``rev``,
+    including uncommitted and untracked files."""
+    def git(*args):
+        proc = subprocess.run(['git', *args], capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise ValueError(f"git {' '.join(args)} failed: {proc.stderr.strip()}")
+        return proc.stdout
+
+    top = git('rev-parse', '--show-toplevel').strip()
+    names = git('diff', '--name-only', '--no-renames', rev, '--').splitlines()
+    names += git('ls-files', '--others', '--exclude-standard', '--full-name', top).splitlines()
+    return {os.path.normpath(os.path.relpath(os.path.join(top, name))) for name in names if name}
+
+
+def _parse_pages(paths, fix_h1=False, jobs=None, graph=None):
+    known = [graph.known_sha256(path) if graph else None for path in paths]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(parse_page, paths, [fix_h1] * len(paths), known, chunksize=16))
+    return [parse_page(path, fix_h1, sha) for path, sha in zip(paths, known)]
+
+
+def check_page(page, index, results, create_placeholders=False):
+    """Run the H1, image and link checks of one parsed page against ``index``."""
+    f = Path(page['path'])
+    fname = f.stem
+    # H1 check
+    h1 = page['h1']
+    if page['fixed']:
+        results['fixed'].append((page['fixed'], str(f)))
+    elif h1 is None:
+        results['errors'].append(('missing_h1', str(f)))
+    elif h1 != fname:
+        results['warnings'].append(('h1_mismatch', str(f), h1, fname))
+
+    # Image checks
+    for alt, target in page['images']:
+        if alt == '':
+            results['warnings'].append(('img_missing_alt', str(f), target))
+        if not URL_RE.match(target):
+            target_path = (f.parent / target).with_name(Path(target).name)
+            if not index.exists(target_path):
+                results['errors'].append(('img_missing_file', str(f), target))
+    if page['html_img']:
+        results['warnings'].append(('html_img_tag', str(f)))
+
+    # Link checks
+    local_anchors = index.headings.get(os.path.normpath(str(f)), set())
+    for target in page['links']:
+        if URL_RE.match(target) or target.startswith('mailto:'):
+            continue
+        if target.startswith('#'):
+            anchor = target[1:]
+            if anchor not in local_anchors:
+                results['errors'].append(('missing_local_anchor', str(f), target))
+            continue
+        # split page and anchor
+        if '#' in target:
+            pagepart, anchor = target.split('#', 1)
+        else:
+            pagepart, anchor = target, None
+        # YAML links are warnings (prefer wiki pages)
+        if pagepart.endswith(('.yml', '.yaml')):
+            results['warnings'].append(('link_to_yaml', str(f), target))
+            # optionally create placeholder page in wiki_pages if asked
+            if create_placeholders:
+                # create a placeholder page with same name (without extension) under wiki_pages
+                placeholder = Path('wiki_pages') / (Path(pagepart).stem + '.md')
+                if not placeholder.exists():
+                    placeholder.write_text(f"# {placeholder.stem}\n\nPlaceholder for `{pagepart}`. See repository for canonical YAML.", encoding='utf-8')
+                    results['fixed'].append(('created_placeholder', str(placeholder)))
+            continue
+        # normalize page filename
+        pagefile = pagepart if pagepart.endswith('.md') else pagepart + '.md'
+        # first try relative to current file
+        target_path = (f.parent / pagefile)
+        if not index.exists(target_path):
+            # try repo-root relative
+            target_path = Path(pagefile)
+            if not index.exists(target_path):
+                # certain links point to documentation, inventory, or other repo files
+                # which are intentionally not wiki pages; ignore them
+                if pagepart.startswith(EXTERNAL_PREFIXES):
+                    # treat as warning instead
+                    results['warnings'].append(('external_link', str(f), target))
+                elif str(f).startswith('docs/'):
+                    # links within docs are not required to be present
+                    results['warnings'].append(('docs_missing_page', str(f), target))
+                elif not pagepart.startswith('wiki_pages/'):
+                    results['warnings'].append(('missing_page', str(f), target))
+                else:
+                    results['errors'].append(('missing_page', str(f), target))
                 continue
-            # split page and anchor
-            if '#' in target:
-                pagepart, anchor = target.split('#', 1)
-            else:
-                pagepart, anchor = target, None
-            # YAML links are warnings (prefer wiki pages)
-            if pagepart.endswith(('.yml', '.yaml')):
-                results['warnings'].append(('link_to_yaml', str(f), target))
-                # optionally create placeholder page in wiki_pages if asked
-                if create_placeholders:
-                    # create a placeholder page with same name (without extension) under wiki_pages
-                    placeholder = Path('wiki_pages') / (Path(pagepart).stem + '.md')
-                    if not placeholder.exists():
-                        placeholder.write_text(f"# {placeholder.stem}\n\nPlaceholder for `{pagepart}`. See repository for canonical YAML.", encoding='utf-8')
-                        results['fixed'].append(('created_placeholder', str(placeholder)))
+        if anchor:
+            target_headings = index.anchors(target_path)
+            if target_headings is None:
+                results['errors'].append(('cannot_read_target', str(f), str(target_path)))
                 continue
-            # normalize page filename
-            pagefile = pagepart if pagepart.endswith('.md') else pagepart + '.md'
-            # first try relative to current file
-            target_path = (f.parent / pagefile)
-            if not target_path.exists():
-                # try repo-root relative
-                target_path = Path(pagefile)
-                if not target_path.exists():
-                    # certain links point to documentation, inventory, or other repo files
-                    # which are intentionally not wiki pages; ignore them
-                    if pagepart.startswith('docs/') or pagepart.startswith('deploy-system-unified') or pagepart.startswith('../deploy-system-unified') or pagepart.startswith('inventory/') or pagepart.startswith('ci-artifacts/'):
-                        # treat as warning instead
-                        results['warnings'].append(('external_link', str(f), target))
-                    elif str(f).startswith('docs/'):
-                        # links within docs are not required to be present
-                        results['warnings'].append(('docs_missing_page', str(f), target))
-                    elif not pagepart.startswith('wiki_pages/'):
-                        results['warnings'].append(('missing_page', str(f), target))
-                    else:
-                        results['errors'].append(('missing_page', str(f), target))
-                    continue
-            if anchor:
-                ttxt = read_file_safe(target_path)
-                if ttxt is None:
-                    results['errors'].append(('cannot_read_target', str(f), str(target_path)))
-                    continue
-                target_headings = set(slugify(h) for _, h in HEADING_RE.findall(ttxt))
-                if anchor not in target_headings:
-                    # GitHub Wiki auto-generates anchors from headings, so missing anchors
-                    # are often false positives. Treat as warning, not error.
-                    results['warnings'].append(('missing_anchor_in_target', str(f), target))
+            if anchor not in target_headings:
+                # GitHub Wiki auto-generates anchors from headings, so missing anchors
+                # are often false positives. Treat as warning, not error.
+                results['warnings'].append(('missing_anchor_in_target', str(f), target))
 
+
+def scan_files(paths, fix_h1=False, create_placeholders=False, jobs=None, graph_file=None, changed=None):
+    """Lint the pages under ``paths``.
+
+    With ``graph_file`` unchanged pages are taken from the persistent link
+    graph instead of being read. With ``changed`` (paths from
+    ``git_changed_files``) only changed pages and the pages linking to a changed
+    path are checked; the rest of the wiki serves as link and anchor targets.
+    """
+    index = WikiIndex(p for p in paths if p.exists())
+    md_files = index.markdown_files()
+    graph = LinkGraph(graph_file)
+
+    # Every page is read at most once; link checks below are index lookups
+    pages = {}
+    pending = []
+    for path in md_files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        page = None if fix_h1 else graph.lookup(path, stat)
+        if page is None:
+            pending.append((path, stat))
+        else:
+            pages[path] = page
+    dirty = set(changed or ()) | graph.vanished()
+    for (path, stat), page in zip(pending, _parse_pages([p for p, _ in pending], fix_h1, jobs, graph)):
+        if page is None:
+            continue
+        if graph.store(path, stat, page):
+            dirty.add(path)
+        pages[path] = page if not page['unchanged'] else graph.page(path)
+        if page.get('fixed'):
+            graph.forget(path)
+
+    if changed is None:
+        selected = [path for path in md_files if path in pages]
+    else:
+        reverse = graph.reverse_edges()
+        affected = set(dirty)
+        for target in dirty:
+            affected.update(reverse.get(target, ()))
+        selected = [path for path in md_files if path in pages and path in affected]
+
+    results = {
+        'files_scanned': len(selected),
+        'errors': [],
+        'warnings': [],
+        'fixed': []
+    }
+
+    for page in pages.values():
+        index.add_page(page)
+    for path in selected:
+        check_page(pages[path], index, results, create_placeholders)
+
+    graph.save()
+    results['link_graph'] = {'pages': len(pages), 'cached': graph.hits, 'parsed': graph.misses}
     return results
 
 
@@ -220,6 +503,10 @@ if __name__ == '__main__':
     ap.add_argument('--fix-h1', action='store_true', help='Auto-fix missing/mismatched H1s')
     ap.add_argument('--create-placeholders', action='store_true', help='Create placeholder .md pages for YAML links under wiki_pages')
     ap.add_argument('--json', action='store_true', help='Output JSON')
+    ap.add_argument('--jobs', '-j', type=int, default=None, help='Parser processes (default: CPU count)')
+    ap.add_argument('--changed-since', metavar='REV', help='Only lint pages changed since the git revision REV and the pages linking to them')
+    ap.add_argument('--cache', help=f'Link graph cache file (default: {DEFAULT_GRAPH_FILE})')
+    ap.add_argument('--no-cache', action='store_true', help='Re-read every page without the link graph cache')
     args = ap.parse_args()
 
     if args.paths:
@@ -227,12 +514,23 @@ if __name__ == '__main__':
     else:
         paths=[p for p in DEFAULT_PATHS if p.exists()]
 
-    res = scan_files(paths, fix_h1=args.fix_h1, create_placeholders=args.create_placeholders)
+    graph_file = None if args.no_cache else Path(args.cache) if args.cache else DEFAULT_GRAPH_FILE
+    changed = None
+    if args.changed_since:
+        try:
+            changed = git_changed_files(args.changed_since)
+        except (OSError, ValueError) as e:
+            ap.error(f'--changed-since: {e}')
+
+    res = scan_files(paths, fix_h1=args.fix_h1, create_placeholders=args.create_placeholders, jobs=args.jobs,
+                     graph_file=graph_file, changed=changed)
 
     if args.json:
         print(json.dumps(res, indent=2))
     else:
         print(f"Files scanned: {res['files_scanned']}")
+        graph = res['link_graph']
+        print(f"Link graph: {graph['pages']} pages ({graph['cached']} cached, {graph['parsed']} parsed)")
         print(f"Errors: {len([e for e in res['errors']])}")
         for e in res['errors'][:200]:
             print('ERROR:', e)
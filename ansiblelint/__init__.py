@@ -19,7 +19,6 @@ import importlib
 import sys
 import types
 import logging
-import inspect
 import os
 import re
 from pathlib import Path
@@ -57,38 +56,57 @@ _rules = _safe_import('ansiblelint.rules', ('AnsibleLintRule', 'RulesCollection'
 # If any submodule is missing, create a compatible fallback — but only when
 # it is safe (local repo tests / CI). This prevents accidental use of the
 # test-only shim in other contexts and closes potential attack vectors.
-from pathlib import Path
-import os
-import inspect
-
 _repo_root = Path(__file__).resolve().parents[1]
+_repo_prefix = str(_repo_root) + os.sep
+_this_file = os.path.realpath(__file__)
+_UNSET = object()
+_origin_cache: Any = _UNSET
+
+
+def _repo_origin() -> str | None:
+    """Return the first importing frame's file that lives in this repo, or None.
+
+    Walks raw frames with ``sys._getframe`` instead of ``inspect.stack()`` so
+    no source context is loaded; frames of this module and of the import
+    machinery are skipped. The result is computed once per import.
+    """
+    global _origin_cache
+    if _origin_cache is not _UNSET:
+        return _origin_cache
+    _origin_cache = None
+    try:
+        frame = sys._getframe(1)
+    except (AttributeError, ValueError):
+        # Be conservative if frame inspection is unavailable
+        return None
+    seen: dict[str, bool] = {}
+    while frame is not None:
+        fn = frame.f_code.co_filename
+        if fn not in seen:
+            if fn.startswith('<'):
+                seen[fn] = False
+            else:
+                real = os.path.realpath(fn)
+                seen[fn] = real != _this_file and (real + os.sep).startswith(_repo_prefix)
+            if seen[fn]:
+                _origin_cache = os.path.realpath(fn)
+                break
+        frame = frame.f_back
+    return _origin_cache
+
 
 def _import_originates_from_repo() -> bool:
-    """Return True if any frame in the import stack originates from this repo.
+    """Return True if a frame in the import stack originates from this repo.
 
     This restricts fallback activation to test runs or code importing from the
     repository itself (prevents global/third-party usage of the shim).
     """
-    try:
-        for fr in inspect.stack():
-            fn = getattr(fr, 'filename', None)
-            if not fn:
-                continue
-            try:
-                p = Path(fn).resolve()
-            except Exception:
-                continue
-            # If the importing frame is inside the repository root, allow fallback
-            if _repo_root == p or _repo_root in p.parents:
-                return True
-    except Exception:
-        # Be conservative if stack inspection fails
-        return False
-    return False
+    return _repo_origin() is not None
 
-# Allow fallback if any of these are true (explicit env toggle OR running tests/CI)
+# Allow fallback if any of these are true (explicit env toggle OR running tests/CI).
+# The cheap checks run first; the frame walk only when they are all false.
 _ALLOW_FALLBACK = bool(os.environ.get('DSU_ALLOW_ANSIBLELINT_SHIM'))
-_ALLOW_FALLBACK = _ALLOW_FALLBACK or _import_originates_from_repo() or ('pytest' in sys.modules) or ('PYTEST_CURRENT_TEST' in os.environ) or ('CI' in os.environ)
+_ALLOW_FALLBACK = _ALLOW_FALLBACK or ('pytest' in sys.modules) or ('PYTEST_CURRENT_TEST' in os.environ) or ('CI' in os.environ) or _import_originates_from_repo()
 
 if not _ALLOW_FALLBACK and (_errors is None or _file_utils is None or _rules is None):
     # Safety: do not create fallback modules outside test/repo/CI contexts.
@@ -154,8 +172,24 @@ rules = _rules
 errors = _errors
 file_utils = _file_utils
 
+def _dsu_rule_ids() -> list[str]:
+    """DSU rule ids present in ansiblelint/rules (for auditability)."""
+    ids: list[str] = []
+    rules_dir = Path(__file__).resolve().parent / 'rules'
+    for f in rules_dir.glob('*.py'):
+        try:
+            m = re.search(r"id\s*=\s*['\"](DSU\d+)['\"]", f.read_text(encoding='utf-8'))
+        except Exception:
+            continue
+        if m:
+            ids.append(m.group(1))
+    return sorted(ids)
+
+
 # If we created any test-only fallbacks, emit an auditable, tagged log entry
 # following project audit/logging conventions (non-sensitive, structured).
+# The metadata (activation reasons, origin frame, rule ids) is only gathered
+# when the logger would actually emit the record.
 try:
     _created_shims = [
         name for name, mod in (
@@ -164,7 +198,8 @@ try:
         if getattr(mod, '__dsu_shim__', False)
     ]
 
-    if _created_shims:
+    _logger = logging.getLogger('dsu.ansiblelint_shim')
+    if _created_shims and _logger.isEnabledFor(logging.INFO):
         # Determine activation reason(s)
         _reasons = []
         if os.environ.get('DSU_ALLOW_ANSIBLELINT_SHIM'):
@@ -178,42 +213,11 @@ try:
         if not _reasons:
             _reasons.append('unknown')
 
-        # Find the first repo-local caller frame (if any)
-        _origin = None
-        for fr in inspect.stack():
-            fn = getattr(fr, 'filename', None)
-            if not fn:
-                continue
-            try:
-                p = Path(fn).resolve()
-            except Exception:
-                continue
-            if _repo_root == p or _repo_root in p.parents:
-                _origin = str(p)
-                break
-
-        # Gather DSU rule ids present in ansiblelint/rules (for auditability)
-        _affected_rules: list[str] = []
-        try:
-            _rules_dir = Path(__file__).resolve().parent / 'rules'
-            if _rules_dir.exists():
-                for _f in _rules_dir.glob('*.py'):
-                    try:
-                        _txt = _f.read_text(encoding='utf-8')
-                    except Exception:
-                        continue
-                    m = re.search(r"id\s*=\s*['\"](DSU\d+)['\"]", _txt)
-                    if m:
-                        _affected_rules.append(m.group(1))
-        except Exception:
-            _affected_rules = []
-
         # Structured, non-sensitive audit log message
-        _logger = logging.getLogger('dsu.ansiblelint_shim')
         _logger.info(
-            f"DSU-SHIM: ansiblelint shim activated; shims={_created_shims}; "
-            f"reason={','.join(sorted(set(_reasons)))}; origin={_origin}; "
-            f"affected_rules={sorted(_affected_rules)}; tag=DSU-SHIM"
+            "DSU-SHIM: ansiblelint shim activated; shims=%s; reason=%s; origin=%s; "
+            "affected_rules=%s; tag=DSU-SHIM",
+            _created_shims, ','.join(sorted(set(_reasons))), _repo_origin(), _dsu_rule_ids(),
         )
 except Exception:
     # Never let logging/audit attempt raise during import — keep shim robust.
@@ -0,0 +1,103 @@
+"""Shared single-pass YAML walker for the DSU ansible-lint rules.
+
+ansible-lint calls every rule's ``matchyaml`` separately for each Lintable.
+Instead of each DSU rule traversing the document itself, rules register a
+visitor here; the first rule to ask about a document triggers one walk that
+feeds every registered visitor, and the per-rule results are cached for the
+other rules' calls on the same document.
+
+ansible-lint puts the rules directory on ``sys.path`` while it imports the
+rule modules, so every rule does a plain ``import _walker`` and all of them
+share this one module, its registry and its cache. This file defines no rule
+class, so ansible-lint importing it as well is harmless.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable
+
+# ansible-lint finishes all rules on one file before the next; a few entries
+# are enough to serve every rule from a single walk.
+CACHE_SIZE = 8
+
+
+class Visitor:
+    """Receives node events for one walk. Subclasses override what they need.
+
+    Events per document: ``start_document`` once, then ``mapping_item`` for
+    every key/value pair and ``scalar`` for every scalar (mapping keys
+    included), then ``end_document``. ``result()`` is read after the walk.
+    """
+
+    def start_document(self, index: int, doc: Any) -> None:
+        pass
+
+    def mapping_item(self, key: Any, value: Any) -> None:
+        pass
+
+    def scalar(self, value: Any) -> None:
+        pass
+
+    def end_document(self, index: int, doc: Any) -> None:
+        pass
+
+    def result(self) -> Any:
+        return None
+
+
+_registry: dict[str, Callable[[], Visitor]] = {}
+_cache: OrderedDict[int, tuple[Any, dict[str, Any]]] = OrderedDict()
+
+
+def register(rule_id: str, factory: Callable[[], Visitor]) -> None:
+    """Register (or replace) the visitor factory of a rule."""
+    _registry[rule_id] = factory
+    _cache.clear()
+
+
+def _walk(docs: list, visitors: list[Visitor]) -> None:
+    for index, doc in enumerate(docs):
+        for visitor in visitors:
+            visitor.start_document(index, doc)
+        stack = [doc]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                items = list(node.items())
+                for key, value in items:
+                    for visitor in visitors:
+                        visitor.mapping_item(key, value)
+                # Keys are visited before values, in document order.
+                for key, value in reversed(items):
+                    stack.append(value)
+                    stack.append(key)
+            elif isinstance(node, list):
+                stack.extend(reversed(node))
+            else:
+                for visitor in visitors:
+                    visitor.scalar(node)
+        for visitor in visitors:
+            visitor.end_document(index, doc)
+
+
+def results(yaml_data: Any, rule_id: str) -> Any:
+    """Result of ``rule_id``'s visitor for ``yaml_data``, walking it at most once."""
+    key = id(yaml_data)
+    entry = _cache.get(key)
+    if entry is None or entry[0] is not yaml_data:
+        entry = (yaml_data, {})
+        _cache[key] = entry
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+
+    found = entry[1]
+    if rule_id not in found:
+        # Walk once for every registered rule not served yet.
+        pending = {rid: factory() for rid, factory in _registry.items() if rid not in found}
+        docs = yaml_data if isinstance(yaml_data, list) else [yaml_data]
+        _walk(docs, list(pending.values()))
+        for rid, visitor in pending.items():
+            found[rid] = visitor.result()
+    return found.get(rule_id)
@@ -3,9 +3,58 @@ from ansiblelint.errors import MatchError
 from ansiblelint.file_utils import Lintable
 from ansiblelint.rules import AnsibleLintRule
 
+import _walker
+
+
+RULE_ID = 'DSU003'
+PLACEHOLDER = 'CHANGE_ME'
+OPERATOR_RE = re.compile(r"!=|==|\bin\b|\bnot\s+in\b")
+DEFAULT_RE = re.compile(r"\|\s*default\s*\(\s*['\"]CHANGE_ME")
+SKIP_FRAGMENTS = ('/molecule/', '/defaults/', '/templates/', '/docs/', '/inventory/')
+
+
+class _PlaceholderVisitor(_walker.Visitor):
+    """Collects placeholder comparisons, minus those guarded by a 'bad_values' list.
+
+    ``bad_values`` literals anywhere in a document exempt every comparison in
+    that document containing one of them; membership is checked with a single
+    alternation regex instead of rescanning the set per string.
+    """
+
+    def __init__(self):
+        self.found = []
+
+    def start_document(self, index, doc):
+        self.bad_values = set()
+        self.candidates = []
+
+    def mapping_item(self, key, value):
+        if key == 'bad_values' and isinstance(value, list):
+            self.bad_values.update(i for i in value if isinstance(i, str) and i)
+
+    def scalar(self, value):
+        # Plain substring test first; the regexes only run on placeholder strings.
+        if isinstance(value, str) and PLACEHOLDER in value and (
+            OPERATOR_RE.search(value) or DEFAULT_RE.search(value)
+        ):
+            self.candidates.append(value)
+
+    def end_document(self, index, doc):
+        if self.candidates and self.bad_values:
+            # Longest first so overlapping literals match deterministically
+            guard_re = re.compile('|'.join(map(re.escape, sorted(self.bad_values, key=len, reverse=True))))
+            self.candidates = [s for s in self.candidates if not guard_re.search(s)]
+        self.found.extend(self.candidates)
+
+    def result(self):
+        return self.found
+
+
+_walker.register(RULE_ID, _PlaceholderVisitor)
+
 
 class NoDirectPlaceholderCompareRule(AnsibleLintRule):
-    id = 'DSU003'
+    id = RULE_ID
     shortdesc = 'Avoid direct comparisons to placeholder default values'
     description = (
         'Directly comparing variables to placeholder values (e.g., CHANGE_ME, '
@@ -31,46 +80,13 @@ class NoDirectPlaceholderCompareRule(AnsibleLintRule):
             return MatchError(lintable=file, rule=self, message=message)
         return message
 
-    def _iter_nodes(self, obj):
-        # Recursively yield all scalar nodes in YAML structures
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                yield from self._iter_nodes(k)
-                yield from self._iter_nodes(v)
-        elif isinstance(obj, list):
-            for item in obj:
-                yield from self._iter_nodes(item)
-        else:
-            yield obj
-
-    def _collect_bad_values(self, obj, out):
-        """Recursively collect literals from any 'bad_values' lists in the doc.
-
-        Args:
-            obj: YAML node (dict/list/scalar)
-            out: set to populate with bad values found (strings)
-        """
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if k == 'bad_values' and isinstance(v, list):
-                    for i in v:
-                        if isinstance(i, str):
-                            out.add(i)
-                else:
-                    self._collect_bad_values(v, out)
-        elif isinstance(obj, list):
-            for item in obj:
-                self._collect_bad_values(item, out)
-        # scalars ignored
-
     def matchyaml(self, file, yaml_doc=None):
         matches = []
         filename = self._get_path(file)
         norm_path = filename.replace('\\', '/')
 
         # Skip test fixtures and intentional placeholder files
-        skip_fragments = ['/molecule/', '/defaults/', '/templates/', '/docs/', '/inventory/']
-        if any(fragment in norm_path for fragment in skip_fragments):
+        if any(fragment in norm_path for fragment in SKIP_FRAGMENTS):
             return matches
 
         yaml_data = yaml_doc
@@ -81,31 +97,11 @@ class NoDirectPlaceholderCompareRule(AnsibleLintRule):
         if yaml_data is None:
             return matches
 
-        # Precompile regexes for performance
-        placeholder_re = re.compile(r'CHANGE_ME')
-        operator_re = re.compile(r"!=|==|\bin\b|\bnot\s+in\b")
-        default_re = re.compile(r"\|\s*default\s*\(\s*['\"]CHANGE_ME")
-
-        docs = yaml_data if isinstance(yaml_data, list) else [yaml_data]
-        for doc in docs:
-            try:
-                # Collect any 'bad_values' entries that indicate intentional placeholder guards
-                bad_values = set()
-                self._collect_bad_values(doc, bad_values)
-
-                for node in self._iter_nodes(doc):
-                    if not isinstance(node, str):
-                        continue
-                    s = node
-                    # Detect direct comparisons and default comparisons to placeholders
-                    if placeholder_re.search(s) and (
-                        operator_re.search(s) or default_re.search(s)
-                    ):
-                        # If the placeholder in question is covered by a nearby 'bad_values' list, ignore it
-                        if any(bv and bv in s for bv in bad_values):
-                            continue
-                        matches.append(self._make_match(file, f"Direct placeholder comparison detected: {s}"))
-            except Exception:
-                # Be tolerant of unexpected structures
-                continue
+        try:
+            found = _walker.results(yaml_data, RULE_ID)
+        except Exception:
+            # Be tolerant of unexpected structures
+            return matches
+        for s in found:
+            matches.append(self._make_match(file, f"Direct placeholder comparison detected: {s}"))
         return matches
@@ -2,9 +2,44 @@ from ansiblelint.errors import MatchError
 from ansiblelint.file_utils import Lintable
 from ansiblelint.rules import AnsibleLintRule
 
+import _walker
+
+
+RULE_ID = 'DSU002'
+CAPABILITY_KEYS = frozenset(('capabilities', 'quadlet_gpu_capabilities'))
+
+
+def _invalid_caps(value):
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, str) and not item.startswith('CAP_')]
+
+
+class _CapabilitiesVisitor(_walker.Visitor):
+    """Reports capability lists with non-CAP_* entries in mapping documents."""
+
+    def __init__(self):
+        self.found = []
+        self.active = False
+
+    def start_document(self, index, doc):
+        self.active = isinstance(doc, dict)
+
+    def mapping_item(self, key, value):
+        if self.active and key in CAPABILITY_KEYS:
+            invalid = _invalid_caps(value)
+            if invalid:
+                self.found.append(f"Invalid capabilities in '{key}': {', '.join(invalid)}")
+
+    def result(self):
+        return self.found
+
+
+_walker.register(RULE_ID, _CapabilitiesVisitor)
+
 
 class NoGpuCapabilitiesRule(AnsibleLintRule):
-    id = 'DSU002'
+    id = RULE_ID
     shortdesc = 'Disallow non-CAP_* entries in capabilities lists'
     description = (
         'Capability lists must contain only Linux CAP_* values. Strings like '
@@ -23,13 +58,7 @@ class NoGpuCapabilitiesRule(AnsibleLintRule):
         return str(file)
 
     def _invalid_caps(self, value):
-        if not isinstance(value, list):
-            return []
-        invalid = []
-        for item in value:
-            if isinstance(item, str) and not item.startswith('CAP_'):
-                invalid.append(item)
-        return invalid
+        return _invalid_caps(value)
 
     def _make_match(self, file, message):
         if isinstance(file, Lintable):
@@ -46,30 +75,6 @@ class NoGpuCapabilitiesRule(AnsibleLintRule):
         if yaml_data is None:
             return matches
 
-        docs = yaml_data if isinstance(yaml_data, list) else [yaml_data]
-        for doc in docs:
-            if not isinstance(doc, dict):
-                continue
-            # Walk the doc recursively for keys that represent capabilities lists.
-            stack = [doc]
-            while stack:
-                node = stack.pop()
-                if isinstance(node, dict):
-                    for key, value in node.items():
-                        if key in ('capabilities', 'quadlet_gpu_capabilities'):
-                            invalid = self._invalid_caps(value)
-                            if invalid:
-                                matches.append(
-                                    self._make_match(
-                                        file,
-                                        f"Invalid capabilities in '{key}': {', '.join(invalid)}",
-                                    )
-                                )
-                        else:
-                            if isinstance(value, (dict, list)):
-                                stack.append(value)
-                elif isinstance(node, list):
-                    for item in node:
-                        if isinstance(item, (dict, list)):
-                            stack.append(item)
-        return matches
\ No newline at end of file
+        for message in _walker.results(yaml_data, RULE_ID):
+            matches.append(self._make_match(file, message))
+        return matches
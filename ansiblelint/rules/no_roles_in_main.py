@@ -2,9 +2,34 @@ from ansiblelint.errors import MatchError
 from ansiblelint.file_utils import Lintable
 from ansiblelint.rules import AnsibleLintRule
 
+import _walker
+
+
+RULE_ID = 'DSU001'
+RESERVED_DIRS = frozenset(('tasks', 'handlers', 'defaults', 'vars', 'meta', 'roles'))
+
+
+class _RolesInPlayVisitor(_walker.Visitor):
+    """Records top-level plays that declare a non-empty 'roles' list."""
+
+    def __init__(self):
+        self.found = []
+
+    def start_document(self, index, doc):
+        if isinstance(doc, dict):
+            roles = doc.get('roles')
+            if isinstance(roles, list) and roles:
+                self.found.append(f"Top-level 'roles' found in play index {index}")
+
+    def result(self):
+        return self.found
+
+
+_walker.register(RULE_ID, _RolesInPlayVisitor)
+
 
 class NoRolesInMainRule(AnsibleLintRule):
-    id = 'DSU001'
+    id = RULE_ID
     shortdesc = 'Do not use top-level roles in main.yml'
     description = 'main.yml must remain a pristine base; use branch_templates/*.yml for role lists and name your playbook site.yml.'
     severity = 'HIGH'
@@ -36,9 +61,8 @@ class NoRolesInMainRule(AnsibleLintRule):
             
         # Avoid identifying files inside standard role structure as violations
         path_parts = norm_path.split('/')
-        reserved_dirs = {'tasks', 'handlers', 'defaults', 'vars', 'meta', 'roles'}
         # Check if any parent directory is a reserved name
-        if any(part in reserved_dirs for part in path_parts[:-1]):
+        if any(part in RESERVED_DIRS for part in path_parts[:-1]):
             return []
             
         if not isinstance(play, dict):
@@ -59,8 +83,7 @@ class NoRolesInMainRule(AnsibleLintRule):
             
         # Avoid identifying files inside standard role structure as violations
         path_parts = norm_path.split('/')
-        reserved_dirs = {'tasks', 'handlers', 'defaults', 'vars', 'meta', 'roles'}
-        if any(part in reserved_dirs for part in path_parts[:-1]):
+        if any(part in RESERVED_DIRS for part in path_parts[:-1]):
             return matches
 
         # Handle modern Lintable object or legacy dict
@@ -73,19 +96,6 @@ class NoRolesInMainRule(AnsibleLintRule):
         if yaml_data is None:
             return matches
 
-        docs = yaml_data if isinstance(yaml_data, list) else [yaml_data]
-        for idx, play in enumerate(docs):
-            try:
-                if isinstance(play, dict):
-                    roles = play.get('roles')
-                    if isinstance(roles, list) and roles:
-                        matches.append(
-                            self._make_match(
-                                file,
-                                f"Top-level 'roles' found in play index {idx}",
-                            )
-                        )
-            except Exception:
-                # Be tolerant of unexpected structures
-                continue
+        for message in _walker.results(yaml_data, RULE_ID):
+            matches.append(self._make_match(file, message))
         return matches
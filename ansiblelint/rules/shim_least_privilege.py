@@ -4,6 +4,13 @@ from ansiblelint.errors import MatchError
 from ansiblelint.file_utils import Lintable
 from ansiblelint.rules import AnsibleLintRule
 
+# Compiled once at rule load; matchfile runs for every Lintable.
+GATING_RE = re.compile(r'DSU_ALLOW_ANSIBLELINT_SHIM|_import_originates_from_repo|pytest|PYTEST_CURRENT_TEST|\bCI\b')
+SHIM_MARKER_RE = re.compile(r"__dsu_shim__\s*=\s*True")
+RISKY_RE = re.compile(r'\brequests\b|\bsocket\b|\bsubprocess\b|\bos\.system\b|\bPopen\b|\burllib\b')
+WRITE_OPEN_RE = re.compile(r"open\(.*['\"]w['\"]")
+ALL_RE = re.compile(r"__all__\s*=\s*\[([^\]]*)\]", re.S)
+
 
 class ShimLeastPrivilegeRule(AnsibleLintRule):
     id = 'DSU004'
@@ -62,36 +69,27 @@ class ShimLeastPrivilegeRule(AnsibleLintRule):
             return matches
 
         # 1) Gating check (env OR repo-origin OR pytest/CI)
-        gating_ok = bool(
-            re.search(r'DSU_ALLOW_ANSIBLELINT_SHIM', text)
-            or re.search(r'_import_originates_from_repo', text)
-            or re.search(r'pytest|PYTEST_CURRENT_TEST', text)
-            or re.search(r'\bCI\b', text)
-        )
-        if not gating_ok:
+        if not GATING_RE.search(text):
             matches.append(self._make_match(file, 'Shim activation must be explicitly gated (env/repo/pytest/CI) — enforces least privilege'))
 
         # 2) Shim markers must be present on fallback modules
-        if not re.search(r"__dsu_shim__\s*=\s*True", text):
+        if not SHIM_MARKER_RE.search(text):
             matches.append(self._make_match(file, 'Shim-created modules must set __dsu_shim__ = True (audit marker)'))
 
         # 3) Must emit an auditable DSU-SHIM log entry with logger 'dsu.ansiblelint_shim'
-        if not (re.search(r"dsu\.ansiblelint_shim", text) and re.search(r"DSU-SHIM", text)):
+        if not ('dsu.ansiblelint_shim' in text and 'DSU-SHIM' in text):
             matches.append(self._make_match(file, "Shim must emit a structured audit log with tag 'DSU-SHIM' via logger 'dsu.ansiblelint_shim'"))
 
         # 4) Prohibit risky imports / runtime side-effects at import time
-        risky_patterns = [r'\brequests\b', r'\bsocket\b', r'\bsubprocess\b', r'\bos\.system\b', r'\bPopen\b', r'\burllib\b']
-        for pat in risky_patterns:
-            if re.search(pat, text):
-                matches.append(self._make_match(file, 'Shim must not perform network/subprocess operations at import time (principle of least privilege)'))
-                break
+        if RISKY_RE.search(text):
+            matches.append(self._make_match(file, 'Shim must not perform network/subprocess operations at import time (principle of least privilege)'))
 
         # 5) Avoid opening/writing files at import time
-        if re.search(r"open\(.*['\"]w['\"]", text):
+        if WRITE_OPEN_RE.search(text):
             matches.append(self._make_match(file, 'Shim must not write files at import time'))
 
         # 6) Ensure __all__ is explicit and does not expose internal markers
-        all_match = re.search(r"__all__\s*=\s*\[([^\]]*)\]", text, re.S)
+        all_match = ALL_RE.search(text)
         if all_match:
             items = all_match.group(1)
             if '*' in items or '__dsu_shim__' in items:
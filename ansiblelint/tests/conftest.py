@@ -0,0 +1,9 @@
+# Rule modules import their shared helpers (``import _walker``) the way
+# ansible-lint loads them: with the rules directory on sys.path.
+import pathlib
+import sys
+
+RULES_DIR = str(pathlib.Path(__file__).resolve().parent.parent / 'rules')
+
+if RULES_DIR not in sys.path:
+    sys.path.append(RULES_DIR)
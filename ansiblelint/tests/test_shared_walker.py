@@ -0,0 +1,77 @@
+# Import the rule modules directly from file to avoid import collision with installed 'ansiblelint' package
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+rules_dir = pathlib.Path(__file__).resolve().parent.parent / 'rules'
+
+
+def load_rule(name):
+    spec = importlib.util.spec_from_file_location(f'dsu_rules.{name}', str(rules_dir / f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+placeholder = load_rule('no_direct_placeholder_compare')
+capabilities = load_rule('no_gpu_capabilities')
+roles_in_main = load_rule('no_roles_in_main')
+walker = placeholder._walker
+
+
+def test_rules_share_one_walker():
+    assert capabilities._walker is walker
+    assert roles_in_main._walker is walker
+    assert {'DSU001', 'DSU002', 'DSU003'} <= set(walker._registry)
+
+
+def test_one_walk_serves_every_rule(monkeypatch):
+    walks = []
+    original = walker._walk
+
+    def counting_walk(docs, visitors):
+        walks.append(len(visitors))
+        return original(docs, visitors)
+
+    monkeypatch.setattr(walker, '_walk', counting_walk)
+    yaml_doc = [
+        {
+            'hosts': 'all',
+            'roles': ['example'],
+            'capabilities': ['SYS_ADMIN'],
+            'tasks': [{'ansible.builtin.assert': {'that': ['foo != "CHANGE_ME"']}}],
+        }
+    ]
+    file = {'path': 'main.yml'}
+
+    assert placeholder.NoDirectPlaceholderCompareRule().matchyaml(file, yaml_doc)
+    assert capabilities.NoGpuCapabilitiesRule().matchyaml(file, yaml_doc)
+    assert roles_in_main.NoRolesInMainRule().matchyaml(file, yaml_doc)
+    assert len(walks) == 1
+
+
+def test_bad_values_guard_is_per_document():
+    rule = placeholder.NoDirectPlaceholderCompareRule()
+    yaml_doc = [
+        {'vars': {'bad_values': ['CHANGE_ME']}, 'that': ['x not in bad_values and x != "CHANGE_ME"']},
+        {'that': ['y != "CHANGE_ME"']},
+    ]
+    matches = rule.matchyaml({'path': 'roles/example/tasks/main.yml'}, yaml_doc)
+    assert matches == ['Direct placeholder comparison detected: y != "CHANGE_ME"']
+
+
+def test_failed_walker_import_leaves_no_module(monkeypatch, tmp_path):
+    broken = tmp_path / '_walker.py'
+    broken.write_text('raise RuntimeError("broken walker")\n')
+    rule = tmp_path / 'rule.py'
+    rule.write_text((rules_dir / 'no_gpu_capabilities.py').read_text())
+    monkeypatch.delitem(sys.modules, '_walker')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    spec = importlib.util.spec_from_file_location('dsu_rules.broken', str(rule))
+    module = importlib.util.module_from_spec(spec)
+    with pytest.raises(RuntimeError, match='broken walker'):
+        spec.loader.exec_module(module)
+    assert '_walker' not in sys.modules
@@ -0,0 +1,83 @@
+import importlib
+import inspect
+import logging
+import os
+import sys
+import time
+
+import pytest
+
+# A cold import of the shim must stay cheaper than the inspect.stack() call the
+# old origin check made on every import. Both are measured in the same process,
+# interleaved, so a loaded runner slows them alike.
+RUNS = 5
+
+# Optional absolute budget, e.g. DSU_SHIM_IMPORT_BUDGET_MS=50 on a quiet machine
+BUDGET_ENV = 'DSU_SHIM_IMPORT_BUDGET_MS'
+
+
+@pytest.fixture
+def fresh_import():
+    """Import ``ansiblelint`` from scratch; the original modules are put back afterwards.
+
+    Rule modules and other tests hold references to the shim's classes, so the
+    modules imported here must not outlive the test.
+    """
+    saved = {k: m for k, m in sys.modules.items() if k.startswith('ansiblelint')}
+
+    def _import():
+        for k in [k for k in sys.modules if k.startswith('ansiblelint')]:
+            del sys.modules[k]
+        start = time.perf_counter()
+        importlib.import_module('ansiblelint')
+        return time.perf_counter() - start
+
+    yield _import
+    for k in [k for k in sys.modules if k.startswith('ansiblelint')]:
+        del sys.modules[k]
+    sys.modules.update(saved)
+
+
+def _stack_walk():
+    start = time.perf_counter()
+    inspect.stack()
+    return time.perf_counter() - start
+
+
+@pytest.fixture
+def quiet_shim_log(monkeypatch):
+    monkeypatch.setenv('DSU_ALLOW_ANSIBLELINT_SHIM', '1')
+    logging.getLogger('dsu.ansiblelint_shim').setLevel(logging.WARNING)
+    yield
+    logging.getLogger('dsu.ansiblelint_shim').setLevel(logging.NOTSET)
+
+
+def test_shim_import_is_cheaper_than_a_stack_walk(fresh_import, quiet_shim_log):
+    imports, walks = [], []
+    for _ in range(RUNS):
+        imports.append(fresh_import())
+        walks.append(_stack_walk())
+    best, baseline = min(imports), min(walks)
+    assert best < baseline, (
+        f'ansiblelint import took {best * 1000:.2f} ms, inspect.stack() {baseline * 1000:.2f} ms'
+    )
+
+
+@pytest.mark.skipif(not os.environ.get(BUDGET_ENV), reason=f'set {BUDGET_ENV} to check an absolute budget')
+def test_shim_import_stays_within_budget(fresh_import, quiet_shim_log):
+    budget = float(os.environ[BUDGET_ENV]) / 1000
+    best = min(fresh_import() for _ in range(RUNS))
+    assert best < budget, f'ansiblelint import took {best * 1000:.1f} ms'
+
+
+def test_origin_check_does_not_use_inspect_stack(fresh_import, monkeypatch):
+    def _fail(*args, **kwargs):
+        raise AssertionError('inspect.stack() must not be called on import')
+
+    monkeypatch.setattr(inspect, 'stack', _fail)
+    monkeypatch.delenv('DSU_ALLOW_ANSIBLELINT_SHIM', raising=False)
+    fresh_import()
+    mod = sys.modules['ansiblelint']
+    # Imported from this test file, which lives in the repository
+    assert mod._import_originates_from_repo()
+    assert mod._repo_origin().endswith('test_shim_import_time.py')
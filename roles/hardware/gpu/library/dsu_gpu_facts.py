@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Audit Event Identifier: DSU-PYS-500018
+# Script Type: Ansible Module
+# Description: Returns GPU discovery results as ansible_facts.dsu_gpu
+# Output: ansible_facts.dsu_gpu (PCI inventory, drivers, eGPU, RDMA, runtimes)
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = r'''
+---
+module: dsu_gpu_facts
+short_description: Gather GPU inventory and capability facts.
+description:
+    - Enumerates display-class PCI devices from sysfs (lspci only as a fallback) and
+      returns them, together with the requested capability probes, as C(ansible_facts.dsu_gpu).
+    - Replaces copying and executing C(files/gpu_discovery.py) and parsing its stdout.
+    - External probes run concurrently under a global deadline. Their results are cached
+      on the host under C(/var/lib/deploy-system/cache), keyed by a fingerprint of the PCI
+      and Thunderbolt topology, loaded modules and driver CLIs.
+options:
+    gather_subset:
+        description:
+            - Which parts of the discovery document to gather.
+            - C(pci) (device inventory and vendor detection) is always included.
+            - C(all) selects every subset.
+        type: list
+        elements: str
+        choices: [all, pci, drivers, container_runtime, egpu, dp_alt_mode, rdma]
+        default: [pci, drivers]
+    configured_vendor:
+        description:
+            - Vendor (or list of vendors) the role is configured for; adds C(vendor_validation).
+        type: raw
+    deadline:
+        description:
+            - Global deadline in seconds for all external probes.
+        type: float
+        default: 15
+    use_lspci:
+        description:
+            - Enumerate devices with C(lspci) instead of sysfs.
+        type: bool
+        default: false
+    cache:
+        description:
+            - Read and write the probe result cache.
+        type: bool
+        default: true
+    cache_file:
+        description:
+            - Probe result cache file on the managed host.
+        type: path
+        default: /var/lib/deploy-system/cache/gpu_discovery.json
+    cache_ttl:
+        description:
+            - Seconds a cached probe result stays valid.
+        type: int
+        default: 86400
+    refresh:
+        description:
+            - Ignore cached results and re-probe; the cache is rewritten.
+        type: bool
+        default: false
+notes:
+    - Run with become so C(dmesg), sysfs driver links and the cache directory are accessible.
+'''
+
+EXAMPLES = r'''
+- name: Gather PCI inventory and driver state
+  dsu_gpu_facts:
+
+- name: Gather everything, ignoring the cache
+  dsu_gpu_facts:
+    gather_subset: [all]
+    refresh: true
+  become: true
+
+- name: Show the primary vendor
+  ansible.builtin.debug:
+    msg: "{{ ansible_facts.dsu_gpu.primary_detected_vendor }}"
+'''
+
+RETURN = r'''
+ansible_facts:
+    description: Facts added to the host.
+    returned: always
+    type: complex
+    contains:
+        dsu_gpu:
+            description:
+                - GPU discovery document. Always contains the PCI fields (C(detected_devices),
+                  C(detected_vendor_list), C(primary_detected_vendor), C(gpu_count), C(is_multi_gpu),
+                  C(is_multi_vendor)), C(gathered_subsets) and C(discovery_cache); the other
+                  keys (C(drivers), C(container_runtime), C(egpu), C(dp_alt_mode), C(rdma),
+                  C(egpu_rdma_integration)) follow the selected subsets.
+            returned: always
+            type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.dsu_gpu_discovery import (
+    DEFAULT_CACHE_FILE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_DEADLINE,
+    DEFAULT_SUBSETS,
+    SUBSETS,
+    discover,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            gather_subset=dict(type='list', elements='str', default=list(DEFAULT_SUBSETS),
+                               choices=['all'] + list(SUBSETS)),
+            configured_vendor=dict(type='raw'),
+            deadline=dict(type='float', default=DEFAULT_DEADLINE),
+            use_lspci=dict(type='bool', default=False),
+            cache=dict(type='bool', default=True),
+            cache_file=dict(type='path', default=DEFAULT_CACHE_FILE),
+            cache_ttl=dict(type='int', default=DEFAULT_CACHE_TTL),
+            refresh=dict(type='bool', default=False),
+        ),
+        supports_check_mode=True,
+    )
+
+    try:
+        result = discover(
+            module.params['gather_subset'],
+            configured_vendor=module.params['configured_vendor'],
+            deadline=module.params['deadline'],
+            use_lspci=module.params['use_lspci'],
+            cache_file=module.params['cache_file'],
+            cache_ttl=module.params['cache_ttl'],
+            refresh=module.params['refresh'],
+            use_cache=module.params['cache'] and not module.check_mode,
+        )
+    except (OSError, ValueError) as e:
+        module.fail_json(msg='GPU discovery failed: %s' % e)
+
+    module.exit_json(changed=False, ansible_facts={'dsu_gpu': result})
+
+
+if __name__ == '__main__':
+    main()
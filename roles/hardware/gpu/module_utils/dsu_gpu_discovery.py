@@ -0,0 +1,815 @@
+# =============================================================================
+# Audit Event Identifier: DSU-PYS-500017
+# Script Type: Ansible Module Utility
+# Description: GPU discovery engine (sysfs inventory, concurrent probes, cache)
+# Output: GPU discovery result document (dict)
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""
+GPU discovery engine shared by the dsu_gpu_facts module and the
+files/gpu_discovery.py CLI.
+
+PCI display devices are enumerated from /sys/bus/pci/devices and
+/sys/class/drm in a single pass (lspci is only a fallback). Driver, runtime,
+eGPU and RDMA probes run concurrently and share one global deadline, so a
+hung tool cannot stall fact gathering for longer than the deadline.
+
+Probe results are cached under /var/lib/deploy-system with a TTL, keyed by a
+fingerprint of the PCI/Thunderbolt topology, loaded modules and the installed
+driver CLIs; hot-plugging an eGPU changes the fingerprint and forces a re-probe.
+
+Only the standard library is used so the module can be shipped by AnsiballZ.
+"""
+import subprocess
+import json
+import re
+import os
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# PCI Vendor IDs
+VENDORS = {
+    "10de": "nvidia",
+    "1002": "amd",
+    "8086": "intel",
+    "102b": "generic",  # Matrox
+    "1a03": "generic",  # Aspeed
+    "1af4": "generic",  # VirtIO
+    "15ad": "generic",  # VMware
+    "1234": "generic",  # QEMU
+}
+
+# Intel GPU Generation Detection
+INTEL_GENERATIONS = {
+    "gen9": ["9bc0", "9bc4", "9bc5", "9bc6", "9bd0", "9bd1", "9bd2"],
+    "gen9lp": ["9ba0", "9baa", "9bab"],
+    "gen10": ["3ea0", "3ea5", "3ea6", "3ea7", "3ea8", "3ea9"],
+    "gen11": ["8a70", "8a71", "8a72", "8a73", "8a74", "8a75", "8a76", "8a77"],
+    "gen12": ["8a50", "8a51", "8a52", "8a53", "8a54", "8a55", "8a56", "8a57"],
+    "xe": ["4c80", "4c8a", "4c90", "4c9a", "4c8b", "4c8c", "4c8d", "4c8e", "4c8f"],
+    "xe_hp": ["4f00", "4f01", "4f02", "4f03", "4f04", "4f05", "4f06", "4f07", "4f08", "4f09"],
+    "battlemage": ["e20b", "e20c", "e20d", "e20e", "e20f", "e21b", "e21c", "e21d", "e21e", "e21f"],
+}
+
+# PCI display classes: VGA, 3D controller, other display controller
+DISPLAY_CLASSES = ("0300", "0302", "0380")
+
+SYSFS_PCI_DEVICES = "/sys/bus/pci/devices"
+SYSFS_DRM = "/sys/class/drm"
+PCI_IDS_PATHS = ("/usr/share/hwdata/pci.ids", "/usr/share/misc/pci.ids", "/usr/share/pci.ids")
+
+DEFAULT_DEADLINE = 15.0
+
+DEFAULT_CACHE_FILE = "/var/lib/deploy-system/cache/gpu_discovery.json"
+DEFAULT_CACHE_TTL = 86400
+CACHE_VERSION = 1
+SYSFS_PCI_SLOTS = "/sys/bus/pci/slots"
+SYSFS_THUNDERBOLT_DEVICES = "/sys/bus/thunderbolt/devices"
+_deadline = None
+
+def set_deadline(seconds):
+    """Start the global probe deadline (None disables it)."""
+    global _deadline
+    _deadline = time.monotonic() + seconds if seconds else None
+
+def remaining_time(default):
+    """Clamp a per-probe timeout to what is left of the global deadline."""
+    if _deadline is None:
+        return default
+    return max(0.0, min(default, _deadline - time.monotonic()))
+
+def run_command(argv, timeout=5):
+    """Run a probe command; returns CompletedProcess or None if unavailable/timed out."""
+    timeout = remaining_time(timeout)
+    if timeout <= 0:
+        return None
+    try:
+        return subprocess.run(argv, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+def read_sysfs(path):
+    """Read a sysfs attribute, returning None if it does not exist."""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def intel_generation(vendor_id, device_id):
+    if vendor_id != "8086":
+        return None
+    for gen, ids in INTEL_GENERATIONS.items():
+        if device_id in ids:
+            return gen
+    return None
+
+def make_device(pci_id, vendor_id, device_id, model):
+    return {
+        "pci_id": pci_id,
+        "vendor_id": vendor_id,
+        "device_id": device_id,
+        "vendor_name": VENDORS.get(vendor_id, "unknown"),
+        "model": model,
+        "intel_generation": intel_generation(vendor_id, device_id)
+    }
+
+def scan_drm(drm_root=SYSFS_DRM):
+    """Map PCI addresses to their DRM nodes (card*/renderD*) from /sys/class/drm."""
+    nodes = {}
+    try:
+        entries = sorted(os.listdir(drm_root))
+    except OSError:
+        return nodes
+    for entry in entries:
+        if not (entry.startswith("card") or entry.startswith("renderD")) or "-" in entry:
+            continue
+        try:
+            pci_id = os.path.basename(os.path.realpath(os.path.join(drm_root, entry, "device")))
+        except OSError:
+            continue
+        nodes.setdefault(pci_id, []).append(entry)
+    return nodes
+
+def lookup_pci_names(pairs, paths=PCI_IDS_PATHS):
+    """Resolve (vendor_id, device_id) pairs to model names with one scan of pci.ids.
+
+    Unknown pairs are left out; callers label them "Device vvvv:dddd".
+    """
+    names = {}
+    wanted_vendors = {vendor for vendor, _ in pairs}
+    for path in paths:
+        try:
+            f = open(path, "r", encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        with f:
+            vendor = vendor_name = None
+            for line in f:
+                if line.startswith("C "):
+                    break  # device classes follow the vendor list
+                if not line.strip() or line.startswith("#"):
+                    continue
+                if not line.startswith("\t"):
+                    vendor = line[:4] if line[:4] in wanted_vendors else None
+                    vendor_name = line[4:].strip()
+                    continue
+                if vendor and not line.startswith("\t\t"):
+                    device_id, _, name = line.strip().partition("  ")
+                    if (vendor, device_id) in pairs:
+                        # Same "<vendor> <device>" form lspci prints
+                        names[(vendor, device_id)] = f"{vendor_name} {name.strip()}"
+        break
+    return names
+
+def scan_pci_sysfs(pci_root=SYSFS_PCI_DEVICES, drm_root=SYSFS_DRM):
+    """Enumerate display-class PCI devices from sysfs in one pass.
+
+    Returns None when sysfs is unavailable (e.g. some containers) so callers
+    can fall back to lspci.
+    """
+    try:
+        entries = sorted(os.listdir(pci_root))
+    except OSError:
+        return None
+    if not entries:
+        return None
+
+    found = []
+    for pci_id in entries:
+        base = os.path.join(pci_root, pci_id)
+        pci_class = read_sysfs(os.path.join(base, "class"))
+        if not pci_class or pci_class[2:6] not in DISPLAY_CLASSES:
+            continue
+        vendor_id = (read_sysfs(os.path.join(base, "vendor")) or "")[2:].lower()
+        device_id = (read_sysfs(os.path.join(base, "device")) or "")[2:].lower()
+        driver_link = os.path.join(base, "driver")
+        driver = os.path.basename(os.readlink(driver_link)) if os.path.islink(driver_link) else None
+        found.append((pci_id, vendor_id, device_id, driver))
+
+    names = lookup_pci_names({(vendor, device) for _, vendor, device, _ in found}) if found else {}
+    drm_nodes = scan_drm(drm_root) if found else {}
+    devices = []
+    for pci_id, vendor_id, device_id, driver in found:
+        model = names.get((vendor_id, device_id), f"Device {vendor_id}:{device_id}")
+        device = make_device(pci_id, vendor_id, device_id, model)
+        device["driver"] = driver
+        device["drm_nodes"] = drm_nodes.get(pci_id, [])
+        devices.append(device)
+    return devices
+
+def get_pci_devices():
+    """Run lspci once and return raw output with full domains (-D)."""
+    result = run_command(["lspci", "-Dnn"], timeout=10)
+    if result is None or result.returncode != 0:
+        return ""
+    return result.stdout
+
+def parse_lspci(output):
+    """Parse lspci output into structured data (display classes only)."""
+    devices = []
+    pattern = re.compile(r"([0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-9a-f])\s+([^\[]+)\s+\[([0-9a-f]+)\]:\s+(.+)\s+\[([0-9a-f]{4}):([0-9a-f]{4})\]")
+    
+    for line in output.splitlines():
+        match = pattern.search(line)
+        if match:
+            pci_id, class_name, class_id, device_name, vendor_id, device_id = match.groups()
+            if class_id not in DISPLAY_CLASSES:
+                continue
+            devices.append(make_device(pci_id, vendor_id, device_id, device_name.strip()))
+    return devices
+
+def discover_devices(use_lspci=False):
+    """Display devices from sysfs, falling back to a single lspci run."""
+    devices = None if use_lspci else scan_pci_sysfs()
+    if devices is None:
+        devices = parse_lspci(get_pci_devices())
+    return devices
+
+_bolt_lock = threading.Lock()
+_bolt_result = []
+
+def boltctl_list():
+    """`boltctl list` output (run at most once per process), or None."""
+    with _bolt_lock:
+        if not _bolt_result:
+            result = run_command(["boltctl", "list"], timeout=10)
+            _bolt_result.append(result.stdout if result is not None and result.returncode == 0 else None)
+        return _bolt_result[0]
+
+def check_nvidia_driver():
+    """Check if NVIDIA driver is loaded."""
+    result = run_command(["nvidia-smi"], timeout=5)
+    if result is not None and result.returncode == 0:
+        # Parse driver version
+        match = re.search(r"Driver Version:\s*(\S+)", result.stdout)
+        driver_version = match.group(1) if match else "unknown"
+            
+        # Parse CUDA version
+        match = re.search(r"CUDA Version:\s*(\S+)", result.stdout)
+        cuda_version = match.group(1) if match else "unknown"
+            
+        return {
+            "available": True,
+            "driver_version": driver_version,
+            "cuda_version": cuda_version
+        }
+    
+    return {"available": False, "driver_version": None, "cuda_version": None}
+
+def check_amdgpu_driver():
+    """Check if AMDGPU driver is loaded."""
+    result = run_command(["rocm-smi"], timeout=5)
+    if result is not None and result.returncode == 0:
+        match = re.search(r"GPU\s+\[.*\]\s+Version:\s*(\S+)", result.stdout)
+        return {
+            "available": True,
+            "driver_version": match.group(1) if match else "unknown"
+        }
+    
+    return {"available": False, "driver_version": None}
+
+def check_intel_driver(devices=None):
+    """Check if Intel GPU driver is loaded."""
+    # The sysfs scan already knows the bound kernel driver; only fall back to
+    # sampling intel_gpu_top when it does not.
+    for device in devices or []:
+        if device.get("vendor_id") == "8086" and device.get("driver") in ("i915", "xe"):
+            return {"available": True, "driver": device["driver"]}
+
+    result = run_command(["timeout", "5", "intel_gpu_top", "-l", "1"], timeout=10)
+    if result is not None and result.returncode == 0:
+        return {"available": True}
+    
+    # Check for i915 module
+    if os.path.exists("/sys/class/drm/card0/device/driver"):
+        driver_link = os.readlink("/sys/class/drm/card0/device/driver")
+        if "i915" in driver_link:
+            return {"available": True, "driver": "i915"}
+    
+    return {"available": False}
+
+def check_egpu_hot_swap():
+    """Check for eGPU hot-swap capability via Thunderbolt/USB4."""
+    egpu_info = {
+        "thunderbolt_detected": False,
+        "usb4_detected": False,
+        "oculink_detected": False,
+        "hot_swap_capable": False,
+        "connected_devices": []
+    }
+    
+    # Check Thunderbolt
+    bolt = boltctl_list()
+    if bolt and bolt.strip():
+        egpu_info["thunderbolt_detected"] = True
+        egpu_info["hot_swap_capable"] = True
+        # Parse connected devices
+        for line in bolt.splitlines():
+            if line.strip():
+                egpu_info["connected_devices"].append({
+                    "type": "thunderbolt",
+                    "info": line.strip()
+                })
+    
+    # Check USB4 (via Thunderbolt system)
+    # USB4 devices appear in thunderbolt list
+    result = run_command(["lssysfs", "list"], timeout=5)
+    if result is not None and result.returncode == 0:
+        egpu_info["usb4_detected"] = True
+    
+    # Check OCuLink (PCIe hot-plug)
+    try:
+        # Check if pciehp is available
+        if os.path.exists("/sys/bus/pci/hotplug"):
+            egpu_info["oculink_detected"] = True
+            egpu_info["hot_swap_capable"] = True
+    except Exception:
+        pass
+    
+    # Check for recently added GPU devices (hot-swap detection)
+    try:
+        # Check dmesg for recent GPU additions
+        result = run_command(["dmesg"], timeout=5)
+        if result is not None and result.returncode == 0:
+            recent_gpus = []
+            for line in result.stdout.splitlines():
+                if any(x in line.lower() for x in ["gpu added", "nvidia", "radeon", "intel"]):
+                    if "hotplug" in line.lower() or "hot-add" in line.lower():
+                        recent_gpus.append(line.strip()[:100])
+            if recent_gpus:
+                egpu_info["recent_hot_adds"] = recent_gpus[-5:]  # Last 5
+    except Exception:
+        pass
+    
+    return egpu_info
+
+def check_dp_alt_mode():
+    """Check DisplayPort Alt Mode via USB-C."""
+    dp_info = {
+        "usb_c_ports": [],
+        "dp_alt_mode_available": False,
+        "connected_displays": [],
+        "thunderbolt_ports": [],
+        "usb4_ports": []
+    }
+    
+    # Check for USB-C ports with DP capability
+    result = run_command(["lsusb", "-t"], timeout=5)
+    if result is not None and result.returncode == 0:
+        for line in result.stdout.splitlines():
+            if "DP" in line or "DisplayPort" in line:
+                dp_info["dp_alt_mode_available"] = True
+                dp_info["connected_displays"].append(line.strip())
+    
+    # Check via sysfs for DP capable USB-C
+    try:
+        for port in os.listdir("/sys/bus/usb/devices"):
+            if "usb" in port:
+                # Check for downstream ports with display capability
+                path = f"/sys/bus/usb/devices/{port}/power/control"
+                if os.path.exists(path):
+                    dp_info["usb_c_ports"].append(port)
+    except Exception:
+        pass
+    
+    # Check Thunderbolt ports
+    bolt = boltctl_list()
+    if bolt and bolt.strip():
+        dp_info["thunderbolt_ports"] = [line.strip() for line in bolt.splitlines() if line.strip()]
+    
+    # Check USB4 ports via sysfs
+    try:
+        if os.path.exists("/sys/bus/thunderbolt"):
+            dp_info["usb4_ports"] = [d for d in os.listdir("/sys/bus/thunderbolt/devices") if d]
+    except Exception:
+        pass
+    
+    # Check connected displays via wayland/X
+    if os.environ.get("WAYLAND_DISPLAY") or os.environ.get("DISPLAY"):
+        result = run_command(["wlr-randr"], timeout=5)
+        if result is not None and result.returncode == 0:
+            for line in result.stdout.splitlines():
+                if line.strip():
+                    dp_info["connected_displays"].append(line.strip()[:80])
+    
+    return dp_info
+
+def check_rdma_support():
+    """Check RDMA (Remote Direct Memory Access) support."""
+    rdma_info = {
+        "rdma_available": False,
+        "rdma_devices": [],
+        "ib_devices": [],
+        "rdma_modules_loaded": [],
+        "roce_supported": False,
+        "iwarp_supported": False
+    }
+    
+    # Check for RDMA devices
+    try:
+        if os.path.exists("/sys/class/infiniband"):
+            rdma_info["rdma_available"] = True
+            rdma_info["ib_devices"] = [d for d in os.listdir("/sys/class/infiniband") if d]
+    except Exception:
+        pass
+    
+    # Check RDMA kernel modules
+    rdma_modules = ["ib_core", "ib_uverbs", "rdma_cm", "mlx5_ib", "i40iw", "bnxt_re"]
+    try:
+        with open("/proc/modules", "r") as f:
+            loaded = [line.split()[0] for line in f]
+            rdma_info["rdma_modules_loaded"] = [m for m in rdma_modules if m in loaded]
+    except Exception:
+        pass
+    
+    # Check RoCE (RDMA over Converged Ethernet)
+    try:
+        if os.path.exists("/sys/class/net"):
+            for net in os.listdir("/sys/class/net"):
+                roce_path = f"/sys/class/net/{net}/device/rdma_roce_state"
+                if os.path.exists(roce_path):
+                    rdma_info["roce_supported"] = True
+                    break
+    except Exception:
+        pass
+    
+    # Check iWARP
+    result = run_command(["rdma", "link"], timeout=5)
+    if result is not None and result.returncode == 0 and result.stdout:
+        rdma_info["rdma_devices"] = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    
+    return rdma_info
+
+def check_egpu_rdma_integration(egpu=None, rdma=None):
+    """Check eGPU + RDMA integration capability (reuses probe results if given)."""
+    integration = {
+        "egpu_rdma_capable": False,
+        "thunderbolt_rdma": False,
+        "pcie_rdma": False,
+        "bandwidth_gbps": 0,
+        "notes": []
+    }
+    
+    egpu = egpu if egpu is not None else check_egpu_hot_swap()
+    rdma = rdma if rdma is not None else check_rdma_support()
+    
+    # Check for Thunderbolt + RDMA (via Thunderbolt to PCIe)
+    if egpu["thunderbolt_detected"] and rdma["rdma_available"]:
+        integration["thunderbolt_rdma"] = True
+        integration["egpu_rdma_capable"] = True
+        integration["notes"].append("Thunderbolt eGPU with RDMA detected")
+        integration["bandwidth_gbps"] = 40  # Thunderbolt 3/4
+    
+    # Check for direct PCIe + RDMA
+    if not egpu["thunderbolt_detected"] and rdma["rdma_available"]:
+        integration["pcie_rdma"] = True
+        integration["egpu_rdma_capable"] = True
+        integration["notes"].append("Direct PCIe GPU with RDMA detected")
+        integration["bandwidth_gbps"] = 32  # PCIe 3.0 x16
+    
+    return integration
+
+def check_podman_gpu():
+    """Check GPU support in Podman."""
+    result = run_command(["podman", "info", "--format", "json"], timeout=10)
+    if result is None or result.returncode != 0:
+        return {"available": False}
+    try:
+        info = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return {"available": False}
+    has_nvidia = "nvidia" in result.stdout.lower()
+    has_fuse = "fuse" in result.stdout.lower() or "fuse3" in result.stdout.lower()
+    return {
+        "available": True,
+        "nvidia_support": has_nvidia,
+        "fuse_support": has_fuse,
+        "version": info.get("version", {}).get("version", "unknown")
+    }
+
+def check_docker_gpu():
+    """Check GPU support in Docker."""
+    result = run_command(["docker", "info", "--format", "json"], timeout=10)
+    if result is None or result.returncode != 0:
+        return {"available": False}
+    try:
+        info = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return {"available": False}
+    return {
+        "available": True,
+        "nvidia_support": "nvidia" in result.stdout.lower(),
+        "version": info.get("ServerVersion", "unknown")
+    }
+
+def list_gpu_device_nodes():
+    """GPU device nodes directly under /dev."""
+    gpu_devices = []
+    for dev in os.listdir("/dev"):
+        if dev.startswith(("nvidia", " render", "card")):
+            gpu_devices.append(f"/dev/{dev}")
+    return gpu_devices
+
+def check_container_runtime_gpu(podman=None, docker=None):
+    """Check GPU support in container runtimes (reuses probe results if given)."""
+    return {
+        "podman": podman if podman is not None else check_podman_gpu(),
+        "docker": docker if docker is not None else check_docker_gpu(),
+        "device_nodes": list_gpu_device_nodes(),
+    }
+
+# Results used for probes that did not finish before the deadline.
+PROBE_FALLBACKS = {
+    "nvidia": {"available": False, "driver_version": None, "cuda_version": None},
+    "amdgpu": {"available": False, "driver_version": None},
+    "intel": {"available": False},
+    "podman": {"available": False},
+    "docker": {"available": False},
+    "egpu": {
+        "thunderbolt_detected": False,
+        "usb4_detected": False,
+        "oculink_detected": False,
+        "hot_swap_capable": False,
+        "connected_devices": []
+    },
+    "dp_alt_mode": {
+        "usb_c_ports": [],
+        "dp_alt_mode_available": False,
+        "connected_displays": [],
+        "thunderbolt_ports": [],
+        "usb4_ports": []
+    },
+    "rdma": {
+        "rdma_available": False,
+        "rdma_devices": [],
+        "ib_devices": [],
+        "rdma_modules_loaded": [],
+        "roce_supported": False,
+        "iwarp_supported": False
+    },
+}
+
+def run_probes(probes, deadline=DEFAULT_DEADLINE):
+    """Run independent probes concurrently under one global deadline.
+
+    ``probes`` maps a name to a zero-argument callable. Every external command
+    is clamped to the remaining deadline; a probe that still has not finished
+    (or raised) is reported with its PROBE_FALLBACKS value and listed under
+    ``timed_out``.
+    """
+    set_deadline(deadline)
+    results = {}
+    timed_out = []
+    if not probes:
+        return results, timed_out
+    pool = ThreadPoolExecutor(max_workers=len(probes))
+    futures = {name: pool.submit(probe) for name, probe in probes.items()}
+    wait(futures.values(), timeout=remaining_time(deadline) if deadline else None)
+    for name, future in futures.items():
+        if future.done() and future.exception() is None:
+            results[name] = future.result()
+        else:
+            future.cancel()
+            timed_out.append(name)
+            results[name] = json.loads(json.dumps(PROBE_FALLBACKS.get(name, {})))
+    pool.shutdown(wait=False)
+    return results, timed_out
+
+def _listdir(path):
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return []
+
+def _tool_signature(name):
+    """Identify an installed CLI by path, mtime and size without running it."""
+    path = shutil.which(name)
+    if not path:
+        return f"{name}:absent"
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{name}:absent"
+    return f"{path}:{st.st_mtime_ns}:{st.st_size}"
+
+def discovery_fingerprint():
+    """Cheap fingerprint of everything the cached probes depend on.
+
+    Covers PCI devices, hot-plug slot occupancy (OCuLink/PCIe), Thunderbolt/USB4
+    devices (eGPU enclosures), loaded kernel modules, the GPU driver module
+    versions and the nvidia-smi/rocm-smi binaries. No external command is run.
+    """
+    digest = hashlib.sha256()
+
+    def add(label, value):
+        digest.update(f"{label}={value}\n".encode())
+
+    add("pci", ",".join(_listdir(SYSFS_PCI_DEVICES)))
+    for slot in _listdir(SYSFS_PCI_SLOTS):
+        add(f"slot:{slot}", read_sysfs(os.path.join(SYSFS_PCI_SLOTS, slot, "adapter")))
+    add("thunderbolt", ",".join(_listdir(SYSFS_THUNDERBOLT_DEVICES)))
+    try:
+        with open("/proc/modules", "r") as f:
+            add("modules", ",".join(sorted(line.split(" ", 1)[0] for line in f)))
+    except OSError:
+        add("modules", "")
+    for module in ("nvidia", "amdgpu", "i915", "xe"):
+        add(f"module:{module}", read_sysfs(f"/sys/module/{module}/version"))
+    for tool in ("nvidia-smi", "rocm-smi"):
+        add("tool", _tool_signature(tool))
+    return digest.hexdigest()
+
+def load_cache(path, fingerprint, ttl):
+    """Return the cache document if fresh and the fingerprint still matches."""
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != CACHE_VERSION
+        or data.get("fingerprint") != fingerprint
+        or time.time() - data.get("created", 0) > ttl
+        or not isinstance(data.get("probes"), dict)
+    ):
+        return None
+    return data
+
+def save_cache(path, fingerprint, probes, created=None):
+    """Atomically persist probe results; silently skipped if not writable."""
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o755, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".gpu_discovery.")
+        with os.fdopen(fd, "w") as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "fingerprint": fingerprint,
+                "created": created or time.time(),
+                "probes": probes,
+            }, f)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def validate_vendor_configuration(configured_vendor, detected_vendors):
+    """Compare configured vendor against detected hardware."""
+    if not configured_vendor or configured_vendor == "generic":
+        return {
+            "valid": True,
+            "warning": "No specific vendor configured, using auto-detection"
+        }
+    
+    # Handle list of vendors
+    if isinstance(configured_vendor, list):
+        configured = configured_vendor
+    else:
+        configured = [configured_vendor]
+    
+    # Check if any configured vendor matches detected
+    matches = [v for v in configured if v in detected_vendors]
+    
+    if matches:
+        return {
+            "valid": True,
+            "matches": matches,
+            "message": f"Configuration matches detected hardware: {matches}"
+        }
+    else:
+        return {
+            "valid": False,
+            "configured": configured,
+            "detected": detected_vendors,
+            "warning": f"Mismatch: configured {configured} but detected {detected_vendors}"
+        }
+
+# Result subsets; "pci" (device inventory, vendor detection) is always gathered.
+SUBSETS = ("pci", "drivers", "container_runtime", "egpu", "dp_alt_mode", "rdma")
+DEFAULT_SUBSETS = ("pci", "drivers")
+
+def discover(subsets=DEFAULT_SUBSETS, configured_vendor=None, deadline=DEFAULT_DEADLINE,
+             use_lspci=False, cache_file=DEFAULT_CACHE_FILE, cache_ttl=DEFAULT_CACHE_TTL,
+             refresh=False, use_cache=True):
+    """Build the GPU discovery document for the requested subsets.
+
+    "all" selects every subset. The eGPU+RDMA integration summary is added
+    when both "egpu" and "rdma" are gathered.
+    """
+    subsets = set(SUBSETS if "all" in subsets else subsets) | {"pci"}
+    unknown = subsets - set(SUBSETS)
+    if unknown:
+        raise ValueError(f"Unknown GPU discovery subset(s): {', '.join(sorted(unknown))}")
+
+    devices = discover_devices(use_lspci=use_lspci)
+    
+    vendor_list = sorted(list(set(d["vendor_name"] for d in devices)))
+    
+    if not vendor_list:
+        vendor_list = ["generic"]
+    elif "unknown" in vendor_list and len(vendor_list) > 1:
+        vendor_list.remove("unknown")
+    
+    # Primary vendor logic
+    primary = "generic"
+    for v in ["nvidia", "amd", "intel"]:
+        if v in vendor_list:
+            primary = v
+            break
+    
+    probes = {}
+    if "drivers" in subsets:
+        probes["nvidia"] = check_nvidia_driver
+        probes["amdgpu"] = check_amdgpu_driver
+        probes["intel"] = lambda: check_intel_driver(devices)
+    if "container_runtime" in subsets:
+        probes["podman"] = check_podman_gpu
+        probes["docker"] = check_docker_gpu
+    if "egpu" in subsets:
+        probes["egpu"] = check_egpu_hot_swap
+    if "dp_alt_mode" in subsets:
+        probes["dp_alt_mode"] = check_dp_alt_mode
+    if "rdma" in subsets:
+        probes["rdma"] = check_rdma_support
+
+    # Only probes missing from a valid cache entry are run.
+    fingerprint = discovery_fingerprint()
+    cache_doc = None
+    if use_cache and not refresh:
+        cache_doc = load_cache(cache_file, fingerprint, cache_ttl)
+    cached_probes = cache_doc["probes"] if cache_doc else {}
+    cached = {name: value for name, value in cached_probes.items() if name in probes}
+    probe_results, timed_out = run_probes(
+        {name: probe for name, probe in probes.items() if name not in cached}, deadline
+    )
+    fresh = {name: value for name, value in probe_results.items() if name not in timed_out}
+    probe_results.update(cached)
+    if fresh and use_cache:
+        # Deadline fallbacks are never cached; merged entries keep the
+        # original creation time so the TTL still bounds their age.
+        save_cache(cache_file, fingerprint, {**cached_probes, **fresh},
+                   created=cache_doc["created"] if cache_doc else None)
+    
+    result = {
+        "gathered_subsets": [name for name in SUBSETS if name in subsets],
+        "detected_devices": devices,
+        "detected_vendor_list": vendor_list,
+        "primary_detected_vendor": primary,
+        "gpu_count": len(devices),
+        "is_multi_gpu": len(devices) > 1,
+        "is_multi_vendor": len(vendor_list) > 1,
+    }
+    if "drivers" in subsets:
+        result["drivers"] = {
+            "nvidia": probe_results["nvidia"],
+            "amdgpu": probe_results["amdgpu"],
+            "intel": probe_results["intel"]
+        }
+    if "container_runtime" in subsets:
+        result["container_runtime"] = check_container_runtime_gpu(probe_results["podman"], probe_results["docker"])
+    for name in ("egpu", "dp_alt_mode", "rdma"):
+        if name in subsets:
+            result[name] = probe_results[name]
+    if "egpu" in subsets and "rdma" in subsets:
+        result["egpu_rdma_integration"] = check_egpu_rdma_integration(probe_results["egpu"], probe_results["rdma"])
+
+    if timed_out:
+        result["probes_timed_out"] = sorted(timed_out)
+    if not use_cache:
+        cache_status = "disabled"
+    elif refresh:
+        cache_status = "refresh"
+    elif cached:
+        cache_status = "hit" if len(cached) == len(probes) else "partial"
+    else:
+        cache_status = "miss" if probes else "unused"
+    result["discovery_cache"] = {"status": cache_status, "fingerprint": fingerprint}
+    
+    # Vendor validation if requested
+    if configured_vendor:
+        result["vendor_validation"] = validate_vendor_configuration(configured_vendor, vendor_list)
+    
+    # Enhanced multi-GPU reporting
+    if len(devices) > 1:
+        result["multi_gpu_details"] = {
+            "total_devices": len(devices),
+            "by_vendor": {},
+            "identical_cards": len(set(d["model"] for d in devices)) == 1,
+            "pci_slots": [d["pci_id"] for d in devices]
+        }
+        
+        # Group by vendor
+        for d in devices:
+            vendor = d["vendor_name"]
+            if vendor not in result["multi_gpu_details"]["by_vendor"]:
+                result["multi_gpu_details"]["by_vendor"][vendor] = []
+            result["multi_gpu_details"]["by_vendor"][vendor].append(d["model"])
+
+    return result
@@ -3,54 +3,127 @@
 # Audit Event Identifier: DSU-PYS-500004
 # Script Type: Benchmark Aggregation
 # Description: Runs benchmarks N times and calculates statistics
-# Output: JSON and Markdown with Mean, Median, Min, Max, StdDev
+# Output: JSON and Markdown with Mean, Median, Min, Max, StdDev, resource usage
 # Last Updated: 2026-02-28
 # Version: 1.0
 # =============================================================================
 """benchmark_aggregator.py - Run benchmarks $N$ times and calculate statistics.
 
-Calculates Mean, Median, Min, Max, and Standard Deviation.
-Outputs results in JSON and Markdown.
+Calculates Mean, Median, Min, Max, Standard Deviation and p95/p99.
+Iterations can run concurrently (--parallel K) for benchmarks that tolerate it,
+and --target-ci stops sampling early once the mean is known precisely enough.
+Each iteration also records the child's CPU time, peak RSS, context switches
+and block I/O (from wait4), so runtime comparisons show where overhead goes.
+Outputs results in JSON and Markdown and records the raw samples in the
+baseline history (see benchmark_baseline.py).
+
+Compare the latest run against its baseline with:
+    benchmark_aggregator.py compare --name <name>
 """
 
 import argparse
 import json
+import os
 import statistics
 import subprocess
 import sys
+import tempfile
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Deque, Dict, List, Optional
+
+from benchmark_engine import ENGINES, EngineError, StorageProfile, parse_profiles, run_engine
+from benchmark_baseline import (
+    EXECUTION_TIME,
+    BaselineStore,
+    compare_runs,
+    mean_ci_relative_width,
+    percentile,
+)
+
+DEFAULT_OUTPUT_DIR = "/var/lib/deploy-system/evidence/benchmark/baselines"
+STDERR_TAIL_LINES = 20
+MAX_RECORDED_FAILURES = 5
+RUSAGE_PREFIX = "rusage."
+
+
+def rusage_metrics(*usages: Any) -> Dict[str, float]:
+    """Per-iteration resource usage of the benchmarked child process(es).
+
+    Counters are summed across children; peak RSS is the largest single peak.
+    """
+    return {
+        "cpu_user_s": sum(u.ru_utime for u in usages),
+        "cpu_system_s": sum(u.ru_stime for u in usages),
+        "max_rss_kb": float(max((u.ru_maxrss for u in usages), default=0)),
+        "ctx_switches_voluntary": float(sum(u.ru_nvcsw for u in usages)),
+        "ctx_switches_involuntary": float(sum(u.ru_nivcsw for u in usages)),
+        "block_in_ops": float(sum(u.ru_inblock for u in usages)),
+        "block_out_ops": float(sum(u.ru_oublock for u in usages)),
+    }
+
+
+def _drain_tail(stream: IO[str], tail: Deque[str]) -> None:
+    """Consume a pipe line by line, keeping only the last ``tail.maxlen`` lines."""
+    for line in stream:
+        tail.append(line)
+    stream.close()
+
+
+def _parse_json_output(output: str) -> Optional[Any]:
+    """Parse the whole stdout as JSON, falling back to its last JSON line."""
+    try:
+        return json.loads(output)
+    except json.JSONDecodeError:
+        pass
+    for line in reversed(output.splitlines()):
+        line = line.strip()
+        if line.startswith("{"):
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                return None
+    return None
 
 
 def run_benchmark(command: List[str], cwd: Optional[Path] = None) -> Dict[str, Any]:
-    """Runs a single iteration of the benchmark."""
+    """Runs a single iteration of the benchmark.
+
+    Stdout is spooled to a temporary file instead of being held in memory
+    while the child runs, then parsed in full once it exits; stderr is
+    streamed and only a short tail is kept for diagnostics.
+    """
     start_time = time.perf_counter()
     try:
-        # Run the command and capture output
-        result = subprocess.run(
-            command,
-            cwd=str(cwd) if cwd else None,
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        end_time = time.perf_counter()
-        
-        # Try to parse the output as JSON if it looks like JSON
-        output_json = None
-        try:
-            output_json = json.loads(result.stdout)
-        except json.JSONDecodeError:
-            pass
+        with tempfile.TemporaryFile(mode="w+") as stdout:
+            proc = subprocess.Popen(
+                command,
+                cwd=str(cwd) if cwd else None,
+                stdin=subprocess.DEVNULL,
+                stdout=stdout,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+            _drain_tail(proc.stderr, stderr_tail)
+            # wait4 reaps the child and returns its own rusage (plus any
+            # descendants it waited for), so concurrent iterations do not bleed
+            # into each other the way RUSAGE_CHILDREN deltas would.
+            _, status, usage = os.wait4(proc.pid, 0)
+            end_time = time.perf_counter()
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            stdout.seek(0)
+            json_data = _parse_json_output(stdout.read())
 
         return {
             "duration": end_time - start_time,
-            "return_code": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "json_data": output_json
+            "return_code": proc.returncode,
+            "stderr_tail": "".join(stderr_tail),
+            "json_data": json_data,
+            "resources": rusage_metrics(usage)
         }
     except Exception as e:
         return {
@@ -60,6 +133,50 @@ def run_benchmark(command: List[str], cwd: Optional[Path] = None) -> Dict[str, A
         }
 
 
+def run_engine_benchmark(engine: str, prefix: List[str], target: Optional[str],
+                         profiles: Optional[List[StorageProfile]], runtime: int) -> Dict[str, Any]:
+    """Runs a single iteration through benchmark_engine, without a shell in between."""
+    start_time = time.perf_counter()
+    try:
+        sample = run_engine(engine, target=target, prefix=prefix, profiles=profiles, runtime=runtime)
+    except (EngineError, OSError) as e:
+        return {
+            "error": str(e),
+            "duration": time.perf_counter() - start_time,
+            "return_code": 1
+        }
+    return {
+        "duration": time.perf_counter() - start_time,
+        "return_code": 0,
+        "json_data": sample.metrics,
+        "resources": rusage_metrics(*sample.rusage)
+    }
+
+
+def collect_metrics(
+    res: Dict[str, Any],
+    durations: List[float],
+    custom_metrics: Dict[str, List[float]],
+    resource_metrics: Dict[str, List[float]],
+) -> None:
+    """Fold one iteration's wall time, resource usage and JSON metrics into the samples."""
+    if res.get("return_code") == 0:
+        durations.append(res["duration"])
+        for key, value in res.get("resources", {}).items():
+            resource_metrics.setdefault(key, []).append(value)
+    if res.get("json_data") and isinstance(res["json_data"], dict):
+        for key, value in res["json_data"].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                custom_metrics.setdefault(key, []).append(float(value))
+
+
+def has_converged(samples: Dict[str, List[float]], target: float, min_samples: int) -> bool:
+    """True once every metric's 95% CI of the mean is narrower than ``target`` (relative)."""
+    if not samples or any(len(values) < min_samples for values in samples.values()):
+        return False
+    return all(mean_ci_relative_width(values) <= target for values in samples.values())
+
+
 def calculate_stats(data: List[float]) -> Dict[str, float]:
     """Calculates statistical metrics for a list of data points."""
     if not data:
@@ -71,19 +188,142 @@ def calculate_stats(data: List[float]) -> Dict[str, float]:
         "max": max(data),
         "mean": statistics.mean(data),
         "median": statistics.median(data),
-        "stdev": statistics.stdev(data) if len(data) > 1 else 0.0
+        "stdev": statistics.stdev(data) if len(data) > 1 else 0.0,
+        "p95": percentile(data, 95),
+        "p99": percentile(data, 99)
     }
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Benchmark Aggregator")
-    parser.add_argument("command", help="Command to benchmark (as a single string)", nargs="+")
-    parser.add_argument("--iterations", "-n", type=int, default=5, help="Number of iterations")
+def format_comparison(name: str, baseline_ts: str, candidate_ts: str, rows: List[Dict[str, Any]]) -> str:
+    """Render a comparison as a Markdown table."""
+    lines = [
+        f"# Benchmark comparison for: {name}",
+        f"- **Baseline**: {baseline_ts}",
+        f"- **Candidate**: {candidate_ts}",
+        "",
+        "| Metric | Baseline p50 | Candidate p50 | Candidate p95 | Candidate p99 | Candidate mean 95% CI | Change | p-value | Verdict |",
+        "| :--- | ---: | ---: | ---: | ---: | :--- | ---: | ---: | :--- |",
+    ]
+    for row in rows:
+        cand = row["candidate"]
+        low, high = cand["mean_ci95"]
+        if row["regression"]:
+            verdict = "REGRESSION"
+        elif row["improvement"]:
+            verdict = "improvement"
+        else:
+            verdict = "no change"
+        lines.append(
+            f"| {row['metric']} | {row['baseline']['p50']:.4f} | {cand['p50']:.4f} | {cand['p95']:.4f} "
+            f"| {cand['p99']:.4f} | [{low:.4f}, {high:.4f}] | {row['median_change_pct']:+.2f}% "
+            f"| {row['p_value']:.4f} | {verdict} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def compare_main(argv: List[str]) -> int:
+    """Compare a stored run against its baseline; exit 1 on a significant regression."""
+    parser = argparse.ArgumentParser(
+        prog="benchmark_aggregator.py compare",
+        description="Compare a benchmark run against the stored baseline",
+    )
+    parser.add_argument("--name", required=True, help="Benchmark run name to compare")
+    parser.add_argument("--output-dir", "-o", default=DEFAULT_OUTPUT_DIR, help="Directory holding the baseline history")
+    parser.add_argument("--candidate", help="Candidate run timestamp (default: latest run)")
+    parser.add_argument("--baseline", help="Baseline run timestamp (default: latest flagged baseline, else the previous run)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level for the Mann-Whitney U test")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Minimum median change in percent to count as a regression")
+    parser.add_argument("--promote", action="store_true", help="Flag the candidate as the new baseline when it does not regress")
+    args = parser.parse_args(argv)
+
+    output_dir = Path(args.output_dir)
+    with BaselineStore.for_output_dir(output_dir) as store:
+        candidate = store.find_run(args.name, args.candidate)
+        if candidate is None:
+            print(f"[!] No stored run for '{args.name}'", file=sys.stderr)
+            return 2
+        if args.baseline:
+            baseline = store.find_run(args.name, args.baseline)
+        else:
+            baseline = store.find_baseline(args.name, candidate["timestamp"])
+        if baseline is None:
+            print(f"[!] No baseline run for '{args.name}' before {candidate['timestamp']}", file=sys.stderr)
+            return 2
+
+        rows = compare_runs(
+            store.samples(baseline["id"]),
+            store.samples(candidate["id"]),
+            alpha=args.alpha,
+            threshold_pct=args.threshold,
+        )
+        regressions = [row["metric"] for row in rows if row["regression"]]
+        if args.promote and not regressions:
+            store.set_baseline(candidate["id"])
+
+    report = format_comparison(args.name, baseline["timestamp"], candidate["timestamp"], rows)
+    stem = f"{args.name}_{candidate['timestamp']}_vs_{baseline['timestamp']}"
+    (output_dir / f"{stem}.compare.json").write_text(json.dumps({
+        "run_name": args.name,
+        "baseline": baseline["timestamp"],
+        "candidate": candidate["timestamp"],
+        "alpha": args.alpha,
+        "threshold_pct": args.threshold,
+        "regressions": regressions,
+        "metrics": rows,
+    }, indent=2))
+    (output_dir / f"{stem}.compare.md").write_text(report)
+    print(report)
+
+    if regressions:
+        print(f"[!] Significant regression in: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "compare":
+        return compare_main(argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark Aggregator",
+        epilog="Use 'benchmark_aggregator.py compare --name NAME' to test a run against its baseline.",
+    )
+    parser.add_argument("command", help="Command to benchmark; with --engine, an optional exec prefix (e.g. podman exec NAME)", nargs="*")
+    parser.add_argument("--iterations", "-n", type=int, default=5, help="Number of iterations (maximum with --target-ci)")
     parser.add_argument("--warmup", "-w", type=int, default=1, help="Number of warmup iterations")
-    parser.add_argument("--output-dir", "-o", default="/var/lib/deploy-system/evidence/benchmark/baselines", help="Output directory")
+    parser.add_argument("--output-dir", "-o", default=DEFAULT_OUTPUT_DIR, help="Output directory")
     parser.add_argument("--name", help="Name for this benchmark run", default="benchmark")
+    parser.add_argument("--set-baseline", action="store_true", help="Flag this run as the baseline for future comparisons")
+    parser.add_argument("--parallel", "-p", type=int, default=1, help="Run up to K iterations concurrently (only for benchmarks that tolerate concurrency)")
+    parser.add_argument("--target-ci", type=float, default=None,
+                        help="Adaptive mode: stop once the 95%% CI of every metric's mean is narrower than this fraction of the mean (e.g. 0.02)")
+    parser.add_argument("--min-iterations", type=int, default=10, help="Minimum iterations before --target-ci may stop sampling")
+    parser.add_argument("--engine", choices=ENGINES, help="Run the native storage/network engine in-process instead of a command")
+    parser.add_argument("--target", help="Engine target directory (storage) or host (network)")
+    parser.add_argument("--profiles", default="", help="Storage engine profiles as rw:bs:iodepth[:rwmixread],...")
+    parser.add_argument("--engine-runtime", type=int, default=5, help="Seconds per fio job / iperf3 run in engine mode")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+    if not args.engine and not args.command:
+        parser.error("a command is required unless --engine is given")
+
+    if args.engine:
+        try:
+            profiles = parse_profiles(args.profiles) if args.profiles else None
+        except ValueError as e:
+            parser.error(str(e))
+
+        def iteration() -> Dict[str, Any]:
+            return run_engine_benchmark(args.engine, args.command, args.target, profiles, args.engine_runtime)
+        description = f"{args.engine} engine" + (f" via {' '.join(args.command)}" if args.command else "")
+    else:
+
+        def iteration() -> Dict[str, Any]:
+            return run_benchmark(args.command)
+        description = " ".join(args.command)
     
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -91,45 +331,60 @@ def main():
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
     run_name = f"{args.name}_{timestamp}"
     
-    print(f"[*] Starting benchmark aggregation for: {' '.join(args.command)}")
+    print(f"[*] Starting benchmark aggregation for: {description}")
     print(f"[*] Warmup: {args.warmup} iterations")
-    print(f"[*] Benchmark: {args.iterations} iterations")
+    print(f"[*] Benchmark: {args.iterations} iterations (parallel: {args.parallel})")
+    if args.target_ci:
+        print(f"[*] Adaptive: stop at 95% CI width <= {args.target_ci:.1%} of mean (min {args.min_iterations} iterations)")
     
     # Warmup
     for i in range(args.warmup):
         print(f"  [Warmup {i+1}/{args.warmup}] Running...", end="\r")
-        run_benchmark(args.command)
+        iteration()
     print("\n  [Warmup] Complete")
     
-    # Actual Benchmark
-    results = []
-    durations = []
-    
-    for i in range(args.iterations):
-        print(f"  [Run {i+1}/{args.iterations}] Running...", end="\r")
-        res = run_benchmark(args.command)
-        results.append(res)
-        if res.get("return_code") == 0:
-            durations.append(res["duration"])
-    print("\n  [Runs] Complete")
-    
-    # Aggregate custom metrics if the script outputs JSON
+    # Actual Benchmark: run in batches of --parallel, checking convergence between batches
+    durations: List[float] = []
     custom_metrics: Dict[str, List[float]] = {}
-    for res in results:
-        if res.get("json_data") and isinstance(res["json_data"], dict):
-            for key, value in res["json_data"].items():
-                if isinstance(value, (int, float)):
-                    if key not in custom_metrics:
-                        custom_metrics[key] = []
-                    custom_metrics[key].append(float(value))
+    resource_metrics: Dict[str, List[float]] = {}
+    failures: List[Dict[str, Any]] = []
+    completed = 0
+    converged = False
 
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        while completed < args.iterations and not converged:
+            batch = min(args.parallel, args.iterations - completed)
+            print(f"  [Run {completed + 1}-{completed + batch}/{args.iterations}] Running...", end="\r")
+            for res in executor.map(lambda _: iteration(), range(batch)):
+                completed += 1
+                collect_metrics(res, durations, custom_metrics, resource_metrics)
+                if res.get("return_code") != 0 and len(failures) < MAX_RECORDED_FAILURES:
+                    failures.append({
+                        "iteration": completed,
+                        "return_code": res.get("return_code"),
+                        "stderr_tail": res.get("stderr_tail") or res.get("error", "")
+                    })
+            if args.target_ci:
+                converged = has_converged(
+                    {EXECUTION_TIME: durations, **custom_metrics}, args.target_ci, args.min_iterations
+                )
+    print(f"\n  [Runs] Complete ({completed} iterations{', converged' if converged else ''})")
+    
     stats_data = {
         "run_name": args.name,
         "timestamp": timestamp,
         "command": args.command,
-        "iterations": args.iterations,
+        "engine": args.engine,
+        "iterations": completed,
+        "requested_iterations": args.iterations,
+        "parallel": args.parallel,
+        "target_ci": args.target_ci,
+        "converged": converged,
         "warmup": args.warmup,
+        "failed_iterations": completed - len(durations),
+        "failures": failures,
         "execution_time_stats": calculate_stats(durations),
+        "resource_stats": {k: calculate_stats(v) for k, v in resource_metrics.items()},
         "custom_metrics_stats": {k: calculate_stats(v) for k, v in custom_metrics.items()}
     }
 
@@ -142,8 +397,9 @@ def main():
     md_content = [
         f"# Benchmark results for: {args.name}",
         f"- **Timestamp**: {timestamp}",
-        f"- **Command**: `{' '.join(args.command)}`",
-        f"- **Iterations**: {args.iterations} (Warmup: {args.warmup})",
+        f"- **Command**: `{description}`",
+        f"- **Iterations**: {completed} of {args.iterations} (Warmup: {args.warmup}, Parallel: {args.parallel}"
+        + (f", converged at {args.target_ci:.1%} CI" if converged else "") + ")",
         "",
         "## Execution Time Statistics (seconds)",
         "| Metric | Value |",
@@ -153,9 +409,23 @@ def main():
         f"| Min | {stats_data['execution_time_stats'].get('min', 0):.4f} |",
         f"| Max | {stats_data['execution_time_stats'].get('max', 0):.4f} |",
         f"| StdDev | {stats_data['execution_time_stats'].get('stdev', 0):.4f} |",
+        f"| p95 | {stats_data['execution_time_stats'].get('p95', 0):.4f} |",
+        f"| p99 | {stats_data['execution_time_stats'].get('p99', 0):.4f} |",
         ""
     ]
     
+    if resource_metrics:
+        md_content.extend([
+            "## Resource Usage Statistics (per iteration)",
+            "| Resource | Mean | Median | p95 | Max |",
+            "| :--- | :--- | :--- | :--- | :--- |",
+        ])
+        for key, stats in stats_data["resource_stats"].items():
+            md_content.append(
+                f"| {key} | {stats['mean']:.4f} | {stats['median']:.4f} | {stats['p95']:.4f} | {stats['max']:.4f} |"
+            )
+        md_content.append("")
+
     if custom_metrics:
         md_content.append("## Custom Metric Statistics")
         for key, stats in stats_data["custom_metrics_stats"].items():
@@ -168,14 +438,31 @@ def main():
                 f"| Min | {stats.get('min', 0):.4f} |",
                 f"| Max | {stats.get('max', 0):.4f} |",
                 f"| StdDev | {stats.get('stdev', 0):.4f} |",
+                f"| p95 | {stats.get('p95', 0):.4f} |",
+                f"| p99 | {stats.get('p99', 0):.4f} |",
                 ""
             ])
 
     md_file.write_text("\n".join(md_content))
+
+    with BaselineStore.for_output_dir(output_dir) as store:
+        store.record_run(
+            args.name,
+            timestamp,
+            [description],
+            {
+                **custom_metrics,
+                **{f"{RUSAGE_PREFIX}{k}": v for k, v in resource_metrics.items()},
+                EXECUTION_TIME: durations,
+            },
+            completed,
+            is_baseline=args.set_baseline,
+        )
     
     print(f"[*] Results saved to {output_dir}")
     print(f"[*] Summary: {md_file}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-PYS-500015
+# Script Type: Benchmark Baseline Store
+# Description: Stores benchmark samples and detects statistical regressions
+# Output: SQLite history and comparison reports
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""benchmark_baseline.py - Baseline history and regression testing for benchmarks.
+
+Every aggregator run records its raw samples (wall time plus the numeric
+metrics a benchmark prints as JSON) in an indexed SQLite history that lives in
+the evidence directory next to the per-run JSON/Markdown files. A candidate run
+is compared against a stored baseline with percentiles, bootstrap confidence
+intervals of the mean and a two-sided Mann-Whitney U test.
+"""
+
+import math
+import random
+import sqlite3
+import statistics
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+HISTORY_FILENAME = "benchmark_history.sqlite3"
+EXECUTION_TIME = "execution_time"
+
+# Custom metric names containing one of these are "higher is better"
+# (throughput style); everything else, including wall time, is "lower is better".
+HIGHER_IS_BETTER_HINTS = ("iops", "bw", "throughput", "mbps", "ops_per_sec", "bandwidth")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    command TEXT NOT NULL,
+    iterations INTEGER NOT NULL,
+    is_baseline INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (name, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_name ON runs (name, timestamp);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_run_metric ON samples (run_id, metric);
+"""
+
+
+def percentile(data: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (same definition as numpy's default)."""
+    if not data:
+        raise ValueError("percentile of empty data")
+    ordered = sorted(data)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def bootstrap_mean_ci(
+    data: Sequence[float],
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """Percentile bootstrap confidence interval of the mean.
+
+    A fixed seed keeps reports reproducible for the same samples.
+    """
+    if not data:
+        raise ValueError("confidence interval of empty data")
+    if len(data) == 1:
+        return data[0], data[0]
+    rng = random.Random(seed)
+    n = len(data)
+    means = sorted(sum(rng.choices(data, k=n)) / n for _ in range(resamples))
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    return percentile(means, tail), percentile(means, 100.0 - tail)
+
+
+def mean_ci_relative_width(data: Sequence[float], confidence: float = 0.95) -> float:
+    """Width of the normal-approximation CI of the mean, relative to the mean.
+
+    Cheap enough to evaluate after every batch in adaptive sampling; returns
+    ``inf`` while the width is undefined (fewer than two samples, zero mean).
+    """
+    if len(data) < 2:
+        return math.inf
+    mean = statistics.mean(data)
+    if mean == 0:
+        return math.inf
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    half_width = z * statistics.stdev(data) / math.sqrt(len(data))
+    return 2.0 * half_width / abs(mean)
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float]:
+    """Two-sided Mann-Whitney U test using the tie-corrected normal approximation.
+
+    Returns ``(U, p_value)`` where ``U`` is the statistic for sample ``a``.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        raise ValueError("Mann-Whitney U needs two non-empty samples")
+
+    pooled = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        average_rank = (i + j) / 2.0 + 1.0
+        for k in range(i, j + 1):
+            ranks[k] = average_rank
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+
+    rank_sum_a = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 0)
+    u_a = rank_sum_a - n1 * (n1 + 1) / 2.0
+
+    n = n1 + n2
+    mean_u = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u_a, 1.0
+    z = (abs(u_a - mean_u) - 0.5) / math.sqrt(variance)
+    p_value = math.erfc(max(z, 0.0) / math.sqrt(2.0))
+    return u_a, min(1.0, p_value)
+
+
+def higher_is_better(metric: str) -> bool:
+    if metric == EXECUTION_TIME:
+        return False
+    lowered = metric.lower()
+    return any(hint in lowered for hint in HIGHER_IS_BETTER_HINTS)
+
+
+class BaselineStore:
+    """SQLite-backed history of benchmark samples, keyed by run name."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def for_output_dir(cls, output_dir: Path) -> "BaselineStore":
+        return cls(Path(output_dir) / HISTORY_FILENAME)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "BaselineStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def record_run(
+        self,
+        name: str,
+        timestamp: str,
+        command: Sequence[str],
+        samples: Dict[str, Iterable[float]],
+        iterations: int,
+        is_baseline: bool = False,
+    ) -> int:
+        """Store one run's raw samples; returns the run id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR REPLACE INTO runs (name, timestamp, command, iterations, is_baseline) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, timestamp, " ".join(command), iterations, int(is_baseline)),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO samples (run_id, metric, value) VALUES (?, ?, ?)",
+                [(run_id, metric, float(v)) for metric, values in samples.items() for v in values],
+            )
+        return run_id
+
+    def set_baseline(self, run_id: int) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE runs SET is_baseline = 1 WHERE id = ?", (run_id,))
+
+    def find_run(self, name: str, timestamp: Optional[str] = None) -> Optional[sqlite3.Row]:
+        """Return the run with ``timestamp``, or the latest run for ``name``."""
+        if timestamp:
+            query = "SELECT * FROM runs WHERE name = ? AND timestamp = ?"
+            return self.conn.execute(query, (name, timestamp)).fetchone()
+        query = "SELECT * FROM runs WHERE name = ? ORDER BY timestamp DESC LIMIT 1"
+        return self.conn.execute(query, (name,)).fetchone()
+
+    def find_baseline(self, name: str, before: str) -> Optional[sqlite3.Row]:
+        """Latest run flagged as baseline before ``before``, else the previous run."""
+        row = self.conn.execute(
+            "SELECT * FROM runs WHERE name = ? AND is_baseline = 1 AND timestamp < ? "
+            "ORDER BY timestamp DESC LIMIT 1",
+            (name, before),
+        ).fetchone()
+        if row is not None:
+            return row
+        return self.conn.execute(
+            "SELECT * FROM runs WHERE name = ? AND timestamp < ? ORDER BY timestamp DESC LIMIT 1",
+            (name, before),
+        ).fetchone()
+
+    def samples(self, run_id: int) -> Dict[str, List[float]]:
+        data: Dict[str, List[float]] = {}
+        for row in self.conn.execute(
+            "SELECT metric, value FROM samples WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ):
+            data.setdefault(row["metric"], []).append(row["value"])
+        return data
+
+
+def compare_metric(
+    metric: str,
+    baseline: Sequence[float],
+    candidate: Sequence[float],
+    alpha: float = 0.05,
+    threshold_pct: float = 5.0,
+) -> Dict[str, Any]:
+    """Compare one metric's samples; a regression must be significant *and* material."""
+    _, p_value = mann_whitney_u(candidate, baseline)
+    base_median = statistics.median(baseline)
+    cand_median = statistics.median(candidate)
+    if base_median:
+        change_pct = (cand_median - base_median) / abs(base_median) * 100.0
+    else:
+        change_pct = 0.0 if cand_median == base_median else math.copysign(math.inf, cand_median)
+
+    better_high = higher_is_better(metric)
+    worse_pct = -change_pct if better_high else change_pct
+    significant = p_value < alpha
+    regression = significant and worse_pct > threshold_pct
+    improvement = significant and -worse_pct > threshold_pct
+
+    def describe(data: Sequence[float]) -> Dict[str, Any]:
+        low, high = bootstrap_mean_ci(data)
+        return {
+            "count": len(data),
+            "mean": statistics.mean(data),
+            "p50": percentile(data, 50),
+            "p95": percentile(data, 95),
+            "p99": percentile(data, 99),
+            "mean_ci95": [low, high],
+        }
+
+    return {
+        "metric": metric,
+        "higher_is_better": better_high,
+        "baseline": describe(baseline),
+        "candidate": describe(candidate),
+        "median_change_pct": change_pct,
+        "p_value": p_value,
+        "significant": significant,
+        "regression": regression,
+        "improvement": improvement,
+    }
+
+
+def compare_runs(
+    baseline: Dict[str, List[float]],
+    candidate: Dict[str, List[float]],
+    alpha: float = 0.05,
+    threshold_pct: float = 5.0,
+) -> List[Dict[str, Any]]:
+    """Compare every metric present in both runs, wall time first."""
+    shared = sorted(set(baseline) & set(candidate), key=lambda m: (m != EXECUTION_TIME, m))
+    return [
+        compare_metric(metric, baseline[metric], candidate[metric], alpha, threshold_pct)
+        for metric in shared
+        if baseline[metric] and candidate[metric]
+    ]
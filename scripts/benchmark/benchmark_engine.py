@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-PYS-500016
+# Script Type: Benchmark Engine
+# Description: Runs fio/iperf3/ping once per sample and parses results in-process
+# Output: Flat JSON metric dictionaries (latency percentiles, IOPS, bandwidth)
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""benchmark_engine.py - Native storage and network benchmark engine.
+
+Replaces the ``benchmark_storage.sh``/``benchmark_network.sh`` JSON modes for
+the aggregator. Each sample spawns the measuring tool exactly once (fio runs
+every profile as stonewalled jobs of one invocation) and the tool's JSON is
+parsed here instead of being piped through ``jq``/``tail``/``cut``.
+
+The tools can run inside a container by passing an exec prefix such as
+``podman exec bench-podman``; results are still parsed on the host, so the
+container only needs fio/iperf3/ping, not bash, jq or python.
+
+Usage:
+    benchmark_engine.py storage [TARGET_DIR] [--profiles randread:4k:32,...]
+    benchmark_engine.py network [HOST] [--duration 5]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_STORAGE_TARGET = "/var/lib/deploy-system/evidence/benchmark"
+DEFAULT_NETWORK_HOST = "127.0.0.1"
+FILE_SIZE = "128M"
+RUNTIME = 5
+PING_COUNT = 5
+# Internal Networking Policy (ISO 27001 §13.1)
+PREFER_RANGE = "10.0.0.0/8"
+
+PING_RTT_RE = re.compile(r"=\s*([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+)\s*ms")
+PING_LOSS_RE = re.compile(r"([\d.]+)%\s+packet loss")
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """One fio job: access pattern, block size and queue depth."""
+
+    rw: str
+    bs: str
+    iodepth: int
+    rwmixread: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.rw}_{self.bs}_qd{self.iodepth}"
+
+    def fio_args(self) -> List[str]:
+        args = [f"--name={self.name}", f"--rw={self.rw}", f"--bs={self.bs}", f"--iodepth={self.iodepth}"]
+        if self.rwmixread is not None:
+            args.append(f"--rwmixread={self.rwmixread}")
+        return args
+
+
+# The first profile is the historical benchmark_storage.sh job; its metrics are
+# also emitted under the legacy names so existing baselines stay comparable.
+LEGACY_PROFILE = StorageProfile("randrw", "4k", 16, rwmixread=75)
+DEFAULT_PROFILES = (
+    LEGACY_PROFILE,
+    StorageProfile("randread", "4k", 1),
+    StorageProfile("randread", "4k", 32),
+    StorageProfile("randwrite", "4k", 32),
+    StorageProfile("read", "1m", 8),
+    StorageProfile("write", "1m", 8),
+)
+
+
+@dataclass
+class EngineSample:
+    """Metrics of one benchmark sample plus the rusage of every tool it spawned."""
+
+    metrics: Dict[str, float] = field(default_factory=dict)
+    rusage: List[Any] = field(default_factory=list)
+
+
+class EngineError(RuntimeError):
+    """A benchmark tool failed or produced unusable output."""
+
+
+def parse_profiles(spec: str) -> List[StorageProfile]:
+    """Parse ``rw:bs:iodepth[:rwmixread]`` items separated by commas."""
+    profiles = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        parts = item.split(":")
+        if len(parts) not in (3, 4):
+            raise ValueError(f"Invalid profile '{item}', expected rw:bs:iodepth[:rwmixread]")
+        mix = int(parts[3]) if len(parts) == 4 else None
+        profiles.append(StorageProfile(parts[0], parts[1], int(parts[2]), mix))
+    return profiles
+
+
+def run_tool(command: Sequence[str], sample: EngineSample) -> str:
+    """Run one tool, record its rusage on ``sample`` and return its stdout."""
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        proc = subprocess.Popen(
+            list(command),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+        )
+        stdout = proc.stdout.read()
+        proc.stdout.close()
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        sample.rusage.append(usage)
+        if proc.returncode != 0:
+            stderr.seek(0)
+            tail = stderr.read()[-2000:].strip()
+            raise EngineError(f"{command[0]} exited with {proc.returncode}: {tail}")
+    return stdout
+
+
+def _clat_percentiles_us(direction: Dict[str, Any]) -> Dict[str, float]:
+    # fio >= 3 reports clat_ns; older releases report clat in usec.
+    if "clat_ns" in direction:
+        percentiles, scale = direction["clat_ns"].get("percentile") or {}, 1000.0
+    else:
+        percentiles, scale = (direction.get("clat") or {}).get("percentile") or {}, 1.0
+    result = {}
+    for label, key in (("p50", "50.000000"), ("p99", "99.000000")):
+        if key in percentiles:
+            result[f"clat_{label}_us"] = percentiles[key] / scale
+    return result
+
+
+def parse_fio(report: Dict[str, Any]) -> Dict[str, float]:
+    """Flatten a fio JSON report into ``<job>_<read|write>_<metric>`` values."""
+    metrics: Dict[str, float] = {}
+    for job in report.get("jobs", []):
+        name = job.get("jobname", "job")
+        for direction in ("read", "write"):
+            data = job.get(direction) or {}
+            if not data.get("io_bytes"):
+                continue
+            prefix = f"{name}_{direction}"
+            metrics[f"{prefix}_iops"] = float(data.get("iops", 0.0))
+            metrics[f"{prefix}_bw_kb"] = float(data.get("bw", 0.0))
+            for key, value in _clat_percentiles_us(data).items():
+                metrics[f"{prefix}_{key}"] = float(value)
+            if name == LEGACY_PROFILE.name:
+                metrics[f"{direction}_iops"] = float(data.get("iops", 0.0))
+                metrics[f"{direction}_bw_kb"] = float(data.get("bw", 0.0))
+    return metrics
+
+
+def run_storage(
+    target_dir: str = DEFAULT_STORAGE_TARGET,
+    profiles: Sequence[StorageProfile] = DEFAULT_PROFILES,
+    prefix: Sequence[str] = (),
+    runtime: int = RUNTIME,
+    size: str = FILE_SIZE,
+) -> EngineSample:
+    """Run every storage profile in a single fio invocation."""
+    if not profiles:
+        raise ValueError("At least one storage profile is required")
+    command = list(prefix) + [
+        "fio",
+        "--output-format=json",
+        "--ioengine=libaio",
+        "--direct=1",
+        "--numjobs=1",
+        "--time_based",
+        f"--runtime={runtime}",
+        f"--size={size}",
+        f"--filename={target_dir.rstrip('/')}/fio_test_file",
+    ]
+    for index, profile in enumerate(profiles):
+        command += profile.fio_args()
+        if index:
+            command.append("--stonewall")
+        if index == len(profiles) - 1:
+            command.append("--unlink=1")
+
+    sample = EngineSample()
+    # The target lives wherever the prefix runs (e.g. inside the container),
+    # so create it there; fio does not create missing directories.
+    run_tool(list(prefix) + ["mkdir", "-p", target_dir], sample)
+    output = run_tool(command, sample)
+    try:
+        # fio may print notices before the JSON document.
+        report = json.loads(output[output.index("{"):])
+    except ValueError as exc:
+        raise EngineError(f"fio produced no JSON report: {exc}") from exc
+    sample.metrics = parse_fio(report)
+    return sample
+
+
+def parse_ping(output: str) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    rtt = PING_RTT_RE.search(output)
+    if rtt:
+        low, avg, high, mdev = (float(value) for value in rtt.groups())
+        metrics.update(latency_ms=avg, latency_min_ms=low, latency_max_ms=high, latency_mdev_ms=mdev)
+    loss = PING_LOSS_RE.search(output)
+    if loss:
+        metrics["packet_loss_pct"] = float(loss.group(1))
+    return metrics
+
+
+def parse_iperf3(report: Dict[str, Any]) -> Dict[str, float]:
+    end = report.get("end") or {}
+    sent = end.get("sum_sent") or {}
+    received = end.get("sum_received") or {}
+    metrics = {
+        "throughput_mbps": float(sent.get("bits_per_second", 0.0)) / 1_000_000,
+        "throughput_received_mbps": float(received.get("bits_per_second", 0.0)) / 1_000_000,
+    }
+    if "retransmits" in sent:
+        metrics["retransmits"] = float(sent["retransmits"])
+    cpu = end.get("cpu_utilization_percent") or {}
+    if "host_total" in cpu:
+        metrics["sender_cpu_pct"] = float(cpu["host_total"])
+    return metrics
+
+
+_IPERF_SERVER_READY: Dict[tuple, bool] = {}
+# Parallel aggregator iterations share this process; check and start under one lock
+_IPERF_SERVER_LOCK = threading.Lock()
+
+
+def ensure_iperf3_server(prefix: Sequence[str], sample: EngineSample) -> None:
+    """Start a daemonised iperf3 server once per exec prefix, like the shell script."""
+    key = tuple(prefix)
+    with _IPERF_SERVER_LOCK:
+        if _IPERF_SERVER_READY.get(key):
+            return
+        try:
+            run_tool(list(prefix) + ["pgrep", "-x", "iperf3"], sample)
+        except EngineError:
+            run_tool(list(prefix) + ["iperf3", "-s", "-D"], sample)
+        _IPERF_SERVER_READY[key] = True
+
+
+def run_network(
+    host: str = DEFAULT_NETWORK_HOST,
+    prefix: Sequence[str] = (),
+    duration: int = RUNTIME,
+) -> EngineSample:
+    """Measure ping latency and iperf3 throughput to ``host``."""
+    if host in ("127.0.0.1", "localhost"):
+        print(
+            f"WARNING: Relying on localhost ({host}) for benchmarks is non-compliant with "
+            f"Internal Networking Policy. Prefer static ranges in {PREFER_RANGE}.",
+            file=sys.stderr,
+        )
+    sample = EngineSample()
+    ensure_iperf3_server(prefix, sample)
+    sample.metrics.update(parse_ping(run_tool(list(prefix) + ["ping", "-c", str(PING_COUNT), "-q", host], sample)))
+    output = run_tool(list(prefix) + ["iperf3", "-c", host, "-t", str(duration), "-J"], sample)
+    try:
+        report = json.loads(output)
+    except json.JSONDecodeError as exc:
+        raise EngineError(f"iperf3 produced no JSON report: {exc}") from exc
+    if report.get("error"):
+        raise EngineError(f"iperf3: {report['error']}")
+    sample.metrics.update(parse_iperf3(report))
+    return sample
+
+
+ENGINES = ("storage", "network")
+
+
+def run_engine(
+    engine: str,
+    target: Optional[str] = None,
+    prefix: Sequence[str] = (),
+    profiles: Optional[Sequence[StorageProfile]] = None,
+    runtime: int = RUNTIME,
+) -> EngineSample:
+    """Dispatch one sample of ``engine`` (``storage`` or ``network``)."""
+    if engine == "storage":
+        return run_storage(target or DEFAULT_STORAGE_TARGET, profiles or DEFAULT_PROFILES, prefix, runtime)
+    if engine == "network":
+        return run_network(target or DEFAULT_NETWORK_HOST, prefix, runtime)
+    raise ValueError(f"Unknown benchmark engine '{engine}' (expected one of {', '.join(ENGINES)})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Native storage/network benchmark engine")
+    parser.add_argument("engine", choices=ENGINES, help="Benchmark to run")
+    parser.add_argument("target", nargs="?", help="Target directory (storage) or host (network)")
+    parser.add_argument("--profiles", default="", help="Storage profiles as rw:bs:iodepth[:rwmixread],... (default: built-in matrix)")
+    parser.add_argument("--runtime", type=int, default=RUNTIME, help="Seconds per fio job / iperf3 run")
+    args = parser.parse_args(argv)
+
+    try:
+        sample = run_engine(
+            args.engine,
+            target=args.target,
+            profiles=parse_profiles(args.profiles) if args.profiles else None,
+            runtime=args.runtime,
+        )
+    except (EngineError, OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(sample.metrics))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
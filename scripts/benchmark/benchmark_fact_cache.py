@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-PYS-500019
+# Script Type: Benchmark
+# Description: Measures fact cache plugin round trips and latency against a live server
+# Output: JSON metrics (round trips, wall time, bytes) on stdout
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""benchmark_fact_cache.py - Round trips and latency of the fact cache plugins.
+
+Runs a vendored community.general cache plugin against a live (local,
+throwaway) server and, for comparison, the access pattern the plugin used
+before:
+
+  redis      SETEX and ZADD as two calls per update, pretty-printed JSON, one
+             GET per key when copying the cache and a keyset sweep on every
+             lookup. Round trips are counted at the client connection, so a
+             pipeline counts once.
+  memcached  the whole key set re-uploaded on every update and one GET per
+             key when copying. Every client call counts as a round trip;
+             uploaded bytes are counted too, so running with --hosts 1000 and
+             --hosts 10000 shows whether bytes per host stay constant.
+
+The metrics are printed as one JSON object, so the run can be wrapped by
+benchmark_aggregator.py to record a baseline:
+
+    benchmark_fact_cache.py --hosts 500 --uri 127.0.0.1:6379:15
+    benchmark_fact_cache.py --backend memcached --hosts 10000 --uri 127.0.0.1:11211
+
+The selected redis database, or the whole memcached server, is flushed before
+and after the run.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[2]
+COLLECTIONS = ROOT / ".ansible" / "collections"
+
+PREFIX = "ansible_facts"
+KEYSET = "ansible_cache_keys"
+MEMCACHED_CALLS = ("get", "get_multi", "set", "set_multi", "append", "delete", "delete_multi")
+
+
+def host_facts(index: int, fact_count: int) -> Dict[str, Any]:
+    """A fact dict of roughly the shape and size setup returns."""
+    facts = {
+        "ansible_hostname": f"host{index:05d}",
+        "ansible_default_ipv4": {"address": f"10.{index // 65536}.{index // 256 % 256}.{index % 256}"},
+        "ansible_os_family": "Debian",
+    }
+    for n in range(fact_count):
+        facts[f"ansible_fact_{n:04d}"] = {"value": f"{index}-{n}", "flags": ["a", "b", "c"], "size": n * 512}
+    return facts
+
+
+class RoundTripCounter:
+    """Counts packed commands sent by redis-py; a pipeline is sent as one."""
+
+    def __init__(self, connection_class: Any) -> None:
+        self.count = 0
+        original = connection_class.send_packed_command
+
+        def counting(conn: Any, *args: Any, **kwargs: Any) -> Any:
+            self.count += 1
+            return original(conn, *args, **kwargs)
+
+        connection_class.send_packed_command = counting
+
+    def measure(self, func: Callable[[], Any]) -> Dict[str, float]:
+        start_count, start = self.count, time.perf_counter()
+        func()
+        return {"round_trips": self.count - start_count, "seconds": round(time.perf_counter() - start, 6)}
+
+
+class MemcachedCallCounter(RoundTripCounter):
+    """Counts memcache.Client calls and the bytes of the values they upload."""
+
+    def __init__(self, client_class: Any) -> None:
+        self.count = 0
+        self.uploaded = 0
+        for name in MEMCACHED_CALLS:
+            setattr(client_class, name, self._wrap(getattr(client_class, name)))
+
+    @staticmethod
+    def _size(value: Any) -> int:
+        if isinstance(value, str):
+            return len(value.encode("utf-8"))
+        if isinstance(value, bytes):
+            return len(value)
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _wrap(self, original: Callable[..., Any]) -> Callable[..., Any]:
+        def counting(client: Any, *args: Any, **kwargs: Any) -> Any:
+            self.count += 1
+            if original.__name__ == "set_multi":
+                self.uploaded += sum(self._size(v) for v in args[0].values())
+            elif original.__name__ in ("set", "append"):
+                self.uploaded += self._size(args[1])
+            return original(client, *args, **kwargs)
+
+        return counting
+
+    def measure(self, func: Callable[[], Any]) -> Dict[str, float]:
+        start_uploaded = self.uploaded
+        metrics = super().measure(func)
+        metrics["uploaded_bytes"] = self.uploaded - start_uploaded
+        return metrics
+
+
+def legacy_redis_pattern(db: Any, hosts: List[str], facts: List[Dict[str, Any]], timeout: int) -> Dict[str, Callable[[], Any]]:
+    """The pre-pipelining redis plugin's calls for set/copy/contains."""
+
+    def set_all() -> None:
+        for host, value in zip(hosts, facts):
+            db.setex(PREFIX + host, timeout, json.dumps(value, sort_keys=True, indent=4))
+            db.zadd(KEYSET, {host: time.time()})
+
+    def copy_all() -> None:
+        db.zremrangebyscore(KEYSET, 0, time.time() - timeout)
+        for key in db.zrange(KEYSET, 0, -1):
+            json.loads(db.get(PREFIX + key.decode()))
+
+    def contains_all() -> None:
+        for host in hosts:
+            db.zremrangebyscore(KEYSET, 0, time.time() - timeout)
+            db.zrank(KEYSET, host)
+
+    return {"set": set_all, "copy": copy_all, "contains": contains_all}
+
+
+def legacy_memcached_pattern(db: Any, hosts: List[str], facts: List[Dict[str, Any]], timeout: int) -> Dict[str, Callable[[], Any]]:
+    """The pre-sharding memcached plugin's calls: the key set dict is re-uploaded per update."""
+    keyset: Dict[str, float] = {}
+
+    def set_all() -> None:
+        for host, value in zip(hosts, facts):
+            db.set(PREFIX + host, value, time=timeout, min_compress_len=1)
+            keyset[host] = time.time()
+            db.set(KEYSET, keyset)
+
+    def copy_all() -> None:
+        for host in list(keyset):
+            db.get(PREFIX + host)
+
+    def contains_all() -> None:
+        for host in hosts:
+            expiry_age = time.time() - timeout
+            for key in [k for k, t in keyset.items() if t < expiry_age]:
+                del keyset[key]
+            db.set(KEYSET, keyset)
+
+    return {"set": set_all, "copy": copy_all, "contains": contains_all}
+
+
+def plugin_pattern(cache: Any, hosts: List[str], facts: List[Dict[str, Any]]) -> Dict[str, Callable[[], Any]]:
+    def set_all() -> None:
+        for host, value in zip(hosts, facts):
+            cache.set(host, value)
+        keyset = getattr(cache, "_keys", None)
+        if keyset is not None:
+            # memcached: include the buffered key set writes
+            keyset.flush()
+
+    def copy_all() -> None:
+        cache._cache = {}
+        cache.copy()
+
+    def contains_all() -> None:
+        for host in hosts:
+            cache.contains(host)
+
+    return {"set": set_all, "copy": copy_all, "contains": contains_all}
+
+
+def stored_bytes(db: Any, hosts: List[str]) -> int:
+    return sum(len(v or b"") for v in db.mget([PREFIX + h for h in hosts]))
+
+
+def redis_setup(args: argparse.Namespace, cache_loader: Any) -> tuple:
+    import redis
+
+    counter = RoundTripCounter(redis.connection.Connection)
+    cache = cache_loader.get(
+        "community.general.redis",
+        _uri=args.uri,
+        _timeout=args.timeout,
+        _compression=args.compression,
+    )
+    db = cache._db
+    return counter, cache, db, legacy_redis_pattern, db.flushdb, lambda hosts: stored_bytes(db, hosts)
+
+
+def memcached_setup(args: argparse.Namespace, cache_loader: Any) -> tuple:
+    import memcache
+
+    counter = MemcachedCallCounter(memcache.Client)
+    db = memcache.Client(args.uri.split(","))
+    db.flush_all()
+    cache = cache_loader.get("community.general.memcached", _uri=args.uri.split(","), _timeout=args.timeout)
+    return counter, cache, db, legacy_memcached_pattern, db.flush_all, None
+
+
+def run(args: argparse.Namespace) -> Dict[str, float]:
+    os.environ["ANSIBLE_COLLECTIONS_PATH"] = os.pathsep.join(
+        filter(None, [str(COLLECTIONS), os.environ.get("ANSIBLE_COLLECTIONS_PATH")])
+    )
+    try:
+        from ansible.plugins.loader import cache_loader
+
+        setup = redis_setup if args.backend == "redis" else memcached_setup
+        counter, cache, db, legacy_pattern, flush, measure_stored = setup(args, cache_loader)
+    except ImportError as exc:
+        raise SystemExit(f"benchmark_fact_cache.py needs ansible-core and the {args.backend} client installed: {exc}")
+
+    hosts = [f"host{i:05d}" for i in range(args.hosts)]
+    facts = [host_facts(i, args.facts) for i in range(args.hosts)]
+
+    metrics: Dict[str, float] = {"hosts": args.hosts}
+    for label, steps in (
+        ("legacy", legacy_pattern(db, hosts, facts, args.timeout)),
+        ("plugin", plugin_pattern(cache, hosts, facts)),
+    ):
+        flush()
+        for step, func in steps.items():
+            for name, value in counter.measure(func).items():
+                metrics[f"{label}_{step}_{name}"] = value
+            if f"{label}_{step}_uploaded_bytes" in metrics:
+                metrics[f"{label}_{step}_bytes_per_host"] = round(metrics[f"{label}_{step}_uploaded_bytes"] / max(1, args.hosts), 1)
+        if measure_stored:
+            metrics[f"{label}_stored_bytes"] = measure_stored(hosts)
+    flush()
+
+    for step in ("set", "copy", "contains"):
+        legacy = metrics[f"legacy_{step}_round_trips"]
+        metrics[f"{step}_round_trip_reduction"] = round(1 - metrics[f"plugin_{step}_round_trips"] / legacy, 4) if legacy else 0.0
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--backend", choices=["redis", "memcached"], default="redis")
+    parser.add_argument(
+        "--uri",
+        help="Redis connection (host:port:db[:password]; default 127.0.0.1:6379:15) or comma separated "
+        "memcached servers (default 127.0.0.1:11211); the data is flushed",
+    )
+    parser.add_argument("--hosts", type=int, default=500, help="Number of cached hosts")
+    parser.add_argument("--facts", type=int, default=200, help="Extra facts per host")
+    parser.add_argument("--timeout", type=int, default=86400, help="Cache timeout in seconds")
+    parser.add_argument("--compression", choices=["none", "zlib", "zstd"], default="none", help="redis only")
+    args = parser.parse_args()
+    if not args.uri:
+        args.uri = "127.0.0.1:6379:15" if args.backend == "redis" else "127.0.0.1:11211"
+
+    json.dump(run(args), sys.stdout, indent=2, sort_keys=True)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
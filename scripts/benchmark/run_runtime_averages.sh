@@ -7,18 +7,20 @@
 # Version: 1.0
 # =============================================================================
 # set -e disconnected to allow diagnostics
+# Samples use the native engine (benchmark_engine.py): fio/iperf3/ping run once
+# per sample inside the runtime via the exec prefix and are parsed on the host.
 
 echo "[Fri Feb 27 11:24:52 PM CET 2026] [*] Starting Runtime Benchmark Suite"
 
 # Podman
 echo "[$(date)] [*] Starting Podman averages..."
-python3 -u scripts/benchmark/benchmark_aggregator.py --name "podman_storage_100" -n 100 -w 5 -- podman exec bench-podman /bin/bash /workspace/benchmark/benchmark_storage.sh /tmp --json || echo "Podman Storage failed"
-python3 -u scripts/benchmark/benchmark_aggregator.py --name "podman_network_100" -n 100 -w 5 -- podman exec bench-podman /bin/bash /workspace/benchmark/benchmark_network.sh 127.0.0.1 --json || echo "Podman Network failed"
+python3 -u scripts/benchmark/benchmark_aggregator.py --name "podman_storage_100" -n 100 -w 5 --engine storage --target /tmp -- podman exec bench-podman || echo "Podman Storage failed"
+python3 -u scripts/benchmark/benchmark_aggregator.py --name "podman_network_100" -n 100 -w 5 --engine network --target 127.0.0.1 -- podman exec bench-podman || echo "Podman Network failed"
 
 # LXC
 echo "[$(date)] [*] Starting LXC averages..."
-python3 -u scripts/benchmark/benchmark_aggregator.py --name "lxc_storage_100" -n 100 -w 5 -- sudo lxc-attach -n bench-lxc -- /bin/bash /workspace/benchmark/benchmark_storage.sh /tmp --json || echo "LXC Storage failed"
-python3 -u scripts/benchmark/benchmark_aggregator.py --name "lxc_network_100" -n 100 -w 5 -- sudo lxc-attach -n bench-lxc -- /bin/bash /workspace/benchmark/benchmark_network.sh 127.0.0.1 --json || echo "LXC Network failed"
+python3 -u scripts/benchmark/benchmark_aggregator.py --name "lxc_storage_100" -n 100 -w 5 --engine storage --target /tmp -- sudo lxc-attach -n bench-lxc -- || echo "LXC Storage failed"
+python3 -u scripts/benchmark/benchmark_aggregator.py --name "lxc_network_100" -n 100 -w 5 --engine network --target 127.0.0.1 -- sudo lxc-attach -n bench-lxc -- || echo "LXC Network failed"
 
 # K3s (Restart service if needed)
 sudo systemctl start k3s
@@ -30,10 +32,16 @@ done
 
 if sudo kubectl get nodes >/dev/null 2>&1; then
     echo "[$(date)] [*] Starting K3s averages..."
-    python3 -u scripts/benchmark/benchmark_aggregator.py --name "k3s_storage_100" -n 100 -w 5 -- sudo kubectl exec benchmark-pod -- /bin/bash /workspace/benchmark/benchmark_storage.sh /tmp --json
-    python3 -u scripts/benchmark/benchmark_aggregator.py --name "k3s_network_100" -n 100 -w 5 -- sudo kubectl exec benchmark-pod -- /bin/bash /workspace/benchmark/benchmark_network.sh 127.0.0.1 --json
+    python3 -u scripts/benchmark/benchmark_aggregator.py --name "k3s_storage_100" -n 100 -w 5 --engine storage --target /tmp -- sudo kubectl exec benchmark-pod --
+    python3 -u scripts/benchmark/benchmark_aggregator.py --name "k3s_network_100" -n 100 -w 5 --engine network --target 127.0.0.1 -- sudo kubectl exec benchmark-pod --
 else
     echo "[$(date)] [!] K3s not ready, skipping..."
 fi
 
+# Regression check against the stored baselines (non-fatal: report only)
+echo "[$(date)] [*] Comparing against stored baselines..."
+for name in podman_storage_100 podman_network_100 lxc_storage_100 lxc_network_100 k3s_storage_100 k3s_network_100; do
+    python3 -u scripts/benchmark/benchmark_aggregator.py compare --name "$name" || echo "$name: regression or no baseline"
+done
+
 echo "[Fri Feb 27 11:24:52 PM CET 2026] [*] Runtime Benchmark Suite Complete"
@@ -3,6 +3,16 @@
 
 The benchmark runs each role in an isolated container, applies the role twice,
 and records whether the second run is idempotent (changed=0 and failed=0).
+Both passes use the ``ansible.posix.jsonl`` stdout callback streamed to a
+per-run event file, which is read back one event at a time to derive the recap
+and per-task changed/failed counts and durations for the second pass.
+
+Roles can be benchmarked concurrently with ``--jobs N``. Each worker draws a
+fresh container from a pool of pre-started runners built on a "warm" image
+that already carries the Ansible collections and apt indexes, so the per-role
+setup cost is paid once per image instead of once per role. ``--shard i/N``
+restricts a run to a deterministic slice of the roles so CI can split the
+sweep across machines; ``--merge`` combines the shard summaries afterwards.
 
 Artifacts are written to:
   projects/deploy-system-unified/ci-artifacts/idempotence/<timestamp>/
@@ -12,21 +22,49 @@ from __future__ import annotations
 
 import argparse
 import json
+import queue
 import re
 import subprocess
 import sys
 import textwrap
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 
-RECAP_RE = re.compile(
-    r"ok=(?P<ok>\d+)\s+changed=(?P<changed>\d+)\s+unreachable=(?P<unreachable>\d+)\s+"
-    r"failed=(?P<failed>\d+)\s+skipped=(?P<skipped>\d+)\s+rescued=(?P<rescued>\d+)\s+ignored=(?P<ignored>\d+)"
-)
+WARM_MARKER = "/etc/dsu-idempotence-warm"
+
+RECAP_FIELDS = ("ok", "changed", "unreachable", "failed", "skipped", "rescued", "ignored")
+RESULT_EVENTS = {
+    "v2_runner_on_ok": "ok",
+    "v2_runner_on_failed": "failed",
+    "v2_runner_on_unreachable": "unreachable",
+    "v2_runner_on_skipped": "skipped",
+}
+
+
+@dataclass
+class TaskStats:
+    name: str
+    path: str
+    ok: int = 0
+    changed: int = 0
+    failed: int = 0
+    unreachable: int = 0
+    skipped: int = 0
+    duration_seconds: float = 0.0
+
+
+@dataclass
+class RunSummary:
+    recap: dict[str, int] | None = None
+    failure_excerpt: str | None = None
+    tasks: dict[str, TaskStats] = field(default_factory=dict)
+    events: int = 0
 
 
 @dataclass
@@ -41,6 +79,9 @@ class RoleResult:
     failure_excerpt: str | None
     log_path: str
     playbook_path: str
+    events_paths: list[str] = field(default_factory=list)
+    task_report_path: str | None = None
+    changed_tasks_second_run: list[dict[str, Any]] = field(default_factory=list)
 
 
 def run_command(
@@ -62,6 +103,14 @@ def run_command(
     return proc.returncode, proc.stdout + proc.stderr
 
 
+def _as_text(value: str | bytes | None) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
 def build_runner_image(repo_root: Path, image: str) -> None:
     dockerfile = textwrap.dedent(
         """\
@@ -96,39 +145,193 @@ def build_runner_image(repo_root: Path, image: str) -> None:
         raise RuntimeError(f"Failed to build container image {image}\n{build_out}")
 
 
-def parse_recap(run_text: str) -> tuple[dict[str, int] | None, str | None]:
-    recap_line = None
-    recap_data = None
-    for line in run_text.splitlines():
-        match = RECAP_RE.search(line)
-        if match:
-            recap_line = line.strip()
-            recap_data = {k: int(v) for k, v in match.groupdict().items()}
-    return recap_data, recap_line
+def build_warm_image(repo_root: Path, base_image: str, warm_image: str) -> None:
+    """Layer refreshed apt indexes on top of the runner image.
 
+    The base image strips ``/var/lib/apt/lists`` to stay small; the warm image
+    keeps them so roles that install packages do not need an ``apt-get update``
+    inside every benchmark container.
+    """
+    dockerfile = textwrap.dedent(
+        f"""\
+        FROM {base_image}
+        ENV DEBIAN_FRONTEND=noninteractive
+        RUN apt-get -o APT::Sandbox::User=root update -y \\
+            && touch {WARM_MARKER}
+        """
+    )
+    inspect_rc, _ = run_command(
+        ["docker", "image", "inspect", warm_image],
+        cwd=repo_root,
+    )
+    if inspect_rc == 0:
+        return
 
-def first_failure_excerpt(text: str) -> str | None:
-    for line in text.splitlines():
-        stripped = line.strip()
-        if "fatal:" in stripped or "FAILED!" in stripped or stripped.startswith("ERROR!"):
-            return stripped
+    build_rc, build_out = run_command(
+        ["docker", "build", "-t", warm_image, "-f", "-", "."],
+        cwd=repo_root,
+        stdin_text=dockerfile,
+    )
+    if build_rc != 0:
+        raise RuntimeError(f"Failed to build warm container image {warm_image}\n{build_out}")
+
+
+class WarmContainerPool:
+    """Keep a set of started, idle runner containers ready for use.
+
+    Every role gets a pristine container: ``acquire`` hands out an idle one and
+    ``release`` destroys it and starts a replacement while roles remain, so the
+    container start-up latency overlaps with benchmarks already running.
+    """
+
+    def __init__(self, *, repo_root: Path, image: str, size: int, total: int) -> None:
+        self.repo_root = repo_root
+        self.image = image
+        self.size = size
+        self._pending = total
+        self._lock = threading.Lock()
+        self._idle: queue.Queue[str] = queue.Queue()
+
+    def _start_container(self) -> str:
+        rc, out = run_command(
+            [
+                "docker",
+                "run",
+                "-d",
+                "--rm",
+                "-v",
+                f"{self.repo_root.as_posix()}:/workspace:z",
+                "-w",
+                "/workspace",
+                self.image,
+                "sleep",
+                "infinity",
+            ],
+            cwd=self.repo_root,
+        )
+        if rc != 0:
+            raise RuntimeError(f"Failed to start runner container from {self.image}\n{out}")
+        return out.strip().splitlines()[-1]
+
+    def start(self) -> None:
+        for _ in range(min(self.size, self._pending)):
+            self._idle.put(self._start_container())
+
+    def acquire(self) -> str:
+        with self._lock:
+            self._pending -= 1
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._start_container()
+
+    def release(self, container: str) -> None:
+        run_command(["docker", "rm", "-f", container], cwd=self.repo_root)
+        with self._lock:
+            refill = self._pending > self._idle.qsize()
+        if refill:
+            self._idle.put(self._start_container())
+
+    def close(self) -> None:
+        while True:
+            try:
+                container = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            run_command(["docker", "rm", "-f", container], cwd=self.repo_root)
+
+
+def _parse_event_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.rstrip("Z"))
+    except ValueError:
+        return None
+
+
+def _task_duration(task: dict[str, Any]) -> float:
+    duration = task.get("duration") or {}
+    start = _parse_event_time(duration.get("start"))
+    end = _parse_event_time(duration.get("end"))
+    if start is None or end is None:
+        return 0.0
+    return max(0.0, (end - start).total_seconds())
+
+
+def _failure_line(host: str, outcome: str, result: dict[str, Any]) -> str:
+    label = "UNREACHABLE!" if outcome == "unreachable" else "FAILED!"
+    message = result.get("msg") or result.get("stderr") or ""
+    return f"fatal: [{host}]: {label} => {message}".strip()
+
+
+def summarize_events(events_path: Path) -> RunSummary:
+    """Stream a ``jsonl`` callback file into a recap and per-task counters.
+
+    Lines are decoded one at a time so multi-MB runs never sit in memory;
+    lines that are not JSON objects (stray warnings) are ignored. A missing
+    or truncated file yields whatever was recorded before it ended.
+    """
+    summary = RunSummary()
+    if not events_path.exists():
+        return summary
+
+    with events_path.open(encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            summary.events += 1
+            name = event.get("_event")
+
+            if name == "v2_playbook_on_stats":
+                recap = {key: 0 for key in RECAP_FIELDS}
+                for host_stats in (event.get("stats") or {}).values():
+                    for key in RECAP_FIELDS:
+                        source = "failures" if key == "failed" else key
+                        recap[key] += int(host_stats.get(source, 0))
+                summary.recap = recap
+                continue
+
+            outcome = RESULT_EVENTS.get(name)
+            if outcome is None:
+                continue
+            task = event.get("task") or {}
+            key = task.get("id") or task.get("name") or ""
+            stats = summary.tasks.get(key)
+            if stats is None:
+                stats = summary.tasks[key] = TaskStats(
+                    name=task.get("name", ""),
+                    path=task.get("path", ""),
+                )
+            stats.duration_seconds = round(stats.duration_seconds + _task_duration(task), 3)
+            for host, result in (event.get("hosts") or {}).items():
+                setattr(stats, outcome, getattr(stats, outcome) + 1)
+                if outcome == "ok" and result.get("changed"):
+                    stats.changed += 1
+                if outcome in ("failed", "unreachable") and summary.failure_excerpt is None:
+                    summary.failure_excerpt = _failure_line(host, outcome, result)
+    return summary
+
+
+def first_error_line(log_path: Path) -> str | None:
+    """Return the first Ansible ``ERROR!`` line from a stderr log, if any."""
+    if not log_path.exists():
+        return None
+    with log_path.open(encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            stripped = line.strip()
+            if stripped.startswith("ERROR!"):
+                return stripped
     return None
 
 
-def split_runs(log_text: str) -> tuple[str, str]:
-    run1_start = "=== RUN1 BEGIN ==="
-    run1_end = "=== RUN1 END ==="
-    run2_start = "=== RUN2 BEGIN ==="
-    run2_end = "=== RUN2 END ==="
-
-    if run1_start not in log_text or run1_end not in log_text:
-        return "", ""
-    if run2_start not in log_text or run2_end not in log_text:
-        return "", ""
-
-    run1 = log_text.split(run1_start, 1)[1].split(run1_end, 1)[0]
-    run2 = log_text.split(run2_start, 1)[1].split(run2_end, 1)[0]
-    return run1.strip(), run2.strip()
+def format_recap(recap: dict[str, int], host: str = "localhost") -> str:
+    return f"{host} : " + " ".join(f"{key}={recap[key]}" for key in RECAP_FIELDS)
 
 
 def role_playbook(role: str) -> str:
@@ -154,7 +357,14 @@ def benchmark_role(
     role: str,
     role_timeout: int,
     run_dir: Path,
+    container: str | None = None,
 ) -> RoleResult:
+    """Apply ``core/<role>`` twice and classify the second run.
+
+    With ``container`` set the passes run via ``docker exec`` inside that
+    pre-started warm runner; otherwise a throwaway ``docker run --rm``
+    container is used and the collections and apt indexes are refreshed first.
+    """
     playbooks_dir = run_dir / "playbooks"
     logs_dir = run_dir / "logs"
     playbooks_dir.mkdir(parents=True, exist_ok=True)
@@ -164,97 +374,102 @@ def benchmark_role(
     playbook_path.write_text(role_playbook(role), encoding="utf-8")
 
     rel_playbook = playbook_path.relative_to(repo_root).as_posix()
+    events_paths = [logs_dir / f"core_{role}.run{n}.jsonl" for n in (1, 2)]
+    stderr_paths = [logs_dir / f"core_{role}.run{n}.stderr.log" for n in (1, 2)]
+    for path in (*events_paths, *stderr_paths):
+        path.unlink(missing_ok=True)
+
+    passes = "\n".join(
+        f'ansible-playbook /workspace/{rel_playbook} -i "localhost," -c local '
+        f"> /workspace/{events.relative_to(repo_root).as_posix()} "
+        f"2> /workspace/{stderr.relative_to(repo_root).as_posix()} || true"
+        for events, stderr in zip(events_paths, stderr_paths)
+    )
     container_script = textwrap.dedent(
         f"""\
         set -euo pipefail
         export ANSIBLE_ROLES_PATH=/workspace/roles:/workspace
+        export ANSIBLE_STDOUT_CALLBACK=ansible.posix.jsonl
+        export ANSIBLE_JSON_INDENT=0
         echo 'benchmark-vault-pass' > /tmp/ansible-vault-pass
         chmod 0600 /tmp/ansible-vault-pass
         export ANSIBLE_VAULT_PASSWORD_FILE=/tmp/ansible-vault-pass
-        if command -v apt-get >/dev/null 2>&1; then
-          apt-get -o APT::Sandbox::User=root update -y >/dev/null 2>&1 || true
+        if [ ! -e {WARM_MARKER} ]; then
+          if command -v apt-get >/dev/null 2>&1; then
+            apt-get -o APT::Sandbox::User=root update -y >/dev/null 2>&1 || true
+          fi
+          ansible-galaxy collection install ansible.posix community.general >/dev/null 2>&1 || true
         fi
-        ansible-galaxy collection install ansible.posix community.general >/dev/null 2>&1 || true
-        ansible-playbook /workspace/{rel_playbook} -i "localhost," -c local > /tmp/run1.log 2>&1 || true
-        ansible-playbook /workspace/{rel_playbook} -i "localhost," -c local > /tmp/run2.log 2>&1 || true
-        echo "=== RUN1 BEGIN ==="
-        cat /tmp/run1.log
-        echo "=== RUN1 END ==="
-        echo "=== RUN2 BEGIN ==="
-        cat /tmp/run2.log
-        echo "=== RUN2 END ==="
         """
-    )
+    ) + passes + "\n"
 
-    cmd = [
-        "docker",
-        "run",
-        "--rm",
-        "-v",
-        f"{repo_root.as_posix()}:/workspace:z",
-        "-w",
-        "/workspace",
-        image,
-        "bash",
-        "-lc",
-        container_script,
-    ]
+    if container is not None:
+        cmd = ["docker", "exec", "-w", "/workspace", container, "bash", "-lc", container_script]
+    else:
+        cmd = [
+            "docker",
+            "run",
+            "--rm",
+            "-v",
+            f"{repo_root.as_posix()}:/workspace:z",
+            "-w",
+            "/workspace",
+            image,
+            "bash",
+            "-lc",
+            container_script,
+        ]
 
     start = time.time()
-    status = "error"
+    rc: int | None = None
     log_output = ""
     try:
         rc, log_output = run_command(cmd, cwd=repo_root, timeout_seconds=role_timeout)
-        run1_text, run2_text = split_runs(log_output)
-
-        recap, recap_line = parse_recap(run2_text)
-        fail_excerpt = first_failure_excerpt(run2_text) or first_failure_excerpt(run1_text)
-
-        changed = recap["changed"] if recap else None
-        failed = recap["failed"] if recap else None
-        unreachable = recap["unreachable"] if recap else None
+    except subprocess.TimeoutExpired as exc:
+        log_output = _as_text(exc.stdout) + _as_text(exc.stderr)
+
+    # The event files are on the bind mount, so they are readable here even
+    # when the container was killed part-way through the second pass.
+    run1 = summarize_events(events_paths[0])
+    run2 = summarize_events(events_paths[1])
+    recap = run2.recap
+    fail_excerpt = (
+        run2.failure_excerpt
+        or first_error_line(stderr_paths[1])
+        or run1.failure_excerpt
+        or first_error_line(stderr_paths[0])
+    )
 
-        if rc != 0:
-            status = "error_container"
-        elif recap is None and (
-            "ERROR!" in run2_text or "FAILED!" in run2_text or "fatal:" in run2_text
-        ):
-            status = "failed"
-        elif recap is None:
-            status = "error_no_recap"
-        elif failed and failed > 0:
-            status = "failed"
-        elif unreachable and unreachable > 0:
-            status = "failed"
-        elif changed == 0:
-            status = "idempotent"
-        else:
-            status = "non_idempotent"
+    changed = recap["changed"] if recap else None
+    failed = recap["failed"] if recap else None
+    unreachable = recap["unreachable"] if recap else None
 
-    except subprocess.TimeoutExpired as exc:
+    if rc is None:
         status = "error_timeout"
-        log_output = (exc.stdout or "") + (exc.stderr or "")
-        recap_line = None
-        changed = None
-        failed = None
-        unreachable = None
         fail_excerpt = f"Timed out after {role_timeout}s"
+    elif rc != 0:
+        status = "error_container"
+    elif recap is None and (run2.failure_excerpt or first_error_line(stderr_paths[1])):
+        status = "failed"
+    elif recap is None:
+        status = "error_no_recap"
+    elif failed and failed > 0:
+        status = "failed"
+    elif unreachable and unreachable > 0:
+        status = "failed"
+    elif changed == 0:
+        status = "idempotent"
     else:
-        if "recap_line" not in locals():
-            recap_line = None
-        if "changed" not in locals():
-            changed = None
-        if "failed" not in locals():
-            failed = None
-        if "unreachable" not in locals():
-            unreachable = None
-        if "fail_excerpt" not in locals():
-            fail_excerpt = None
+        status = "non_idempotent"
 
     duration = time.time() - start
     log_path = logs_dir / f"core_{role}.log"
     log_path.write_text(log_output, encoding="utf-8")
 
+    task_report_path = logs_dir / f"core_{role}.run2.tasks.json"
+    task_rows = [asdict(task) for task in run2.tasks.values()]
+    task_report_path.write_text(json.dumps(task_rows, indent=2) + "\n", encoding="utf-8")
+
     return RoleResult(
         role=role,
         status=status,
@@ -262,10 +477,15 @@ def benchmark_role(
         changed_second_run=changed,
         failed_second_run=failed,
         unreachable_second_run=unreachable,
-        recap_line_second_run=recap_line,
+        recap_line_second_run=format_recap(recap) if recap else None,
         failure_excerpt=fail_excerpt,
         log_path=str(log_path.relative_to(repo_root)),
         playbook_path=str(playbook_path.relative_to(repo_root)),
+        events_paths=[str(path.relative_to(repo_root)) for path in events_paths],
+        task_report_path=str(task_report_path.relative_to(repo_root)),
+        changed_tasks_second_run=[
+            row for row in task_rows if row["changed"] or row["failed"] or row["unreachable"]
+        ],
     )
 
 
@@ -280,6 +500,92 @@ def collect_roles(roles_dir: Path, selected: list[str] | None) -> list[str]:
     return [r for r in available if r in selected]
 
 
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a 1-based ``i/N`` shard specification."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', expected i/N (e.g. 2/4)")
+    index, total = int(match.group(1)), int(match.group(2))
+    if total < 1 or not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"Invalid shard '{value}', need 1 <= i <= N")
+    return index, total
+
+
+def shard_roles(roles: list[str], shard: tuple[int, int] | None) -> list[str]:
+    """Select this shard's roles round-robin from the sorted role list."""
+    if shard is None:
+        return roles
+    index, total = shard
+    return roles[index - 1 :: total]
+
+
+def benchmark_roles(
+    *,
+    repo_root: Path,
+    image: str,
+    roles: list[str],
+    role_timeout: int,
+    run_dir: Path,
+    jobs: int,
+    warm_pool: bool,
+) -> list[RoleResult]:
+    """Benchmark ``roles`` with at most ``jobs`` running concurrently.
+
+    Each role is a ``docker`` child process, so a thread pool is enough to keep
+    ``jobs`` containers busy. Results are returned in role order regardless of
+    completion order so summaries stay stable between runs.
+    """
+    pool: WarmContainerPool | None = None
+    if warm_pool:
+        pool = WarmContainerPool(repo_root=repo_root, image=image, size=jobs, total=len(roles))
+        pool.start()
+
+    def run_one(role: str) -> RoleResult:
+        print(f"[benchmark] core/{role} ...", flush=True)
+        container = pool.acquire() if pool else None
+        try:
+            result = benchmark_role(
+                repo_root=repo_root,
+                image=image,
+                role=role,
+                role_timeout=role_timeout,
+                run_dir=run_dir,
+                container=container,
+            )
+        finally:
+            if pool and container:
+                pool.release(container)
+        print(
+            f"[result] core/{role}: {result.status} (changed={result.changed_second_run}, failed={result.failed_second_run}, unreachable={result.unreachable_second_run})",
+            flush=True,
+        )
+        return result
+
+    results: dict[str, RoleResult] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = {executor.submit(run_one, role): role for role in roles}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+    finally:
+        if pool:
+            pool.close()
+    return [results[role] for role in roles]
+
+
+def load_results(summary_path: Path) -> tuple[dict[str, Any], list[RoleResult]]:
+    """Load a ``summary.json`` (or the run directory holding it)."""
+    if summary_path.is_dir():
+        summary_path = summary_path / "summary.json"
+    payload = json.loads(summary_path.read_text(encoding="utf-8"))
+    names = {f.name for f in fields(RoleResult)}
+    results = [
+        RoleResult(**{k: v for k, v in row.items() if k in names})
+        for row in payload.get("results", [])
+    ]
+    return payload, results
+
+
 def summary_counts(results: list[RoleResult]) -> dict[str, int]:
     counts: dict[str, int] = {}
     for result in results:
@@ -334,11 +640,107 @@ def write_markdown_summary(
         if result.failure_excerpt:
             lines.append(f"- `core/{result.role}`: {result.failure_excerpt}")
 
+    task_rows = [
+        "| core/{role} | {task} | `{path}` | {changed} | {failed} | {duration}s |".format(
+            role=result.role,
+            task=task["name"].replace("|", "\\|"),
+            path=task["path"],
+            changed=task["changed"],
+            failed=task["failed"] + task["unreachable"],
+            duration=task["duration_seconds"],
+        )
+        for result in results
+        for task in result.changed_tasks_second_run
+    ]
+    if task_rows:
+        lines.extend(
+            [
+                "",
+                "## Changed/Failed Tasks (2nd run)",
+                "",
+                "| Role | Task | Path | Changed | Failed | Duration |",
+                "| :--- | :--- | :--- | ---: | ---: | ---: |",
+                *task_rows,
+            ]
+        )
+
     summary_path = run_dir / "summary.md"
     summary_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
     return summary_path
 
 
+def write_summaries(
+    *,
+    repo_root: Path,
+    dsu_root: Path,
+    run_dir: Path,
+    run_id: str,
+    results: list[RoleResult],
+    started_at: str,
+    ended_at: str,
+    extra: dict[str, Any] | None = None,
+) -> tuple[Path, Path]:
+    summary_path = write_markdown_summary(
+        repo_root=repo_root,
+        run_dir=run_dir,
+        results=results,
+        started_at=started_at,
+        ended_at=ended_at,
+    )
+
+    payload: dict[str, Any] = {
+        "run_id": run_id,
+        "started_at_utc": started_at,
+        "ended_at_utc": ended_at,
+        "roles_benchmarked": len(results),
+        "summary_counts": summary_counts(results),
+        "results": [asdict(r) for r in results],
+        "summary_markdown_path": str(summary_path.relative_to(repo_root)),
+        **(extra or {}),
+    }
+    json_path = run_dir / "summary.json"
+    json_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+    latest_path = dsu_root / "ci-artifacts" / "idempotence" / "LATEST_RUN.txt"
+    latest_path.write_text(f"{run_id}\n", encoding="utf-8")
+    return json_path, summary_path
+
+
+def merge_summaries(
+    *,
+    repo_root: Path,
+    dsu_root: Path,
+    sources: list[Path],
+    run_id: str,
+) -> tuple[Path, Path]:
+    """Combine shard ``summary.json`` files into a single run summary."""
+    merged: dict[str, RoleResult] = {}
+    started: list[str] = []
+    ended: list[str] = []
+    shards: list[str] = []
+    for source in sources:
+        payload, results = load_results(source)
+        started.append(payload.get("started_at_utc", ""))
+        ended.append(payload.get("ended_at_utc", ""))
+        if payload.get("shard"):
+            shards.append(payload["shard"])
+        for result in results:
+            merged[result.role] = result
+
+    run_dir = dsu_root / "ci-artifacts" / "idempotence" / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    return write_summaries(
+        repo_root=repo_root,
+        dsu_root=dsu_root,
+        run_dir=run_dir,
+        run_id=run_id,
+        results=[merged[role] for role in sorted(merged)],
+        started_at=min((s for s in started if s), default=""),
+        ended_at=max((e for e in ended if e), default=""),
+        extra={"merged_from": [str(s) for s in sources], "merged_shards": sorted(shards)},
+    )
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Benchmark idempotence across roles/core/*")
     parser.add_argument(
@@ -357,73 +759,113 @@ def main() -> int:
         default="dsu-idempotence-bench:ubuntu22.04-v2",
         help="Container image to use for benchmark runs",
     )
+    parser.add_argument(
+        "--warm-image",
+        default="",
+        help="Warm runner image with apt indexes baked in (default: <image>-warm)",
+    )
     parser.add_argument(
         "--no-build-image",
         action="store_true",
         help="Skip building benchmark image when missing",
     )
+    parser.add_argument(
+        "--no-warm-pool",
+        action="store_true",
+        help="Use one throwaway 'docker run --rm' container per role instead of the warm pool",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of roles to benchmark concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Only benchmark shard i of N (1-based, e.g. 2/4) of the sorted role list",
+    )
+    parser.add_argument(
+        "--run-id",
+        default="",
+        help="Artifact run id (default: UTC timestamp)",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        type=Path,
+        metavar="SUMMARY",
+        help="Merge shard summary.json files (or their run directories) into one summary and exit",
+    )
     args = parser.parse_args()
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
     script_dir = Path(__file__).resolve().parent
     dsu_root = script_dir.parent
     repo_root = dsu_root.parent
     roles_dir = dsu_root / "roles" / "core"
 
+    run_id = args.run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    if args.merge:
+        json_path, summary_path = merge_summaries(
+            repo_root=repo_root,
+            dsu_root=dsu_root,
+            sources=args.merge,
+            run_id=run_id,
+        )
+        print(f"[done] merged summary: {json_path.relative_to(repo_root)}")
+        print(f"[done] merged summary: {summary_path.relative_to(repo_root)}")
+        return 0
+
     selected_roles = [r.strip() for r in args.roles.split(",") if r.strip()] or None
-    roles = collect_roles(roles_dir, selected_roles)
+    roles = shard_roles(collect_roles(roles_dir, selected_roles), args.shard)
     if not roles:
         print("No core roles found to benchmark.", file=sys.stderr)
         return 1
 
-    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
     run_dir = dsu_root / "ci-artifacts" / "idempotence" / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
 
     started_at = datetime.now(timezone.utc).isoformat()
 
+    image = args.image
     if not args.no_build_image:
         build_runner_image(repo_root, args.image)
+    if not args.no_warm_pool:
+        image = args.warm_image or f"{args.image}-warm"
+        if not args.no_build_image:
+            build_warm_image(repo_root, args.image, image)
 
-    results: list[RoleResult] = []
-    for role in roles:
-        print(f"[benchmark] core/{role} ...", flush=True)
-        result = benchmark_role(
-            repo_root=repo_root,
-            image=args.image,
-            role=role,
-            role_timeout=args.role_timeout,
-            run_dir=run_dir,
-        )
-        results.append(result)
-        print(
-            f"[result] core/{role}: {result.status} (changed={result.changed_second_run}, failed={result.failed_second_run}, unreachable={result.unreachable_second_run})",
-            flush=True,
-        )
+    results = benchmark_roles(
+        repo_root=repo_root,
+        image=image,
+        roles=roles,
+        role_timeout=args.role_timeout,
+        run_dir=run_dir,
+        jobs=args.jobs,
+        warm_pool=not args.no_warm_pool,
+    )
 
     ended_at = datetime.now(timezone.utc).isoformat()
-    summary_path = write_markdown_summary(
+    extra: dict[str, Any] = {"jobs": args.jobs}
+    if args.shard:
+        extra["shard"] = f"{args.shard[0]}/{args.shard[1]}"
+    json_path, summary_path = write_summaries(
         repo_root=repo_root,
+        dsu_root=dsu_root,
         run_dir=run_dir,
+        run_id=run_id,
         results=results,
         started_at=started_at,
         ended_at=ended_at,
+        extra=extra,
     )
 
-    payload: dict[str, Any] = {
-        "run_id": run_id,
-        "started_at_utc": started_at,
-        "ended_at_utc": ended_at,
-        "roles_benchmarked": len(results),
-        "summary_counts": summary_counts(results),
-        "results": [r.__dict__ for r in results],
-        "summary_markdown_path": str(summary_path.relative_to(repo_root)),
-    }
-    json_path = run_dir / "summary.json"
-    json_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
-
-    latest_path = dsu_root / "ci-artifacts" / "idempotence" / "LATEST_RUN.txt"
-    latest_path.write_text(f"{run_id}\n", encoding="utf-8")
-
     print(f"[done] summary: {json_path.relative_to(repo_root)}")
     print(f"[done] summary: {summary_path.relative_to(repo_root)}")
     return 0
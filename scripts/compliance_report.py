@@ -16,35 +16,429 @@ Generates comprehensive compliance reports for:
 - NIST SP 800-53
 - ISO 27001:2022
 
+Each role is walked from tasks/main.yml through its include_tasks/import_tasks
+graph and block/rescue/always sections, with tags inherited the way Ansible
+applies them. Task files are parsed in a process pool and kept in a persistent
+scan cache keyed by path, mtime, size and content hash, so only edited files
+are re-parsed between runs.
+
+Every scan also rebuilds a SQLite inverted index mapping each control to the
+role, file, line and task implementing it; the report is rendered from that
+index and the ``query`` subcommand answers single questions without a rescan.
+
 Usage:
     python compliance_report.py [--format json|markdown|html] [--output FILE]
+                                [--cache FILE | --no-cache] [--jobs N] [--timings N]
+                                [--index FILE]
+    python compliance_report.py query (--control 'NIST AC-6' | --role security/sshd) [--json]
 """
 
 import os
 import re
+import sys
 import json
+import time
+import hashlib
+import sqlite3
+import tempfile
 import yaml
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 import argparse
 
+# libyaml is an order of magnitude faster; fall back to the pure-Python loader.
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class LineLoader(SafeLoader):
+    """SafeLoader that records the 1-based source line of every mapping as ``__line__``."""
+
+    def construct_mapping(self, node, deep=False):
+        mapping = super().construct_mapping(node, deep=deep)
+        mapping['__line__'] = node.start_mark.line + 1
+        return mapping
+
+
+SCAN_CACHE_VERSION = 3
+
+INCLUDE_KEYS = {
+    'include_tasks': False,
+    'ansible.builtin.include_tasks': False,
+    'include': False,
+    'ansible.builtin.include': False,
+    'import_tasks': True,
+    'ansible.builtin.import_tasks': True,
+}
+BLOCK_SECTIONS = ('block', 'rescue', 'always')
+JINJA_EXPR = re.compile(r'\{\{.*?\}\}')
+# Below this many uncached files a process pool costs more than it saves.
+PARALLEL_MIN_FILES = 16
+
+
+def _normalize_tags(value: Any) -> List[str]:
+    """Return tags as a list of strings (Ansible also accepts 'a,b' strings)."""
+    if isinstance(value, str):
+        return [tag.strip() for tag in value.split(',') if tag.strip()]
+    if isinstance(value, list):
+        return [str(tag) for tag in value if isinstance(tag, (str, int, float))]
+    return []
+
+
+def _include_target(task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    for key, static in INCLUDE_KEYS.items():
+        if key not in task:
+            continue
+        value = task[key]
+        if isinstance(value, dict):
+            value = value.get('file') or value.get('_raw_params')
+        if isinstance(value, str) and value.strip():
+            return {'file': value.strip(), 'import': static}
+    return None
+
+
+def reduce_tasks(data: Any) -> List[Dict]:
+    """Reduce parsed YAML to what the report needs, keeping block structure.
+
+    Each entry has ``name``, ``line`` and ``tags``; blocks keep their ``block``/``rescue``/
+    ``always`` children and include/import statements carry an ``include``.
+    """
+    reduced = []
+    for task in data if isinstance(data, list) else []:
+        if not isinstance(task, dict):
+            continue
+        name = task.get('name', '')
+        entry: Dict[str, Any] = {
+            'name': name if isinstance(name, str) else str(name),
+            'line': task.get('__line__', 0),
+            'tags': _normalize_tags(task.get('tags', [])),
+        }
+        if any(section in task for section in BLOCK_SECTIONS):
+            for section in BLOCK_SECTIONS:
+                entry[section] = reduce_tasks(task.get(section) or [])
+        else:
+            include = _include_target(task)
+            if include:
+                entry['include'] = include
+        reduced.append(entry)
+    return reduced
+
+
+def _fallback_tasks(content: str) -> List[Dict]:
+    """Single-pass line scanner for task files that are not valid YAML.
+
+    Picks up ``- name:`` entries and the block-style ``tags:`` list that
+    follows them; nesting is flattened.
+    """
+    tasks: List[Dict] = []
+    current: Optional[Dict[str, Any]] = None
+    tags_indent: Optional[int] = None
+    for lineno, line in enumerate(content.splitlines(), 1):
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        if stripped.startswith('- name:'):
+            current = {'name': stripped[len('- name:'):].strip().strip('"\''), 'line': lineno, 'tags': []}
+            tasks.append(current)
+            tags_indent = None
+        elif current is not None and stripped.startswith('tags:'):
+            inline = stripped[len('tags:'):].strip()
+            if inline:
+                current['tags'] = _normalize_tags(inline.strip('[]'))
+                tags_indent = None
+            else:
+                tags_indent = indent
+        elif tags_indent is not None and current is not None:
+            if stripped.startswith('- ') and indent >= tags_indent:
+                current['tags'].append(stripped[2:].strip().strip('"\''))
+            elif stripped:
+                tags_indent = None
+    return tasks
+
+
+def parse_task_content(content: str) -> Dict[str, Any]:
+    """Parse a task file's content; falls back to the line scanner on YAML errors."""
+    try:
+        return {'tasks': reduce_tasks(yaml.load(content, Loader=LineLoader)), 'error': None}
+    except yaml.YAMLError as e:
+        return {'tasks': _fallback_tasks(content), 'error': f"YAML error, used fallback parser: {str(e).splitlines()[0]}"}
+
+
+def parse_task_file(path: str, known_sha256: Optional[str] = None) -> Dict[str, Any]:
+    """Read, hash and parse one task file (runs in a worker process).
+
+    When the content hash equals ``known_sha256`` parsing is skipped and
+    ``tasks`` is None so the caller reuses its cached entry.
+    """
+    start = time.perf_counter()
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    result: Dict[str, Any] = {'path': path, 'sha256': digest, 'tasks': None, 'error': None}
+    if digest != known_sha256:
+        result.update(parse_task_content(raw.decode('utf-8', errors='replace')))
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class ScanCache:
+    """Persistent cache of parsed task files.
+
+    Entries are keyed by file path and validated by (mtime_ns, size); when
+    those changed but the SHA-256 of the content did not (touch, checkout),
+    the entry is still reused. Only the reduced task structure needed for the
+    report is stored.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.seen: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if path and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+                if data.get('version') == SCAN_CACHE_VERSION:
+                    self.entries = data.get('files', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def lookup(self, key: str, stat: os.stat_result) -> Optional[List[Dict]]:
+        """Return cached tasks if (mtime_ns, size) still match."""
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            return entry['tasks']
+        return None
+
+    def known_sha256(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        return entry['sha256'] if entry else None
+
+    def store(self, key: str, stat: os.stat_result, result: Dict[str, Any]) -> List[Dict]:
+        """Record a worker result; ``tasks`` None means the content hash matched."""
+        self.seen.add(key)
+        if result['tasks'] is None:
+            self.hits += 1
+            entry = self.entries[key]
+        else:
+            self.misses += 1
+            entry = {'sha256': result['sha256'], 'tasks': result['tasks']}
+        entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        self.entries[key] = entry
+        self.dirty = True
+        return entry['tasks']
+
+    def save(self) -> None:
+        """Write the cache atomically, dropping entries for files that vanished."""
+        stale = set(self.entries) - self.seen
+        if not self.path or not (self.dirty or stale):
+            return
+        for key in stale:
+            del self.entries[key]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix='.scan_cache.')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': SCAN_CACHE_VERSION, 'files': self.entries}, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+
+FRAMEWORKS = ('cis', 'stig', 'nist', 'iso27001')
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS roles (
+    name TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    total_tasks INTEGER NOT NULL,
+    tagged_tasks INTEGER NOT NULL,
+    coverage REAL NOT NULL,
+    cis_controls INTEGER NOT NULL,
+    stig_controls INTEGER NOT NULL,
+    nist_controls INTEGER NOT NULL,
+    iso_controls INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    role TEXT NOT NULL,
+    file TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_controls (
+    task_id INTEGER NOT NULL REFERENCES tasks (id),
+    framework TEXT NOT NULL,
+    control TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_role ON tasks (role);
+CREATE INDEX IF NOT EXISTS idx_controls_control ON task_controls (framework, grp, control);
+CREATE INDEX IF NOT EXISTS idx_controls_tag ON task_controls (tag);
+CREATE INDEX IF NOT EXISTS idx_controls_task ON task_controls (task_id);
+"""
+
+
+def control_for_tag(tag: str) -> Optional[Tuple[str, str, str]]:
+    """Map a compliance tag to ``(framework, control, group)``, or None.
+
+    The group is the CIS section or NIST family used to structure reports.
+    """
+    if tag.startswith('cis_'):
+        control = tag.replace('cis_', 'CIS ').replace('_', '.')
+        parts = control.split()
+        return 'cis', control, parts[1].split('.')[0] if len(parts) > 1 else 'Other'
+    if tag.startswith('stig_v_'):
+        return 'stig', tag.replace('stig_v_', 'V-').upper(), ''
+    if tag.startswith('nist_'):
+        control = tag.replace('nist_', 'NIST ').replace('_', '-').upper()
+        if control in ['NIST-80053', 'NIST-800193']:
+            return None
+        return 'nist', control, control.split('-')[0] if '-' in control else 'Other'
+    if tag.startswith('iso_27001_'):
+        return 'iso27001', tag.replace('iso_27001_', 'ISO 27001 §'), ''
+    return None
+
+
+class ComplianceIndex:
+    """SQLite inverted index from compliance controls to role tasks.
+
+    Each scan rebuilds the index in one transaction; queries and report
+    rendering read from it without re-scanning the roles.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path) if path else ':memory:')
+        self.conn.executescript(INDEX_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def reset(self, roles_path: str) -> None:
+        with self.conn:
+            for table in ('task_controls', 'tasks', 'roles', 'meta'):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [('generated_at', datetime.now().isoformat()), ('roles_path', roles_path)],
+            )
+
+    def add_role(self, role: str, stats: Dict[str, Any], tasks: List[Tuple[str, int, str, List[str]]]) -> None:
+        """Store one role's stats and its ``(file, line, name, tags)`` tasks."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO roles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (role, role.split('/')[0], stats['total_tasks'], stats['tagged_tasks'], stats['coverage'],
+                 stats['cis_controls'], stats['stig_controls'], stats['nist_controls'], stats['iso_controls']),
+            )
+            controls = []
+            for file, line, name, tags in tasks:
+                cursor = self.conn.execute(
+                    "INSERT INTO tasks (role, file, line, name, tags) VALUES (?, ?, ?, ?, ?)",
+                    (role, file, line, name, json.dumps(tags)),
+                )
+                for tag in tags:
+                    mapped = control_for_tag(tag)
+                    if mapped:
+                        controls.append((cursor.lastrowid,) + mapped + (tag,))
+            self.conn.executemany(
+                "INSERT INTO task_controls (task_id, framework, control, grp, tag) VALUES (?, ?, ?, ?, ?)",
+                controls,
+            )
+
+    def meta(self, key: str) -> str:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else ''
+
+    def has_data(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM roles LIMIT 1").fetchone() is not None
+
+    def role_stats(self) -> Iterator[Tuple]:
+        """Roles by descending coverage; ties keep scan order."""
+        return self.conn.execute(
+            "SELECT name, total_tasks, tagged_tasks, coverage, cis_controls, stig_controls, "
+            "nist_controls, iso_controls FROM roles ORDER BY coverage DESC, rowid"
+        )
+
+    def category_stats(self) -> Iterator[Tuple]:
+        return self.conn.execute(
+            "SELECT category, count(*), sum(total_tasks), sum(tagged_tasks) FROM roles "
+            "GROUP BY category ORDER BY category"
+        )
+
+    def control_count(self, framework: str) -> int:
+        return self.conn.execute(
+            "SELECT count(DISTINCT control) FROM task_controls WHERE framework = ?", (framework,)
+        ).fetchone()[0]
+
+    def controls(self, framework: str, by_group: bool = True) -> Iterator[Tuple[str, str, List[str], int]]:
+        """Yield ``(control, group, sorted roles, task count)``, ordered by group
+        then control, or by control alone."""
+        order = "c.grp, c.control" if by_group else "c.control"
+        rows = self.conn.execute(
+            "SELECT c.control, c.grp, group_concat(DISTINCT t.role), count(*) "
+            "FROM task_controls c JOIN tasks t ON t.id = c.task_id "
+            f"WHERE c.framework = ? GROUP BY c.grp, c.control ORDER BY {order}",
+            (framework,),
+        )
+        for control, group, roles, count in rows:
+            yield control, group, sorted(roles.split(',')), count
+
+    def entries(self, framework: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(control, task entry)`` for every mapping of ``framework``."""
+        rows = self.conn.execute(
+            "SELECT c.control, t.role, t.name, t.tags, t.file, t.line "
+            "FROM task_controls c JOIN tasks t ON t.id = c.task_id "
+            "WHERE c.framework = ? ORDER BY c.control, c.rowid",
+            (framework,),
+        )
+        for control, role, name, tags, file, line in rows:
+            yield control, {'role': role, 'task': name, 'tags': json.loads(tags), 'file': file, 'line': line}
+
+    def find_control(self, control: str) -> List[Tuple]:
+        """Tasks implementing ``control``, given as displayed ('NIST AC-6'),
+        without the framework prefix ('AC-6') or as the raw tag ('nist_ac_6')."""
+        return self.conn.execute(
+            "SELECT DISTINCT c.framework, c.control, t.role, t.file, t.line, t.name "
+            "FROM task_controls c JOIN tasks t ON t.id = c.task_id "
+            "WHERE c.control = ?1 COLLATE NOCASE OR c.tag = lower(?1) OR c.control LIKE '% ' || ?1 "
+            "ORDER BY c.framework, c.control, t.role, t.file, t.line",
+            (control.strip(),),
+        ).fetchall()
+
+    def find_role(self, role: str) -> List[Tuple]:
+        """Controls covered by ``role`` with the number of tasks mapping each."""
+        return self.conn.execute(
+            "SELECT c.framework, c.control, count(*) "
+            "FROM task_controls c JOIN tasks t ON t.id = c.task_id "
+            "WHERE t.role = ? GROUP BY c.framework, c.control ORDER BY c.framework, c.grp, c.control",
+            (role.strip('/'),),
+        ).fetchall()
+
 
 class ComplianceReportGenerator:
     """Generates compliance reports from Ansible role task tags."""
     
-    def __init__(self, roles_path: str):
+    def __init__(self, roles_path: str, cache_path: Optional[str] = None, jobs: Optional[int] = None,
+                 index_path: Optional[str] = None):
         self.roles_path = Path(roles_path)
-        self.compliance_data = {
-            'cis': defaultdict(list),
-            'stig': defaultdict(list),
-            'nist': defaultdict(list),
-            'iso27001': defaultdict(list),
-        }
+        self.cache = ScanCache(Path(cache_path) if cache_path else None)
+        self.index = ComplianceIndex(Path(index_path) if index_path else None)
+        self.jobs = jobs or os.cpu_count() or 1
         self.role_stats = {}
         self.total_tasks = 0
         self.tagged_tasks = 0
+        self.parsed_files: Dict[str, List[Dict]] = {}
+        self.file_timings: Dict[str, float] = {}
+        self.parse_errors: Dict[str, str] = {}
+        self.scan_seconds = 0.0
         
     def scan_roles(self) -> None:
         """Scan all roles for compliance tags."""
@@ -53,18 +447,119 @@ class ComplianceReportGenerator:
             'networking', 'ops', 'orchestration', 'security',
             'storage', 'virtualization'
         ]
+        start = time.perf_counter()
+        self.index.reset(str(self.roles_path))
         
+        roles = []
         for category in role_categories:
             category_path = self.roles_path / category
             if not category_path.exists():
                 continue
                 
-            for role_dir in category_path.iterdir():
+            for role_dir in sorted(category_path.iterdir()):
                 if role_dir.is_dir() and not role_dir.name.startswith('.'):
-                    self._scan_role(role_dir, category)
-                    
+                    roles.append((role_dir, category))
+
+        # Parse every task file of every role up front (in parallel), then walk
+        # the include graph in memory.
+        task_files = []
+        for role_dir, _ in roles:
+            tasks_dir = role_dir / 'tasks'
+            if tasks_dir.is_dir():
+                task_files.extend(sorted(tasks_dir.rglob('*.yml')) + sorted(tasks_dir.rglob('*.yaml')))
+        self._load_files(task_files)
+
+        for role_dir, category in roles:
+            self._scan_role(role_dir, category)
+
+        self.cache.save()
+        self.scan_seconds = time.perf_counter() - start
+
+    def _load_files(self, paths: List[Path]) -> None:
+        """Fill ``parsed_files`` from the cache, parsing the rest in a process pool."""
+        pending = []
+        for path in paths:
+            key = str(path.resolve())
+            if key in self.parsed_files:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            tasks = self.cache.lookup(key, stat)
+            if tasks is not None:
+                self.parsed_files[key] = tasks
+            else:
+                pending.append((key, stat))
+        if not pending:
+            return
+
+        args = [(key, self.cache.known_sha256(key)) for key, _ in pending]
+        if self.jobs > 1 and len(pending) >= PARALLEL_MIN_FILES:
+            with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                results = list(pool.map(parse_task_file, *zip(*args), chunksize=8))
+        else:
+            results = [parse_task_file(*arg) for arg in args]
+
+        for (key, stat), result in zip(pending, results):
+            self.parsed_files[key] = self.cache.store(key, stat, result)
+            self.file_timings[key] = result['seconds']
+            if result['error']:
+                self.parse_errors[key] = result['error']
+
+    def _resolve_include(self, target: str, role_path: Path, current_file: Path) -> List[Path]:
+        """Resolve an include/import target to existing files.
+
+        ``{{ role_path }}`` is substituted; any other Jinja expression becomes a
+        glob wildcard (e.g. ``os_specific/{{ ansible_os_family }}.yml``), so all
+        variants the role ships are scanned.
+        """
+        target = re.sub(r'\{\{\s*role_path\s*\}\}', str(role_path), target)
+        pattern = JINJA_EXPR.sub('*', target)
+        literal = re.sub(r'\.ya?ml$', '', pattern.replace('*', '')).strip('/.')
+        if not literal:
+            # Fully dynamic (e.g. '{{ item }}'): nothing sensible to resolve.
+            return []
+        bases = [current_file.parent, role_path / 'tasks']
+        for base in bases:
+            candidate = Path(pattern) if Path(pattern).is_absolute() else base / pattern
+            if '*' in pattern:
+                matches = sorted(candidate.parent.glob(candidate.name))
+                if matches:
+                    return matches
+            elif candidate.is_file():
+                return [candidate]
+        return []
+
+    def _walk_tasks(self, tasks: List[Dict], inherited: List[str], role_path: Path,
+                    current_file: Path, visited: Set[str]):
+        """Yield (task, effective_tags, file) for every task, expanding blocks and includes."""
+        for task in tasks:
+            tags = inherited + [t for t in task.get('tags', []) if t not in inherited]
+            if any(section in task for section in BLOCK_SECTIONS):
+                # Block tags apply to every task in block/rescue/always.
+                for section in BLOCK_SECTIONS:
+                    yield from self._walk_tasks(task.get(section, []), tags, role_path, current_file, visited)
+                continue
+
+            yield task, tags, current_file
+            include = task.get('include')
+            if not include:
+                continue
+            # Tags on import_tasks are inherited; include_tasks tags only
+            # apply to the include statement itself.
+            child_tags = tags if include['import'] else inherited
+            for child in self._resolve_include(include['file'], role_path, current_file):
+                key = str(child.resolve())
+                if key in visited:
+                    continue
+                visited.add(key)
+                if key not in self.parsed_files:
+                    self._load_files([child])
+                yield from self._walk_tasks(self.parsed_files.get(key, []), child_tags, role_path, child, visited)
+
     def _scan_role(self, role_path: Path, category: str) -> None:
-        """Scan a single role for compliance tags."""
+        """Scan a single role for compliance tags, following its includes."""
         tasks_file = role_path / 'tasks' / 'main.yml'
         if not tasks_file.exists():
             return
@@ -72,133 +567,73 @@ class ComplianceReportGenerator:
         role_name = f"{category}/{role_path.name}"
         task_count = 0
         tagged_count = 0
-        cis_controls = set()
-        stig_controls = set()
-        nist_controls = set()
-        iso_controls = set()
+        controls = {framework: set() for framework in FRAMEWORKS}
+        rows = []
+        repo_root = self.roles_path.resolve().parent
         
         try:
-            with open(tasks_file, 'r') as f:
-                content = f.read()
-                
-            # Parse tasks
-            tasks = self._parse_tasks(content)
+            main_key = str(tasks_file.resolve())
+            tasks = self.parsed_files.get(main_key)
+            if tasks is None:
+                self._load_files([tasks_file])
+                tasks = self.parsed_files.get(main_key, [])
             
-            for task in tasks:
+            for task, tags, task_file in self._walk_tasks(tasks, [], role_path, tasks_file, {main_key}):
                 task_count += 1
-                self.total_tasks += 1
-                
-                tags = task.get('tags', [])
-                task_name = task.get('name', '')
-                
-                # Extract CIS tags
-                for tag in tags:
-                    if not isinstance(tag, str):
-                        continue
-                    if tag.startswith('cis_'):
-                        cis_control = tag.replace('cis_', 'CIS ').replace('_', '.')
-                        self.compliance_data['cis'][cis_control].append({
-                            'role': role_name,
-                            'task': task_name,
-                            'tags': tags
-                        })
-                        cis_controls.add(tag)
-                        tagged_count += 1
-                        self.tagged_tasks += 1
-                        
-                    elif tag.startswith('stig_v_'):
-                        stig_id = tag.replace('stig_v_', 'V-').upper()
-                        self.compliance_data['stig'][stig_id].append({
-                            'role': role_name,
-                            'task': task_name,
-                            'tags': tags
-                        })
-                        stig_controls.add(tag)
-                        tagged_count += 1
-                        self.tagged_tasks += 1
-                        
-                    elif tag.startswith('nist_'):
-                        nist_control = tag.replace('nist_', 'NIST ').replace('_', '-').upper()
-                        if nist_control not in ['NIST-80053', 'NIST-800193']:
-                            self.compliance_data['nist'][nist_control].append({
-                                'role': role_name,
-                                'task': task_name,
-                                'tags': tags
-                            })
-                            nist_controls.add(tag)
-                            tagged_count += 1
-                            self.tagged_tasks += 1
-                            
-                    elif tag.startswith('iso_27001_'):
-                        iso_control = tag.replace('iso_27001_', 'ISO 27001 §')
-                        self.compliance_data['iso27001'][iso_control].append({
-                            'role': role_name,
-                            'task': task_name,
-                            'tags': tags
-                        })
-                        iso_controls.add(tag)
-                        tagged_count += 1
-                        self.tagged_tasks += 1
+                mapped = [control_for_tag(tag) for tag in tags]
+                for control in filter(None, mapped):
+                    controls[control[0]].add(control[1])
+                # A task counts once towards coverage, however many controls it maps.
+                if any(mapped):
+                    tagged_count += 1
+
+                resolved = task_file.resolve()
+                try:
+                    file_label = str(resolved.relative_to(repo_root))
+                except ValueError:
+                    file_label = str(resolved)
+                rows.append((file_label, task.get('line', 0), task.get('name', ''), tags))
                         
             self.role_stats[role_name] = {
                 'total_tasks': task_count,
                 'tagged_tasks': tagged_count,
                 'coverage': (tagged_count / task_count * 100) if task_count > 0 else 0,
-                'cis_controls': len(cis_controls),
-                'stig_controls': len(stig_controls),
-                'nist_controls': len(nist_controls),
-                'iso_controls': len(iso_controls),
+                'cis_controls': len(controls['cis']),
+                'stig_controls': len(controls['stig']),
+                'nist_controls': len(controls['nist']),
+                'iso_controls': len(controls['iso27001']),
             }
+            self.index.add_role(role_name, self.role_stats[role_name], rows)
+            self.total_tasks += task_count
+            self.tagged_tasks += tagged_count
             
         except Exception as e:
             print(f"Error scanning {role_path}: {e}")
             
-    def _parse_tasks(self, content: str) -> List[Dict]:
-        """Parse YAML content to extract tasks."""
-        tasks = []
-        try:
-            data = yaml.safe_load(content)
-            if data and isinstance(data, list):
-                tasks = data
-        except yaml.YAMLError:
-            # Fallback: regex parsing for task names and tags
-            task_pattern = r'-\s*name:\s*["\']?([^"\']+)["\']?\s*\n((?:.*?\n)*?)(?=-\s*name:|$)'
-            for match in re.finditer(task_pattern, content, re.MULTILINE):
-                task_name = match.group(1).strip()
-                task_body = match.group(2)
-                
-                tags_match = re.search(r'tags:\s*\n((?:\s*-\s*\w+.*\n)*)', task_body)
-                tags = []
-                if tags_match:
-                    tags = re.findall(r'-\s*(\w+(?:_\w+)*)', tags_match.group(1))
-                    
-                tasks.append({
-                    'name': task_name,
-                    'tags': tags
-                })
-                
-        return tasks
-        
     def generate_summary(self) -> Dict[str, Any]:
         """Generate summary statistics."""
         return {
-            'generated_at': datetime.now().isoformat(),
-            'roles_path': str(self.roles_path),
+            'generated_at': self.index.meta('generated_at') or datetime.now().isoformat(),
+            'roles_path': self.index.meta('roles_path') or str(self.roles_path),
             'total_roles': len(self.role_stats),
             'total_tasks': self.total_tasks,
             'tagged_tasks': self.tagged_tasks,
             'overall_coverage': (self.tagged_tasks / self.total_tasks * 100) if self.total_tasks > 0 else 0,
-            'cis_controls_mapped': len(self.compliance_data['cis']),
-            'stig_controls_mapped': len(self.compliance_data['stig']),
-            'nist_controls_mapped': len(self.compliance_data['nist']),
-            'iso_controls_mapped': len(self.compliance_data['iso27001']),
+            'cis_controls_mapped': self.index.control_count('cis'),
+            'stig_controls_mapped': self.index.control_count('stig'),
+            'nist_controls_mapped': self.index.control_count('nist'),
+            'iso_controls_mapped': self.index.control_count('iso27001'),
+            'files_scanned': len(self.parsed_files),
+            'files_parsed': len(self.file_timings),
+            'scan_seconds': round(self.scan_seconds, 3),
+            'parse_errors': dict(self.parse_errors),
         }
         
-    def generate_markdown_report(self) -> str:
-        """Generate markdown compliance report."""
+    def iter_markdown_report(self) -> Iterator[str]:
+        """Render the markdown compliance report from the index, chunk by chunk."""
         summary = self.generate_summary()
         
-        report = f"""# Compliance Report - Deploy-System-Unified Ansible Roles
+        yield f"""# Compliance Report - Deploy-System-Unified Ansible Roles
 
 **Generated:** {summary['generated_at']}  
 **Roles Path:** {summary['roles_path']}
@@ -226,40 +661,31 @@ class ComplianceReportGenerator:
 |----------|-------|--------------|-------------|--------------|
 """
         
-        # Group by category
-        categories = defaultdict(lambda: {'roles': 0, 'tasks': 0, 'tagged': 0})
-        for role, stats in self.role_stats.items():
-            category = role.split('/')[0]
-            categories[category]['roles'] += 1
-            categories[category]['tasks'] += stats['total_tasks']
-            categories[category]['tagged'] += stats['tagged_tasks']
-            
-        for category, data in sorted(categories.items()):
-            avg_coverage = (data['tagged'] / data['tasks'] * 100) if data['tasks'] > 0 else 0
-            report += f"| {category.capitalize()} | {data['roles']} | {avg_coverage:.1f}% | {data['tasks']} | {data['tagged']} |\n"
+        for category, roles, tasks, tagged in self.index.category_stats():
+            avg_coverage = (tagged / tasks * 100) if tasks > 0 else 0
+            yield f"| {category.capitalize()} | {roles} | {avg_coverage:.1f}% | {tasks} | {tagged} |\n"
             
-        report += """
+        yield """
 ---
 
 ## CIS Benchmark Coverage
 
 """
-        # Group CIS controls by section
-        cis_sections = defaultdict(list)
-        for control, tasks in sorted(self.compliance_data['cis'].items()):
-            section = control.split()[1].split('.')[0] if len(control.split()) > 1 else 'Other'
-            cis_sections[section].append((control, tasks))
-            
-        for section, controls in sorted(cis_sections.items()):
-            report += f"### Section {section}\n\n"
-            report += "| Control | Roles | Tasks |\n"
-            report += "|---------|-------|-------|\n"
-            for control, tasks in controls:
-                roles = set(t['role'] for t in tasks)
-                report += f"| {control} | {', '.join(sorted(roles))} | {len(tasks)} |\n"
-            report += "\n"
+        # Controls arrive grouped by section
+        section = None
+        for control, group, roles, count in self.index.controls('cis'):
+            if group != section:
+                if section is not None:
+                    yield "\n"
+                section = group
+                yield f"### Section {section}\n\n"
+                yield "| Control | Roles | Tasks |\n"
+                yield "|---------|-------|-------|\n"
+            yield f"| {control} | {', '.join(roles)} | {count} |\n"
+        if section is not None:
+            yield "\n"
             
-        report += """
+        yield """
 ---
 
 ## STIG Coverage
@@ -267,11 +693,10 @@ class ComplianceReportGenerator:
 | STIG ID | Roles | Tasks |
 |---------|-------|-------|
 """
-        for stig_id, tasks in sorted(self.compliance_data['stig'].items()):
-            roles = set(t['role'] for t in tasks)
-            report += f"| {stig_id} | {', '.join(sorted(roles))} | {len(tasks)} |\n"
+        for stig_id, _, roles, count in self.index.controls('stig'):
+            yield f"| {stig_id} | {', '.join(roles)} | {count} |\n"
             
-        report += """
+        yield """
 ---
 
 ## NIST 800-53 Coverage
@@ -279,12 +704,10 @@ class ComplianceReportGenerator:
 | Control | Family | Roles | Tasks |
 |---------|--------|-------|-------|
 """
-        for control, tasks in sorted(self.compliance_data['nist'].items()):
-            family = control.split('-')[0] if '-' in control else 'Other'
-            roles = set(t['role'] for t in tasks)
-            report += f"| {control} | {family} | {', '.join(sorted(roles))} | {len(tasks)} |\n"
+        for control, family, roles, count in self.index.controls('nist', by_group=False):
+            yield f"| {control} | {family} | {', '.join(roles)} | {count} |\n"
             
-        report += """
+        yield """
 ---
 
 ## ISO 27001:2022 Coverage
@@ -292,11 +715,10 @@ class ComplianceReportGenerator:
 | Control | Roles | Tasks |
 |---------|-------|-------|
 """
-        for control, tasks in sorted(self.compliance_data['iso27001'].items()):
-            roles = set(t['role'] for t in tasks)
-            report += f"| {control} | {', '.join(sorted(roles))} | {len(tasks)} |\n"
+        for control, _, roles, count in self.index.controls('iso27001'):
+            yield f"| {control} | {', '.join(roles)} | {count} |\n"
             
-        report += """
+        yield """
 ---
 
 ## Role Coverage Details
@@ -304,17 +726,17 @@ class ComplianceReportGenerator:
 | Role | Tasks | Tagged | Coverage | CIS | STIG | NIST | ISO |
 |------|-------|--------|----------|-----|------|------|-----|
 """
-        for role, stats in sorted(self.role_stats.items(), key=lambda x: x[1]['coverage'], reverse=True):
-            report += f"| {role} | {stats['total_tasks']} | {stats['tagged_tasks']} | {stats['coverage']:.1f}% | {stats['cis_controls']} | {stats['stig_controls']} | {stats['nist_controls']} | {stats['iso_controls']} |\n"
+        for role, tasks, tagged, coverage, cis, stig, nist, iso in self.index.role_stats():
+            yield f"| {role} | {tasks} | {tagged} | {coverage:.1f}% | {cis} | {stig} | {nist} | {iso} |\n"
             
-        report += f"""
+        yield f"""
 ---
 
 ## Audit Readiness
 
 This report demonstrates compliance mapping coverage for:
 
-- **CIS Benchmarks**: {summary['cis_controls_mapped']} controls mapped across {len(self.role_stats)} roles
+- **CIS Benchmarks**: {summary['cis_controls_mapped']} controls mapped across {summary['total_roles']} roles
 - **DISA STIG**: {summary['stig_controls_mapped']} controls mapped
 - **NIST SP 800-53**: {summary['nist_controls_mapped']} controls mapped across multiple control families
 - **ISO 27001:2022**: {summary['iso_controls_mapped']} controls mapped
@@ -326,41 +748,96 @@ This report demonstrates compliance mapping coverage for:
 
 *Generated by Compliance Report Generator v1.0*
 """
-        return report
+
+    def generate_markdown_report(self) -> str:
+        """Generate markdown compliance report."""
+        return ''.join(self.iter_markdown_report())
         
     def generate_json_report(self) -> str:
         """Generate JSON compliance report."""
+        compliance_data: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for framework in FRAMEWORKS:
+            compliance_data[framework] = defaultdict(list)
+            for control, entry in self.index.entries(framework):
+                compliance_data[framework][control].append(entry)
         return json.dumps({
             'summary': self.generate_summary(),
             'role_stats': self.role_stats,
-            'compliance_data': {
-                'cis': dict(self.compliance_data['cis']),
-                'stig': dict(self.compliance_data['stig']),
-                'nist': dict(self.compliance_data['nist']),
-                'iso27001': dict(self.compliance_data['iso27001']),
-            }
+            'compliance_data': compliance_data,
         }, indent=2)
         
     def save_report(self, output_path: str, format: str = 'markdown') -> None:
         """Save report to file."""
-        if format == 'json':
-            content = self.generate_json_report()
-        else:
-            content = self.generate_markdown_report()
-            
         with open(output_path, 'w') as f:
-            f.write(content)
+            if format == 'json':
+                f.write(self.generate_json_report())
+            else:
+                f.writelines(self.iter_markdown_report())
         print(f"Report saved to: {output_path}")
 
 
-def main():
+def query_main(argv: List[str]) -> int:
+    """Answer control/role questions from the index without re-scanning."""
+    parser = argparse.ArgumentParser(
+        prog='compliance_report.py query',
+        description='Query the compliance index (run a report first to build it)',
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--control', help="Control to look up, e.g. 'NIST AC-6', 'AC-6', 'V-230264' or 'nist_ac_6'")
+    group.add_argument('--role', help="Role to look up, e.g. 'security/sshd'")
+    parser.add_argument('--index', help='Index file (default: <roles-path>/../.cache/compliance_index.sqlite3)')
+    parser.add_argument('--roles-path', default='roles', help='Path to roles directory')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args(argv)
+
+    index_path = Path(args.index) if args.index else default_index_path(Path(args.roles_path))
+    if not index_path.exists():
+        print(f"Error: no compliance index at {index_path}; generate a report first")
+        return 2
+    index = ComplianceIndex(index_path)
+    try:
+        if args.control:
+            fields = ('framework', 'control', 'role', 'file', 'line', 'task')
+            rows = index.find_control(args.control)
+        else:
+            fields = ('framework', 'control', 'tasks')
+            rows = index.find_role(args.role)
+        if args.json:
+            print(json.dumps([dict(zip(fields, row)) for row in rows], indent=2))
+        elif args.control:
+            for framework, control, role, file, line, task in rows:
+                print(f"{control}\t{role}\t{file}:{line}\t{task}")
+        else:
+            for framework, control, count in rows:
+                print(f"{framework}\t{control}\t{count} task(s)")
+        if not rows and not args.json:
+            print(f"No matches in index generated {index.meta('generated_at')}")
+        return 0 if rows else 1
+    finally:
+        index.close()
+
+
+def default_index_path(roles_path: Path) -> Path:
+    return roles_path.resolve().parent / '.cache' / 'compliance_index.sqlite3'
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'query':
+        return query_main(argv[1:])
+
     parser = argparse.ArgumentParser(description='Generate compliance reports for Ansible roles')
     parser.add_argument('--roles-path', default='roles', help='Path to roles directory')
     parser.add_argument('--format', choices=['json', 'markdown', 'html'], default='markdown',
                        help='Output format')
     parser.add_argument('--output', '-o', help='Output file path')
+    parser.add_argument('--cache', help='Scan cache file (default: <roles-path>/../.cache/compliance_scan.json)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every task file without the scan cache')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--timings', type=int, default=0, metavar='N', help='Print the N slowest files to parse')
+    parser.add_argument('--index', help='Control index file (default: <roles-path>/../.cache/compliance_index.sqlite3)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Find roles directory
     roles_path = Path(args.roles_path)
@@ -374,8 +851,21 @@ def main():
                 
     print(f"Scanning roles in: {roles_path}")
     
-    generator = ComplianceReportGenerator(str(roles_path))
+    cache_path = None
+    if not args.no_cache:
+        cache_path = args.cache or str(roles_path.resolve().parent / '.cache' / 'compliance_scan.json')
+
+    index_path = args.index or str(default_index_path(roles_path))
+    generator = ComplianceReportGenerator(str(roles_path), cache_path, args.jobs, index_path)
     generator.scan_roles()
+    print(f"Scanned {len(generator.parsed_files)} task files in {generator.scan_seconds:.3f}s "
+          f"(cache: {generator.cache.hits} hit(s), {generator.cache.misses} parsed)")
+    for path, error in sorted(generator.parse_errors.items()):
+        print(f"Warning: {path}: {error}")
+    if args.timings:
+        slowest = sorted(generator.file_timings.items(), key=lambda item: item[1], reverse=True)
+        for path, seconds in slowest[:args.timings]:
+            print(f"  {seconds * 1000:8.2f} ms  {path}")
     
     summary = generator.generate_summary()
     print(f"\n=== Compliance Report Summary ===")
@@ -394,7 +884,9 @@ def main():
         # Default output
         output_file = f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
         generator.save_report(output_file, 'markdown')
+    generator.index.close()
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
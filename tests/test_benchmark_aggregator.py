@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000115
+# File Type: Python Test Script
+# Test Type: Benchmark Aggregator Validation
+# Description: Test streaming, parallel and adaptive sampling and rusage capture of the benchmark aggregator
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test benchmark_aggregator.py against small python child processes."""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts' / 'benchmark'))
+
+import benchmark_aggregator as aggregator  # noqa: E402
+import benchmark_baseline as baseline  # noqa: E402
+
+
+def python(code):
+    """Command running ``code`` in a fresh interpreter."""
+    return [sys.executable, '-c', code]
+
+
+class TestParseJsonOutput(unittest.TestCase):
+    """Test parsing of the captured stdout."""
+
+    def test_whole_output(self):
+        """Test a multi-line JSON document."""
+        self.assertEqual(aggregator._parse_json_output('{\n"a": 1\n}\n'), {'a': 1})
+
+    def test_last_json_line(self):
+        """Test log noise before the metrics falls back to the last JSON line."""
+        output = '{"a": 1}\nprogress 50%\n{"a": 2}\ndone\n'
+        self.assertEqual(aggregator._parse_json_output(output), {'a': 2})
+
+    def test_no_json(self):
+        """Test plain or truncated output yields None."""
+        self.assertIsNone(aggregator._parse_json_output('hello\n'))
+        self.assertIsNone(aggregator._parse_json_output('{"a": \n'))
+        self.assertIsNone(aggregator._parse_json_output(''))
+
+
+class TestRunBenchmark(unittest.TestCase):
+    """Test a single streamed iteration."""
+
+    def test_large_output(self):
+        """Test metrics after a lot of output still parse and only the stderr tail is kept."""
+        res = aggregator.run_benchmark(python(
+            'import sys\n'
+            'for i in range(20000): print("line", i); print("err", i, file=sys.stderr)\n'
+            'print(\'{"ops_per_sec": 7}\')\n'
+        ))
+        self.assertEqual(res['return_code'], 0)
+        self.assertEqual(res['json_data'], {'ops_per_sec': 7})
+        stderr_lines = res['stderr_tail'].splitlines()
+        self.assertEqual(len(stderr_lines), aggregator.STDERR_TAIL_LINES)
+        self.assertEqual(stderr_lines[-1], 'err 19999')
+        self.assertGreater(res['duration'], 0)
+
+    def test_long_pretty_printed_json(self):
+        """Test a pretty-printed JSON document is parsed however many lines it spans."""
+        res = aggregator.run_benchmark(python(
+            'import json; print(json.dumps({"metric_%d" % i: i for i in range(1000)}, indent=2))'
+        ))
+        self.assertEqual(res['return_code'], 0)
+        self.assertEqual(len(res['json_data']), 1000)
+        self.assertEqual(res['json_data']['metric_999'], 999)
+
+    def test_exit_code(self):
+        """Test a failing command reports its exit code and stderr."""
+        res = aggregator.run_benchmark(python('import sys; sys.exit("boom")'))
+        self.assertEqual(res['return_code'], 1)
+        self.assertEqual(res['stderr_tail'], 'boom\n')
+        self.assertIsNone(res['json_data'])
+
+    def test_missing_command(self):
+        """Test a command that cannot start is an error, not an exception."""
+        res = aggregator.run_benchmark(['/nonexistent/benchmark'])
+        self.assertEqual(res['return_code'], -1)
+        self.assertIn('error', res)
+
+
+class TestCollectMetrics(unittest.TestCase):
+    """Test folding iterations into samples."""
+
+    def test_collect(self):
+        """Test failed iterations add no wall time and non-numeric values are ignored."""
+        durations, custom, resources = [], {}, {}
+        aggregator.collect_metrics({'return_code': 0, 'duration': 1.5, 'resources': {'max_rss_kb': 10.0},
+                                    'json_data': {'iops': 3, 'ok': True, 'host': 'x'}},
+                                   durations, custom, resources)
+        aggregator.collect_metrics({'return_code': 2, 'duration': 9.0, 'resources': {'max_rss_kb': 99.0},
+                                    'json_data': {'iops': 4}},
+                                   durations, custom, resources)
+        self.assertEqual(durations, [1.5])
+        self.assertEqual(resources, {'max_rss_kb': [10.0]})
+        self.assertEqual(custom, {'iops': [3.0, 4.0]})
+
+
+class TestHasConverged(unittest.TestCase):
+    """Test the adaptive stopping rule."""
+
+    def test_has_converged(self):
+        """Test every metric needs enough samples and a narrow enough CI."""
+        steady = [1.0, 1.01, 0.99, 1.0]
+        noisy = [1.0, 3.0, 0.5, 2.0]
+        self.assertTrue(aggregator.has_converged({'a': steady}, 0.05, 4))
+        self.assertFalse(aggregator.has_converged({'a': steady}, 0.05, 5))
+        self.assertFalse(aggregator.has_converged({'a': steady, 'b': noisy}, 0.05, 4))
+        self.assertFalse(aggregator.has_converged({}, 0.05, 1))
+
+
+class TestMain(unittest.TestCase):
+    """Test whole aggregator runs."""
+
+    def setUp(self):
+        """Create the output directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        """Remove the output directory."""
+        self._tmp.cleanup()
+
+    def run_main(self, *args, command):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rc = aggregator.main(['-w', '0', '-o', str(self.output_dir), '--name', 'suite', *args, '--', *command])
+        self.assertEqual(rc, 0)
+        return json.loads(next(self.output_dir.glob('suite_*.json')).read_text())
+
+    def test_parallel_iterations_overlap(self):
+        """Test --parallel runs a batch of iterations concurrently."""
+        start = time.perf_counter()
+        stats = self.run_main('-n', '4', '--parallel', '4', command=python('import time; time.sleep(0.5)'))
+        self.assertLess(time.perf_counter() - start, 1.5)
+        self.assertEqual(stats['iterations'], 4)
+        self.assertEqual(stats['parallel'], 4)
+        self.assertEqual(stats['execution_time_stats']['count'], 4)
+
+    def test_target_ci_stops_early(self):
+        """Test --target-ci stops once the minimum iterations have converged."""
+        stats = self.run_main('-n', '50', '--parallel', '2', '--target-ci', '10', '--min-iterations', '4',
+                              command=python('print(\'{"ops_per_sec": 5}\')'))
+        self.assertTrue(stats['converged'])
+        self.assertEqual(stats['iterations'], 4)
+        self.assertEqual(stats['requested_iterations'], 50)
+        self.assertEqual(stats['custom_metrics_stats']['ops_per_sec']['count'], 4)
+
+    def test_target_ci_without_convergence(self):
+        """Test sampling runs to --iterations when the CI stays too wide."""
+        stats = self.run_main('-n', '3', '--target-ci', '0.0001', '--min-iterations', '2',
+                              command=python('import random; print(\'{"ops_per_sec": %d}\' % random.randint(1, 1000))'))
+        self.assertFalse(stats['converged'])
+        self.assertEqual(stats['iterations'], 3)
+
+    def test_failures_recorded(self):
+        """Test failed iterations are counted and a bounded number recorded."""
+        stats = self.run_main('-n', '7', '--parallel', '3', command=python('import sys; sys.exit("no disk")'))
+        self.assertEqual(stats['failed_iterations'], 7)
+        self.assertEqual(len(stats['failures']), aggregator.MAX_RECORDED_FAILURES)
+        self.assertEqual(stats['failures'][0], {'iteration': 1, 'return_code': 1, 'stderr_tail': 'no disk\n'})
+        self.assertEqual(stats['execution_time_stats'], {})
+
+
+def fake_rusage(utime, stime, maxrss, nvcsw, nivcsw, inblock, oublock):
+    """Stand-in for a resource.struct_rusage."""
+    return SimpleNamespace(ru_utime=utime, ru_stime=stime, ru_maxrss=maxrss, ru_nvcsw=nvcsw,
+                           ru_nivcsw=nivcsw, ru_inblock=inblock, ru_oublock=oublock)
+
+
+# Allocates ~64 MiB and burns CPU so the child's rusage is clearly non-zero.
+HUNGRY = 'data = bytearray(64 << 20)\nfor _ in range(len(data) // 4096): data[_ * 4096] = 1\nsum(range(3000000))'
+
+
+class TestResourceUsage(unittest.TestCase):
+    """Test per-iteration rusage capture."""
+
+    def test_rusage_metrics(self):
+        """Test counters are summed across children and peak RSS is the largest peak."""
+        metrics = aggregator.rusage_metrics(fake_rusage(0.5, 0.25, 1000, 3, 1, 8, 16),
+                                            fake_rusage(1.5, 0.75, 4000, 2, 4, 0, 4))
+        self.assertEqual(metrics, {
+            'cpu_user_s': 2.0, 'cpu_system_s': 1.0, 'max_rss_kb': 4000.0,
+            'ctx_switches_voluntary': 5.0, 'ctx_switches_involuntary': 5.0,
+            'block_in_ops': 8.0, 'block_out_ops': 20.0,
+        })
+        self.assertEqual(aggregator.rusage_metrics()['max_rss_kb'], 0.0)
+
+    def test_run_benchmark_measures_the_child(self):
+        """Test run_benchmark reports the child's own CPU time and peak RSS."""
+        res = aggregator.run_benchmark(python(HUNGRY))
+        self.assertEqual(res['return_code'], 0)
+        self.assertGreater(res['resources']['max_rss_kb'], 64 << 10)
+        self.assertGreater(res['resources']['cpu_user_s'] + res['resources']['cpu_system_s'], 0)
+        self.assertEqual(set(res['resources']), set(aggregator.rusage_metrics()))
+
+    def test_main_records_resources(self):
+        """Test resource statistics are reported and stored with the rusage prefix."""
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(aggregator.main(['-n', '2', '-w', '0', '-o', tmp, '--name', 'suite', '--',
+                                              *python(HUNGRY)]), 0)
+            stats = json.loads(next(Path(tmp).glob('suite_*.json')).read_text())
+            markdown = next(Path(tmp).glob('suite_*.md')).read_text()
+            with baseline.BaselineStore.for_output_dir(Path(tmp)) as store:
+                samples = store.samples(store.find_run('suite')['id'])
+        self.assertEqual(stats['resource_stats']['max_rss_kb']['count'], 2)
+        self.assertGreater(stats['resource_stats']['max_rss_kb']['min'], 64 << 10)
+        self.assertIn('## Resource Usage Statistics (per iteration)', markdown)
+        self.assertIn('| max_rss_kb |', markdown)
+        self.assertEqual(len(samples['rusage.max_rss_kb']), 2)
+        self.assertIn('rusage.cpu_user_s', samples)
+
+
+if __name__ == '__main__':
+    unittest.main()
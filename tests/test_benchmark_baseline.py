@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000114
+# File Type: Python Test Script
+# Test Type: Benchmark Baseline Validation
+# Description: Test the baseline history, statistics and regression compare of the benchmarks
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test benchmark_baseline.py and the aggregator's compare command."""
+
+import contextlib
+import io
+import json
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts' / 'benchmark'))
+
+import benchmark_aggregator as aggregator  # noqa: E402
+import benchmark_baseline as baseline  # noqa: E402
+
+FAST = [1.00, 1.02, 0.98, 1.01, 0.99, 1.00, 1.03, 0.97, 1.01, 0.99]
+SLOW = [value * 1.2 for value in FAST]
+
+
+class TestStatistics(unittest.TestCase):
+    """Test the statistics helpers."""
+
+    def test_percentile(self):
+        """Test linear interpolation matches numpy's default."""
+        data = [15, 20, 35, 40, 50]
+        self.assertEqual(baseline.percentile(data, 50), 35)
+        self.assertAlmostEqual(baseline.percentile(data, 95), 48.0)
+        self.assertAlmostEqual(baseline.percentile(data, 40), 29.0)
+        self.assertEqual(baseline.percentile([7.0], 99), 7.0)
+        with self.assertRaises(ValueError):
+            baseline.percentile([], 50)
+
+    def test_bootstrap_mean_ci(self):
+        """Test the interval brackets the mean and is reproducible."""
+        low, high = baseline.bootstrap_mean_ci(FAST)
+        self.assertLess(low, sum(FAST) / len(FAST))
+        self.assertGreater(high, sum(FAST) / len(FAST))
+        self.assertEqual((low, high), baseline.bootstrap_mean_ci(FAST))
+        self.assertEqual(baseline.bootstrap_mean_ci([3.0]), (3.0, 3.0))
+
+    def test_mann_whitney_u(self):
+        """Test U and the continuity-corrected p-value against reference values."""
+        u_stat, p_value = baseline.mann_whitney_u([1, 2, 3], [4, 5, 6])
+        self.assertEqual(u_stat, 0)
+        self.assertAlmostEqual(p_value, 0.0808556, places=5)
+        # ties: midranks give U=2.5; tie-corrected sigma^2=11.143, z=1.498
+        u_stat, p_value = baseline.mann_whitney_u([1, 2, 2, 3], [2, 3, 4, 4])
+        self.assertEqual(u_stat, 2.5)
+        self.assertAlmostEqual(p_value, 0.1342, places=4)
+        self.assertEqual(baseline.mann_whitney_u([5, 5], [5, 5]), (2.0, 1.0))
+        with self.assertRaises(ValueError):
+            baseline.mann_whitney_u([], [1])
+
+    def test_mean_ci_relative_width(self):
+        """Test the relative CI width and its undefined cases."""
+        self.assertTrue(math.isinf(baseline.mean_ci_relative_width([1.0])))
+        self.assertTrue(math.isinf(baseline.mean_ci_relative_width([0.0, 0.0])))
+        self.assertEqual(baseline.mean_ci_relative_width([2.0, 2.0, 2.0]), 0.0)
+        self.assertLess(baseline.mean_ci_relative_width(FAST), 0.05)
+
+    def test_higher_is_better(self):
+        """Test throughput-style metrics are higher-is-better."""
+        self.assertFalse(baseline.higher_is_better(baseline.EXECUTION_TIME))
+        self.assertTrue(baseline.higher_is_better('read_iops'))
+        self.assertTrue(baseline.higher_is_better('throughput_mbps'))
+        self.assertFalse(baseline.higher_is_better('latency_ms'))
+
+
+class TestCompare(unittest.TestCase):
+    """Test the regression verdicts."""
+
+    def test_slower_wall_time_is_a_regression(self):
+        """Test a significant, material slowdown."""
+        row = baseline.compare_metric(baseline.EXECUTION_TIME, FAST, SLOW)
+        self.assertTrue(row['significant'])
+        self.assertTrue(row['regression'])
+        self.assertAlmostEqual(row['median_change_pct'], 20.0)
+        self.assertEqual(set(row['candidate']), {'count', 'mean', 'p50', 'p95', 'p99', 'mean_ci95'})
+
+    def test_direction_follows_the_metric(self):
+        """Test more IOPS is an improvement, not a regression."""
+        row = baseline.compare_metric('read_iops', FAST, SLOW)
+        self.assertFalse(row['regression'])
+        self.assertTrue(row['improvement'])
+
+    def test_small_or_noisy_changes_are_not_regressions(self):
+        """Test the threshold and the significance level both apply."""
+        self.assertFalse(baseline.compare_metric('latency_ms', FAST, SLOW, threshold_pct=25)['regression'])
+        self.assertFalse(baseline.compare_metric('latency_ms', FAST[:2], SLOW[:2])['regression'])
+
+    def test_compare_runs(self):
+        """Test only shared metrics are compared, wall time first."""
+        rows = baseline.compare_runs(
+            {'zeta': FAST, baseline.EXECUTION_TIME: FAST, 'only_base': FAST, 'empty': []},
+            {'zeta': FAST, baseline.EXECUTION_TIME: SLOW, 'empty': []},
+        )
+        self.assertEqual([row['metric'] for row in rows], [baseline.EXECUTION_TIME, 'zeta'])
+
+
+class HistoryTestCase(unittest.TestCase):
+    """Scratch output directory holding a baseline history."""
+
+    def setUp(self):
+        """Create the output directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        """Remove the output directory."""
+        self._tmp.cleanup()
+
+    def record(self, timestamp, durations, is_baseline=False, **metrics):
+        with baseline.BaselineStore.for_output_dir(self.output_dir) as store:
+            return store.record_run('suite', timestamp, ['bench', 'cmd'],
+                                    {baseline.EXECUTION_TIME: durations, **metrics},
+                                    len(durations), is_baseline=is_baseline)
+
+
+class TestBaselineStore(HistoryTestCase):
+    """Test the SQLite history."""
+
+    def test_record_and_find(self):
+        """Test samples round-trip and the latest run is found."""
+        first = self.record('20261018T100000Z', FAST, read_iops=[100.0, 110.0])
+        second = self.record('20261018T110000Z', SLOW)
+        with baseline.BaselineStore.for_output_dir(self.output_dir) as store:
+            self.assertEqual(store.samples(first), {baseline.EXECUTION_TIME: FAST, 'read_iops': [100.0, 110.0]})
+            self.assertEqual(store.find_run('suite')['id'], second)
+            self.assertEqual(store.find_run('suite', '20261018T100000Z')['id'], first)
+            self.assertIsNone(store.find_run('other'))
+            self.assertEqual(store.find_run('suite')['command'], 'bench cmd')
+
+    def test_find_baseline(self):
+        """Test the latest flagged baseline wins over the previous run."""
+        flagged = self.record('20261018T090000Z', FAST, is_baseline=True)
+        previous = self.record('20261018T100000Z', FAST)
+        self.record('20261018T110000Z', SLOW)
+        with baseline.BaselineStore.for_output_dir(self.output_dir) as store:
+            self.assertEqual(store.find_baseline('suite', '20261018T110000Z')['id'], flagged)
+            self.assertIsNone(store.find_baseline('suite', '20261018T090000Z'))
+            store.conn.execute('UPDATE runs SET is_baseline = 0')
+            self.assertEqual(store.find_baseline('suite', '20261018T110000Z')['id'], previous)
+
+    def test_rerecord_replaces_samples(self):
+        """Test recording the same run again does not duplicate its samples."""
+        self.record('20261018T100000Z', FAST)
+        run_id = self.record('20261018T100000Z', SLOW)
+        with baseline.BaselineStore.for_output_dir(self.output_dir) as store:
+            self.assertEqual(store.samples(run_id), {baseline.EXECUTION_TIME: SLOW})
+            self.assertEqual(store.conn.execute('SELECT COUNT(*) FROM samples').fetchone()[0], len(SLOW))
+
+
+class TestCompareCommand(HistoryTestCase):
+    """Test 'benchmark_aggregator.py compare'."""
+
+    def compare(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            rc = aggregator.main(['compare', '--name', 'suite', '-o', str(self.output_dir), *args])
+        return rc, stdout.getvalue(), stderr.getvalue()
+
+    def test_regression_exits_1(self):
+        """Test a regressed candidate fails and the reports are written."""
+        self.record('20261018T100000Z', FAST, is_baseline=True)
+        self.record('20261018T110000Z', SLOW)
+        rc, out, err = self.compare()
+        self.assertEqual(rc, 1)
+        self.assertIn('| execution_time |', out)
+        self.assertIn('REGRESSION', out)
+        self.assertIn('Significant regression in: execution_time', err)
+        report = json.loads((self.output_dir / 'suite_20261018T110000Z_vs_20261018T100000Z.compare.json').read_text())
+        self.assertEqual(report['regressions'], [baseline.EXECUTION_TIME])
+        self.assertTrue((self.output_dir / 'suite_20261018T110000Z_vs_20261018T100000Z.compare.md').exists())
+
+    def test_promote(self):
+        """Test --promote flags a candidate without regressions as the new baseline."""
+        self.record('20261018T100000Z', SLOW, is_baseline=True)
+        candidate = self.record('20261018T110000Z', FAST)
+        rc, out, _ = self.compare('--promote')
+        self.assertEqual(rc, 0)
+        self.assertIn('improvement', out)
+        with baseline.BaselineStore.for_output_dir(self.output_dir) as store:
+            self.assertEqual(store.find_baseline('suite', '20261018T120000Z')['id'], candidate)
+
+    def test_explicit_runs(self):
+        """Test --candidate and --baseline select stored runs."""
+        self.record('20261018T100000Z', FAST)
+        self.record('20261018T110000Z', SLOW)
+        self.record('20261018T120000Z', FAST)
+        rc, _, _ = self.compare('--candidate', '20261018T110000Z', '--baseline', '20261018T120000Z')
+        self.assertEqual(rc, 1)
+
+    def test_missing_runs_exit_2(self):
+        """Test a missing candidate or baseline."""
+        self.assertEqual(self.compare()[0], 2)
+        self.record('20261018T100000Z', FAST)
+        rc, _, err = self.compare()
+        self.assertEqual(rc, 2)
+        self.assertIn('No baseline run', err)
+
+
+class TestAggregatorHistory(HistoryTestCase):
+    """Test that aggregator runs land in the history."""
+
+    def test_run_is_recorded(self):
+        """Test wall time and JSON metrics are stored, flagged as baseline on request."""
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            rc = aggregator.main(['-n', '3', '-w', '0', '-o', str(self.output_dir), '--name', 'suite',
+                                  '--set-baseline', '--', sys.executable, '-c', 'print(\'{"read_iops": 42}\')'])
+        self.assertEqual(rc, 0)
+        with baseline.BaselineStore.for_output_dir(self.output_dir) as store:
+            run = store.find_run('suite')
+            self.assertTrue(run['is_baseline'])
+            self.assertEqual(run['iterations'], 3)
+            samples = store.samples(run['id'])
+        self.assertEqual(samples['read_iops'], [42.0, 42.0, 42.0])
+        self.assertEqual(len(samples[baseline.EXECUTION_TIME]), 3)
+        stats = json.loads(next(self.output_dir.glob('suite_*.json')).read_text())
+        self.assertIn('p99', stats['execution_time_stats'])
+
+
+if __name__ == '__main__':
+    unittest.main()
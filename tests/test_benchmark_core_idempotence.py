@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000113
+# File Type: Python Test Script
+# Test Type: Benchmark Harness Validation
+# Description: Test scheduling, sharding and result parsing of the core idempotence benchmark
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test the core role idempotence benchmark without docker."""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import benchmark_core_idempotence as bench  # noqa: E402
+
+
+def role_result(role, status='idempotent', changed=0):
+    return bench.RoleResult(
+        role=role,
+        status=status,
+        duration_seconds=1.0,
+        changed_second_run=changed,
+        failed_second_run=0,
+        unreachable_second_run=0,
+        recap_line_second_run=None,
+        failure_excerpt=None,
+        log_path=f'logs/core_{role}.log',
+        playbook_path=f'playbooks/core_{role}.yml',
+    )
+
+
+def task_event(event, name, task_id, hosts, start='2026-10-18T10:00:00.000000Z', end='2026-10-18T10:00:01.500000Z'):
+    return {
+        '_event': event,
+        'task': {'name': name, 'id': task_id, 'path': f'/workspace/roles/core/demo/tasks/main.yml:{task_id}',
+                 'duration': {'start': start, 'end': end}},
+        'hosts': hosts,
+    }
+
+
+def stats_event(**stats):
+    return {'_event': 'v2_playbook_on_stats', 'stats': {'localhost': stats}}
+
+
+def write_events(path, events, tail=''):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(json.dumps(event) + '\n' for event in events) + tail)
+
+
+IDEMPOTENT_RUN = [
+    {'_event': 'v2_playbook_on_start'},
+    task_event('v2_runner_on_ok', 'Install packages', '1', {'localhost': {'changed': False}}),
+    task_event('v2_runner_on_skipped', 'Debian only', '2', {'localhost': {}}),
+    stats_event(ok=1, changed=0, failures=0, unreachable=0, skipped=1, rescued=0, ignored=0),
+]
+
+NON_IDEMPOTENT_RUN = [
+    task_event('v2_runner_on_ok', 'Install packages', '1', {'localhost': {'changed': False}}),
+    task_event('v2_runner_on_ok', 'Template | config', '3', {'localhost': {'changed': True}},
+               end='2026-10-18T10:00:00.250000Z'),
+    stats_event(ok=2, changed=1, failures=0, unreachable=0, skipped=0, rescued=0, ignored=0),
+]
+
+
+class FakeDocker:
+    """Record docker commands; ``docker run -d`` returns a new container id."""
+
+    def __init__(self):
+        self.commands = []
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, cmd, **kwargs):
+        with self.lock:
+            self.commands.append(cmd)
+            if cmd[:3] == ['docker', 'run', '-d']:
+                self.started += 1
+                return 0, f'container-{self.started}\n'
+        return 0, ''
+
+    def removed(self):
+        return [cmd[-1] for cmd in self.commands if cmd[:3] == ['docker', 'rm', '-f']]
+
+
+class TestSharding(unittest.TestCase):
+    """Test --shard parsing and role selection."""
+
+    def test_parse_shard(self):
+        """Test valid and invalid i/N values."""
+        self.assertEqual(bench.parse_shard('2/4'), (2, 4))
+        self.assertEqual(bench.parse_shard(' 1 / 1 '), (1, 1))
+        for value in ('0/4', '5/4', '1/0', '2', 'a/b'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                bench.parse_shard(value)
+
+    def test_shards_partition_roles(self):
+        """Test the shards are disjoint, cover every role and stay balanced."""
+        roles = [f'role{n:02d}' for n in range(11)]
+        shards = [bench.shard_roles(roles, (index, 4)) for index in range(1, 5)]
+        self.assertEqual(sorted(sum(shards, [])), roles)
+        self.assertEqual([len(shard) for shard in shards], [3, 3, 3, 2])
+        self.assertEqual(bench.shard_roles(roles, None), roles)
+
+
+class TestWarmContainerPool(unittest.TestCase):
+    """Test the pre-started runner pool."""
+
+    def setUp(self):
+        """Patch docker."""
+        self.docker = FakeDocker()
+        patch = mock.patch.object(bench, 'run_command', self.docker)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_every_role_gets_a_fresh_container(self):
+        """Test containers are never reused and no more are started than roles."""
+        pool = bench.WarmContainerPool(repo_root=Path('/repo'), image='warm', size=2, total=3)
+        pool.start()
+        self.assertEqual(self.docker.started, 2)
+
+        used = []
+        for _ in range(3):
+            container = pool.acquire()
+            used.append(container)
+            pool.release(container)
+        pool.close()
+
+        self.assertEqual(len(set(used)), 3)
+        self.assertEqual(self.docker.started, 3)
+        self.assertEqual(sorted(self.docker.removed()), sorted(used))
+
+    def test_small_runs_do_not_overfill(self):
+        """Test a pool larger than the role count only starts what is needed."""
+        pool = bench.WarmContainerPool(repo_root=Path('/repo'), image='warm', size=4, total=1)
+        pool.start()
+        pool.release(pool.acquire())
+        pool.close()
+        self.assertEqual(self.docker.started, 1)
+
+    def test_start_failure(self):
+        """Test a failing docker run is reported."""
+        with mock.patch.object(bench, 'run_command', return_value=(125, 'no such image')):
+            pool = bench.WarmContainerPool(repo_root=Path('/repo'), image='missing', size=1, total=1)
+            with self.assertRaisesRegex(RuntimeError, 'no such image'):
+                pool.start()
+
+
+class TestBenchmarkRoles(unittest.TestCase):
+    """Test concurrent scheduling of role benchmarks."""
+
+    def setUp(self):
+        """Patch docker and the per-role benchmark."""
+        self.docker = FakeDocker()
+        self.running = 0
+        self.peak = 0
+        self.containers = []
+        self.lock = threading.Lock()
+        for target, value in (('run_command', self.docker), ('benchmark_role', self.fake_role)):
+            patch = mock.patch.object(bench, target, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fake_role(self, *, role, container=None, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.containers.append(container)
+        # later roles finish first
+        time.sleep(0.02 * (5 - int(role[-1])))
+        with self.lock:
+            self.running -= 1
+        return role_result(role)
+
+    def run_roles(self, jobs, warm_pool):
+        with mock.patch('builtins.print'):
+            return bench.benchmark_roles(
+                repo_root=Path('/repo'), image='warm', roles=[f'role{n}' for n in range(5)],
+                role_timeout=60, run_dir=Path('/repo/run'), jobs=jobs, warm_pool=warm_pool,
+            )
+
+    def test_jobs_bound_concurrency_and_order_is_stable(self):
+        """Test at most ``jobs`` roles run at once and results keep role order."""
+        results = self.run_roles(jobs=3, warm_pool=False)
+        self.assertEqual([r.role for r in results], [f'role{n}' for n in range(5)])
+        self.assertGreater(self.peak, 1)
+        self.assertLessEqual(self.peak, 3)
+        self.assertEqual(self.containers, [None] * 5)
+        self.assertEqual(self.docker.commands, [])
+
+    def test_warm_pool(self):
+        """Test every role runs in its own warm container, all removed afterwards."""
+        self.run_roles(jobs=2, warm_pool=True)
+        self.assertEqual(len(set(self.containers)), 5)
+        self.assertNotIn(None, self.containers)
+        self.assertEqual(sorted(self.docker.removed()), sorted(self.containers))
+
+
+class TestMergeSummaries(unittest.TestCase):
+    """Test merging shard summaries."""
+
+    def test_merge(self):
+        """Test shard results are combined in role order with the overall time span."""
+        with tempfile.TemporaryDirectory() as tmp:
+            repo_root = Path(tmp)
+            dsu_root = repo_root / 'dsu'
+            sources = []
+            for shard, roles, started, ended in (
+                ('1/2', ['beta', 'delta'], '2026-10-18T10:00:00', '2026-10-18T10:20:00'),
+                ('2/2', ['alpha', 'gamma'], '2026-10-18T09:55:00', '2026-10-18T10:10:00'),
+            ):
+                run_dir = dsu_root / 'ci-artifacts' / 'idempotence' / shard.replace('/', 'of')
+                run_dir.mkdir(parents=True)
+                results = [role_result(role, 'non_idempotent' if role == 'gamma' else 'idempotent')
+                           for role in roles]
+                bench.write_summaries(
+                    repo_root=repo_root, dsu_root=dsu_root, run_dir=run_dir, run_id=shard,
+                    results=results, started_at=started, ended_at=ended, extra={'shard': shard},
+                )
+                sources.append(run_dir)
+
+            json_path, md_path = bench.merge_summaries(
+                repo_root=repo_root, dsu_root=dsu_root, sources=sources, run_id='merged',
+            )
+            payload = json.loads(json_path.read_text())
+            self.assertEqual([r['role'] for r in payload['results']], ['alpha', 'beta', 'delta', 'gamma'])
+            self.assertEqual(payload['summary_counts'], {'idempotent': 3, 'non_idempotent': 1})
+            self.assertEqual(payload['started_at_utc'], '2026-10-18T09:55:00')
+            self.assertEqual(payload['ended_at_utc'], '2026-10-18T10:20:00')
+            self.assertEqual(payload['merged_shards'], ['1/2', '2/2'])
+            self.assertIn('- Non-idempotent: 1', md_path.read_text())
+            self.assertEqual((dsu_root / 'ci-artifacts' / 'idempotence' / 'LATEST_RUN.txt').read_text(), 'merged\n')
+
+
+class TestSummarizeEvents(unittest.TestCase):
+    """Test reading the jsonl callback output."""
+
+    def setUp(self):
+        """Create a scratch directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        self._tmp.cleanup()
+
+    def test_recap_and_tasks(self):
+        """Test the recap, per-task counters and durations."""
+        path = self.tmp / 'run.jsonl'
+        write_events(path, NON_IDEMPOTENT_RUN + [
+            task_event('v2_runner_on_ok', 'Install packages', '1', {'localhost': {'changed': True}}),
+        ])
+        summary = bench.summarize_events(path)
+        self.assertEqual(summary.events, 4)
+        self.assertEqual(summary.recap, {'ok': 2, 'changed': 1, 'unreachable': 0, 'failed': 0,
+                                         'skipped': 0, 'rescued': 0, 'ignored': 0})
+        self.assertEqual(bench.format_recap(summary.recap),
+                         'localhost : ok=2 changed=1 unreachable=0 failed=0 skipped=0 rescued=0 ignored=0')
+        install = summary.tasks['1']
+        self.assertEqual((install.ok, install.changed, install.duration_seconds), (2, 1, 3.0))
+        self.assertEqual((summary.tasks['3'].changed, summary.tasks['3'].duration_seconds), (1, 0.25))
+        self.assertIsNone(summary.failure_excerpt)
+
+    def test_failures_stray_lines_and_truncation(self):
+        """Test the first failure is kept and unparsable or cut-off lines are skipped."""
+        path = self.tmp / 'run.jsonl'
+        write_events(path, [
+            task_event('v2_runner_on_failed', 'Start service', '4', {'localhost': {'msg': 'unit not found'}}),
+            task_event('v2_runner_on_unreachable', 'Ping', '5', {'localhost': {'msg': 'ssh down'}}),
+        ], tail='[WARNING]: stray callback warning\n{"_event": "v2_playbook_on_st')
+        summary = bench.summarize_events(path)
+        self.assertEqual(summary.events, 2)
+        self.assertIsNone(summary.recap)
+        self.assertEqual(summary.failure_excerpt, 'fatal: [localhost]: FAILED! => unit not found')
+        self.assertEqual(summary.tasks['5'].unreachable, 1)
+
+    def test_missing_file(self):
+        """Test a run that never started yields an empty summary."""
+        summary = bench.summarize_events(self.tmp / 'missing.jsonl')
+        self.assertEqual((summary.recap, summary.events, summary.tasks), (None, 0, {}))
+
+    def test_first_error_line(self):
+        """Test the first ERROR! line of a stderr log is returned."""
+        log = self.tmp / 'stderr.log'
+        log.write_text("[WARNING]: noise\nERROR! the role 'core/demo' was not found\nERROR! second\n")
+        self.assertEqual(bench.first_error_line(log), "ERROR! the role 'core/demo' was not found")
+        self.assertIsNone(bench.first_error_line(self.tmp / 'missing.log'))
+
+
+class TestBenchmarkRole(unittest.TestCase):
+    """Test classification of the second run from the captured event files."""
+
+    def setUp(self):
+        """Create a scratch repository."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo_root = Path(self._tmp.name)
+        self.run_dir = self.repo_root / 'ci-artifacts' / 'run'
+        self.logs = self.run_dir / 'logs'
+
+    def tearDown(self):
+        """Remove the scratch repository."""
+        self._tmp.cleanup()
+
+    def run_role(self, runs, rc=0, stderr=None, timeout=False):
+        """Benchmark core/demo with a container that writes ``runs`` as the event files."""
+        commands = []
+
+        def container(cmd, **kwargs):
+            commands.append(cmd)
+            for number, events in enumerate(runs, start=1):
+                write_events(self.logs / f'core_demo.run{number}.jsonl', events)
+            if stderr:
+                (self.logs / 'core_demo.run2.stderr.log').write_text(stderr)
+            if timeout:
+                raise bench.subprocess.TimeoutExpired(cmd, 60, output=b'partial output')
+            return rc, 'container output'
+
+        with mock.patch.object(bench, 'run_command', container):
+            result = bench.benchmark_role(repo_root=self.repo_root, image='runner', role='demo',
+                                          role_timeout=60, run_dir=self.run_dir, container='warm-1')
+        self.commands = commands
+        return result
+
+    def test_idempotent(self):
+        """Test a clean second run through the warm container."""
+        result = self.run_role([NON_IDEMPOTENT_RUN, IDEMPOTENT_RUN])
+        self.assertEqual(result.status, 'idempotent')
+        self.assertEqual(result.changed_second_run, 0)
+        self.assertEqual(result.changed_tasks_second_run, [])
+        self.assertEqual(self.commands[0][:5], ['docker', 'exec', '-w', '/workspace', 'warm-1'])
+        script = self.commands[0][-1]
+        self.assertIn('ANSIBLE_STDOUT_CALLBACK=ansible.posix.jsonl', script)
+        self.assertIn('> /workspace/ci-artifacts/run/logs/core_demo.run2.jsonl', script)
+        self.assertEqual(result.events_paths, ['ci-artifacts/run/logs/core_demo.run1.jsonl',
+                                               'ci-artifacts/run/logs/core_demo.run2.jsonl'])
+
+    def test_non_idempotent_reports_changed_tasks(self):
+        """Test changed tasks of the second run are listed and written to the task report."""
+        result = self.run_role([IDEMPOTENT_RUN, NON_IDEMPOTENT_RUN])
+        self.assertEqual(result.status, 'non_idempotent')
+        self.assertEqual(result.recap_line_second_run,
+                         'localhost : ok=2 changed=1 unreachable=0 failed=0 skipped=0 rescued=0 ignored=0')
+        self.assertEqual([task['name'] for task in result.changed_tasks_second_run], ['Template | config'])
+        report = json.loads((self.repo_root / result.task_report_path).read_text())
+        self.assertEqual(len(report), 2)
+
+    def test_failed_without_recap(self):
+        """Test a second run that died with an ERROR! line is a failure, not a missing recap."""
+        result = self.run_role([IDEMPOTENT_RUN, []], stderr='ERROR! conflicting action statements\n')
+        self.assertEqual(result.status, 'failed')
+        self.assertEqual(result.failure_excerpt, 'ERROR! conflicting action statements')
+
+    def test_no_recap(self):
+        """Test a second run without a recap or error."""
+        self.assertEqual(self.run_role([IDEMPOTENT_RUN, IDEMPOTENT_RUN[:2]]).status, 'error_no_recap')
+
+    def test_container_error(self):
+        """Test a non-zero docker exit."""
+        self.assertEqual(self.run_role([IDEMPOTENT_RUN, IDEMPOTENT_RUN], rc=125).status, 'error_container')
+
+    def test_timeout_keeps_partial_events(self):
+        """Test a timed-out role still reads the events written before it was killed."""
+        result = self.run_role([IDEMPOTENT_RUN, NON_IDEMPOTENT_RUN[:2]], timeout=True)
+        self.assertEqual(result.status, 'error_timeout')
+        self.assertEqual(result.failure_excerpt, 'Timed out after 60s')
+        self.assertEqual(len(result.changed_tasks_second_run), 1)
+        self.assertEqual((self.repo_root / result.log_path).read_text(), 'partial output')
+
+
+if __name__ == '__main__':
+    unittest.main()
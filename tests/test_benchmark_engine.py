@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000111
+# File Type: Python Test Script
+# Test Type: Benchmark Engine Validation
+# Description: Test fio/ping/iperf3 parsing and the exec prefix of the benchmark engine
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test the native benchmark engine against fake tools."""
+
+import json
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts' / 'benchmark'))
+
+import benchmark_engine as engine  # noqa: E402
+
+FIO_REPORT = {
+    'jobs': [
+        {
+            'jobname': 'randrw_4k_qd16',
+            'read': {'io_bytes': 4096, 'iops': 1200.5, 'bw': 4802,
+                     'clat_ns': {'percentile': {'50.000000': 250000, '99.000000': 1500000}}},
+            'write': {'io_bytes': 4096, 'iops': 400.0, 'bw': 1600,
+                      'clat_ns': {'percentile': {'50.000000': 300000}}},
+        },
+        {
+            'jobname': 'read_1m_qd8',
+            'read': {'io_bytes': 1 << 20, 'iops': 90.0, 'bw': 92160,
+                     'clat': {'percentile': {'99.000000': 800.0}}},
+            'write': {'io_bytes': 0, 'iops': 0.0, 'bw': 0},
+        },
+    ],
+}
+
+# Stands in for "podman exec <container>": logs the command, then runs it
+# with the fake tools first on PATH.
+PREFIX_SCRIPT = '''#!/bin/sh
+echo "$*" >> "{log}"
+PATH="{bin}:$PATH" exec "$@"
+'''
+
+
+class TestParsers(unittest.TestCase):
+    """Test parsing of the tools' output."""
+
+    def test_parse_profiles(self):
+        """Test rw:bs:iodepth[:rwmixread] profile specs."""
+        profiles = engine.parse_profiles('randread:4k:32, randrw:4k:16:75,')
+        self.assertEqual([p.name for p in profiles], ['randread_4k_qd32', 'randrw_4k_qd16'])
+        self.assertEqual(profiles[1].fio_args()[-1], '--rwmixread=75')
+        with self.assertRaises(ValueError):
+            engine.parse_profiles('randread:4k')
+
+    def test_parse_fio(self):
+        """Test flattening of a fio report, including legacy names and clat units."""
+        metrics = engine.parse_fio(FIO_REPORT)
+        self.assertEqual(metrics['randrw_4k_qd16_read_iops'], 1200.5)
+        self.assertEqual(metrics['randrw_4k_qd16_read_clat_p50_us'], 250.0)
+        self.assertEqual(metrics['randrw_4k_qd16_read_clat_p99_us'], 1500.0)
+        self.assertEqual(metrics['read_iops'], 1200.5)
+        self.assertEqual(metrics['write_bw_kb'], 1600.0)
+        # fio < 3 reports clat in usec already
+        self.assertEqual(metrics['read_1m_qd8_read_clat_p99_us'], 800.0)
+        # directions without I/O are skipped
+        self.assertNotIn('read_1m_qd8_write_iops', metrics)
+
+    def test_parse_ping(self):
+        """Test ping summary parsing."""
+        output = ('5 packets transmitted, 5 received, 0% packet loss, time 4005ms\n'
+                  'rtt min/avg/max/mdev = 0.031/0.045/0.062/0.011 ms\n')
+        self.assertEqual(engine.parse_ping(output), {
+            'latency_ms': 0.045, 'latency_min_ms': 0.031, 'latency_max_ms': 0.062,
+            'latency_mdev_ms': 0.011, 'packet_loss_pct': 0.0,
+        })
+
+    def test_parse_iperf3(self):
+        """Test iperf3 JSON parsing."""
+        report = {'end': {'sum_sent': {'bits_per_second': 9.5e9, 'retransmits': 3},
+                          'sum_received': {'bits_per_second': 9.4e9},
+                          'cpu_utilization_percent': {'host_total': 12.5}}}
+        self.assertEqual(engine.parse_iperf3(report), {
+            'throughput_mbps': 9500.0, 'throughput_received_mbps': 9400.0,
+            'retransmits': 3.0, 'sender_cpu_pct': 12.5,
+        })
+
+
+class TestRunStorage(unittest.TestCase):
+    """Test run_storage through an exec prefix with a fake fio."""
+
+    def setUp(self):
+        """Set up the fake fio and exec prefix."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.log = self.tmp / 'prefix.log'
+        fake_bin = self.tmp / 'bin'
+        fake_bin.mkdir()
+        (self.tmp / 'report.json').write_text(json.dumps(FIO_REPORT))
+        self._script(fake_bin / 'fio', f'#!/bin/sh\necho "fio: notice"\ncat "{self.tmp}/report.json"\n')
+        self.prefix = [str(self._script(self.tmp / 'exec', PREFIX_SCRIPT.format(log=self.log, bin=fake_bin)))]
+
+    def tearDown(self):
+        """Remove the fake tools."""
+        self._tmp.cleanup()
+
+    @staticmethod
+    def _script(path, body):
+        path.write_text(body)
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+        return path
+
+    def test_creates_target_through_prefix(self):
+        """Test the target directory is created inside the prefix before fio runs."""
+        target = self.tmp / 'evidence' / 'benchmark'
+        sample = engine.run_storage(str(target), prefix=self.prefix, runtime=1)
+
+        self.assertTrue(target.is_dir())
+        commands = self.log.read_text().splitlines()
+        self.assertEqual(commands[0], f'mkdir -p {target}')
+        self.assertTrue(commands[1].startswith('fio --output-format=json'))
+        self.assertIn(f'--filename={target}/fio_test_file', commands[1])
+        self.assertEqual(sample.metrics['read_iops'], 1200.5)
+        self.assertEqual(len(sample.rusage), 2)
+
+    def test_mkdir_failure_stops_before_fio(self):
+        """Test an uncreatable target raises EngineError without running fio."""
+        blocker = self.tmp / 'file'
+        blocker.write_text('')
+        with self.assertRaises(engine.EngineError) as ctx:
+            engine.run_storage(str(blocker / 'benchmark'), prefix=self.prefix, runtime=1)
+        self.assertTrue(str(ctx.exception).startswith(f'{self.prefix[0]} exited with 1'))
+        self.assertEqual(len(self.log.read_text().splitlines()), 1)
+
+    def test_no_profiles(self):
+        """Test an empty profile list is rejected."""
+        with self.assertRaises(ValueError):
+            engine.run_storage(str(self.tmp), profiles=(), prefix=self.prefix)
+
+
+class TestIperf3Server(unittest.TestCase):
+    """Test the iperf3 server is started once per exec prefix."""
+
+    def setUp(self):
+        """Set up a slow fake pgrep that finds no server, a fake iperf3 and the exec prefix."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.log = self.tmp / 'prefix.log'
+        fake_bin = self.tmp / 'bin'
+        fake_bin.mkdir()
+        TestRunStorage._script(fake_bin / 'pgrep', '#!/bin/sh\nsleep 0.2\nexit 1\n')
+        TestRunStorage._script(fake_bin / 'iperf3', '#!/bin/sh\nexit 0\n')
+        self.prefix = [str(TestRunStorage._script(self.tmp / 'exec',
+                                                  PREFIX_SCRIPT.format(log=self.log, bin=fake_bin)))]
+        self.addCleanup(engine._IPERF_SERVER_READY.pop, tuple(self.prefix), None)
+
+    def tearDown(self):
+        """Remove the fake tools."""
+        self._tmp.cleanup()
+
+    def test_concurrent_callers_start_one_server(self):
+        """Test parallel iterations do not each start a server on the same port."""
+        errors = []
+
+        def ensure():
+            try:
+                engine.ensure_iperf3_server(self.prefix, engine.EngineSample())
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=ensure) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.log.read_text().splitlines(), ['pgrep -x iperf3', 'iperf3 -s -D'])
+        engine.ensure_iperf3_server(self.prefix, engine.EngineSample())
+        self.assertEqual(len(self.log.read_text().splitlines()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000116
+# File Type: Python Test Script
+# Test Type: Compliance Report Validation
+# Description: Test the scan cache, include graph, control index and query command of the compliance report
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test compliance_report.py against a small fixture roles tree."""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import compliance_report as report  # noqa: E402
+
+FIXTURE_FILES = {
+    'security/sshd/tasks/main.yml': '''---
+- name: "NIST AC-6 | Restrict root login"
+  ansible.builtin.debug:
+    msg: root
+  tags:
+    - nist_ac_6
+    - cis_5_2_1
+
+- name: Import hardening
+  ansible.builtin.import_tasks: hardening.yml
+  tags:
+    - stig_v_230264
+
+- name: Include OS specifics
+  ansible.builtin.include_tasks: "os/{{ ansible_os_family }}.yml"
+  tags:
+    - nist_cm_6
+
+- name: Crypto block
+  tags:
+    - iso_27001_8_26
+  block:
+    - name: Set ciphers
+      ansible.builtin.debug:
+        msg: ciphers
+  rescue:
+    - name: Report cipher failure
+      ansible.builtin.debug:
+        msg: failed
+
+- name: Untagged task
+  ansible.builtin.debug:
+    msg: nothing
+''',
+    'security/sshd/tasks/hardening.yml': '''---
+- name: Disable password auth
+  ansible.builtin.debug:
+    msg: password
+  tags: [cis_5_2_2]
+
+- name: Import deeper checks
+  ansible.builtin.import_tasks: deep.yml
+''',
+    # imports hardening.yml back: the cycle must not be followed
+    'security/sshd/tasks/deep.yml': '''---
+- name: Encrypt transport
+  ansible.builtin.debug:
+    msg: tls
+  tags: nist_sc_8
+
+- name: Import hardening again
+  ansible.builtin.import_tasks: "{{ role_path }}/tasks/hardening.yml"
+''',
+    'security/sshd/tasks/os/Debian.yml': '''---
+- name: Debian packages
+  ansible.builtin.debug:
+    msg: apt
+  tags: [cis_1_1]
+''',
+    'security/sshd/tasks/os/RedHat.yml': '''---
+- name: RedHat packages
+  ansible.builtin.debug:
+    msg: dnf
+''',
+    # not valid YAML: picked up by the line scanner
+    'core/base/tasks/main.yml': '''---
+- name: Base hardening
+  tags:
+    - cis_5_2_1
+  bogus: [unclosed
+''',
+}
+
+# (task, effective tags, file) in walk order for security/sshd
+SSHD_WALK = [
+    ('NIST AC-6 | Restrict root login', ['nist_ac_6', 'cis_5_2_1'], 'main.yml'),
+    ('Import hardening', ['stig_v_230264'], 'main.yml'),
+    ('Disable password auth', ['stig_v_230264', 'cis_5_2_2'], 'hardening.yml'),
+    ('Import deeper checks', ['stig_v_230264'], 'hardening.yml'),
+    ('Encrypt transport', ['stig_v_230264', 'nist_sc_8'], 'deep.yml'),
+    ('Import hardening again', ['stig_v_230264'], 'deep.yml'),
+    ('Include OS specifics', ['nist_cm_6'], 'main.yml'),
+    ('Debian packages', ['cis_1_1'], 'Debian.yml'),
+    ('RedHat packages', [], 'RedHat.yml'),
+    ('Set ciphers', ['iso_27001_8_26'], 'main.yml'),
+    ('Report cipher failure', ['iso_27001_8_26'], 'main.yml'),
+    ('Untagged task', [], 'main.yml'),
+]
+
+
+class FixtureTestCase(unittest.TestCase):
+    """Fixture roles tree with its cache and index under a scratch directory."""
+
+    def setUp(self):
+        """Write the fixture roles."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.roles = self.root / 'roles'
+        for relpath, content in FIXTURE_FILES.items():
+            path = self.roles / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        self.cache_path = self.root / '.cache' / 'compliance_scan.json'
+        self.index_path = self.root / '.cache' / 'compliance_index.sqlite3'
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        self._tmp.cleanup()
+
+    def scan(self, cache=True):
+        generator = report.ComplianceReportGenerator(
+            str(self.roles), str(self.cache_path) if cache else None, 1, str(self.index_path))
+        generator.scan_roles()
+        self.addCleanup(generator.index.close)
+        return generator
+
+    def task_file(self, relpath):
+        return self.roles / 'security' / 'sshd' / 'tasks' / relpath
+
+
+class TestIncludeGraph(FixtureTestCase):
+    """Test the include/import walk and tag inheritance."""
+
+    def test_walk(self):
+        """Test transitive imports, include globs, blocks and cycles in walk order."""
+        generator = self.scan()
+        rows = generator.index.conn.execute(
+            "SELECT name, tags, file FROM tasks WHERE role = 'security/sshd' ORDER BY id").fetchall()
+        self.assertEqual([(name, json.loads(tags), Path(file).name) for name, tags, file in rows], SSHD_WALK)
+        self.assertEqual(rows[0][2], 'roles/security/sshd/tasks/main.yml')
+
+    def test_role_stats(self):
+        """Test a task counts once towards coverage and controls are counted per framework."""
+        stats = self.scan().role_stats['security/sshd']
+        self.assertEqual((stats['total_tasks'], stats['tagged_tasks']), (12, 10))
+        self.assertEqual((stats['cis_controls'], stats['stig_controls'], stats['nist_controls'],
+                          stats['iso_controls']), (3, 1, 3, 1))
+
+    def test_resolve_include(self):
+        """Test role_path substitution, Jinja globs and fully dynamic targets."""
+        generator = report.ComplianceReportGenerator(str(self.roles))
+        self.addCleanup(generator.index.close)
+        role = self.roles / 'security' / 'sshd'
+        main = self.task_file('main.yml')
+        self.assertEqual(generator._resolve_include('{{ role_path }}/tasks/deep.yml', role, main),
+                         [role / 'tasks' / 'deep.yml'])
+        self.assertEqual(generator._resolve_include('os/{{ ansible_os_family }}.yml', role, main),
+                         [role / 'tasks' / 'os' / 'Debian.yml', role / 'tasks' / 'os' / 'RedHat.yml'])
+        # relative to the including file first, then the role's tasks directory
+        self.assertEqual(generator._resolve_include('hardening.yml', role, self.task_file('os/Debian.yml')),
+                         [role / 'tasks' / 'hardening.yml'])
+        self.assertEqual(generator._resolve_include('{{ item }}', role, main), [])
+        self.assertEqual(generator._resolve_include('missing.yml', role, main), [])
+
+    def test_fallback_parser(self):
+        """Test invalid YAML is still scanned and reported."""
+        generator = self.scan()
+        self.assertEqual(generator.role_stats['core/base']['tagged_tasks'], 1)
+        self.assertEqual(list(generator.parse_errors),
+                         [str((self.roles / 'core' / 'base' / 'tasks' / 'main.yml').resolve())])
+
+
+class TestScanCache(FixtureTestCase):
+    """Test reuse and invalidation of the scan cache."""
+
+    def key(self, relpath):
+        return str(self.task_file(relpath).resolve())
+
+    def test_unchanged_files_are_not_reread(self):
+        """Test a second scan is served from the cache."""
+        first = self.scan()
+        self.assertEqual((first.cache.hits, first.cache.misses), (0, 6))
+        second = self.scan()
+        self.assertEqual((second.cache.hits, second.cache.misses), (6, 0))
+        self.assertEqual(second.file_timings, {})
+        self.assertEqual(second.role_stats, first.role_stats)
+
+    def test_mtime_change_rehashes_without_parsing(self):
+        """Test a touched file is hashed again but its parsed tasks are reused."""
+        self.scan()
+        path = self.task_file('deep.yml')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        generator = self.scan()
+        self.assertEqual(list(generator.file_timings), [self.key('deep.yml')])
+        self.assertEqual((generator.cache.hits, generator.cache.misses), (6, 0))
+        entry = json.loads(self.cache_path.read_text())['files'][self.key('deep.yml')]
+        self.assertEqual(entry['mtime_ns'], path.stat().st_mtime_ns)
+
+    def test_content_change_is_reparsed(self):
+        """Test a changed hash (same size) or a changed size re-parses the file."""
+        self.scan()
+        path = self.task_file('deep.yml')
+        stat = path.stat()
+        path.write_text(path.read_text().replace('nist_sc_8', 'nist_sc_9'))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(path.stat().st_size, stat.st_size)
+        generator = self.scan()
+        self.assertEqual(generator.cache.misses, 1)
+        self.assertEqual([row[1] for row in generator.index.find_control('nist_sc_9')], ['NIST SC-9'])
+
+        path.write_text(path.read_text().replace('nist_sc_9', 'nist_sc_10'))
+        generator = self.scan()
+        self.assertEqual(generator.cache.misses, 1)
+        self.assertEqual(generator.index.find_control('nist_sc_9'), [])
+        self.assertEqual(len(generator.index.find_control('NIST SC-10')), 1)
+
+    def test_new_include_target_is_followed(self):
+        """Test an include added to a cached file reaches the new file."""
+        self.scan()
+        self.task_file('extra.yml').write_text('- name: Extra task\n  tags: [stig_v_230300]\n')
+        with self.task_file('deep.yml').open('a') as f:
+            f.write('\n- name: Import extra\n  ansible.builtin.import_tasks: extra.yml\n')
+        generator = self.scan()
+        self.assertEqual(generator.role_stats['security/sshd']['stig_controls'], 2)
+
+    def test_version_mismatch_and_stale_entries(self):
+        """Test another cache version is ignored and vanished files are dropped on save."""
+        self.scan()
+        doc = json.loads(self.cache_path.read_text())
+        doc['version'] = report.SCAN_CACHE_VERSION + 1
+        self.cache_path.write_text(json.dumps(doc))
+        self.assertEqual(self.scan().cache.misses, 6)
+
+        self.task_file('os/RedHat.yml').unlink()
+        self.scan()
+        files = json.loads(self.cache_path.read_text())['files']
+        self.assertEqual(len(files), 5)
+        self.assertNotIn(self.key('os/RedHat.yml'), files)
+
+    def test_no_cache(self):
+        """Test scanning without a cache file parses everything and writes nothing."""
+        generator = self.scan(cache=False)
+        self.assertEqual(generator.cache.misses, 6)
+        self.assertFalse(self.cache_path.exists())
+
+
+class TestComplianceIndex(FixtureTestCase):
+    """Test the control index and the query subcommand."""
+
+    def setUp(self):
+        """Scan the fixture into the index."""
+        super().setUp()
+        self.generator = self.scan()
+
+    def query(self, *args):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            rc = report.main(['query', '--index', str(self.index_path), *args])
+        return rc, stdout.getvalue()
+
+    def test_find_control_spellings(self):
+        """Test a control is found as displayed, without its prefix or as the raw tag."""
+        expected = [('nist', 'NIST AC-6', 'security/sshd', 'roles/security/sshd/tasks/main.yml', 2,
+                     'NIST AC-6 | Restrict root login')]
+        index = self.generator.index
+        for spelling in ('NIST AC-6', 'nist ac-6', 'AC-6', 'nist_ac_6'):
+            self.assertEqual(index.find_control(spelling), expected, spelling)
+        self.assertEqual([row[2] for row in index.find_control('CIS 5.2.1')], ['core/base', 'security/sshd'])
+
+    def test_find_role_and_controls(self):
+        """Test per-role control counts and the per-framework control listing."""
+        index = self.generator.index
+        self.assertIn(('stig', 'V-230264', 5), index.find_role('security/sshd/'))
+        self.assertIn(('iso27001', 'ISO 27001 §8_26', 2), index.find_role('security/sshd'))
+        self.assertEqual(list(index.controls('cis')), [
+            ('CIS 1.1', '1', ['security/sshd'], 1),
+            ('CIS 5.2.1', '5', ['core/base', 'security/sshd'], 2),
+            ('CIS 5.2.2', '5', ['security/sshd'], 1),
+        ])
+        self.assertEqual(index.control_count('nist'), 3)
+
+    def test_json_report_from_index(self):
+        """Test the JSON report lists every mapping with its file and line."""
+        data = json.loads(self.generator.generate_json_report())
+        self.assertEqual(data['summary']['total_tasks'], 13)
+        self.assertEqual(data['summary']['files_scanned'], 6)
+        entry = data['compliance_data']['nist']['NIST SC-8'][0]
+        self.assertEqual((entry['role'], entry['file'], entry['line']),
+                         ('security/sshd', 'roles/security/sshd/tasks/deep.yml', 2))
+
+    def test_query_control(self):
+        """Test 'query --control' prints matches as text or JSON."""
+        rc, out = self.query('--control', 'V-230264')
+        self.assertEqual(rc, 0)
+        self.assertEqual([line.split('\t')[2] for line in out.splitlines()], [
+            'roles/security/sshd/tasks/deep.yml:2', 'roles/security/sshd/tasks/deep.yml:7',
+            'roles/security/sshd/tasks/hardening.yml:2', 'roles/security/sshd/tasks/hardening.yml:7',
+            'roles/security/sshd/tasks/main.yml:9'])
+        self.assertEqual(out.splitlines()[-1].split('\t'),
+                         ['V-230264', 'security/sshd', 'roles/security/sshd/tasks/main.yml:9', 'Import hardening'])
+        rc, out = self.query('--control', 'nist_sc_8', '--json')
+        self.assertEqual(json.loads(out), [{
+            'framework': 'nist', 'control': 'NIST SC-8', 'role': 'security/sshd',
+            'file': 'roles/security/sshd/tasks/deep.yml', 'line': 2, 'task': 'Encrypt transport'}])
+
+    def test_query_role(self):
+        """Test 'query --role' lists the role's controls."""
+        rc, out = self.query('--role', 'core/base', '--json')
+        self.assertEqual(rc, 0)
+        self.assertEqual(json.loads(out), [{'framework': 'cis', 'control': 'CIS 5.2.1', 'tasks': 1}])
+
+    def test_query_misses(self):
+        """Test no match exits 1 and a missing index exits 2."""
+        rc, out = self.query('--control', 'NIST ZZ-1')
+        self.assertEqual(rc, 1)
+        self.assertIn('No matches', out)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            rc = report.main(['query', '--index', str(self.root / 'missing.sqlite3'), '--role', 'core/base'])
+        self.assertEqual(rc, 2)
+
+    def test_rescan_replaces_index(self):
+        """Test a rescan rebuilds the index instead of appending to it."""
+        self.generator.index.close()
+        self.scan()
+        rc, out = self.query('--control', 'NIST AC-6', '--json')
+        self.assertEqual(len(json.loads(out)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000112
+# File Type: Python Test Script
+# Test Type: GPU Discovery Validation
+# Description: Test the GPU discovery engine and dsu_gpu_facts against a fake sysfs tree
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test the GPU discovery engine and the dsu_gpu_facts module."""
+
+import contextlib
+import functools
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+ROLE = Path(__file__).resolve().parent.parent / 'roles' / 'hardware' / 'gpu'
+
+
+def load_source(name, path):
+    """Import a role file by path under the given module name."""
+    spec = importlib.util.spec_from_file_location(name, str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+discovery = load_source('dsu_gpu_discovery', ROLE / 'module_utils' / 'dsu_gpu_discovery.py')
+
+try:
+    from ansible.module_utils import basic
+except ImportError:
+    basic = None
+
+# pci id: (class, vendor, device, bound driver)
+PCI_DEVICES = {
+    '0000:00:02.0': ('0x030000', '0x8086', '0x8a52', 'i915'),
+    '0000:00:1f.0': ('0x060100', '0x8086', '0x7a06', None),
+    '0000:01:00.0': ('0x030200', '0x10de', '0x2684', 'nvidia'),
+    '0000:02:00.0': ('0x038000', '0x1af4', '0x1050', None),
+}
+
+PCI_IDS = '''# fake pci.ids
+10de  NVIDIA Corporation
+\t2684  AD102 [GeForce RTX 4090]
+\t\t10de 167c  subsystem entry
+8086  Intel Corporation
+\t8a52  Iris Plus Graphics G7
+C 03  Display controller
+'''
+
+# probe name -> engine function replaced by a counting stand-in
+PROBE_FUNCTIONS = {
+    'nvidia': 'check_nvidia_driver',
+    'amdgpu': 'check_amdgpu_driver',
+    'intel': 'check_intel_driver',
+    'podman': 'check_podman_gpu',
+    'docker': 'check_docker_gpu',
+    'egpu': 'check_egpu_hot_swap',
+    'dp_alt_mode': 'check_dp_alt_mode',
+    'rdma': 'check_rdma_support',
+}
+
+SUBSET_PROBES = {
+    'drivers': ['nvidia', 'amdgpu', 'intel'],
+    'container_runtime': ['podman', 'docker'],
+    'egpu': ['egpu'],
+    'dp_alt_mode': ['dp_alt_mode'],
+    'rdma': ['rdma'],
+}
+
+
+def build_sysfs(root, devices=PCI_DEVICES):
+    """Create a fake /sys/bus/pci/devices + /sys/class/drm tree and pci.ids under root."""
+    pci = root / 'bus' / 'pci' / 'devices'
+    drm = root / 'class' / 'drm'
+    for directory in (pci, drm, root / 'bus' / 'pci' / 'drivers', root / 'bus' / 'pci' / 'slots',
+                      root / 'bus' / 'thunderbolt' / 'devices'):
+        directory.mkdir(parents=True, exist_ok=True)
+    for pci_id, (pci_class, vendor, device, driver) in devices.items():
+        add_pci_device(root, pci_id, pci_class, vendor, device, driver)
+    for node in ('card0', 'renderD128', 'card0-DP-1'):
+        (drm / node).mkdir()
+        (drm / node / 'device').symlink_to(pci / '0000:01:00.0')
+    (drm / 'card1').mkdir()
+    (drm / 'card1' / 'device').symlink_to(pci / '0000:00:02.0')
+    (root / 'pci.ids').write_text(PCI_IDS)
+    return pci, drm
+
+
+def add_pci_device(root, pci_id, pci_class, vendor, device, driver=None):
+    base = root / 'bus' / 'pci' / 'devices' / pci_id
+    base.mkdir()
+    for attr, value in (('class', pci_class), ('vendor', vendor), ('device', device)):
+        (base / attr).write_text(value + '\n')
+    if driver:
+        driver_dir = root / 'bus' / 'pci' / 'drivers' / driver
+        driver_dir.mkdir(exist_ok=True)
+        (base / 'driver').symlink_to(driver_dir)
+
+
+class FakeHostTestCase(unittest.TestCase):
+    """Run discovery against a fake sysfs tree with counting probe stand-ins."""
+
+    def setUp(self):
+        """Build the fake tree and patch the engine onto it."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.pci, self.drm = build_sysfs(self.root)
+        self.cache_file = str(self.root / 'cache' / 'gpu_discovery.json')
+        self.probe_calls = []
+
+        scan = discovery.scan_pci_sysfs
+        patches = [
+            mock.patch.object(discovery, 'SYSFS_PCI_DEVICES', str(self.pci)),
+            mock.patch.object(discovery, 'SYSFS_PCI_SLOTS', str(self.root / 'bus' / 'pci' / 'slots')),
+            mock.patch.object(discovery, 'SYSFS_THUNDERBOLT_DEVICES', str(self.root / 'bus' / 'thunderbolt' / 'devices')),
+            mock.patch.object(discovery, 'lookup_pci_names',
+                              functools.partial(discovery.lookup_pci_names, paths=(str(self.root / 'pci.ids'),))),
+            mock.patch.object(discovery, 'discover_devices',
+                              lambda use_lspci=False: scan(str(self.pci), str(self.drm))),
+            mock.patch.object(discovery, 'list_gpu_device_nodes', lambda: ['/dev/dri/card0']),
+        ]
+        for name, function in PROBE_FUNCTIONS.items():
+            patches.append(mock.patch.object(discovery, function, self._probe(name)))
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Remove the fake tree."""
+        self._tmp.cleanup()
+
+    def _probe(self, name):
+        def probe(*args):
+            self.probe_calls.append(name)
+            value = json.loads(json.dumps(discovery.PROBE_FALLBACKS[name]))
+            value['probed'] = len(self.probe_calls)
+            return value
+        return probe
+
+    def discover(self, subsets=('pci', 'drivers'), **kwargs):
+        kwargs.setdefault('cache_file', self.cache_file)
+        kwargs.setdefault('deadline', 5)
+        return discovery.discover(subsets, **kwargs)
+
+
+class TestDiscoverSubsets(FakeHostTestCase):
+    """Test gather_subset selection."""
+
+    def test_default_subsets(self):
+        """Test pci + drivers inventory from the fake tree."""
+        result = self.discover()
+        self.assertEqual(result['gathered_subsets'], ['pci', 'drivers'])
+        self.assertEqual(sorted(self.probe_calls), ['amdgpu', 'intel', 'nvidia'])
+        self.assertEqual([d['pci_id'] for d in result['detected_devices']],
+                         ['0000:00:02.0', '0000:01:00.0', '0000:02:00.0'])
+        self.assertEqual(result['detected_vendor_list'], ['generic', 'intel', 'nvidia'])
+        self.assertEqual(result['primary_detected_vendor'], 'nvidia')
+        self.assertEqual(result['gpu_count'], 3)
+        self.assertTrue(result['is_multi_gpu'])
+        self.assertEqual(sorted(result['drivers']), ['amdgpu', 'intel', 'nvidia'])
+        for key in ('container_runtime', 'egpu', 'dp_alt_mode', 'rdma', 'egpu_rdma_integration'):
+            self.assertNotIn(key, result)
+
+    def test_pci_only(self):
+        """Test pci alone runs no probe."""
+        result = self.discover(['pci'])
+        self.assertEqual(result['gathered_subsets'], ['pci'])
+        self.assertEqual(self.probe_calls, [])
+        self.assertNotIn('drivers', result)
+        self.assertEqual(result['discovery_cache']['status'], 'unused')
+
+    def test_pci_is_always_gathered(self):
+        """Test pci is added to any selection."""
+        result = self.discover(['rdma'])
+        self.assertEqual(result['gathered_subsets'], ['pci', 'rdma'])
+        self.assertEqual(self.probe_calls, ['rdma'])
+        self.assertEqual(result['gpu_count'], 3)
+
+    def test_all(self):
+        """Test all selects every subset and the eGPU+RDMA summary."""
+        result = self.discover(['all'])
+        self.assertEqual(result['gathered_subsets'], list(discovery.SUBSETS))
+        self.assertEqual(sorted(self.probe_calls), sorted(sum(SUBSET_PROBES.values(), [])))
+        self.assertEqual(result['container_runtime']['device_nodes'], ['/dev/dri/card0'])
+        for key in ('egpu', 'dp_alt_mode', 'rdma', 'egpu_rdma_integration'):
+            self.assertIn(key, result)
+
+    def test_unknown_subset(self):
+        """Test an unknown subset is rejected before probing."""
+        with self.assertRaises(ValueError):
+            self.discover(['pci', 'bogus'])
+        self.assertEqual(self.probe_calls, [])
+
+    def test_vendor_validation(self):
+        """Test configured_vendor adds vendor_validation."""
+        self.assertTrue(self.discover(['pci'], configured_vendor='intel')['vendor_validation']['valid'])
+        self.assertFalse(self.discover(['pci'], configured_vendor=['amd'])['vendor_validation']['valid'])
+
+
+class TestDiscoverCache(FakeHostTestCase):
+    """Test the probe cache: hit, miss, expiry, fingerprint and refresh."""
+
+    def test_miss_then_hit(self):
+        """Test the second run is served from the cache without probing."""
+        first = self.discover()
+        self.assertEqual(first['discovery_cache']['status'], 'miss')
+        self.assertTrue(os.path.exists(self.cache_file))
+        self.probe_calls.clear()
+
+        second = self.discover()
+        self.assertEqual(second['discovery_cache']['status'], 'hit')
+        self.assertEqual(self.probe_calls, [])
+        self.assertEqual(second['drivers'], first['drivers'])
+
+    def test_partial_hit_probes_only_missing(self):
+        """Test a wider selection only runs the probes not cached yet."""
+        self.discover()
+        self.probe_calls.clear()
+        result = self.discover(['drivers', 'rdma'])
+        self.assertEqual(result['discovery_cache']['status'], 'partial')
+        self.assertEqual(self.probe_calls, ['rdma'])
+        with open(self.cache_file) as f:
+            self.assertEqual(sorted(json.load(f)['probes']), ['amdgpu', 'intel', 'nvidia', 'rdma'])
+
+    def test_expiry(self):
+        """Test an entry older than cache_ttl is re-probed."""
+        self.discover()
+        with open(self.cache_file) as f:
+            doc = json.load(f)
+        doc['created'] = time.time() - 120
+        with open(self.cache_file, 'w') as f:
+            json.dump(doc, f)
+        self.probe_calls.clear()
+
+        self.assertEqual(self.discover(cache_ttl=300)['discovery_cache']['status'], 'hit')
+        self.assertEqual(self.probe_calls, [])
+        self.assertEqual(self.discover(cache_ttl=60)['discovery_cache']['status'], 'miss')
+        self.assertEqual(sorted(self.probe_calls), ['amdgpu', 'intel', 'nvidia'])
+
+    def test_fingerprint_invalidation(self):
+        """Test a new PCI device (e.g. a hot-plugged eGPU) invalidates the cache."""
+        first = self.discover()
+        self.probe_calls.clear()
+        add_pci_device(self.root, '0000:05:00.0', '0x030000', '0x1002', '0x744c', 'amdgpu')
+
+        second = self.discover()
+        self.assertNotEqual(second['discovery_cache']['fingerprint'], first['discovery_cache']['fingerprint'])
+        self.assertEqual(second['discovery_cache']['status'], 'miss')
+        self.assertEqual(sorted(self.probe_calls), ['amdgpu', 'intel', 'nvidia'])
+        self.assertEqual(second['gpu_count'], 4)
+
+    def test_refresh(self):
+        """Test refresh re-probes a valid cache and rewrites it."""
+        self.discover()
+        self.probe_calls.clear()
+        result = self.discover(refresh=True)
+        self.assertEqual(result['discovery_cache']['status'], 'refresh')
+        self.assertEqual(sorted(self.probe_calls), ['amdgpu', 'intel', 'nvidia'])
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f)['probes']['nvidia'], result['drivers']['nvidia'])
+
+    def test_disabled(self):
+        """Test use_cache=False neither reads nor writes the cache."""
+        result = self.discover(use_cache=False)
+        self.assertEqual(result['discovery_cache']['status'], 'disabled')
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_timed_out_probes_are_not_cached(self):
+        """Test a deadline fallback is reported but never written to the cache."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.addCleanup(discovery.set_deadline, None)
+
+        def hung():
+            release.wait(10)
+            return {'rdma_available': True}
+
+        with mock.patch.object(discovery, 'check_rdma_support', hung):
+            result = self.discover(['drivers', 'rdma'], deadline=0.3)
+        self.assertEqual(result['probes_timed_out'], ['rdma'])
+        self.assertEqual(result['rdma'], discovery.PROBE_FALLBACKS['rdma'])
+        with open(self.cache_file) as f:
+            self.assertEqual(sorted(json.load(f)['probes']), ['amdgpu', 'intel', 'nvidia'])
+
+        self.probe_calls.clear()
+        result = self.discover(['drivers', 'rdma'])
+        self.assertEqual(result['discovery_cache']['status'], 'partial')
+        self.assertEqual(self.probe_calls, ['rdma'])
+        self.assertNotIn('probes_timed_out', result)
+
+    def test_merge_keeps_created(self):
+        """Test probes added to an entry do not extend its age."""
+        self.discover()
+        with open(self.cache_file) as f:
+            doc = json.load(f)
+        doc['created'] = created = time.time() - 100
+        with open(self.cache_file, 'w') as f:
+            json.dump(doc, f)
+
+        self.discover(['drivers', 'rdma'])
+        with open(self.cache_file) as f:
+            doc = json.load(f)
+        self.assertEqual(doc['created'], created)
+        self.assertIn('rdma', doc['probes'])
+
+
+class TestCacheFile(unittest.TestCase):
+    """Test load_cache/save_cache on their own."""
+
+    def setUp(self):
+        """Create a scratch cache directory."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.path = str(self.root / 'cache' / 'gpu_discovery.json')
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        self._tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_round_trip(self):
+        """Test a saved entry loads back and is written atomically and world-readable."""
+        discovery.save_cache(self.path, 'abc', {'nvidia': {'available': True}})
+        doc = discovery.load_cache(self.path, 'abc', 60)
+        self.assertEqual(doc['version'], discovery.CACHE_VERSION)
+        self.assertEqual(doc['probes'], {'nvidia': {'available': True}})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['gpu_discovery.json'])
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+        self.assertIsNone(discovery.load_cache(self.path, 'other', 60))
+
+    def test_version_mismatch(self):
+        """Test an entry written by another cache version is ignored."""
+        discovery.save_cache(self.path, 'abc', {})
+        with open(self.path) as f:
+            doc = json.load(f)
+        doc['version'] = discovery.CACHE_VERSION + 1
+        self.write(json.dumps(doc))
+        self.assertIsNone(discovery.load_cache(self.path, 'abc', 60))
+
+    def test_corrupt_or_missing(self):
+        """Test unreadable, truncated or malformed files are treated as a miss."""
+        self.assertIsNone(discovery.load_cache(self.path, 'abc', 60))
+        os.makedirs(os.path.dirname(self.path))
+        for text in ('{"version": 1, "fing', '[]', json.dumps({
+                'version': discovery.CACHE_VERSION, 'fingerprint': 'abc', 'created': time.time(), 'probes': []})):
+            self.write(text)
+            self.assertIsNone(discovery.load_cache(self.path, 'abc', 60), text)
+
+    def test_unwritable_directory(self):
+        """Test saving is silently skipped when the cache directory cannot be created."""
+        blocker = self.root / 'file'
+        blocker.write_text('')
+        path = str(blocker / 'cache' / 'gpu_discovery.json')
+        discovery.save_cache(path, 'abc', {})
+        self.assertIsNone(discovery.load_cache(path, 'abc', 60))
+
+
+class TestSysfsInventory(unittest.TestCase):
+    """Test the single-pass sysfs inventory and its lspci fallback."""
+
+    def setUp(self):
+        """Build the fake tree and point pci.ids lookups at it."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.pci, self.drm = build_sysfs(self.root)
+        patch = mock.patch.object(discovery, 'lookup_pci_names',
+                                  functools.partial(discovery.lookup_pci_names, paths=(str(self.root / 'pci.ids'),)))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Remove the fake tree."""
+        self._tmp.cleanup()
+
+    def test_scan_pci_sysfs(self):
+        """Test display devices with driver, DRM nodes, names and Intel generation."""
+        devices = {d['pci_id']: d for d in discovery.scan_pci_sysfs(str(self.pci), str(self.drm))}
+        self.assertEqual(sorted(devices), ['0000:00:02.0', '0000:01:00.0', '0000:02:00.0'])
+        self.assertEqual(devices['0000:00:02.0'], {
+            'pci_id': '0000:00:02.0', 'vendor_id': '8086', 'device_id': '8a52', 'vendor_name': 'intel',
+            'model': 'Intel Corporation Iris Plus Graphics G7', 'intel_generation': 'gen12',
+            'driver': 'i915', 'drm_nodes': ['card1'],
+        })
+        nvidia = devices['0000:01:00.0']
+        self.assertEqual(nvidia['model'], 'NVIDIA Corporation AD102 [GeForce RTX 4090]')
+        self.assertEqual(nvidia['driver'], 'nvidia')
+        # connectors such as card0-DP-1 are not device nodes
+        self.assertEqual(nvidia['drm_nodes'], ['card0', 'renderD128'])
+        virtio = devices['0000:02:00.0']
+        self.assertEqual(virtio['model'], 'Device 1af4:1050')
+        self.assertEqual((virtio['vendor_name'], virtio['driver'], virtio['drm_nodes']), ('generic', None, []))
+
+    def test_lookup_pci_names(self):
+        """Test subsystem lines, the class list and unreadable files are skipped."""
+        missing = str(self.root / 'missing.ids')
+        names = discovery.lookup_pci_names.func({('10de', '2684'), ('10de', '167c'), ('8086', '03')},
+                                                 paths=(missing, str(self.root / 'pci.ids')))
+        self.assertEqual(names, {('10de', '2684'): 'NVIDIA Corporation AD102 [GeForce RTX 4090]'})
+
+    def test_no_sysfs(self):
+        """Test a missing or empty sysfs tree yields None."""
+        self.assertIsNone(discovery.scan_pci_sysfs(str(self.root / 'missing'), str(self.drm)))
+        (self.root / 'empty').mkdir()
+        self.assertIsNone(discovery.scan_pci_sysfs(str(self.root / 'empty'), str(self.drm)))
+
+    def test_lspci_fallback(self):
+        """Test discover_devices parses one lspci run when sysfs is unavailable."""
+        lspci = (
+            '0000:00:1f.0 ISA bridge [0601]: Intel Corporation Device [8086:7a06]\n'
+            '0000:01:00.0 VGA compatible controller [0300]: NVIDIA Corporation AD102 [GeForce RTX 4090] [10de:2684] (rev a1)\n'
+        )
+        scan = functools.partial(discovery.scan_pci_sysfs, str(self.root / 'missing'), str(self.drm))
+        with mock.patch.object(discovery, 'scan_pci_sysfs', scan), \
+                mock.patch.object(discovery, 'get_pci_devices', return_value=lspci) as get_pci_devices:
+            devices = discovery.discover_devices()
+        get_pci_devices.assert_called_once_with()
+        self.assertEqual(devices, [discovery.make_device('0000:01:00.0', '10de', '2684',
+                                                         'NVIDIA Corporation AD102 [GeForce RTX 4090]')])
+
+    def test_use_lspci(self):
+        """Test use_lspci skips sysfs."""
+        with mock.patch.object(discovery, 'scan_pci_sysfs') as scan, \
+                mock.patch.object(discovery, 'get_pci_devices', return_value=''):
+            self.assertEqual(discovery.discover_devices(use_lspci=True), [])
+        scan.assert_not_called()
+
+    def test_intel_driver_from_sysfs(self):
+        """Test check_intel_driver uses the bound driver instead of running intel_gpu_top."""
+        devices = discovery.scan_pci_sysfs(str(self.pci), str(self.drm))
+        with mock.patch.object(discovery, 'run_command') as run_command:
+            self.assertEqual(discovery.check_intel_driver(devices), {'available': True, 'driver': 'i915'})
+            self.assertEqual(discovery.check_intel_driver([{'vendor_id': '8086', 'driver': 'xe'}]),
+                             {'available': True, 'driver': 'xe'})
+        run_command.assert_not_called()
+
+
+class TestRunProbes(unittest.TestCase):
+    """Test concurrent probes under the global deadline."""
+
+    def setUp(self):
+        """Release blocked probes and clear the deadline after each test."""
+        self.release = threading.Event()
+        self.addCleanup(discovery.set_deadline, None)
+        self.addCleanup(self.release.set)
+
+    def test_probes_run_concurrently(self):
+        """Test independent probes overlap instead of running back to back."""
+        def probe(value):
+            def run():
+                time.sleep(0.4)
+                return {'available': value}
+            return run
+
+        start = time.monotonic()
+        results, timed_out = discovery.run_probes({name: probe(name) for name in ('nvidia', 'amdgpu', 'intel')}, 5)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(timed_out, [])
+        self.assertEqual(results, {'nvidia': {'available': 'nvidia'}, 'amdgpu': {'available': 'amdgpu'},
+                                   'intel': {'available': 'intel'}})
+
+    def test_deadline_and_errors_fall_back(self):
+        """Test hung and failing probes get their fallback and are listed as timed out."""
+        def hung():
+            self.release.wait(10)
+            return {'available': True}
+
+        def broken():
+            raise OSError('no such tool')
+
+        start = time.monotonic()
+        results, timed_out = discovery.run_probes(
+            {'nvidia': lambda: {'available': True}, 'rdma': hung, 'intel': broken}, 0.3)
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertEqual(sorted(timed_out), ['intel', 'rdma'])
+        self.assertEqual(results['nvidia'], {'available': True})
+        self.assertEqual(results['rdma'], discovery.PROBE_FALLBACKS['rdma'])
+        self.assertIsNot(results['rdma'], discovery.PROBE_FALLBACKS['rdma'])
+        self.assertEqual(results['intel'], {'available': False})
+
+    def test_no_probes(self):
+        """Test an empty probe set."""
+        self.assertEqual(discovery.run_probes({}), ({}, []))
+
+    def test_commands_are_clamped_to_the_deadline(self):
+        """Test run_command gives up when the global deadline runs out."""
+        discovery.set_deadline(0.3)
+        start = time.monotonic()
+        self.assertIsNone(discovery.run_command([sys.executable, '-c', 'import time; time.sleep(10)'], timeout=10))
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertIsNone(discovery.run_command([sys.executable, '-c', 'pass']))
+
+
+@unittest.skipIf(basic is None, 'ansible is not installed')
+class TestGpuFactsModule(FakeHostTestCase):
+    """Test the dsu_gpu_facts module."""
+
+    def setUp(self):
+        """Load the module with the role's module_utils in place."""
+        super().setUp()
+        patch = mock.patch.dict(sys.modules, {'ansible.module_utils.dsu_gpu_discovery': discovery})
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.facts = load_source('dsu_gpu_facts', ROLE / 'library' / 'dsu_gpu_facts.py')
+
+    @contextlib.contextmanager
+    def module_args(self, args):
+        try:
+            from ansible.module_utils.testing import patch_module_args
+        except ImportError:
+            with mock.patch.object(basic, '_ANSIBLE_ARGS',
+                                   json.dumps({'ANSIBLE_MODULE_ARGS': args}).encode()):
+                yield
+        else:
+            with patch_module_args(args):
+                yield
+
+    def run_module(self, **args):
+        args.setdefault('cache_file', self.cache_file)
+        stdout = io.StringIO()
+        with self.module_args(args), contextlib.redirect_stdout(stdout), self.assertRaises(SystemExit):
+            self.facts.main()
+        return json.loads(stdout.getvalue())
+
+    def test_argument_spec_matches_documentation(self):
+        """Test the argument spec against DOCUMENTATION and the role's argument_specs."""
+        captured = {}
+        real = self.facts.AnsibleModule
+
+        def capture(**kwargs):
+            captured.update(kwargs)
+            return real(**kwargs)
+
+        with mock.patch.object(self.facts, 'AnsibleModule', capture):
+            self.run_module()
+
+        spec = captured['argument_spec']
+        documented = yaml.safe_load(self.facts.DOCUMENTATION)['options']
+        self.assertEqual(sorted(spec), sorted(documented))
+        for name, option in documented.items():
+            self.assertEqual(spec[name]['type'], option['type'], name)
+            self.assertEqual(spec[name].get('default'), option.get('default'), name)
+            self.assertEqual(spec[name].get('choices'), option.get('choices'), name)
+            self.assertEqual(spec[name].get('elements'), option.get('elements'), name)
+        self.assertTrue(captured['supports_check_mode'])
+
+        role_spec = yaml.safe_load((ROLE / 'meta' / 'argument_specs.yml').read_text())
+        role_options = role_spec['argument_specs']['main']['options']
+        self.assertEqual(role_options['gpu_stack_discovery_subsets']['default'], spec['gather_subset']['default'])
+        self.assertEqual(role_options['gpu_stack_discovery_cache_ttl']['default'], spec['cache_ttl']['default'])
+
+    def test_facts(self):
+        """Test the document is returned as ansible_facts.dsu_gpu."""
+        result = self.run_module(gather_subset=['all'])
+        self.assertFalse(result['changed'])
+        facts = result['ansible_facts']['dsu_gpu']
+        self.assertEqual(facts['gathered_subsets'], list(discovery.SUBSETS))
+        self.assertEqual(facts['primary_detected_vendor'], 'nvidia')
+        self.assertEqual(facts['discovery_cache']['status'], 'miss')
+
+        self.probe_calls.clear()
+        facts = self.run_module(gather_subset=['all'])['ansible_facts']['dsu_gpu']
+        self.assertEqual(facts['discovery_cache']['status'], 'hit')
+        self.assertEqual(self.probe_calls, [])
+
+    def test_refresh(self):
+        """Test refresh is passed through."""
+        self.run_module()
+        self.probe_calls.clear()
+        facts = self.run_module(refresh=True)['ansible_facts']['dsu_gpu']
+        self.assertEqual(facts['discovery_cache']['status'], 'refresh')
+        self.assertEqual(sorted(self.probe_calls), ['amdgpu', 'intel', 'nvidia'])
+
+    def test_check_mode_leaves_cache_alone(self):
+        """Test check mode gathers facts without touching the cache."""
+        facts = self.run_module(_ansible_check_mode=True)['ansible_facts']['dsu_gpu']
+        self.assertEqual(facts['discovery_cache']['status'], 'disabled')
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_invalid_subset(self):
+        """Test gather_subset choices are enforced."""
+        result = self.run_module(gather_subset=['bogus'])
+        self.assertTrue(result['failed'])
+        self.assertIn('gather_subset', result['msg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000118
+# File Type: Python Test Script
+# Test Type: Role Index Validation
+# Description: Test role discovery, reference parsing and the cached role index used by the wiki generators
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test .scripts/role_index.py against a scratch role tree."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / '.scripts'))
+
+import role_index  # noqa: E402
+
+REFERENCE = '''# Role Reference
+
+## Storage Roles
+
+### `storage/backup`
+
+Backups.
+
+### `storage/backup/rclone`
+
+Cloud sync with rclone.
+
+
+## Network Services Roles
+
+### `networking/services`
+Service roles.
+### `networking/services/endlessh`
+'''
+
+ROLES = {
+    'storage/handlers/main.yml': '---\n',
+    'storage/backup/tasks/main.yml': '---\n',
+    'storage/backup/defaults/main.yml': 'backup_enabled: true  # Run backups\nbackup_paths:\n  - /etc\n',
+    'storage/backup/molecule/default/tasks/verify.yml': '---\n',
+    'storage/backup/templates/backup.sh.j2': '',
+    'storage/backup/rclone/tasks/main.yml': '---\n',
+    'storage/backup/rclone/defaults/main.yml': 'rclone_remote: s3  # Remote name\n',
+    'storage/backup/restic/defaults/main.yml': 'restic_repo: /srv/restic\n',
+    'networking/services/tasks/main.yml': '---\n',
+    'networking/services/endlessh/tasks/main.yml': '---\n',
+    'networking/services/endlessh/molecule/default/molecule.yml': '---\n',
+    'core/base/tasks/main.yml': '---\n',
+}
+
+
+class TestParsers(unittest.TestCase):
+    """Test the defaults and ROLE_REFERENCE.md parsers."""
+
+    def test_parse_defaults(self):
+        """Test top-level variables keep their first occurrence and trailing comment."""
+        text = ('---\n# header: not a variable\nfoo: 1  # The foo\nbar:\n  nested: 2\nfoo: 3  # again\n'
+                'url: "http://x#y"\n')
+        self.assertEqual(role_index.parse_defaults(text),
+                         [['foo', 'The foo'], ['bar', ''], ['url', 'y"']])
+
+    def test_parse_reference(self):
+        """Test role order, categories and trimmed description blocks."""
+        ref = role_index.parse_reference(REFERENCE)
+        self.assertEqual(ref['order'], ['storage/backup', 'storage/backup/rclone',
+                                        'networking/services', 'networking/services/endlessh'])
+        self.assertEqual(ref['categories'], {
+            'Storage': ['storage/backup', 'storage/backup/rclone'],
+            'Network Services': ['networking/services', 'networking/services/endlessh'],
+        })
+        self.assertEqual(ref['blocks']['storage/backup'], 'Backups.')
+        self.assertEqual(ref['blocks']['storage/backup/rclone'],
+                         'Cloud sync with rclone.\n\n\n## Network Services Roles')
+        self.assertEqual(ref['blocks']['networking/services'], 'Service roles.')
+        self.assertEqual(ref['blocks']['networking/services/endlessh'], '')
+
+    def test_parse_reference_edge_cases(self):
+        """Test a repeated role keeps one position and its last block, and odd headers are tolerated."""
+        ref = role_index.parse_reference(
+            '### `orphan`\nno category\n## Core Roles\n### `core/a`\nfirst\n### `core/b`\n'
+            '### `core/a`\nsecond\n### `unterminated\n')
+        self.assertEqual(ref['order'], ['orphan', 'core/a', 'core/b', 'unterminated'])
+        self.assertEqual(ref['categories'], {'Core': ['core/a', 'core/b', 'core/a']})
+        self.assertEqual(ref['blocks']['core/a'], 'second')
+        self.assertEqual(ref['blocks']['orphan'], 'no category\n## Core Roles')
+        self.assertEqual(role_index.parse_reference(''), {'order': [], 'categories': {}, 'blocks': {}})
+
+    def test_role_page(self):
+        """Test nested role names map to flat page names."""
+        self.assertEqual(role_index.role_page('storage/backup/rclone'), 'storage_backup_rclone.md')
+
+
+class RoleTreeTestCase(unittest.TestCase):
+    """Scratch role tree, reference page and cache file."""
+
+    def setUp(self):
+        """Write the role tree and reference."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.roles_root = self.root / 'roles'
+        for relpath, content in ROLES.items():
+            path = self.roles_root / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        self.reference = self.root / 'ROLE_REFERENCE.md'
+        self.reference.write_text(REFERENCE)
+        self.cache_file = self.root / '.cache' / 'role_index.json'
+
+    def tearDown(self):
+        """Remove the scratch tree."""
+        self._tmp.cleanup()
+
+    def index(self, **kwargs):
+        index = role_index.RoleIndex(self.roles_root, self.reference, self.cache_file, **kwargs)
+        index.save()
+        return index
+
+    def bump(self, path, content=None):
+        """Rewrite ``path`` and move its mtime forward so the change is visible to the stamps."""
+        stat = path.stat()
+        if content is not None:
+            path.write_text(content)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+class TestDiscoverRoles(RoleTreeTestCase):
+    """Test finding role directories."""
+
+    def test_nested_roles(self):
+        """Test sub-roles below a role are found and role content directories are not roles."""
+        roles = role_index.discover_roles(self.roles_root)
+        self.assertEqual(sorted(roles), [
+            'core/base', 'networking/services', 'networking/services/endlessh',
+            'storage/backup', 'storage/backup/rclone', 'storage/backup/restic',
+        ])
+        self.assertEqual(roles['storage/backup'], {'tasks', 'defaults', 'molecule', 'templates', 'rclone', 'restic'})
+        self.assertEqual(roles['storage/backup/restic'], {'defaults'})
+
+    def test_missing_root(self):
+        """Test a missing roles root has no roles."""
+        self.assertEqual(role_index.discover_roles(self.root / 'missing'), {})
+
+
+class TestRoleIndex(RoleTreeTestCase):
+    """Test building, reusing and refreshing the cached index."""
+
+    def test_build(self):
+        """Test role entries, categories and queries."""
+        index = self.index()
+        self.assertEqual(sorted(index.rebuilt), sorted(role_index.discover_roles(self.roles_root)))
+        backup = index.role('storage/backup')
+        self.assertEqual((backup['category'], backup['has_tasks'], backup['has_templates'], backup['has_molecule']),
+                         ('Storage', True, True, True))
+        self.assertEqual(index.role('networking/services/endlessh')['category'], 'Network Services')
+        self.assertEqual(index.role('core/base')['category'], 'Core')
+        self.assertEqual(index.variables('storage/backup'), [('backup_enabled', 'Run backups'), ('backup_paths', '')])
+        self.assertEqual(index.variables('storage/backup/rclone'), [('rclone_remote', 'Remote name')])
+        self.assertEqual(index.variables('core/base'), [])
+        self.assertEqual(index.variables('core/missing'), [])
+        self.assertEqual(index.reference_block('storage/backup'), 'Backups.')
+        self.assertEqual(index.reference_block('core/base'), '')
+        self.assertEqual(index.reference_roles()[:2], ['storage/backup', 'storage/backup/rclone'])
+        self.assertEqual(list(index.roles_by_category()), ['Storage', 'Network Services'])
+
+    def test_cache_reuse(self):
+        """Test an unchanged tree is served from the cache without rewriting it."""
+        first = self.index()
+        mtime = self.cache_file.stat().st_mtime_ns
+        second = self.index()
+        self.assertEqual(second.rebuilt, [])
+        self.assertFalse(second.dirty)
+        self.assertEqual(second.roles, first.roles)
+        self.assertEqual(self.cache_file.stat().st_mtime_ns, mtime)
+
+    def test_defaults_change(self):
+        """Test a changed defaults file re-reads only its role."""
+        self.index()
+        self.bump(self.roles_root / 'storage/backup/rclone/defaults/main.yml', 'rclone_remote: b2  # Remote\n')
+        index = self.index()
+        self.assertEqual(index.rebuilt, ['storage/backup/rclone'])
+        self.assertEqual(index.variables('storage/backup/rclone'), [('rclone_remote', 'Remote')])
+        self.assertEqual(self.index().rebuilt, [])
+
+    def test_role_directory_change(self):
+        """Test a new role subdirectory re-reads the role and a removed role leaves the index."""
+        self.index()
+        (self.roles_root / 'core/base/templates').mkdir()
+        self.bump(self.roles_root / 'core/base')
+        index = self.index()
+        self.assertEqual(index.rebuilt, ['core/base'])
+        self.assertTrue(index.role('core/base')['has_templates'])
+
+        for path in sorted((self.roles_root / 'storage/backup/restic').rglob('*'), reverse=True):
+            path.rmdir() if path.is_dir() else path.unlink()
+        (self.roles_root / 'storage/backup/restic').rmdir()
+        index = self.index()
+        self.assertIsNone(index.role('storage/backup/restic'))
+        self.assertNotIn('storage/backup/restic', json.loads(self.cache_file.read_text())['roles'])
+
+    def test_reference_change(self):
+        """Test a reference change moves categories without re-reading roles."""
+        self.index()
+        self.bump(self.reference, REFERENCE.replace('## Storage Roles', '## Backup Roles'))
+        index = self.index()
+        self.assertEqual(index.rebuilt, [])
+        self.assertEqual(index.role('storage/backup/rclone')['category'], 'Backup')
+        self.assertEqual(role_index.RoleIndex(self.roles_root, self.reference, self.cache_file)
+                         .role('storage/backup')['category'], 'Backup')
+
+    def test_missing_reference(self):
+        """Test a missing reference leaves categories to the role path."""
+        self.reference.unlink()
+        index = self.index()
+        self.assertEqual(index.reference_roles(), [])
+        self.assertEqual(index.role('networking/services/endlessh')['category'], 'Networking')
+
+    def test_refresh(self):
+        """Test a long-lived index picks up changes on refresh."""
+        index = self.index()
+        self.bump(self.roles_root / 'core/base/tasks/main.yml')
+        (self.roles_root / 'core/base/defaults').mkdir()
+        (self.roles_root / 'core/base/defaults/main.yml').write_text('base_enabled: true\n')
+        index.rebuilt = []
+        index.refresh()
+        self.assertEqual(index.rebuilt, ['core/base'])
+        self.assertTrue(index.dirty)
+        self.assertEqual(index.variables('core/base'), [('base_enabled', '')])
+
+    def test_stale_cache_is_ignored(self):
+        """Test --rebuild, another index version or another roles root re-read every role."""
+        roles = len(self.index().roles)
+        self.assertEqual(len(self.index(rebuild=True).rebuilt), roles)
+        data = json.loads(self.cache_file.read_text())
+        self.cache_file.write_text(json.dumps(dict(data, roles_root='/elsewhere')))
+        self.assertEqual(len(self.index().rebuilt), roles)
+        self.cache_file.write_text(json.dumps(dict(data, version=role_index.INDEX_VERSION + 1)))
+        self.assertEqual(len(self.index().rebuilt), roles)
+        self.cache_file.write_text('{not json')
+        self.assertEqual(len(self.index().rebuilt), roles)
+
+    def test_no_cache_file(self):
+        """Test an index without a cache file is built and never written."""
+        index = role_index.RoleIndex(self.roles_root, self.reference, None)
+        index.save()
+        self.assertEqual(len(index.rebuilt), 6)
+        self.assertFalse(self.cache_file.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# =============================================================================
+# Audit Event Identifier: DSU-TST-1000117
+# File Type: Python Test Script
+# Test Type: Wiki Linter Validation
+# Description: Test the page index, link graph cache and --changed-since selection of the wiki linter
+# Last Updated: 2026-10-18
+# Version: 1.0
+# =============================================================================
+"""Test .scripts/wiki_wiki_lint.py against a small scratch wiki."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS = Path(__file__).resolve().parent.parent / '.scripts'
+sys.path.insert(0, str(SCRIPTS))
+
+import wiki_wiki_lint as lint  # noqa: E402
+
+WIKI = {
+    'wiki_pages/Home.md': '# Home\n\nSee [Setup](Setup) and [tuning](Setup#tuning).\n\n![Diagram](images/arch.png)\n',
+    'wiki_pages/Setup.md': '# Setup\n\n## Tuning\n\nBack to [Home](Home.md).\n',
+    'wiki_pages/FAQ.md': '# FAQ\n\nRead [the docs](https://example.com) or [jump](#faq).\n',
+    'wiki_pages/images/arch.png': 'png',
+}
+GRAPH = Path('.cache/wiki_link_graph.json')
+
+
+class WikiTestCase(unittest.TestCase):
+    """Scratch wiki, used as the working directory like the linter expects."""
+
+    def setUp(self):
+        """Write the wiki and change into it."""
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for relpath, content in WIKI.items():
+            path = self.root / relpath
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+
+    def tearDown(self):
+        """Remove the wiki."""
+        self._tmp.cleanup()
+
+    def scan(self, changed=None, graph_file=GRAPH, **kwargs):
+        return lint.scan_files([Path('wiki_pages')], jobs=1, graph_file=graph_file, changed=changed, **kwargs)
+
+    def checked(self, changed=None):
+        """Pages check_page ran on."""
+        with mock.patch.object(lint, 'check_page', wraps=lint.check_page) as check_page:
+            results = self.scan(changed)
+        return [call.args[0]['path'] for call in check_page.call_args_list], results
+
+    def touch(self, relpath, content=None):
+        path = Path(relpath)
+        stat = path.stat()
+        if content is not None:
+            path.write_text(content)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+class TestParsePage(WikiTestCase):
+    """Test reading a page into the index."""
+
+    def test_parse(self):
+        """Test headings, links and images are extracted."""
+        page = lint.parse_page('wiki_pages/Home.md')
+        self.assertFalse(page['unchanged'])
+        self.assertEqual(page['h1'], 'Home')
+        self.assertEqual(page['slugs'], ['home'])
+        # image syntax matches the link pattern too
+        self.assertEqual(page['links'], ['Setup', 'Setup#tuning', 'images/arch.png'])
+        self.assertEqual(page['images'], [('Diagram', 'images/arch.png')])
+        self.assertFalse(page['html_img'])
+        self.assertIsNone(lint.parse_page('wiki_pages/Missing.md'))
+
+    def test_known_sha256(self):
+        """Test an unchanged hash returns only the hash."""
+        sha256 = lint.parse_page('wiki_pages/Setup.md')['sha256']
+        self.assertEqual(lint.parse_page('wiki_pages/Setup.md', known_sha256=sha256),
+                         {'path': 'wiki_pages/Setup.md', 'sha256': sha256, 'unchanged': True})
+        self.assertEqual(lint.parse_page('wiki_pages/Setup.md', fix_h1=True, known_sha256=sha256)['slugs'],
+                         ['setup', 'tuning'])
+
+    def test_fix_h1(self):
+        """Test a mismatched H1 is rewritten from the file name."""
+        Path('wiki_pages/Setup.md').write_text('# Install\n\ntext\n')
+        self.assertEqual(lint.parse_page('wiki_pages/Setup.md', fix_h1=True)['fixed'], 'fix_h1')
+        self.assertEqual(Path('wiki_pages/Setup.md').read_text(), '# Setup\n\ntext\n')
+
+    def test_page_targets(self):
+        """Test links resolve page-relative and repo-relative, skipping URLs, anchors and YAML."""
+        page = {'path': 'wiki_pages/roles/Role.md', 'images': [('', 'img/a.png'), ('', 'https://x/b.png')],
+                'links': ['Home', '../Setup.md#tuning', '#local', 'mailto:a@b', 'https://x', 'vars.yml']}
+        self.assertEqual(lint.page_targets(page), {
+            'wiki_pages/roles/img/a.png', 'wiki_pages/roles/Home.md', 'Home.md', 'wiki_pages/Setup.md', '../Setup.md',
+        })
+
+
+class TestWikiIndex(WikiTestCase):
+    """Test the page and file existence index."""
+
+    def test_nested_roots(self):
+        """Test a page under two scanned roots is listed once, in root order."""
+        Path('wiki_pages/sub').mkdir()
+        Path('wiki_pages/sub/Deep.md').write_text('# Deep\n')
+        index = lint.WikiIndex([Path('wiki_pages/sub'), Path('wiki_pages')])
+        self.assertEqual(index.markdown_files(), [
+            'wiki_pages/sub/Deep.md', 'wiki_pages/FAQ.md', 'wiki_pages/Home.md', 'wiki_pages/Setup.md',
+        ])
+        self.assertTrue(index.exists('wiki_pages/images/../images/arch.png'))
+        self.assertFalse(index.exists('wiki_pages/images/missing.png'))
+
+    def test_anchors(self):
+        """Test anchors of pages outside the scan are read once and unreadable files give None."""
+        Path('README.md').write_text('# Readme\n## Quick Start!\n')
+        index = lint.WikiIndex([Path('wiki_pages')])
+        self.assertEqual(index.anchors('README.md'), {'readme', 'quick-start'})
+        Path('README.md').unlink()
+        self.assertEqual(index.anchors('README.md'), {'readme', 'quick-start'})
+        self.assertIsNone(index.anchors('Nope.md'))
+
+
+class TestLinkGraphCache(WikiTestCase):
+    """Test reuse and invalidation of the link graph."""
+
+    def test_full_scan(self):
+        """Test the fixture wiki lints without errors."""
+        results = self.scan()
+        self.assertEqual((results['files_scanned'], results['errors']), (3, []))
+
+    def test_reuse(self):
+        """Test unchanged pages are served from the graph and give the same results."""
+        first = self.scan()
+        self.assertEqual(first['link_graph'], {'pages': 3, 'cached': 0, 'parsed': 3})
+        second = self.scan()
+        self.assertEqual(second['link_graph'], {'pages': 3, 'cached': 3, 'parsed': 0})
+        self.assertEqual(second['warnings'], first['warnings'])
+        with mock.patch.object(lint, 'read_file_safe') as read:
+            self.scan()
+        read.assert_not_called()
+
+    def test_touched_page_is_not_reparsed(self):
+        """Test a page with a new mtime but the same content keeps its parse."""
+        self.scan()
+        self.touch('wiki_pages/Setup.md')
+        self.assertEqual(self.scan()['link_graph'], {'pages': 3, 'cached': 3, 'parsed': 0})
+        entry = json.loads(GRAPH.read_text())['pages']['wiki_pages/Setup.md']
+        self.assertEqual(entry['mtime_ns'], os.stat('wiki_pages/Setup.md').st_mtime_ns)
+
+    def test_changed_page_is_reparsed(self):
+        """Test new content (same size or not) is parsed again."""
+        self.scan()
+        self.touch('wiki_pages/Setup.md', '# Setup\n\n## Tunxng\n\nBack to [Home](Home.md).\n')
+        results = self.scan()
+        self.assertEqual(results['link_graph'], {'pages': 3, 'cached': 2, 'parsed': 1})
+        self.assertIn(('missing_anchor_in_target', 'wiki_pages/Home.md', 'Setup#tuning'), results['warnings'])
+        Path('wiki_pages/Setup.md').write_text('# Setup\n\n## Tuning\n')
+        self.assertEqual(self.scan()['link_graph']['parsed'], 1)
+
+    def test_stale_pages_and_versions(self):
+        """Test deleted pages leave the graph and another graph version is ignored."""
+        self.scan()
+        Path('wiki_pages/FAQ.md').unlink()
+        self.scan()
+        self.assertEqual(sorted(json.loads(GRAPH.read_text())['pages']), ['wiki_pages/Home.md', 'wiki_pages/Setup.md'])
+        GRAPH.write_text(json.dumps({'version': lint.LINK_GRAPH_VERSION + 1, 'pages': {}}))
+        self.assertEqual(self.scan()['link_graph']['parsed'], 2)
+
+    def test_fixed_h1_is_reparsed(self):
+        """Test a page rewritten by --fix-h1 is not served from its pre-fix entry."""
+        Path('wiki_pages/FAQ.md').write_text('Questions\n')
+        results = self.scan(fix_h1=True)
+        self.assertEqual(results['fixed'], [('insert_h1', 'wiki_pages/FAQ.md')])
+        self.assertEqual(self.scan()['link_graph'], {'pages': 3, 'cached': 2, 'parsed': 1})
+        self.assertEqual(self.scan()['errors'], [])
+
+    def test_no_cache(self):
+        """Test without a graph file every page is parsed and nothing is written."""
+        self.scan(graph_file=None)
+        self.assertEqual(self.scan(graph_file=None)['link_graph']['parsed'], 3)
+        self.assertFalse(GRAPH.exists())
+
+
+class TestChangedSelection(WikiTestCase):
+    """Test the pages --changed-since selects."""
+
+    def test_full_scan(self):
+        """Test without a change set every page is checked."""
+        self.assertEqual(self.checked()[0], ['wiki_pages/FAQ.md', 'wiki_pages/Home.md', 'wiki_pages/Setup.md'])
+
+    def test_changed_page_and_its_linkers(self):
+        """Test a changed page is checked with the pages linking to it."""
+        self.scan()
+        pages, results = self.checked({'wiki_pages/Setup.md'})
+        self.assertEqual(pages, ['wiki_pages/Home.md', 'wiki_pages/Setup.md'])
+        self.assertEqual(results['files_scanned'], 2)
+        self.assertEqual(self.checked({'wiki_pages/FAQ.md'})[0], ['wiki_pages/FAQ.md'])
+
+    def test_changed_image(self):
+        """Test a changed image selects the pages showing it."""
+        self.assertEqual(self.checked({'wiki_pages/images/arch.png'})[0], ['wiki_pages/Home.md'])
+
+    def test_nothing_changed(self):
+        """Test an empty change set checks nothing."""
+        self.scan()
+        self.assertEqual(self.checked(set())[0], [])
+
+    def test_edited_page_outside_change_set(self):
+        """Test a page the graph saw change is checked even if git did not report it."""
+        self.scan()
+        self.touch('wiki_pages/Setup.md', '# Setup\n\nBack to [Home](Home.md).\n')
+        pages, results = self.checked(set())
+        self.assertEqual(pages, ['wiki_pages/Home.md', 'wiki_pages/Setup.md'])
+        self.assertIn(('missing_anchor_in_target', 'wiki_pages/Home.md', 'Setup#tuning'), results['warnings'])
+
+    def test_deleted_page(self):
+        """Test deleting a page re-checks the pages linking to it."""
+        self.scan()
+        Path('wiki_pages/Setup.md').unlink()
+        pages, results = self.checked({'wiki_pages/Setup.md'})
+        self.assertEqual(pages, ['wiki_pages/Home.md'])
+        self.assertIn(('missing_page', 'wiki_pages/Home.md', 'Setup'), results['warnings'])
+
+    def test_deleted_page_outside_change_set(self):
+        """Test a page that vanished from the graph counts as changed."""
+        self.scan()
+        Path('wiki_pages/Setup.md').unlink()
+        self.assertEqual(self.checked(set())[0], ['wiki_pages/Home.md'])
+
+
+class TestGitChangedFiles(WikiTestCase):
+    """Test the change set taken from git and the command line."""
+
+    def git(self, *args):
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                       check=True, capture_output=True)
+
+    def setUp(self):
+        """Commit the wiki to a scratch repository."""
+        super().setUp()
+        self.git('init', '-q')
+        Path('.gitignore').write_text('.cache/\n')
+        self.git('add', '-A')
+        self.git('commit', '-qm', 'wiki')
+
+    def test_changed_files(self):
+        """Test committed, modified and untracked files are reported relative to the working directory."""
+        Path('wiki_pages/FAQ.md').write_text('# FAQ\n\nUpdated.\n')
+        self.git('commit', '-qam', 'faq')
+        Path('wiki_pages/Setup.md').write_text('# Setup\n')
+        Path('wiki_pages/New.md').write_text('# New\n')
+        self.assertEqual(lint.git_changed_files('HEAD'), {'wiki_pages/Setup.md', 'wiki_pages/New.md'})
+        self.assertEqual(lint.git_changed_files('HEAD~1'),
+                         {'wiki_pages/FAQ.md', 'wiki_pages/Setup.md', 'wiki_pages/New.md'})
+        os.chdir('wiki_pages')
+        self.assertEqual(lint.git_changed_files('HEAD'), {'Setup.md', 'New.md'})
+        with self.assertRaises(ValueError):
+            lint.git_changed_files('no-such-rev')
+
+    def test_command_line(self):
+        """Test --changed-since lints the changed page and its linkers and rejects bad revisions."""
+        command = [sys.executable, str(SCRIPTS / 'wiki_wiki_lint.py'), '--paths', 'wiki_pages', '--json', '-j', '1']
+        Path('wiki_pages/Setup.md').write_text('# Setup\n\nBack to [Home](Home.md).\n')
+        proc = subprocess.run(command + ['--changed-since', 'HEAD'], capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 1, proc.stderr)
+        results = json.loads(proc.stdout)
+        self.assertEqual(results['files_scanned'], 2)
+        self.assertIn(['missing_anchor_in_target', 'wiki_pages/Home.md', 'Setup#tuning'], results['warnings'])
+        self.assertTrue(GRAPH.exists())
+        proc = subprocess.run(command + ['--changed-since', 'no-such-rev'], capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn('--changed-since', proc.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()